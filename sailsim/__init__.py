@@ -0,0 +1,41 @@
+"""
+A program to simulate sailboats and test sailing algorithms.
+
+Submodules and the main classes are loaded on first access, so importing sailsim does not load
+the GUI, the noise library or NumPy.
+"""
+
+import importlib
+
+__version__ = "0.0.2"
+
+# Name -> module that defines it
+_LAZY_ATTRIBUTES = {
+    "Simulation": "sailsim.simulation.Simulation",
+    "Boat": "sailsim.boat.Boat",
+    "Sailor": "sailsim.sailor.Sailor",
+    "Wind": "sailsim.wind.Wind",
+    "Windfield": "sailsim.wind.Windfield",
+    "Fluctuationfield": "sailsim.wind.Fluctuationfield",
+    "Squallfield": "sailsim.wind.Squallfield",
+    "WindGrid": "sailsim.wind.WindGrid",
+}
+_SUBPACKAGES = ("boat", "gui", "sailor", "simulation", "utils", "wind")
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    """Import submodules and classes when they are accessed the first time."""
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    elif name in _SUBPACKAGES:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__) | set(_SUBPACKAGES))
@@ -1,4 +1,5 @@
 from math import sqrt, pi, sin, cos
+from typing import Optional
 
 from sailsim.boat.FrameList import FrameList
 from sailsim.sailor.Sailor import Sailor
@@ -42,7 +43,7 @@ class Boat:
     temp_rudderTorque: float
     temp_centerboardTorque: float
 
-    sailor: Sailor
+    sailor: Optional[Sailor]
 
     def __init__(self, posX: float = 0, posY: float = 0, direction: float = 0, speedX: float = 0, speedY: float = 0, angSpeed: float = 0) -> None:
         """
@@ -98,6 +99,8 @@ class Boat:
 
         self.frameList: FrameList = FrameList()
 
+        self.sailor = None
+
     # Simulation methods
     def applyCauses(self, forceX: float, forceY: float, torque: float, interval: float) -> None:
         """Change speed according a force & torque given."""
@@ -114,7 +117,7 @@ class Boat:
         self.posY += self.speedY * interval
         self.direction = directionKeepInterval(self.direction + self.angSpeed * interval)
 
-    def runSailor(self) -> None:
+    def runSailor(self, time: float = 0) -> None:
         """Activate the sailing algorithm to decide what the boat should do."""
         if self.sailor is not None:
             # Run sailor if sailor exists
@@ -125,7 +128,8 @@ class Boat:
                 cartToArg(self.speedX, self.speedY),
                 self.direction,
                 self.temp_apparentWindSpeed,
-                self.temp_apparentWindAngle
+                self.temp_apparentWindAngle,
+                time
             )
 
             # Retrieve boat properties from Sailor
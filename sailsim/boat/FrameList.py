@@ -1,5 +1,19 @@
 """This module includes everything to store the simulation of a boat."""
 
+# Names of all Frame attributes in the order of the .csv columns
+FRAME_FIELDS = (
+    "frameNr", "time",
+    "boatPosX", "boatPosY", "boatSpeedX", "boatSpeedY", "boatDirection", "boatAngSpeed",
+    "boatMainSailAngle", "boatRudderAngle",
+    "boatApparentWindX", "boatApparentWindY", "boatApparentWindAngle", "boatLeewayAngle", "boatAngleOfAttack",
+    "boatForceX", "boatForceY",
+    "boatSailDragX", "boatSailDragY", "boatSailLiftX", "boatSailLiftY",
+    "boatCenterboardDragX", "boatCenterboardDragY", "boatCenterboardLiftX", "boatCenterboardLiftY",
+    "boatRudderDragX", "boatRudderDragY", "boatRudderLiftX", "boatRudderLiftY",
+    "boatTorque", "boatWaterDragTorque", "boatCenterboardTorque", "boatRudderTorque",
+    "windX", "windY",
+)
+
 
 class Frame():
     """This class is holding all data about one frame in the simulation."""
@@ -86,6 +100,15 @@ class Frame():
         """Collect and save all information about the wind."""
         (self.windX, self.windY) = wind.getWindCart(x, y, self.time)
 
+    def setValues(self, values) -> None:
+        """Load all values from a sequence in the order of FRAME_FIELDS."""
+        self.__dict__.update(zip(FRAME_FIELDS, values))
+        self.frameNr = int(self.frameNr)
+
+    def getValues(self) -> list[float]:
+        """Return all values in the order of FRAME_FIELDS."""
+        return [getattr(self, name) for name in FRAME_FIELDS]
+
     def getCSVLine(self) -> str:
         """Return string that contains all data about this frame."""
         data = [
@@ -120,6 +143,15 @@ class FrameList():
         frame.collectWind(simulation.wind, posX, posY)
         self.frames.append(frame)
 
+    def appendValues(self, rows) -> None:
+        """Append a frame for every row of values in the order of FRAME_FIELDS."""
+        if hasattr(rows, "tolist"):
+            rows = rows.tolist()  # NumPy array to Python floats
+        for row in rows:
+            frame: Frame = Frame()
+            frame.setValues(row)
+            self.frames.append(frame)
+
     def reset(self) -> None:
         """Delete all previously saved frames."""
         self.frames = []
@@ -161,6 +193,17 @@ class FrameList():
         with open(name, "w", encoding="utf-8") as file:
             file.write(self.getCSV())
 
+    def getValues(self) -> list[list[float]]:
+        """Return the values of all frames, one row per frame in the order of FRAME_FIELDS."""
+        return [frame.getValues() for frame in self.frames]
+
+    def saveNumpy(self, name: str = "output.npy") -> None:
+        """Save all values as binary NumPy array with one row per frame, see FRAME_FIELDS for the columns."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        if not name.endswith(".npy"):
+            name += ".npy"
+        np.save(name, np.array(self.getValues(), dtype=np.float64).reshape(-1, len(FRAME_FIELDS)))
+
     def __getitem__(self, key: int) -> Frame:
         return self.frames.__getitem__(key)
 
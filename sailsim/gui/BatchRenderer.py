@@ -0,0 +1,268 @@
+"""
+Render simulation runs to images without a display.
+
+The map (following the boat) and the boat inspector are drawn side by side with Qt's offscreen platform,
+frame ranges are split across worker processes:
+
+    sailsim-render upwind.json --output frames --step 4 --jobs 4 --video upwind.mp4
+
+The frames of a run saved with `sailsim --binary` can be rendered without simulating again (--frames).
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter, sleep
+from typing import Any, Optional
+
+import numpy as np
+
+from sailsim.simulation.scenario import createSimulation, loadScenario
+
+DEFAULT_SIZE = (1280, 720)
+DEFAULT_SCALE = 8.0         # Pixels per meter of the map
+INSPECTOR_WIDTH = 0.3       # Part of the image that shows the boat inspector
+FRAME_PATTERN = "frame{:06d}.png"
+FFMPEG_PATTERN = "frame%06d.png"
+
+
+def ensureApplication():
+    """Return the QApplication, one with the offscreen platform is created if there is none."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication  # pylint: disable=import-outside-toplevel
+    return QApplication.instance() or QApplication([])
+
+
+class FrameRenderer:
+    """Draw frames of a boat with a MapViewScene and a BoatInspectorScene into QImages."""
+
+    def __init__(self, boat, wind=None, size: tuple[int, int] = DEFAULT_SIZE, scale: float = DEFAULT_SCALE) -> None:
+        """
+        Create a FrameRenderer, frames have to be rendered in increasing order.
+
+        The boat path is drawn up to the rendered frame, so the FrameRenderer has to be created before
+        frames are added to the frameList of the boat.
+
+        Args:
+            boat:   boat whose frames are rendered
+            wind:   wind that is shown in the overlay of the map, None to hide it
+            size:   width and height of the images (in pixels)
+            scale:  pixels per meter of the map
+        """
+        from sailsim.gui.boatInspector import BoatInspectorScene  # pylint: disable=import-outside-toplevel
+        from sailsim.gui.mapView import MapViewScene  # pylint: disable=import-outside-toplevel
+
+        self.app = ensureApplication()
+        self.boat = boat
+        self.size = size
+        self.scale = scale
+        self.mapScene = MapViewScene(boat, wind)
+        if wind is not None:
+            self.mapScene.windOverlay.setVisible(True)
+        if boat.sailor is None:
+            self.mapScene.waypoints.setVisible(False)
+        self.inspectorScene = BoatInspectorScene(boat)
+
+    def render(self, framenumber: int):
+        """Return a QImage of a frame."""
+        # pylint: disable=import-outside-toplevel
+        from PySide6.QtCore import QRectF, Qt
+        from PySide6.QtGui import QColor, QImage, QPainter
+
+        (width, height) = self.size
+        mapWidth = round(width * (1 - INSPECTOR_WIDTH))
+        frame = self.boat.frameList[framenumber]
+        self.mapScene.path.extendBoatPath(framenumber + 1)
+        self.mapScene.viewFrame(framenumber)
+        self.inspectorScene.viewFrame(framenumber)
+        source = QRectF(0, 0, mapWidth / self.scale, height / self.scale)
+        source.moveCenter(self.mapScene.boat.pos())
+        self.waitForWind(source)
+
+        image = QImage(width, height, QImage.Format_RGB32)
+        image.fill(QColor(156, 211, 219))
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.mapScene.render(painter, QRectF(0, 0, mapWidth, height), source)
+        inspectorWidth = width - mapWidth
+        self.inspectorScene.render(painter, QRectF(mapWidth, (height - inspectorWidth) / 2, inspectorWidth, inspectorWidth), QRectF(-8, -8, 16, 16))
+        painter.setPen(Qt.black)
+        painter.drawText(10, 20, f"frame {int(frame.frameNr)}  t = {frame.time:.2f}s")
+        painter.end()
+        return image
+
+    def waitForWind(self, source) -> None:
+        """Render the wind tiles of the map area synchronously, the overlay draws tiles as they arrive in the GUI."""
+        overlay = self.mapScene.windOverlay
+        if overlay is None or not overlay.isVisible():
+            return
+        from PySide6.QtGui import QImage, QPainter  # pylint: disable=import-outside-toplevel
+        (width, height) = (round(source.width() * self.scale), round(source.height() * self.scale))
+        probe = QImage(max(width, 1), max(height, 1), QImage.Format_RGB32)
+        painter = QPainter(probe)
+        self.mapScene.render(painter, probe.rect(), source)  # Requests the missing tiles
+        painter.end()
+        while overlay.renderer.pending:
+            sleep(0.001)
+            self.app.processEvents()
+
+    def close(self) -> None:
+        self.mapScene.close()
+
+
+def splitRange(first: int, last: int, step: int, parts: int) -> list[tuple[int, int]]:
+    """Split the frames first, first + step, ... up to last into at most parts ranges (start, stop) that start on the steps."""
+    count = (last - first) // step + 1
+    parts = max(min(parts, count), 1)
+    bounds = [first + (count * part // parts) * step for part in range(parts + 1)]
+    bounds[-1] = last + 1
+    return [(bounds[part], bounds[part + 1]) for part in range(parts)]
+
+
+def renderRange(scenario: dict[str, Any], framesPath: str, start: int, stop: int, step: int, first: int, outputDir: str,
+                size: tuple[int, int] = DEFAULT_SIZE, scale: float = DEFAULT_SCALE, wind: bool = False) -> int:
+    """
+    Render the frames start, start + step, ... before stop to PNG files, can run in a worker process. Return the number of images.
+
+    The images are numbered from frame first on, so the ranges of all workers form one sequence.
+
+    Args:
+        scenario:   scenario of the run, the boat and the sailor are shown
+        framesPath: .npy file with all frames of the run, see FrameList.saveNumpy
+        start:      first frame of the range
+        stop:       end of the range (exclusive)
+        step:       render every step-th frame
+        first:      frame of the first image of the sequence
+        outputDir:  folder for the images
+        size:       width and height of the images (in pixels)
+        scale:      pixels per meter of the map
+        wind:       show the wind overlay
+    """
+    simulation = createSimulation(scenario)
+    boat = simulation.boat
+    renderer = FrameRenderer(boat, simulation.wind if wind else None, size, scale)
+    boat.frameList.appendValues(np.load(framesPath, mmap_mode="r")[:stop])
+    count = 0
+    try:
+        for framenumber in range(start, min(stop, len(boat.frameList)), step):
+            image = renderer.render(framenumber)
+            image.save(os.path.join(outputDir, FRAME_PATTERN.format((framenumber - first) // step)))
+            count += 1
+    finally:
+        renderer.close()
+    return count
+
+
+def _renderRangeArgs(args: tuple) -> int:
+    """Unpack arguments for executor.map."""
+    return renderRange(*args)
+
+
+def encodeVideo(outputDir: str, path: str, fps: float) -> bool:
+    """Encode the images of a folder to a video with ffmpeg. Return False if ffmpeg is not installed."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return False
+    subprocess.run([ffmpeg, "-loglevel", "error", "-y", "-framerate", f"{fps:g}", "-i", os.path.join(outputDir, FFMPEG_PATTERN),
+                    "-pix_fmt", "yuv420p", path], check=True)
+    return True
+
+
+def renderRun(scenario: dict[str, Any], outputDir: str, framesPath: Optional[str] = None, first: int = 0, last: Optional[int] = None,
+              step: int = 1, jobs: Optional[int] = 1, size: tuple[int, int] = DEFAULT_SIZE, scale: float = DEFAULT_SCALE,
+              wind: bool = False, video: Optional[str] = None, fps: Optional[float] = None) -> dict[str, Any]:
+    """
+    Render a run to a PNG sequence and optionally to a video. Return a summary of the rendering.
+
+    Args:
+        scenario:   scenario of the run
+        outputDir:  folder for the images
+        framesPath: .npy file with the frames of the run, the scenario is simulated if it is None
+        first:      first frame that is rendered
+        last:       last frame that is rendered, default: last frame of the run
+        step:       render every step-th frame
+        jobs:       number of worker processes, None: number of cpus
+        size:       width and height of the images (in pixels)
+        scale:      pixels per meter of the map
+        wind:       show the wind overlay
+        video:      path of a video that is encoded with ffmpeg if it is installed
+        fps:        frame rate of the video, default: real time
+    """
+    startTime = perf_counter()
+    os.makedirs(outputDir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as temporary:
+        if framesPath is None:
+            from sailsim.simulation.StopConditions import Watchdog  # pylint: disable=import-outside-toplevel
+            simulation = createSimulation(scenario)
+            simulation.addStopCondition(Watchdog())
+            simulation.run()
+            framesPath = os.path.join(temporary, "frames.npy")
+            simulation.boat.frameList.saveNumpy(framesPath)
+        frameCount = len(np.load(framesPath, mmap_mode="r"))
+        last = frameCount - 1 if last is None else min(last, frameCount - 1)
+        if last < first:
+            raise ValueError(f"no frames to render from {first} to {last}")
+
+        ranges = splitRange(first, last, step, jobs or os.cpu_count() or 1)
+        arguments = [(scenario, framesPath, start, stop, step, first, outputDir, size, scale, wind) for (start, stop) in ranges]
+        if len(arguments) == 1:
+            images = renderRange(*arguments[0])
+        else:
+            # Fresh interpreters, a forked process would inherit the Qt and thread state of this one
+            with ProcessPoolExecutor(len(arguments), mp_context=get_context("spawn")) as pool:
+                images = sum(pool.map(_renderRangeArgs, arguments))
+
+    summary: dict[str, Any] = {"images": images, "video": None}
+    if video is not None:
+        timestep = createSimulation(scenario).timestep
+        if encodeVideo(outputDir, video, fps or 1 / (timestep * step)):
+            summary["video"] = video
+    summary["wallTime"] = perf_counter() - startTime
+    return summary
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    """Entry point of the sailsim-render command."""
+    parser = argparse.ArgumentParser(prog="sailsim-render", description="Render a sailsim run to images and video without display.")
+    parser.add_argument("scenario", help="scenario file (.json or .toml)")
+    parser.add_argument("-o", "--output", default="frames", help="folder for the images, default: frames")
+    parser.add_argument("--frames", metavar="NPY", help="frames of the run saved by sailsim --binary, default: simulate the scenario")
+    parser.add_argument("--first", type=int, default=0, help="first frame, default: 0")
+    parser.add_argument("--last", type=int, help="last frame, default: last frame of the run")
+    parser.add_argument("--step", type=int, default=1, help="render every STEP-th frame, default: 1")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes, 0: number of cpus, default: 1")
+    parser.add_argument("--size", default=f"{DEFAULT_SIZE[0]}x{DEFAULT_SIZE[1]}", help="image size WIDTHxHEIGHT, default: %(default)s")
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE, help="pixels per meter of the map, default: %(default)s")
+    parser.add_argument("--wind", action="store_true", help="show the wind overlay")
+    parser.add_argument("--video", help="encode the images to this video file (requires ffmpeg)")
+    parser.add_argument("--fps", type=float, help="frame rate of the video, default: real time")
+    args = parser.parse_args(arguments)
+
+    try:
+        size = tuple(int(value) for value in args.size.lower().split("x"))
+        if len(size) != 2 or min(size) < 1:
+            raise ValueError
+    except ValueError:
+        parser.error(f"invalid size {args.size!r}, expected WIDTHxHEIGHT")
+    if args.step < 1:
+        parser.error("step has to be at least 1")
+
+    try:
+        summary = renderRun(loadScenario(args.scenario), args.output, args.frames, args.first, args.last, args.step, args.jobs or None,
+                            size, args.scale, args.wind, args.video, args.fps)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        print(f"{args.scenario}: {type(error).__name__}: {error}", file=sys.stderr)
+        return 1
+    print(f"{summary['images']} images in {summary['wallTime']:.1f}s")
+    if args.video is not None and summary["video"] is None:
+        print("ffmpeg not found, no video was encoded", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,13 +10,21 @@ from sailsim.gui.tkinterutils import exitMsg, drawCompass
 
 
 class ConfigBoat(Tk):
-    def __init__(self, boat, wind=None):
-        """Create a boat config window."""
+    def __init__(self, boat, wind=None, changed=None):
+        """
+        Create a boat config window.
+
+        Args:
+            boat:       boat to configure
+            wind:       wind that is shown
+            changed:    function that is called after the values were saved, e.g. CheckpointLog.restart
+        """
         super().__init__()
         self.title("Configure Boat")
 
         self.boat = boat
         self.wind = wind
+        self.changed = changed
 
         # Position and rotation control
         self.posControl = Frame(self)
@@ -127,6 +135,9 @@ class ConfigBoat(Tk):
         self.boat.hullArea = stringToFloat(self.varHullArea.get())
         self.boat.centerboardArea = stringToFloat(self.varCenterboardArea.get())
 
+        if self.changed is not None:
+            self.changed()
+
     # Canvas update methods
     def updateCanvasBoat(self, *args):
         """Update direction of boat arrow based on scale position of direction. Also updates the main sail."""
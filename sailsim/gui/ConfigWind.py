@@ -13,11 +13,19 @@ from sailsim.gui.tkinterutils import exitMsg, drawCompass
 
 
 class ConfigWind(Tk):
-    def __init__(self, wind):
+    def __init__(self, wind, changed=None):
+        """
+        Create a wind config window.
+
+        Args:
+            wind:       wind to configure
+            changed:    function that is called after the values were applied, e.g. lambda: log.resimulateFrom(0)
+        """
         super().__init__()
         self.title("Configure Boat")
 
         self.wind = wind
+        self.changed = changed
 
         self.list = Listbox(self, selectmode="browse", exportselection=False)
         self.list.grid(row=0, column=0, columnspan=2, sticky="ns")
@@ -66,6 +74,8 @@ class ConfigWind(Tk):
     def buttonApply(self):
         for windFrame in self.windFrames:
             windFrame.write()
+        if self.changed is not None:
+            self.changed()
 
     def buttonCancel(self):
         exitMsg(self.buttonApply, self)
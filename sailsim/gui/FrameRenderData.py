@@ -0,0 +1,138 @@
+"""This module contains the FrameRenderData class that precomputes the geometry of the boat items for all frames."""
+
+from operator import attrgetter
+
+import numpy as np
+
+from sailsim.boat.FrameList import FrameList
+from sailsim.utils.vectorized import cartToArg, polarToCart
+
+# Geometry of the boat drawing (in m)
+SAIL_LENGTH = 2.0
+RUDDER_OFFSET = 2.2     # Distance of the rudder axis from the center of the boat
+RUDDER_LENGTH = 0.5
+
+# Vectors are drawn with the speed in m/s and forces in N * FORCE_SCALE
+FORCE_SCALE = 1 / 1024
+ARROW_ANGLE = 0.4       # Angle between arrow line and head (in rad)
+
+# Arrows of GUIBoatVectors: name, frame fields of the vector, scale, starts at the rudder
+ARROWS = (
+    ("boatSpeed", "boatSpeedX", "boatSpeedY", 1.0, False),
+    ("boatForce", "boatForceX", "boatForceY", FORCE_SCALE, False),
+    ("boatForceSailDrag", "boatSailDragX", "boatSailDragY", FORCE_SCALE, False),
+    ("boatForceSailLift", "boatSailLiftX", "boatSailLiftY", FORCE_SCALE, False),
+    ("boatForceCenterboardDrag", "boatCenterboardDragX", "boatCenterboardDragY", FORCE_SCALE, False),
+    ("boatForceCenterboardLift", "boatCenterboardLiftX", "boatCenterboardLiftY", FORCE_SCALE, False),
+    ("boatForceRudderDrag", "boatRudderDragX", "boatRudderDragY", FORCE_SCALE, True),
+    ("boatForceRudderLift", "boatRudderLiftX", "boatRudderLiftY", FORCE_SCALE, True),
+)
+
+# Frame fields the rows are computed from
+RENDER_FIELDS = ("boatPosX", "boatPosY", "boatDirection", "boatMainSailAngle", "boatRudderAngle") + tuple(
+    field for (_, fieldX, fieldY, *_) in ARROWS for field in (fieldX, fieldY))
+
+# Columns of a row: pose of the boat (posX, posY, rotation, sailX, sailY, rudderX, rudderY) in scene coordinates,
+# bounding box of all arrow lines (minX, minY, maxX, maxY) and for every arrow its line (x1, y1, x2, y2) and
+# the directions of both sides of its head (x, y, x, y)
+POSE_COLUMNS = 7
+BOUNDS_COLUMN = POSE_COLUMNS
+ARROWS_COLUMN = BOUNDS_COLUMN + 4
+ARROW_COLUMNS = 8
+COLUMN_COUNT = ARROWS_COLUMN + ARROW_COLUMNS * len(ARROWS)
+
+
+def headDirections(dx: np.ndarray, dy: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return the directions (x1, y1, x2, y2) of both sides of the arrow heads of lines (dx, dy), the sides are drawn back from the tip."""
+    argument = cartToArg(dx, dy)
+    return polarToCart(1.0, argument - ARROW_ANGLE) + polarToCart(1.0, argument + ARROW_ANGLE)
+
+
+class FrameRenderData:
+    """
+    Scene geometry of GUIBoat and GUIBoatVectors for every frame of a FrameList.
+
+    The rows are computed with NumPy for all frames at once and for the new frames when the FrameList grew,
+    so showing a frame is a row lookup without any trigonometry.
+    """
+
+    def __init__(self, frameList: FrameList) -> None:
+        """
+        Create FrameRenderData, the rows are computed when they are needed first.
+
+        Args:
+            frameList:  frames of the boat
+        """
+        self.frameList = frameList
+        self.values = np.empty((0, COLUMN_COUNT))
+        self.count = 0  # Frames with computed rows
+
+    def extend(self, frameCount: int = -1) -> None:
+        """Compute the rows of the frames up to frameCount (default: all frames), all rows are rebuilt if there are fewer frames than before."""
+        if frameCount < 0:
+            frameCount = len(self.frameList)
+        if frameCount < self.count:
+            self.count = 0
+        if frameCount == self.count:
+            return
+        if frameCount > len(self.values):
+            capacity = max(2 * len(self.values), frameCount, 1024)
+            self.values = np.resize(self.values, (capacity, COLUMN_COUNT))
+        getter = attrgetter(*RENDER_FIELDS)
+        values = np.array([getter(frame) for frame in self.frameList.frames[self.count:frameCount]], dtype=np.float64)
+        self.values[self.count:frameCount] = self.computeRows(dict(zip(RENDER_FIELDS, values.T)))
+        self.count = frameCount
+
+    @staticmethod
+    def computeRows(columns: dict[str, np.ndarray]) -> np.ndarray:
+        """Return the rows for frames given as an array of every field of RENDER_FIELDS."""
+        column = columns.__getitem__
+        rows = np.empty((len(columns["boatPosX"]), COLUMN_COUNT))
+        direction = column("boatDirection")
+        sail = column("boatMainSailAngle")
+        rudder = column("boatRudderAngle")
+        # Scene y is -y
+        rows[:, 0] = column("boatPosX")
+        rows[:, 1] = -column("boatPosY")
+        rows[:, 2] = np.degrees(direction)
+        (sailX, sailY) = polarToCart(SAIL_LENGTH, sail)
+        rows[:, 3] = -sailX
+        rows[:, 4] = sailY
+        (rudderBladeX, rudderBladeY) = polarToCart(RUDDER_LENGTH, rudder)
+        rows[:, 5] = rudderBladeX
+        rows[:, 6] = RUDDER_OFFSET + rudderBladeY
+
+        (rudderX, rudderY) = polarToCart(RUDDER_OFFSET, direction)
+        rudderX = -rudderX
+        for (index, (_, fieldX, fieldY, scale, atRudder)) in enumerate(ARROWS):
+            first = ARROWS_COLUMN + index * ARROW_COLUMNS
+            dx = column(fieldX) * scale
+            dy = -column(fieldY) * scale
+            (x1, y1) = (rudderX, rudderY) if atRudder else (0.0, 0.0)
+            rows[:, first] = x1
+            rows[:, first + 1] = y1
+            rows[:, first + 2] = x1 + dx
+            rows[:, first + 3] = y1 + dy
+            for (offset, head) in enumerate(headDirections(dx, dy)):
+                rows[:, first + 4 + offset] = head
+
+        # Every arrow starts or ends at one of these points
+        starts = ARROWS_COLUMN + ARROW_COLUMNS * np.arange(len(ARROWS))
+        xs = rows[:, np.concatenate((starts, starts + 2))]
+        ys = rows[:, np.concatenate((starts + 1, starts + 3))]
+        rows[:, BOUNDS_COLUMN] = xs.min(axis=1)
+        rows[:, BOUNDS_COLUMN + 1] = ys.min(axis=1)
+        rows[:, BOUNDS_COLUMN + 2] = xs.max(axis=1)
+        rows[:, BOUNDS_COLUMN + 3] = ys.max(axis=1)
+        return rows
+
+    def row(self, framenumber: int) -> list[float]:
+        """Return the row of a frame, the rows of frames that were added to the FrameList are computed first."""
+        if framenumber >= self.count:
+            self.extend()
+        if not 0 <= framenumber < self.count:
+            raise IndexError(f"frame {framenumber} out of range")
+        return self.values[framenumber].tolist()
+
+    def __len__(self) -> int:
+        return self.count
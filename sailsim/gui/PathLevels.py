@@ -0,0 +1,168 @@
+"""This module contains the PathLevels class that keeps a polyline in several levels of detail."""
+
+from array import array
+from math import floor, inf
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+class PathLevels:
+    """
+    Polyline that is simplified for several zoom levels while points are appended.
+
+    Level 0 holds every point, level k keeps the points of level k - 1 that are at least tolerances[k]
+    away from the last point it kept (radial distance simplification). As the tolerances double with
+    every level, every point of the polyline is less than 2 * tolerances[k] away from a point of level k.
+
+    Points added with extendArrays() are simplified with NumPy by keeping the first point of every run of
+    points in the same cell of a grid with the tolerance of the level, they are less than sqrt(2) * tolerances[k]
+    away from a kept point.
+
+    Each level is split into chunks of chunkSize points with their bounding boxes, so only the chunks
+    in view have to be drawn. Consecutive chunks share their boundary point.
+    """
+
+    def __init__(self, baseTolerance: float = 0.02, levelCount: int = 16, chunkSize: int = 1024) -> None:
+        """
+        Create empty PathLevels.
+
+        Args:
+            baseTolerance:  tolerance of level 1 (in m), it doubles with every level
+            levelCount:     number of levels including level 0
+            chunkSize:      points per chunk
+        """
+        self.tolerances: list[float] = [0.0] + [baseTolerance * 2**k for k in range(levelCount - 1)]
+        self.chunkSize = chunkSize
+        self.chunks: list[list[array]] = []               # level -> chunk -> x0, y0, x1, y1, ...
+        self.bounds: list[list[list[float]]] = []         # level -> chunk -> minX, minY, maxX, maxY
+        self.count = 0
+        self.clear()
+
+    def clear(self) -> None:
+        """Delete all points."""
+        self.chunks = [[] for _ in self.tolerances]
+        self.bounds = [[] for _ in self.tolerances]
+        self.count = 0
+        # Level 0 keeps every point, it has the tolerance -1
+        self._levels = list(zip(self.chunks, self.bounds, [-1.0] + [tolerance**2 for tolerance in self.tolerances[1:]]))
+
+    def append(self, x: float, y: float) -> None:
+        """Add a point to the end of the polyline."""
+        self.count += 1
+        if self.count == 1:
+            for level in range(len(self.tolerances)):
+                self.newChunk(level, x, y)
+            return
+        chunkLength = 2 * self.chunkSize
+        for (chunks, bounds, toleranceSq) in self._levels:
+            chunk = chunks[-1]
+            deltaX = x - chunk[-2]
+            deltaY = y - chunk[-1]
+            if deltaX * deltaX + deltaY * deltaY < toleranceSq:
+                return  # Coarser levels have larger tolerances, they don't keep the point either
+            if len(chunk) >= chunkLength:
+                chunk = array("d", (chunk[-2], chunk[-1]))
+                chunks.append(chunk)
+                bounds.append([chunk[0], chunk[1], chunk[0], chunk[1]])
+            chunk.append(x)
+            chunk.append(y)
+            box = bounds[-1]
+            if x < box[0]:
+                box[0] = x
+            elif x > box[2]:
+                box[2] = x
+            if y < box[1]:
+                box[1] = y
+            elif y > box[3]:
+                box[3] = y
+
+    def newChunk(self, level: int, x: float, y: float) -> None:
+        self.chunks[level].append(array("d", (x, y)))
+        self.bounds[level].append([x, y, x, y])
+
+    def extend(self, points) -> None:
+        """Add points (x, y) to the end of the polyline."""
+        for (x, y) in points:
+            self.append(x, y)
+
+    def extendArrays(self, xs, ys) -> None:
+        """Add many points given as arrays of x and y coordinates to the end of the polyline."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if xs.size == 0:
+            return
+        if self.count == 0:
+            self.append(float(xs[0]), float(ys[0]))
+            (xs, ys) = (xs[1:], ys[1:])
+        for (level, tolerance) in enumerate(self.tolerances):
+            if level == 0:
+                self.appendArrays(level, xs, ys)
+                continue
+            cellsX = np.floor(xs / tolerance)
+            cellsY = np.floor(ys / tolerance)
+            last = self.chunks[level][-1]
+            previousX = np.concatenate(([floor(last[-2] / tolerance)], cellsX[:-1]))
+            previousY = np.concatenate(([floor(last[-1] / tolerance)], cellsY[:-1]))
+            keep = (cellsX != previousX) | (cellsY != previousY)
+            self.appendArrays(level, xs[keep], ys[keep])
+        self.count += xs.size
+
+    def appendArrays(self, level: int, xs: np.ndarray, ys: np.ndarray) -> None:
+        """Append points to the chunks of a level without simplifying them."""
+        points = np.empty(2 * xs.size)
+        points[0::2] = xs
+        points[1::2] = ys
+        chunks = self.chunks[level]
+        bounds = self.bounds[level]
+        chunkLength = 2 * self.chunkSize
+        while points.size:
+            chunk = chunks[-1]
+            if len(chunk) >= chunkLength:
+                chunk = array("d", (chunk[-2], chunk[-1]))
+                chunks.append(chunk)
+                bounds.append([chunk[0], chunk[1], chunk[0], chunk[1]])
+            part = points[:chunkLength - len(chunk)]
+            points = points[part.size:]
+            chunk.frombytes(part.tobytes())
+            box = bounds[-1]
+            box[:] = [min(box[0], float(part[0::2].min())), min(box[1], float(part[1::2].min())),
+                      max(box[2], float(part[0::2].max())), max(box[3], float(part[1::2].max()))]
+
+    def levelFor(self, pixelSize: float, maxError: float = 0.5) -> int:
+        """Return the coarsest level that differs from the polyline by at most maxError pixels of pixelSize (in m)."""
+        level = 0
+        for k, tolerance in enumerate(self.tolerances):
+            if 2 * tolerance <= pixelSize * maxError:
+                level = k
+        return level
+
+    def visibleChunks(self, level: int, rect: Optional[tuple[float, float, float, float]] = None) -> Iterator[int]:
+        """Yield the indices of the chunks of a level that intersect rect (minX, minY, maxX, maxY), all if rect is None."""
+        for index, (minX, minY, maxX, maxY) in enumerate(self.bounds[level]):
+            if rect is None or (minX <= rect[2] and maxX >= rect[0] and minY <= rect[3] and maxY >= rect[1]):
+                yield index
+
+    def points(self, level: int) -> list[tuple[float, float]]:
+        """Return all points of a level."""
+        result = []
+        for index, chunk in enumerate(self.chunks[level]):
+            start = 0 if index == 0 else 2  # Skip the shared boundary point
+            result.extend(zip(chunk[start::2], chunk[start + 1::2]))
+        return result
+
+    def boundingBox(self) -> Optional[tuple[float, float, float, float]]:
+        """Return minX, minY, maxX, maxY of all points or None if there are none."""
+        if not self.bounds[0]:
+            return None
+        box = [inf, inf, -inf, -inf]
+        for (minX, minY, maxX, maxY) in self.bounds[0]:
+            box = [min(box[0], minX), min(box[1], minY), max(box[2], maxX), max(box[3], maxY)]
+        return tuple(box)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        sizes = [sum(len(chunk) // 2 for chunk in chunks) for chunks in self.chunks]
+        return f"PathLevels {self.count} points, levels: {sizes}"
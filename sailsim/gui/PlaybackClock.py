@@ -0,0 +1,64 @@
+"""This module contains the PlaybackClock class that maps wall-clock time to frames for playback."""
+
+from math import floor
+from time import perf_counter
+from typing import Callable
+
+# Speed multipliers offered by the GUI, negative speeds play backwards
+PLAYBACK_SPEEDS = (-10.0, -4.0, -2.0, -1.0, -0.5, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 10.0, 100.0)
+
+
+class PlaybackClock:
+    """
+    Compute the frame that should be shown from the time elapsed since playback started.
+
+    Frames are skipped if the display can't keep up, so playback never falls behind the wall clock.
+    """
+
+    def __init__(self, timestep: float, speed: float = 1.0, clock: Callable[[], float] = perf_counter) -> None:
+        """
+        Create a PlaybackClock.
+
+        Args:
+            timestep:   time between two frames of the simulation (in s)
+            speed:      simulated seconds per wall-clock second, negative to play backwards
+            clock:      function returning the wall-clock time (in s)
+        """
+        self.timestep = timestep
+        self.speed = speed
+        self.clock = clock
+        self.startFrame = 0
+        self.startTime = 0.0
+
+    def start(self, frame: int) -> None:
+        """Start playback at a frame, e.g. when playing starts or the user moved the slider."""
+        self.startFrame = frame
+        self.startTime = self.clock()
+
+    def setSpeed(self, speed: float) -> None:
+        """Change the speed, playback continues from the current frame."""
+        frame = self.frame()
+        self.speed = speed
+        self.startFrame = frame
+        self.startTime = self.clock()
+
+    def frame(self) -> float:
+        """Return the (fractional) frame at the current time."""
+        return self.startFrame + (self.clock() - self.startTime) * self.speed / self.timestep
+
+    def targetFrame(self, firstFrame: int, lastFrame: int) -> tuple[int, bool]:
+        """
+        Return the frame to show now and whether it was limited to firstFrame or lastFrame.
+
+        When it is limited, playback is restarted at the limit, so it continues in real time if the
+        range grows (e.g. while frames are simulated) instead of jumping ahead.
+        """
+        frame = self.frame()
+        if frame > lastFrame or frame < firstFrame:
+            limit = lastFrame if frame > lastFrame else firstFrame
+            self.start(limit)
+            return (limit, True)
+        return (floor(frame + 1e-6), False)  # Tolerate rounding errors of the float times
+
+    def __repr__(self) -> str:
+        return f"PlaybackClock {self.speed}x @frm{floor(self.frame())}"
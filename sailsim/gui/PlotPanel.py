@@ -0,0 +1,201 @@
+"""This module contains the PlotPanel widget that plots frame values over time."""
+
+from typing import Optional, Sequence
+
+import numpy as np
+from PySide6.QtCore import QPointF, Qt, Signal
+from PySide6.QtGui import QColor, QPainter, QPen, QPolygonF
+from PySide6.QtWidgets import QMenu, QWidget
+
+from sailsim.boat.FrameList import FRAME_FIELDS, FrameList
+from sailsim.gui.SeriesPyramid import SeriesPyramid
+
+# Fields that can be plotted and the fields that are plotted by default
+PLOT_FIELDS = FRAME_FIELDS[2:]
+DEFAULT_PLOT_FIELDS = ("boatSpeedX", "boatSpeedY")
+PLOT_COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f")
+
+# Smallest number of frames that can be shown when zooming in
+MIN_VIEW_FRAMES = 10
+
+
+class PlotPanel(QWidget):
+    """
+    Plot frame values over the frame number.
+
+    Every field is kept in a SeriesPyramid, so only the minimum and maximum per pixel column are drawn
+    no matter how many frames are shown. The mouse wheel zooms, dragging with the middle button pans,
+    clicking or dragging with the left button selects a frame and the right button chooses the fields.
+    """
+
+    frameSelected = Signal(int)
+
+    def __init__(self, frameList: FrameList, fields: Sequence[str] = DEFAULT_PLOT_FIELDS, parent=None) -> None:
+        """
+        Create a PlotPanel, call extend() when frames were added to frameList.
+
+        Args:
+            frameList:  frames to plot
+            fields:     names of the frame fields to plot, see PLOT_FIELDS
+            parent:     parent widget
+        """
+        super().__init__(parent)
+        self.frameList = frameList
+        self.series: dict[str, SeriesPyramid] = {}
+        self.count = 0                                      # Frames in the series
+        self.view: Optional[tuple[float, float]] = None     # Shown frames (start, stop), None shows all
+        self.frame = 0
+        self.panStart: Optional[tuple[float, tuple[float, float]]] = None
+        self.setMinimumHeight(80)
+        self.setFields(fields)
+
+    def setFields(self, fields: Sequence[str]) -> None:
+        """Plot the fields, the series of fields that were plotted before are kept."""
+        for field in fields:
+            if field not in PLOT_FIELDS:
+                raise ValueError(f"{field} can't be plotted")
+        self.series = {field: self.series[field] if field in self.series else self.loadSeries(field, 0, self.count) for field in fields}
+        self.update()
+
+    def loadSeries(self, field: str, start: int, stop: int, series: Optional[SeriesPyramid] = None) -> SeriesPyramid:
+        """Append the values of the frames start to stop (exclusive) of a field to a series."""
+        if series is None:
+            series = SeriesPyramid()
+        frames = self.frameList.frames
+        series.extend(np.fromiter((getattr(frames[index], field) for index in range(start, stop)), np.float64, stop - start))
+        return series
+
+    def extend(self, frameCount: int) -> None:
+        """Add the frames up to frameCount to the plot, the plot is rebuilt if there are fewer frames than before."""
+        if frameCount < self.count:
+            for series in self.series.values():
+                series.clear()
+            self.count = 0
+        if frameCount == self.count:
+            return
+        for (field, series) in self.series.items():
+            self.loadSeries(field, self.count, frameCount, series)
+        self.count = frameCount
+        self.update()
+
+    def setFrame(self, frame: int) -> None:
+        """Move the cursor to a frame, the view follows if the frame isn't shown."""
+        self.frame = frame
+        if self.view is not None:
+            (start, stop) = self.view
+            if not start <= frame <= stop:
+                width = stop - start
+                start = min(max(frame - width / 2, 0), max(self.count - 1 - width, 0))
+                self.view = (start, start + width)
+        self.update()
+
+    def viewRange(self) -> tuple[float, float]:
+        """Return first and last frame that are shown."""
+        if self.view is None:
+            return (0, max(self.count - 1, 1))
+        return self.view
+
+    def setView(self, start: float, stop: float) -> None:
+        """Show the frames start to stop, the range is limited to the frames."""
+        last = max(self.count - 1, 1)
+        width = min(max(stop - start, MIN_VIEW_FRAMES), last)
+        start = min(max(start, 0), last - width)
+        self.view = None if width >= last else (start, start + width)
+        self.update()
+
+    def frameAt(self, x: float) -> float:
+        """Return the frame at the x coordinate of the widget."""
+        (start, stop) = self.viewRange()
+        return start + x / max(self.width(), 1) * (stop - start)
+
+    # Drawing
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), QColor("white"))
+        (start, stop) = self.viewRange()
+        width = self.width()
+        height = self.height()
+        first = int(start)
+        last = int(stop) + 2  # Include the frame after the view, so the line reaches the border
+
+        valueRange = [np.inf, -np.inf]
+        for series in self.series.values():
+            limits = series.range(first, last)
+            if limits is not None and np.isfinite(limits).all():
+                valueRange = [min(valueRange[0], limits[0]), max(valueRange[1], limits[1])]
+        if valueRange[0] > valueRange[1]:
+            valueRange = [-1, 1]
+        (low, high) = valueRange
+        margin = (high - low) * 0.05 or 1
+        (low, high) = (low - margin, high + margin)
+
+        scaleX = width / (stop - start)
+        scaleY = height / (high - low)
+        for (index, (field, series)) in enumerate(self.series.items()):
+            (frames, mins, maxs) = series.envelope(first, last, width)
+            # Go down and up in every pixel column, so the polyline covers the envelope
+            xs = np.repeat((frames - start) * scaleX, 2)
+            ys = np.empty(2 * mins.size)
+            ys[0::2] = (high - maxs) * scaleY
+            ys[1::2] = (high - mins) * scaleY
+            finite = np.isfinite(ys)
+            polygon = QPolygonF([QPointF(x, y) for (x, y) in zip(xs[finite].tolist(), ys[finite].tolist())])
+            color = QColor(PLOT_COLORS[index % len(PLOT_COLORS)])
+            painter.setPen(QPen(color, 0))
+            painter.drawPolyline(polygon)
+            painter.drawText(5, 15 * (index + 1), field)
+
+        painter.setPen(QPen(QColor("black"), 0))
+        painter.drawText(width - 80, 15, f"{high:.4g}")
+        painter.drawText(width - 80, height - 5, f"{low:.4g}")
+        if low < 0 < high:
+            painter.setPen(QPen(QColor("lightgray"), 0, Qt.DashLine))
+            painter.drawLine(QPointF(0, high * scaleY), QPointF(width, high * scaleY))
+        cursor = (self.frame - start) * scaleX
+        painter.setPen(QPen(QColor("red"), 0))
+        painter.drawLine(QPointF(cursor, 0), QPointF(cursor, height))
+
+    # Input
+
+    def wheelEvent(self, event) -> None:
+        """Zoom in and out around the mouse."""
+        (start, stop) = self.viewRange()
+        center = self.frameAt(event.position().x())
+        factor = 0.8 ** (event.angleDelta().y() / 120)
+        self.setView(center - (center - start) * factor, center + (stop - center) * factor)
+
+    def mousePressEvent(self, event) -> None:
+        if event.button() == Qt.LeftButton:
+            self.selectFrame(event.position().x())
+        elif event.button() == Qt.MiddleButton:
+            self.panStart = (event.position().x(), self.viewRange())
+
+    def mouseMoveEvent(self, event) -> None:
+        if event.buttons() & Qt.LeftButton:
+            self.selectFrame(event.position().x())
+        elif event.buttons() & Qt.MiddleButton and self.panStart is not None:
+            (x, (start, stop)) = self.panStart
+            shift = (x - event.position().x()) / max(self.width(), 1) * (stop - start)
+            self.setView(start + shift, stop + shift)
+
+    def mouseReleaseEvent(self, event) -> None:
+        self.panStart = None
+
+    def selectFrame(self, x: float) -> None:
+        frame = min(max(round(self.frameAt(x)), 0), max(self.count - 1, 0))
+        self.frameSelected.emit(frame)
+
+    def contextMenuEvent(self, event) -> None:
+        """Choose the plotted fields."""
+        menu = QMenu(self)
+        for field in PLOT_FIELDS:
+            action = menu.addAction(field)
+            action.setCheckable(True)
+            action.setChecked(field in self.series)
+        chosen = menu.exec(event.globalPos())
+        if chosen is not None:
+            fields = [field for field in self.series if field != chosen.text()]
+            if chosen.isChecked():
+                fields.append(chosen.text())
+            self.setFields(fields)
@@ -1,64 +1,268 @@
 """This class is the main GUI for the sailsim project."""
 
+from time import perf_counter
+from typing import Any, Callable, Optional, Sequence
+
 from PySide6.QtCore import QTimer
-from PySide6.QtWidgets import QMainWindow
+from PySide6.QtGui import QAction, QCloseEvent
+from PySide6.QtWidgets import QComboBox, QMainWindow
 
+from sailsim.gui.PlotPanel import PlotPanel
+from sailsim.gui.PlaybackClock import PLAYBACK_SPEEDS, PlaybackClock
+from sailsim.gui.SimulationWorker import SimulationWorker
+from sailsim.gui.Trajectory import Trajectory
 from sailsim.gui.boatInspector import BoatInspectorScene
 from sailsim.gui.mapView import MapViewScene
 from sailsim.gui.qtmain import Ui_MainWindow
+from sailsim.simulation.CheckpointLog import CheckpointLog
+
+
+# Refresh rate if the screen doesn't report one (in Hz)
+DEFAULT_REFRESH_RATE = 60
+
+# Interval in which the events of Tk config windows are processed (in ms)
+TK_INTERVAL = 20
 
 
 class SailsimGUI(QMainWindow):
     """Main GUI for sailsim."""
 
-    def __init__(self, simulation):
+    def __init__(self, simulation, runSimulation: bool = True, trajectories: Sequence[Trajectory] = ()):
         """
         Create SailsimGUI object.
 
         Args:
             simulation      Simulation that should be displayed
+            runSimulation   simulate the remaining frames in the background, the GUI shows them as they arrive
+                            (changes in the config windows are always simulated)
+            trajectories    runs that are overlaid on the map for comparison, they show the same frame as the simulation
         """
         super().__init__()
 
         self.simulation = simulation
         self.frame = 0
+        self.frameCount = len(simulation.boat.frameList)  # Frames shown in slider, path and plot
+        self.worker: Optional[SimulationWorker] = None
+        self.configWindows: list[tuple[Any, QTimer]] = []  # Open Tk config windows and the timers processing their events
+
+        # Checkpoints of the run, a config change only simulates the frames it affects again. Runs that were
+        # started before can't go back to the start and an ExternalSailor can't be saved in a checkpoint.
+        self.checkpointLog: Optional[CheckpointLog] = None
+        if simulation.frame == 0:
+            try:
+                self.checkpointLog = CheckpointLog(simulation)
+            except TypeError:
+                pass
 
         # Load UI from QT generated file
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
         # self.setWindowState(Qt.WindowMaximized)
 
-        # Playback and timeSlider
+        # Playback and timeSlider, both update the widgets at most once per display refresh
+        screen = self.screen()
+        refreshRate = screen.refreshRate() if screen is not None and screen.refreshRate() > 0 else DEFAULT_REFRESH_RATE
+        self.refreshInterval = 1 / refreshRate
+        self.playback = PlaybackClock(simulation.timestep)
+        self.playbackFrame = 0  # Frame set by playStep, other frames come from the user
         self.timer = QTimer(self)
-        self.timer.setInterval(simulation.timestep * 1000)
+        self.timer.setInterval(max(int(self.refreshInterval * 1000), 1))
         self.timer.timeout.connect(self.playStep)
-        self.ui.timeSlider.setMaximum(len(simulation))
+        self.renderTimer = QTimer(self)
+        self.renderTimer.setSingleShot(True)
+        self.renderTimer.timeout.connect(self.renderFrame)
+        self.lastRender = -self.refreshInterval
+        self.ui.timeSlider.setMaximum(max(len(simulation.boat.frameList) - 1, 0))
         self.ui.timeSlider.setValue(self.frame)
 
+        # Playback speed, negative speeds play backwards
+        self.speedBox = QComboBox(self)
+        for speed in PLAYBACK_SPEEDS:
+            self.speedBox.addItem(f"{speed:g}x", speed)
+        self.speedBox.setCurrentIndex(PLAYBACK_SPEEDS.index(1.0))
+        self.speedBox.currentIndexChanged.connect(self.changeSpeed)
+        self.ui.controlBar.insertWidget(self.ui.controlBar.indexOf(self.ui.frameNr), self.speedBox)
+
         # set up map view
-        self.mapViewScene = MapViewScene(simulation.boat)
+        self.mapViewScene = MapViewScene(simulation.boat, simulation.wind)
         self.ui.mapView.setScene(self.mapViewScene)
+        for trajectory in trajectories:
+            self.mapViewScene.addTrajectory(trajectory)
+        self.actionShowWindMap = QAction("Wind", self)
+        self.actionShowWindMap.setCheckable(True)
+        self.actionShowWindMap.toggled.connect(self.actionViewShowWindMap)
+        viewActions = self.ui.menuView.actions()
+        self.ui.menuView.insertAction(viewActions[viewActions.index(self.ui.actionShowWaypointsPathMap) + 1], self.actionShowWindMap)
+
+        # Config windows, the run is simulated again after they changed something
+        self.actionConfigBoat = QAction("Boat...", self)
+        self.actionConfigBoat.triggered.connect(self.openConfigBoat)
+        self.actionConfigWind = QAction("Wind...", self)
+        self.actionConfigWind.triggered.connect(self.openConfigWind)
+        for action in (self.actionConfigBoat, self.actionConfigWind):
+            action.setEnabled(self.checkpointLog is not None)
+            self.ui.menuEdit.addAction(action)
 
         # set up boat inspector
-        self.boatInspectorScene = BoatInspectorScene(simulation.boat)
+        self.boatInspectorScene = BoatInspectorScene(simulation.boat, renderData=self.mapViewScene.renderData)
         self.ui.boatInspector.setScene(self.boatInspectorScene)
 
+        # set up plot panel, clicking in it selects the frame
+        self.plotPanel = PlotPanel(simulation.boat.frameList)
+        self.plotPanel.extend(len(simulation.boat.frameList))
+        self.plotPanel.frameSelected.connect(self.ui.timeSlider.setValue)
+        self.ui.right.addWidget(self.plotPanel)
+
         self.updateFrame(0)
         self.updateViewStates()
 
+        if runSimulation and (simulation.lastFrame is None or simulation.frame <= simulation.lastFrame):
+            self.startSimulation()
+
+    def startSimulation(self) -> None:
+        """Run the simulation in a SimulationWorker and show the frames while they are recorded."""
+        if self.worker is not None and self.worker.isRunning():
+            return
+        self.worker = SimulationWorker(self.simulation, log=self.checkpointLog, parent=self)
+        self.worker.framesAvailable.connect(self.framesAvailable)
+        self.worker.start()
+
+    def stopSimulation(self) -> None:
+        """Stop the SimulationWorker, the frames recorded so far can still be viewed."""
+        if self.worker is not None:
+            self.worker.stop()
+
+    def framesAvailable(self, frameCount: int) -> None:
+        """Extend slider, boat path and plot to the frames recorded so far, they are rebuilt if frames were replaced."""
+        # Counts of a worker that was stopped before the frames were replaced may still arrive
+        frameCount = min(frameCount, len(self.simulation.boat.frameList))
+        self.ui.timeSlider.setMaximum(max(frameCount - 1, 0))
+        self.frame = min(self.frame, self.ui.timeSlider.value())  # The slider moved back if frames were deleted
+        self.mapViewScene.path.extendBoatPath(frameCount)
+        self.mapViewScene.renderData.extend(frameCount)
+        self.plotPanel.extend(frameCount)
+        if self.frameCount <= self.frame < frameCount:
+            # The frame shown is new
+            self.updateFrame(self.frame)
+        self.frameCount = frameCount
+
+    def simulateAgain(self, change: Callable[[CheckpointLog], None]) -> None:
+        """
+        Replace the frames a change affects with frames of a new run in the SimulationWorker.
+
+        The worker is stopped, change drops the checkpoints the change affects and the run goes back to the
+        last checkpoint that is left. The frames before it are kept, the rest is simulated again.
+
+        Args:
+            change:     function that applies the change to the CheckpointLog, e.g. lambda log: log.invalidate(frame)
+        """
+        if self.checkpointLog is None:
+            raise ValueError("the run has no checkpoints to go back to")
+        self.stopSimulation()
+        change(self.checkpointLog)
+        self.checkpointLog.rewind()
+        self.framesAvailable(len(self.simulation.boat.frameList))
+        self.startSimulation()
+
+    def boatChanged(self) -> None:
+        """Simulate the whole run again with the values of simulation.initBoat, called by ConfigBoat."""
+        self.simulateAgain(CheckpointLog.reloadBoat)
+
+    def windChanged(self) -> None:
+        """
+        Simulate the whole run again with the changed wind, called by ConfigWind.
+
+        ConfigWind changes the wind for all times, so no checkpoint but the first one is kept.
+        """
+        if self.mapViewScene.windOverlay is not None:
+            self.mapViewScene.windOverlay.clearTiles()
+        self.simulateAgain(lambda log: log.invalidate(0))
+
+    def setCommands(self, commandList: list) -> None:
+        """
+        Give the sailor new commands, only the frames after it reached the first command that changed are simulated again.
+
+        Commands are compared by identity, keep the command objects that didn't change.
+        """
+        self.simulateAgain(lambda log: log.changeCommands(commandList))
+        self.mapViewScene.waypoints.updateWaypoints()
+        self.mapViewScene.update()
+
+    def openConfigBoat(self) -> None:
+        """Edit the initial boat in a ConfigBoat window."""
+        from sailsim.gui.ConfigBoat import ConfigBoat  # pylint: disable=import-outside-toplevel
+        self.showConfigWindow(ConfigBoat(self.simulation.initBoat, self.simulation.wind, changed=self.boatChanged))
+
+    def openConfigWind(self) -> None:
+        """Edit the wind in a ConfigWind window."""
+        from sailsim.gui.ConfigWind import ConfigWind  # pylint: disable=import-outside-toplevel
+        self.showConfigWindow(ConfigWind(self.simulation.wind, changed=self.windChanged))
+
+    def showConfigWindow(self, window) -> None:
+        """
+        Show a Tk config window next to the GUI.
+
+        The events of the window are processed by a QTimer instead of the Tk mainloop, so the GUI keeps
+        showing the frames while the window is open. The timer stops when the window was destroyed.
+        """
+        from tkinter import TclError  # pylint: disable=import-outside-toplevel
+        timer = QTimer(self)
+        timer.setInterval(TK_INTERVAL)
+
+        def processEvents() -> None:
+            try:
+                window.update()
+            except TclError:
+                # The window was closed
+                timer.stop()
+                self.configWindows.remove((window, timer))
+
+        timer.timeout.connect(processEvents)
+        self.configWindows.append((window, timer))
+        timer.start()
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Close the config windows and stop the simulation and the wind overlay threads before the window is closed."""
+        if self.configWindows:
+            from tkinter import TclError  # pylint: disable=import-outside-toplevel
+            for (window, timer) in self.configWindows:
+                timer.stop()
+                try:
+                    window.destroy()
+                except TclError:
+                    pass  # Closed before its timer noticed
+            self.configWindows = []
+        self.stopSimulation()
+        self.mapViewScene.close()
+        super().closeEvent(event)
+
     def updateFrame(self, framenumber):
-        """Update display when the frame changed."""
+        """Update display when the frame changed. The widgets are updated at most once per display refresh."""
+        if framenumber < len(self.simulation.boat.frameList):
+            self.frame = framenumber
+            if self.timer.isActive() and framenumber != self.playbackFrame:
+                # The user moved the slider, continue playback from there
+                self.playback.start(framenumber)
+                self.playbackFrame = framenumber
+            if not self.renderTimer.isActive():
+                wait = self.lastRender + self.refreshInterval - perf_counter()
+                self.renderTimer.start(max(int(wait * 1000), 0))
+
+    def renderFrame(self):
+        """Show the current frame in all widgets."""
+        self.lastRender = perf_counter()
+        framenumber = self.frame
         frames = self.simulation.boat.frameList.frames
         if framenumber < len(frames):
-            self.frame = framenumber
             frame = frames[framenumber]
 
             # Update widgets
-            maxFrame = str(len(self.simulation))
+            maxFrame = str(self.simulation.lastFrame if self.simulation.lastFrame is not None else self.ui.timeSlider.maximum())
             self.ui.frameNr.setText(str(framenumber).zfill(len(maxFrame)) + "/" + maxFrame)
             self.mapViewScene.viewFrame(framenumber)
             self.boatInspectorScene.viewFrame(framenumber)
             self.ui.valueInspector.viewFrame(frame)
+            self.plotPanel.setFrame(framenumber)
 
     def incFrame(self):
         """Move to the next frame if it is in the range of the slider."""
@@ -79,25 +283,38 @@ class SailsimGUI(QMainWindow):
     def pressedPlay(self, active):
         """Start or stop animation depending on active."""
         if active:
-            if self.simulation.lastFrame > self.frame:
+            forward = self.playback.speed > 0
+            if (forward and (self.frame < self.ui.timeSlider.maximum() or self.simulationRunning())) or (not forward and self.frame > 0):
+                self.playback.start(self.frame)
+                self.playbackFrame = self.frame
                 self.timer.start()
             else:
                 self.playStop()
         else:
             self.playStop()
 
+    def changeSpeed(self, index: int):
+        """Set the playback speed to the speed with the index given in PLAYBACK_SPEEDS."""
+        self.playback.setSpeed(PLAYBACK_SPEEDS[index])
+
     def playStop(self):
         """Stop the animation and uncheck the play button."""
         self.timer.stop()
         self.ui.buttonPlay.setChecked(False)
 
     def playStep(self):
-        """Increase the frame if it is still available. Otherwise stop the animation."""
-        if self.simulation.lastFrame > self.frame:
-            self.incFrame()
-        else:
+        """Show the frame of the current time, frames are skipped if needed. Stop at the end unless more frames are simulated."""
+        (frame, limited) = self.playback.targetFrame(0, self.ui.timeSlider.maximum())
+        if frame != self.frame:
+            self.playbackFrame = frame
+            self.ui.timeSlider.setValue(frame)
+        if limited and (self.playback.speed < 0 or not self.simulationRunning()):
             self.playStop()
 
+    def simulationRunning(self) -> bool:
+        """Check if frames are still being simulated."""
+        return self.worker is not None and self.worker.isRunning()
+
     def updateViewStates(self):
         """Load states for QActions from child widgets."""
         # Import states from mapView
@@ -106,6 +323,7 @@ class SailsimGUI(QMainWindow):
         self.ui.actionShowBoatPathMap.setChecked(self.mapViewScene.path.isVisible())
         self.ui.actionShowWaypointsMap.setChecked(self.mapViewScene.waypoints.displayWaypoints)
         self.ui.actionShowWaypointsPathMap.setChecked(self.mapViewScene.waypoints.displayWaypointsPath)
+        self.actionShowWindMap.setChecked(self.mapViewScene.windOverlay.isVisible())
 
         # Import states from boatInspector
         self.ui.actionShowBoatInspector.setChecked(self.boatInspectorScene.boat.isVisible())
@@ -139,6 +357,11 @@ class SailsimGUI(QMainWindow):
         self.mapViewScene.waypoints.displayWaypointsPath = state
         self.mapViewScene.update()
 
+    def actionViewShowWindMap(self, state):
+        """Show/hide the wind overlay on the map view."""
+        self.mapViewScene.windOverlay.setVisible(state)
+        self.mapViewScene.update()
+
     # Display for boatInspector
     def actionViewShowBoatInspector(self, state):
         """Show/hide the boat on the boat inspector."""
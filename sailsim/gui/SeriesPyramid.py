@@ -0,0 +1,115 @@
+"""This module contains the SeriesPyramid class that summarizes a time series for plotting."""
+
+from typing import Optional
+
+import numpy as np
+
+
+class SeriesPyramid:
+    """
+    Time series with a pyramid of minima and maxima for plotting it at any zoom.
+
+    Level 0 holds every value, every block of level k holds the minimum and maximum of factor blocks
+    of level k - 1. A plot of any range with any number of pixels only reads at most about
+    factor + 1 blocks per pixel column, so plotting millions of values is as fast as plotting a thousand.
+    """
+
+    def __init__(self, factor: int = 4) -> None:
+        """
+        Create an empty SeriesPyramid.
+
+        Args:
+            factor: number of blocks of a level that are summarized in one block of the next level
+        """
+        self.factor = factor
+        self.mins: list[np.ndarray] = []    # level -> buffer of the minima (level 0: values)
+        self.maxs: list[np.ndarray] = []    # level -> buffer of the maxima (level 0: values)
+        self.counts: list[int] = []         # level -> number of used blocks
+        self.clear()
+
+    def clear(self) -> None:
+        """Delete all values."""
+        values = np.empty(1024)
+        self.mins = [values]
+        self.maxs = [values]
+        self.counts = [0]
+
+    def extend(self, values) -> None:
+        """Append values to the series."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        self.store(0, self.counts[0], values, values)
+        level = 0
+        first = self.counts[0] - values.size  # First value of the level that changed
+        while self.counts[level] > self.factor:
+            # Summarize the changed blocks of level in the next level, the last block may be incomplete
+            count = self.counts[level]
+            first -= first % self.factor
+            offsets = np.arange(first, count, self.factor)
+            mins = np.minimum.reduceat(self.mins[level][first:count], offsets - first)
+            maxs = np.maximum.reduceat(self.maxs[level][first:count], offsets - first)
+            level += 1
+            if level == len(self.counts):
+                self.mins.append(np.empty(0))
+                self.maxs.append(np.empty(0))
+                self.counts.append(0)
+            first //= self.factor
+            self.store(level, first, mins, maxs)
+
+    def store(self, level: int, start: int, mins: np.ndarray, maxs: np.ndarray) -> None:
+        """Write blocks to a level from block start on, the buffers grow if needed."""
+        end = start + mins.size
+        if end > self.mins[level].size:
+            capacity = max(2 * self.mins[level].size, end, 16)
+            self.mins[level] = np.resize(self.mins[level], capacity)
+            self.maxs[level] = self.mins[level] if level == 0 else np.resize(self.maxs[level], capacity)
+        self.mins[level][start:end] = mins
+        if level > 0:
+            self.maxs[level][start:end] = maxs
+        self.counts[level] = end
+
+    def values(self) -> np.ndarray:
+        """Return all values."""
+        return self.mins[0][:self.counts[0]]
+
+    def envelope(self, start: int, stop: int, buckets: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return the minima and maxima of the values start to stop (exclusive) in about buckets groups.
+
+        The groups are aligned to the blocks of the level that is used, their first indices are returned
+        as well: (indices, minima, maxima). If there are fewer values than buckets, the values are returned.
+        """
+        start = max(start, 0)
+        stop = min(stop, self.counts[0])
+        if stop <= start:
+            empty = np.empty(0)
+            return (empty, empty, empty)
+        step = (stop - start) / max(buckets, 1)
+        if step <= 1:
+            values = self.mins[0][start:stop]
+            return (np.arange(start, stop), values, values)
+        level = 0
+        while level + 1 < len(self.counts) and self.factor**(level + 1) <= step:
+            level += 1
+        blockSize = self.factor**level
+        # Block sizes are at most step, so the edges are strictly increasing
+        edges = (start + np.floor(np.arange(buckets + 1) * step).astype(np.int64)) // blockSize
+        edges[-1] = min(-(-stop // blockSize), self.counts[level])
+        count = edges[-1]
+        mins = np.minimum.reduceat(self.mins[level][:count], edges[:-1])
+        maxs = np.maximum.reduceat(self.maxs[level][:count], edges[:-1])
+        return (edges[:-1] * blockSize, mins, maxs)
+
+    def range(self, start: int, stop: int) -> Optional[tuple[float, float]]:
+        """Return minimum and maximum of the values start to stop (exclusive), None if there are none."""
+        (_, mins, maxs) = self.envelope(start, stop, 64)
+        if mins.size == 0:
+            return None
+        return (float(np.nanmin(mins)), float(np.nanmax(maxs)))
+
+    def __len__(self) -> int:
+        return self.counts[0]
+
+    def __repr__(self) -> str:
+        return f"SeriesPyramid {self.counts[0]} values, {len(self.counts)} levels"
@@ -0,0 +1,73 @@
+"""This module contains the SimulationWorker class that runs a simulation while the GUI shows it."""
+
+from time import perf_counter
+from typing import Optional
+
+from PySide6.QtCore import QThread, Signal
+
+from sailsim.simulation.CheckpointLog import CheckpointLog
+from sailsim.simulation.Simulation import Simulation
+from sailsim.simulation.StopConditions import STOP_DIVERGED
+
+
+class SimulationWorker(QThread):
+    """
+    Run a simulation in a thread and report the recorded frames while it runs.
+
+    The frames are appended to the frameList of the boat by the thread, the GUI may read all frames
+    up to the number reported by framesAvailable.
+    """
+
+    framesAvailable = Signal(int)   # Number of frames recorded so far
+    simulationStopped = Signal(str)  # Stop reason, empty if lastFrame was reached or the worker was stopped
+
+    def __init__(self, simulation: Simulation, batchFrames: int = 100, refreshRate: float = 60, log: Optional[CheckpointLog] = None,
+                 parent=None) -> None:
+        """
+        Create a SimulationWorker, call start() to run the simulation.
+
+        Args:
+            simulation:     simulation to run until lastFrame (or until stop() if it has none)
+            batchFrames:    frames simulated between checks for new frames and stop requests
+            refreshRate:    framesAvailable is emitted at most this often per second
+            log:            CheckpointLog of the simulation, it is run through the log so it keeps its checkpoints
+            parent:         parent of the QThread
+        """
+        super().__init__(parent)
+        self.simulation = simulation
+        self.batchFrames = batchFrames
+        self.refreshInterval = 1 / refreshRate
+        self.log = log
+        self.stopReason: Optional[str] = None
+
+    def run(self) -> None:
+        """Simulate in batches, runs in the thread."""
+        simulation = self.simulation
+        run = self.log.run if self.log is not None else simulation.run
+        frames = simulation.boat.frameList.frames
+        lastEmit = -self.refreshInterval
+        reason = None
+        while not self.isInterruptionRequested():
+            steps = self.batchFrames
+            if simulation.lastFrame is not None:
+                steps = min(steps, simulation.lastFrame + 1 - simulation.frame)
+                if steps < 1:
+                    break
+            try:
+                reason = run(steps)
+            except (OverflowError, ValueError, ZeroDivisionError):
+                reason = STOP_DIVERGED
+            now = perf_counter()
+            if now - lastEmit >= self.refreshInterval:
+                lastEmit = now
+                self.framesAvailable.emit(len(frames))
+            if reason is not None:
+                break
+        self.stopReason = reason
+        self.framesAvailable.emit(len(frames))
+        self.simulationStopped.emit(reason or "")
+
+    def stop(self) -> None:
+        """Stop simulating after the current batch and wait for the thread."""
+        self.requestInterruption()
+        self.wait()
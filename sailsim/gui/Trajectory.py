@@ -0,0 +1,61 @@
+"""This module contains the Trajectory class that holds the track of a run for comparing runs in the GUI."""
+
+import os
+from typing import Optional
+
+import numpy as np
+
+from sailsim.boat.FrameList import FRAME_FIELDS, FrameList
+
+# Frame fields a Trajectory keeps
+TRAJECTORY_FIELDS = ("boatPosX", "boatPosY", "boatDirection", "boatMainSailAngle", "boatRudderAngle")
+
+
+class Trajectory:
+    """
+    Track of a boat (position, direction, sail and rudder angles) of a finished run.
+
+    The values are kept in NumPy arrays, if the trajectory is loaded from a .npy file they are memory
+    mapped and only read when they are drawn.
+    """
+
+    def __init__(self, columns: dict[str, np.ndarray], name: str = "") -> None:
+        """
+        Create a Trajectory.
+
+        Args:
+            columns:    array of every field of TRAJECTORY_FIELDS, all with the same length
+            name:       name of the run shown in the GUI
+        """
+        lengths = {len(columns[field]) for field in TRAJECTORY_FIELDS}
+        if len(lengths) != 1:
+            raise ValueError("all columns of a trajectory need the same length")
+        self.columns = columns
+        self.name = name
+
+    @classmethod
+    def fromFrameList(cls, frameList: FrameList, name: str = "") -> "Trajectory":
+        """Copy the trajectory from the frames of a FrameList."""
+        frames = frameList.frames
+        columns = {field: np.fromiter((getattr(frame, field) for frame in frames), np.float64, len(frames)) for field in TRAJECTORY_FIELDS}
+        return cls(columns, name)
+
+    @classmethod
+    def load(cls, path: str, name: Optional[str] = None) -> "Trajectory":
+        """Load a trajectory memory mapped from a .npy file saved by FrameList.saveNumpy."""
+        data = np.load(path, mmap_mode="r")
+        if data.ndim != 2 or data.shape[1] != len(FRAME_FIELDS):
+            raise ValueError(f"{path} has no frames, expected {len(FRAME_FIELDS)} columns")
+        columns = {field: data[:, FRAME_FIELDS.index(field)] for field in TRAJECTORY_FIELDS}
+        return cls(columns, os.path.splitext(os.path.basename(path))[0] if name is None else name)
+
+    def state(self, framenumber: int) -> tuple[float, ...]:
+        """Return the values of TRAJECTORY_FIELDS at a frame, runs that have ended stay at their last frame."""
+        index = min(max(framenumber, 0), len(self) - 1)
+        return tuple(float(self.columns[field][index]) for field in TRAJECTORY_FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.columns["boatPosX"])
+
+    def __repr__(self) -> str:
+        return f"Trajectory {self.name} {len(self)} frames"
@@ -0,0 +1,237 @@
+"""This module contains the wind overlay of the map that is rendered in tiles by a thread pool."""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from math import floor, log2
+from typing import Optional
+
+import numpy as np
+from PySide6.QtCore import QObject, QPointF, QRectF, Qt, Signal
+from PySide6.QtGui import QColor, QImage, QPainter, QPen, QPolygonF
+from PySide6.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem, QWidget
+
+from sailsim.gui.qgraphicsitems import visibleRect
+from sailsim.utils.vectorized import cartToRadius
+from sailsim.wind.Wind import Wind
+
+# Size of a tile (in pixels) and number of wind samples per tile side for the heatmap and the arrows
+TILE_PIXELS = 256
+HEATMAP_SAMPLES = 32
+ARROW_SAMPLES = 8
+
+# Colors of the heatmap from calm to maxSpeed, the heatmap is drawn with OVERLAY_ALPHA
+SPEED_COLORS = np.array([(49, 54, 149), (69, 117, 180), (116, 173, 209), (254, 224, 144), (244, 109, 67), (165, 0, 38)], dtype=np.float64)
+OVERLAY_ALPHA = 110
+
+# Tile key: (zoom, tileX, tileY, timeBucket), tile (x, y) covers scene coordinates x * size to (x + 1) * size
+TileKey = tuple[int, int, int, int]
+
+
+def tileSize(zoom: int) -> float:
+    """Return the size of the tiles of a zoom level in scene coordinates (in m)."""
+    return TILE_PIXELS / 2**zoom
+
+
+def speedColors(speed: np.ndarray, maxSpeed: float) -> np.ndarray:
+    """Return the ARGB32 colors of wind speeds as uint32 array."""
+    position = np.clip(speed / maxSpeed, 0, 1) * (len(SPEED_COLORS) - 1)
+    lower = np.minimum(position.astype(np.int64), len(SPEED_COLORS) - 2)
+    weight = (position - lower)[..., None]
+    rgb = (SPEED_COLORS[lower] * (1 - weight) + SPEED_COLORS[lower + 1] * weight).astype(np.uint32)
+    return (OVERLAY_ALPHA << 24) | (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def renderTile(wind: Wind, key: TileKey, time: float, maxSpeed: float) -> QImage:
+    """Render the tile of a key with the wind at time, can run in any thread."""
+    (zoom, tileX, tileY, _) = key
+    size = tileSize(zoom)
+
+    # Heatmap of the speed, the samples are at the centers of the cells, scene y is -y
+    cells = (np.arange(HEATMAP_SAMPLES) + 0.5) * size / HEATMAP_SAMPLES
+    (windX, windY) = wind.getWindCartGrid(tileX * size + cells, -(tileY * size + cells), time)
+    colors = np.ascontiguousarray(speedColors(cartToRadius(windX, windY), maxSpeed))
+    heatmap = QImage(colors.data, HEATMAP_SAMPLES, HEATMAP_SAMPLES, 4 * HEATMAP_SAMPLES, QImage.Format_ARGB32)
+    image = heatmap.scaled(TILE_PIXELS, TILE_PIXELS, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+    # Arrows in the direction of the wind, their length grows with the speed
+    cells = (np.arange(ARROW_SAMPLES) + 0.5) * size / ARROW_SAMPLES
+    (windX, windY) = wind.getWindCartGrid(tileX * size + cells, -(tileY * size + cells), time)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(QPen(QColor(0, 0, 0, 160), 1.2))
+    cellPixels = TILE_PIXELS / ARROW_SAMPLES
+    for (iy, ix) in np.ndindex(windX.shape):
+        speed = float(cartToRadius(windX[iy, ix], windY[iy, ix]))
+        if speed == 0 or not np.isfinite(speed):
+            continue
+        length = 0.4 * cellPixels * min(speed / maxSpeed, 1) + 0.2 * cellPixels
+        direction = QPointF(float(windX[iy, ix]), -float(windY[iy, ix])) / speed
+        center = QPointF((ix + 0.5) * cellPixels, (iy + 0.5) * cellPixels)
+        tip = center + direction * length / 2
+        side = QPointF(-direction.y(), direction.x())
+        painter.drawLine(center - direction * length / 2, tip)
+        painter.drawPolyline(QPolygonF([tip - direction * 4 + side * 3, tip, tip - direction * 4 - side * 3]))
+    painter.end()
+    return image
+
+
+class WindTileCache:
+    """Keep the last used tiles, the least recently used tile is dropped when maxTiles are stored."""
+
+    def __init__(self, maxTiles: int = 256) -> None:
+        self.maxTiles = maxTiles
+        self.tiles: "OrderedDict[TileKey, QImage]" = OrderedDict()
+
+    def get(self, key: TileKey) -> Optional[QImage]:
+        """Return a tile and mark it as used or return None if it isn't stored."""
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+        return tile
+
+    def put(self, key: TileKey, tile: QImage) -> None:
+        self.tiles[key] = tile
+        self.tiles.move_to_end(key)
+        while len(self.tiles) > self.maxTiles:
+            self.tiles.popitem(last=False)
+
+    def clear(self) -> None:
+        self.tiles.clear()
+
+    def __contains__(self, key: TileKey) -> bool:
+        return key in self.tiles
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+
+class WindTileRenderer(QObject):
+    """Render tiles in a thread pool, tileReady is emitted in the GUI thread when a tile was stored in the cache."""
+
+    tileReady = Signal(object)  # TileKey
+    tileRendered = Signal(object, object)  # TileKey, QImage, emitted by the threads
+
+    def __init__(self, wind: Wind, maxSpeed: float = 10, timeBucket: float = 1, workers: int = 2, maxTiles: int = 256, parent=None) -> None:
+        """
+        Create a WindTileRenderer.
+
+        Args:
+            wind:       wind that is shown
+            maxSpeed:   wind speed with the strongest color (in m/s)
+            timeBucket: tiles are rendered for the start of time buckets of this length (in s)
+            workers:    number of threads
+            maxTiles:   number of tiles kept in the cache
+            parent:     parent of the QObject
+        """
+        super().__init__(parent)
+        self.wind = wind
+        self.maxSpeed = maxSpeed
+        self.timeBucket = timeBucket
+        self.cache = WindTileCache(maxTiles)
+        self.pending: dict[TileKey, Future] = {}
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="windtiles")
+        self.tileRendered.connect(self.storeTile)  # Queued, the cache is only used by the GUI thread
+
+    def bucket(self, time: float) -> int:
+        return floor(time / self.timeBucket)
+
+    def request(self, key: TileKey) -> None:
+        """Render a tile unless it is cached or rendered already."""
+        if key in self.cache or key in self.pending:
+            return
+        self.pending[key] = self.executor.submit(self.render, key)
+
+    def render(self, key: TileKey) -> None:
+        try:
+            tile = renderTile(self.wind, key, key[3] * self.timeBucket, self.maxSpeed)
+        except (ArithmeticError, ValueError):
+            tile = None  # Wind that can't be sampled isn't shown
+        self.tileRendered.emit(key, tile)
+
+    def storeTile(self, key: TileKey, tile: Optional[QImage]) -> None:
+        self.pending.pop(key, None)
+        if tile is not None:
+            self.cache.put(key, tile)
+            self.tileReady.emit(key)
+
+    def retain(self, keys) -> None:
+        """Cancel the requests for all tiles except keys that haven't started yet."""
+        for key in [key for key in self.pending if key not in keys]:
+            if self.pending[key].cancel():
+                del self.pending[key]
+
+    def shutdown(self) -> None:
+        """Stop the threads, requested tiles that haven't started are dropped."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class GUIWindOverlay(QGraphicsItem):
+    """
+    Display a heatmap of the wind speed and arrows in the wind direction on the map.
+
+    The overlay is drawn from tiles for the zoom level and time bucket that are rendered in the background.
+    Tiles that are missing are requested, until they are ready the tile of a neighbouring time bucket is drawn
+    if it is cached.
+    """
+
+    extent = 1e6  # The overlay covers the scene up to this distance (in m)
+    maxZoom = 12
+    minZoom = -12
+
+    def __init__(self, wind: Wind, *args, **options) -> None:
+        """Create a GUIWindOverlay, options are passed to the WindTileRenderer."""
+        super().__init__(*args)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)  # Fill option.exposedRect
+        self.setZValue(-1)
+        self.renderer = WindTileRenderer(wind, **options)
+        self.renderer.tileReady.connect(self.tileReady)
+        self.time = 0.0
+        self.shownKeys: set[TileKey] = set()
+
+    def setTime(self, time: float) -> None:
+        """Show the wind at a time."""
+        if self.renderer.bucket(time) != self.renderer.bucket(self.time):
+            self.update()
+        self.time = time
+
+    def tileReady(self, key: TileKey) -> None:
+        if key in self.shownKeys:
+            size = tileSize(key[0])
+            self.update(QRectF(key[1] * size, key[2] * size, size, size))
+
+    def clearTiles(self) -> None:
+        """Drop all rendered tiles, e.g. after the wind was changed. The tiles in view are rendered again."""
+        self.renderer.retain(set())
+        self.renderer.cache.clear()
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return QRectF(-self.extent, -self.extent, 2 * self.extent, 2 * self.extent)
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, _widget: Optional[QWidget] = None) -> None:
+        """Draw the tiles in the exposed part of the paint device, missing tiles are requested."""
+        scale = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        zoom = min(max(floor(log2(scale)), self.minZoom), self.maxZoom) if scale > 0 else 0
+        size = tileSize(zoom)
+        visible = visibleRect(painter, option) & self.boundingRect()
+        if not visible.isValid():
+            return
+        bucket = self.renderer.bucket(self.time)
+        cache = self.renderer.cache
+        keys = set()
+        missing = []
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        for tileY in range(floor(visible.top() / size), floor(visible.bottom() / size) + 1):
+            for tileX in range(floor(visible.left() / size), floor(visible.right() / size) + 1):
+                key = (zoom, tileX, tileY, bucket)
+                keys.add(key)
+                tile = cache.get(key)
+                if tile is None:
+                    missing.append(key)
+                    tile = cache.get((zoom, tileX, tileY, bucket - 1)) or cache.get((zoom, tileX, tileY, bucket + 1))
+                if tile is not None:
+                    painter.drawImage(QRectF(tileX * size, tileY * size, size, size), tile)
+        self.shownKeys = keys
+        self.renderer.retain(keys)
+        for key in missing:
+            self.renderer.request(key)
@@ -1,10 +1,13 @@
 """This module contains the class declaration of BoatInspectorWidget."""
 
+from typing import Optional
+
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor, QMouseEvent, QPainter, QResizeEvent, QWheelEvent
 from PySide6.QtWidgets import QApplication, QGraphicsScene, QGraphicsRectItem, QGraphicsView
 
 from sailsim.boat.Boat import Boat
+from sailsim.gui.FrameRenderData import FrameRenderData
 from sailsim.gui.qgraphicsitems import GUIBoatVectors, GUIBoat
 
 
@@ -18,13 +21,14 @@ class BoatInspectorScene(QGraphicsScene):
     displaySpeed = True
     displayForces = True
 
-    def __init__(self, boat: Boat, parent=None) -> None:
+    def __init__(self, boat: Boat, parent=None, renderData: Optional[FrameRenderData] = None) -> None:
         """
         Create a BoatInspectorScene object.
 
         Args:
             boat: Boat      Boat of the simulation
             parent          Parent of the QGraphicsScene
+            renderData      precomputed geometry of the frames of boat, e.g. the one of the MapViewScene
         """
         super().__init__(parent)
 
@@ -34,11 +38,13 @@ class BoatInspectorScene(QGraphicsScene):
         background.setPen(Qt.NoPen)
         self.addItem(background)
 
-        self.boat = GUIBoat(boat)
+        self.renderData = FrameRenderData(boat.frameList) if renderData is None else renderData
+
+        self.boat = GUIBoat(boat, renderData=self.renderData)
         self.boat.allowMovement = False
         self.addItem(self.boat)
 
-        self.boatVectors = GUIBoatVectors(boat)
+        self.boatVectors = GUIBoatVectors(boat, renderData=self.renderData)
         self.boatVectors.followBoat = False
         self.addItem(self.boatVectors)
 
@@ -1,46 +1,67 @@
 """This module contains the class declaration for the MapViewWidget."""
 
+from typing import Optional
+
 from PySide6.QtCore import QPointF, Qt
 from PySide6.QtGui import QColor, QCursor, QKeyEvent, QPainter, QPen, QResizeEvent, QWheelEvent
 from PySide6.QtWidgets import QApplication, QGraphicsRectItem, QGraphicsScene, QGraphicsView
 
 from sailsim.boat.Boat import Boat
-from sailsim.gui.qgraphicsitems import GUIBoatVectors, GUIBoat, GUIBoatPath, GUIWaypoints
+from sailsim.gui.WindOverlay import GUIWindOverlay
+from sailsim.gui.FrameRenderData import FrameRenderData
+from sailsim.gui.Trajectory import Trajectory
+from sailsim.gui.qgraphicsitems import GUIBoatVectors, GUIBoat, GUIBoatPath, GUITrajectoryBoat, GUITrajectoryPath, GUIWaypoints
+from sailsim.wind.Wind import Wind
 
 # map movements constants
 ZOOM_IN_FACTOR = 1.25
 ZOOM_OUT_FACTOR = 1 / ZOOM_IN_FACTOR
 SCROLL_STEP = 10
 
+# Colors of the runs that are overlaid for comparison
+RUN_COLORS = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#bcbd22", "#17becf")
+
 
 class MapViewScene(QGraphicsScene):
     """Map Widget that displays the boat and its path."""
 
-    def __init__(self, boat: Boat, parent=None) -> None:
+    def __init__(self, boat: Boat, wind: Optional[Wind] = None, parent=None) -> None:
         """
         Create a MapViewScene object.
 
         Args:
             boat: Boat      Boat of the simulation
+            wind: Wind      Wind of the simulation, shown in an overlay that is hidden at first
             parent          Parent of the QGraphicsScene
         """
         super().__init__(parent)
 
         self.setBackgroundBrush(QColor(156, 211, 219))
 
-        self.boat = GUIBoat(boat)
+        self.windOverlay: Optional[GUIWindOverlay] = None
+        if wind is not None:
+            self.windOverlay = GUIWindOverlay(wind)
+            self.windOverlay.setVisible(False)
+            self.addItem(self.windOverlay)
+
+        # Geometry of boat and vectors for all frames, shared by both items
+        self.renderData = FrameRenderData(boat.frameList)
+
+        self.boat = GUIBoat(boat, renderData=self.renderData)
         self.addItem(self.boat)
 
         self.path = GUIBoatPath(boat)
         self.path.setPen(QPen(Qt.black, 2))
         self.addItem(self.path)
 
-        self.boatVectors = GUIBoatVectors(boat)
+        self.boatVectors = GUIBoatVectors(boat, renderData=self.renderData)
         self.addItem(self.boatVectors)
 
         self.waypoints = GUIWaypoints(boat)
         self.addItem(self.waypoints)
 
+        self.trajectories: list[tuple[GUITrajectoryPath, GUITrajectoryBoat]] = []
+
         # Make area scrollable beyond boat boundaries
         # TODO find nicer way to do this
         self.addItem(QGraphicsRectItem(-2048, -2048, 4096, 4096))
@@ -49,8 +70,37 @@ class MapViewScene(QGraphicsScene):
         """Set the boat to a position saved in a frame given."""
         self.boat.setFrame(framenumber)
         self.boatVectors.setFrame(framenumber)
+        for (_, trajectoryBoat) in self.trajectories:
+            trajectoryBoat.setFrame(framenumber)
+        if self.windOverlay is not None and framenumber < len(self.boat.frameList):
+            self.windOverlay.setTime(self.boat.frameList[framenumber].time)
         self.update()
 
+    def addTrajectory(self, trajectory: Trajectory, color: Optional[QColor] = None) -> tuple[GUITrajectoryPath, GUITrajectoryBoat]:
+        """
+        Overlay the path and the boat of another run, the boat follows the shown frame.
+
+        Args:
+            trajectory: Trajectory of the run
+            color:      color of the run, default: next color of RUN_COLORS
+        """
+        if color is None:
+            color = QColor(RUN_COLORS[len(self.trajectories) % len(RUN_COLORS)])
+        path = GUITrajectoryPath(trajectory)
+        path.setPen(QPen(color, 1.5))
+        path.setToolTip(trajectory.name)
+        self.addItem(path)
+        trajectoryBoat = GUITrajectoryBoat(trajectory, color)
+        trajectoryBoat.setToolTip(trajectory.name)
+        self.addItem(trajectoryBoat)
+        self.trajectories.append((path, trajectoryBoat))
+        return (path, trajectoryBoat)
+
+    def close(self) -> None:
+        """Stop the threads of the wind overlay."""
+        if self.windOverlay is not None:
+            self.windOverlay.renderer.shutdown()
+
 
 class MapViewView(QGraphicsView):
     """QT Viewport for viewing the MapViewScene."""
@@ -5,10 +5,16 @@ from functools import cached_property
 from typing import Optional, Union
 
 from PySide6.QtCore import QLineF, QPoint, QPointF, QRectF
-from PySide6.QtGui import QPainter, QPainterPath, QPen, QPolygonF, Qt
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen, QPolygonF, Qt
 from PySide6.QtWidgets import QGraphicsItem, QGraphicsLineItem, QGraphicsPathItem, QStyleOptionGraphicsItem, QWidget
 
+import numpy as np
+
 from sailsim.boat.Boat import Boat
+from sailsim.gui.FrameRenderData import (ARROW_ANGLE, ARROW_COLUMNS, ARROWS, ARROWS_COLUMN, BOUNDS_COLUMN, POSE_COLUMNS, RUDDER_LENGTH,
+                                         RUDDER_OFFSET, SAIL_LENGTH, FrameRenderData)
+from sailsim.gui.PathLevels import PathLevels
+from sailsim.gui.Trajectory import Trajectory
 from sailsim.sailor.Commands import Waypoint
 
 
@@ -24,6 +30,17 @@ def dynamicSizePen(pen: QPen, painter: QPainter) -> QPen:
     return pen
 
 
+def visibleRect(painter: QPainter, option: QStyleOptionGraphicsItem) -> QRectF:
+    """Return the part of an item that is exposed and inside the paint device in item coordinates."""
+    visible = option.exposedRect
+    (inverse, invertible) = painter.worldTransform().inverted()
+    if invertible:
+        device = painter.device()
+        deviceRect = inverse.mapRect(QRectF(0, 0, device.width(), device.height()))
+        visible = visible & deviceRect if visible.isValid() else deviceRect
+    return visible
+
+
 def pointsToPath(points: list[tuple[float, float]], jump: int = 1) -> QPainterPath:
     """Convert a pointlist into a QPainterPath."""
     path = QPainterPath()
@@ -37,29 +54,32 @@ def pointsToPath(points: list[tuple[float, float]], jump: int = 1) -> QPainterPa
 class GUIBoat(QGraphicsItem):
     """Display a sailsim boat in a QGraphicsScene."""
 
-    mainSail = QLineF(0, 0, 0, 2)
-    rudder = QLineF(0, 2.2, 0, 2.2)
+    mainSail = QLineF(0, 0, 0, SAIL_LENGTH)
+    rudder = QLineF(0, RUDDER_OFFSET, 0, RUDDER_OFFSET)
 
     allowMovement = True
+    color = Qt.black
 
     displayMainSail = True
     displayRudder = True
 
-    def __init__(self, boat: Boat, parent=None) -> None:
+    def __init__(self, boat: Boat, parent=None, renderData: Optional[FrameRenderData] = None) -> None:
         """
         Create a GUIBoat Objects.
 
         Args:
-            boat:   Boat to display
-            parent: Parent of the QGraphicsItem
+            boat:       Boat to display
+            parent:     Parent of the QGraphicsItem
+            renderData: precomputed geometry of the frames of boat, can be shared with other items of the boat
         """
         super().__init__(parent)
         self.frameList = boat.frameList
+        self.renderData = FrameRenderData(boat.frameList) if renderData is None else renderData
 
     def paint(self, painter: QPainter, _option: QStyleOptionGraphicsItem, _widget: Optional[QWidget] = None) -> None:
         """Paint the boat on the painter given."""
         painter.setPen(Qt.NoPen)
-        painter.setBrush(Qt.black)
+        painter.setBrush(self.color)
         painter.drawPath(self.boatShape)
         painter.setBrush(Qt.NoBrush)
 
@@ -77,9 +97,14 @@ class GUIBoat(QGraphicsItem):
 
     def boundingRect(self) -> QRectF:
         """Return bounding rect of the boat."""
+        return self.boatRect
+
+    @cached_property
+    def boatRect(self) -> QRectF:
+        """Return the bounding rectangle of the boat for every angle of sail and rudder, so it doesn't change with the frame."""
         return (self.boatShape.boundingRect()
-                | QRectF(self.mainSail.p1(), self.mainSail.p2()).normalized()
-                | QRectF(self.rudder.p1(), self.rudder.p2()).normalized()
+                | QRectF(-SAIL_LENGTH, -SAIL_LENGTH, 2 * SAIL_LENGTH, 2 * SAIL_LENGTH)
+                | QRectF(-RUDDER_LENGTH, RUDDER_OFFSET - RUDDER_LENGTH, 2 * RUDDER_LENGTH, 2 * RUDDER_LENGTH)
                 )
 
     @cached_property
@@ -99,26 +124,62 @@ class GUIBoat(QGraphicsItem):
         Args:
             framenumber: int   number of the frame
         """
-        frame = self.frameList[framenumber]
+        self.setPose(*self.renderData.row(framenumber)[:POSE_COLUMNS])
+
+    def setState(self, posX: float, posY: float, direction: float, mainSailAngle: float, rudderAngle: float) -> None:
+        """Move and turn the boat, sail and rudder."""
+        self.setPose(posX, -posY, direction / pi * 180, -sin(mainSailAngle) * SAIL_LENGTH, cos(mainSailAngle) * SAIL_LENGTH,
+                     sin(rudderAngle) * RUDDER_LENGTH, RUDDER_OFFSET + cos(rudderAngle) * RUDDER_LENGTH)
+
+    def setPose(self, posX: float, posY: float, rotation: float, sailX: float, sailY: float, rudderX: float, rudderY: float) -> None:
+        """Set position and rotation (in degrees) of the boat and the end points of sail and rudder in scene coordinates."""
         if self.allowMovement:
-            self.setPos(QPointF(frame.boatPosX, -frame.boatPosY))
-        self.setRotation(frame.boatDirection / pi * 180)
+            self.setPos(posX, posY)
+        self.setRotation(rotation)
+
+        self.mainSail.setP2(QPointF(sailX, sailY))
+        self.rudder.setP2(QPointF(rudderX, rudderY))
+
+
+class GUITrajectoryBoat(GUIBoat):
+    """Display the boat of a Trajectory of another run in a QGraphicsScene."""
+
+    def __init__(self, trajectory: Trajectory, color: QColor, parent=None) -> None:
+        """
+        Create a GUITrajectoryBoat object.
+
+        Args:
+            trajectory: Trajectory to display
+            color:      color of the boat
+            parent:     Parent of the QGraphicsItem
+        """
+        super(GUIBoat, self).__init__(parent)  # pylint: disable=bad-super-call
+        self.trajectory = trajectory
+        self.color = color
+        # Every boat needs its own lines
+        self.mainSail = QLineF(GUIBoat.mainSail.p1(), GUIBoat.mainSail.p1() + QPointF(0, SAIL_LENGTH))
+        self.rudder = QLineF(GUIBoat.rudder.p1(), GUIBoat.rudder.p1())
+        self.setVisible(len(trajectory) > 0)
 
-        self.mainSail.setP2(QPointF(-sin(frame.boatMainSailAngle), cos(frame.boatMainSailAngle)) * 2)
-        self.rudder.setP2(self.rudder.p1() + QPointF(sin(frame.boatRudderAngle), cos(frame.boatRudderAngle)) * 0.5)
+    def setFrame(self, framenumber: int) -> None:
+        """Show the trajectory at a frame, it stays at its last frame when it ended."""
+        if len(self.trajectory):
+            self.setState(*self.trajectory.state(framenumber))
 
 
 class QGraphicsArrowItem(QGraphicsLineItem):
     """Draws a arrow with head."""
 
     arrowHead: QPolygonF
+    headDirections: tuple[float, float, float, float]
     headSize = 10.0
-    arrowAngle = .4
+    arrowAngle = ARROW_ANGLE
 
     def __init__(self, *args) -> None:
         """Create a QGraphicsArrowItem."""
         super().__init__(*args)
 
+        self.headDirections = self.computeHeadDirections()
         self.updateHead()
 
     def paint(self, painter: QPainter, _option: QStyleOptionGraphicsItem, _widget: Optional[QWidget] = None) -> None:
@@ -148,13 +209,27 @@ class QGraphicsArrowItem(QGraphicsLineItem):
         return super().boundingRect() | self.arrowHead.boundingRect()
 
     def updateHead(self, scale: float = 1.0) -> None:
-        """Update shape and size of the arrow head."""
+        """Update size of the arrow head."""
+        tip = self.line().p2()
+        (side1X, side1Y, side2X, side2Y) = self.headDirections
+        self.arrowHead = QPolygonF([tip - QPointF(side1X, side1Y) * scale, tip, tip - QPointF(side2X, side2Y) * scale])
+
+    def computeHeadDirections(self) -> tuple[float, float, float, float]:
+        """Return the directions (x1, y1, x2, y2) of both sides of the arrow head for the current line."""
         line = self.line()
         angle = atan2(line.dy(), line.dx())
+        return (sin(pi/2 - angle - self.arrowAngle), cos(pi/2 - angle - self.arrowAngle),
+                sin(pi/2 - angle + self.arrowAngle), cos(pi/2 - angle + self.arrowAngle))
 
-        line1 = QPointF(sin(pi/2 - angle - self.arrowAngle), cos(pi/2 - angle - self.arrowAngle))
-        line2 = QPointF(sin(pi/2 - angle + self.arrowAngle), cos(pi/2 - angle + self.arrowAngle))
-        self.arrowHead = QPolygonF([line.p2() - line1 * scale, line.p2(), line.p2() - line2 * scale])
+    def setLine(self, *args) -> None:
+        """Set the line of the QGraphicsArrowItem, the arguments are the ones of QGraphicsLineItem.setLine()."""
+        super().setLine(*args)
+        self.headDirections = self.computeHeadDirections()
+
+    def setGeometry(self, geometry: list[float]) -> None:
+        """Set line and the precomputed directions of the arrow head sides: x1, y1, x2, y2, side1X, side1Y, side2X, side2Y."""
+        super().setLine(*geometry[:4])
+        self.headDirections = tuple(geometry[4:])
 
     def setP2(self, point: Union[QPoint, QPointF]) -> None:
         """Set the end point of the QGraphicsArrowItem."""
@@ -163,24 +238,113 @@ class QGraphicsArrowItem(QGraphicsLineItem):
         self.setLine(line)
 
 
-class GUIBoatPath(QGraphicsPathItem):
+class GUILevelPath(QGraphicsPathItem):
+    """Display a polyline from PathLevels in the level of detail of the zoom, only the chunks in view are drawn."""
+
+    maxError = 1.0  # Largest deviation of the drawn path (in pixels)
+
+    def __init__(self, *args) -> None:
+        """Create an empty GUILevelPath object."""
+        super().__init__(*args)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)  # Fill option.exposedRect
+        self.levels = PathLevels()
+        self.chunkPaths: dict[tuple[int, int], QPainterPath] = {}
+        self.rect = QRectF()
+
+    def clearPath(self) -> None:
+        """Delete all points of the path."""
+        self.prepareGeometryChange()
+        self.levels.clear()
+        self.chunkPaths = {}
+        self.rect = QRectF()
+
+    def beginChange(self) -> list[int]:
+        """Prepare adding points to self.levels, pass the result to endChange() when they were added."""
+        self.prepareGeometryChange()
+        return [len(chunks) for chunks in self.levels.chunks]
+
+    def endChange(self, chunkCounts: list[int]) -> None:
+        """Update bounding rectangle and the cached chunks after points were added."""
+        box = self.levels.boundingBox()
+        if box is not None:
+            self.rect = QRectF(box[0], box[1], box[2] - box[0], box[3] - box[1])
+
+        # The last chunk of every level might have changed
+        for (level, index) in list(self.chunkPaths):
+            if index >= chunkCounts[level] - 1:
+                del self.chunkPaths[(level, index)]
+        self.update()
+
+    def chunkPath(self, level: int, index: int) -> QPainterPath:
+        """Return the QPainterPath of a chunk of a level, it is created when it is drawn for the first time."""
+        path = self.chunkPaths.get((level, index))
+        if path is None:
+            chunk = self.levels.chunks[level][index]
+            path = QPainterPath(QPointF(chunk[0], chunk[1]))
+            for i in range(2, len(chunk), 2):
+                path.lineTo(chunk[i], chunk[i + 1])
+            self.chunkPaths[(level, index)] = path
+        return path
+
+    def boundingRect(self) -> QRectF:
+        """Return bounding rectangle of all points of the path."""
+        return self.rect
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, _widget: Optional[QWidget] = None) -> None:
+        """Paint the visible part of the path in the level of detail of the zoom of the painter."""
+        pixelSize = 1 / QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        level = self.levels.levelFor(pixelSize, self.maxError)
+        # Only draw chunks in the exposed part of the paint device
+        visible = visibleRect(painter, option)
+        rect = (visible.left(), visible.top(), visible.right(), visible.bottom()) if visible.isValid() else None
+        painter.setPen(dynamicSizePen(self.pen(), painter))
+        for index in self.levels.visibleChunks(level, rect):
+            painter.drawPath(self.chunkPath(level, index))
+
+
+class GUIBoatPath(GUILevelPath):
     """Display the path of a sailsim boat in a QGraphicsScene."""
 
     def __init__(self, boat: Boat, *args) -> None:
         """Create a GUIBoatPath object."""
         super().__init__(*args)
         self.frameList = boat.frameList
-        self.updateBoatPath(5)
+        self.pathEnd = 0  # Index of the next frame that is added to the path
+        self.updateBoatPath()
+
+    def updateBoatPath(self) -> None:
+        """Build the path from all frames of the frameList."""
+        self.clearPath()
+        self.pathEnd = 0
+        self.extendBoatPath(len(self.frameList))
+
+    def extendBoatPath(self, frameCount: int) -> None:
+        """Add the frames up to frameCount that were recorded after the last update to the path, the path is rebuilt if there are fewer frames than before."""
+        if frameCount < self.pathEnd:
+            self.clearPath()
+            self.pathEnd = 0
+        if frameCount == self.pathEnd:
+            return
+        chunkCounts = self.beginChange()
+        frames = self.frameList.frames
+        append = self.levels.append
+        for i in range(self.pathEnd, frameCount):
+            frame = frames[i]
+            append(frame.boatPosX, -frame.boatPosY)
+        self.pathEnd = frameCount
+        self.endChange(chunkCounts)
 
-    def updateBoatPath(self, jump: int = 1) -> None:
-        """Convert a pointlist into a QPainterPath."""
-        points = self.frameList.getCoordinateList()
-        self.setPath(pointsToPath(points, jump))
 
-    def paint(self, painter: QPainter, _option: QStyleOptionGraphicsItem, _widget: Optional[QWidget] = None) -> None:
-        """Paint the boat path on the painter given."""
-        painter.setPen(dynamicSizePen(self.pen(), painter))
-        painter.drawPath(self.path())
+class GUITrajectoryPath(GUILevelPath):
+    """Display the path of a Trajectory of another run in a QGraphicsScene."""
+
+    def __init__(self, trajectory: Trajectory, *args) -> None:
+        """Create a GUITrajectoryPath object, the path is simplified with NumPy."""
+        super().__init__(*args)
+        self.trajectory = trajectory
+        chunkCounts = self.beginChange()
+        self.levels.extendArrays(trajectory.columns["boatPosX"], -np.asarray(trajectory.columns["boatPosY"]))
+        self.endChange(chunkCounts)
 
 
 class GUIBoatVectors(QGraphicsItem):
@@ -199,11 +363,23 @@ class GUIBoatVectors(QGraphicsItem):
 
     followBoat = True
 
-    def __init__(self, boat: Boat, parent=None) -> None:
-        """Create a GUIBoatVectors object."""
+    def __init__(self, boat: Boat, parent=None, renderData: Optional[FrameRenderData] = None) -> None:
+        """
+        Create a GUIBoatVectors object.
+
+        Args:
+            boat:       Boat whose vectors are displayed
+            parent:     Parent of the QGraphicsItem
+            renderData: precomputed geometry of the frames of boat, can be shared with other items of the boat
+        """
         super().__init__(parent)
 
         self.frameList = boat.frameList
+        self.renderData = FrameRenderData(boat.frameList) if renderData is None else renderData
+        self.arrows: list[QGraphicsArrowItem] = [getattr(self, name) for (name, *_) in ARROWS]
+        self.row: Optional[list[float]] = None  # Row of the FrameRenderData of the frame shown
+        self.rect = QRectF()        # Bounding rectangle of the lines of all arrows
+        self.headMargin = 0.0       # Size of the arrow heads when they were painted last
 
         self.boatSpeed.setPen(QPen(Qt.blue, 2))
         self.boatForce.setPen(QPen(Qt.darkRed, 2))
@@ -218,6 +394,10 @@ class GUIBoatVectors(QGraphicsItem):
 
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = None) -> None:
         """Paint boat Vectors with the painter given."""
+        if self.row is None:
+            return
+        self.updateArrows()
+
         # Draw forces
         self.boatForceSailDrag.paint(painter, option, widget)
         self.boatForceSailLift.paint(painter, option, widget)
@@ -231,6 +411,7 @@ class GUIBoatVectors(QGraphicsItem):
         # Display Direction and Speed
         self.boatSpeed.paint(painter, option, widget)
         self.boatForce.paint(painter, option, widget)
+        self.headMargin = self.boatSpeed.headSize / painterScale(painter)
 
         # Draw bounding rectangle (for testing)
         # painter.setPen(dynamicSizePen(QPen(Qt.black), painter))
@@ -239,11 +420,8 @@ class GUIBoatVectors(QGraphicsItem):
 
     def boundingRect(self) -> QRectF:
         """Return bounding rectangle of the boat vectors."""
-        return (self.boatSpeed.boundingRect() | self.boatForce.boundingRect()
-                | self.boatForceSailDrag.boundingRect() | self.boatForceSailLift.boundingRect()
-                | self.boatForceCenterboardDrag.boundingRect() | self.boatForceCenterboardLift.boundingRect()
-                | self.boatForceRudderDrag.boundingRect() | self.boatForceRudderLift.boundingRect()
-                )
+        margin = self.headMargin
+        return self.rect.adjusted(-margin, -margin, margin, margin)
 
     def setFrame(self, framenumber: int) -> None:
         """
@@ -252,27 +430,21 @@ class GUIBoatVectors(QGraphicsItem):
         Args:
             framenumber: int   number of the frame
         """
-        frame = self.frameList[framenumber]
-
-        scaleForce = 1 / 1024
-
+        row = self.renderData.row(framenumber)
+        (minX, minY, maxX, maxY) = row[BOUNDS_COLUMN:BOUNDS_COLUMN + 4]
+        self.prepareGeometryChange()
+        self.row = row
+        self.rect = QRectF(minX, minY, maxX - minX, maxY - minY)
         if self.followBoat:
-            self.setPos(QPointF(frame.boatPosX, -frame.boatPosY))
-
-        self.boatSpeed.setP2(QPointF(frame.boatSpeedX, -frame.boatSpeedY))
-        self.boatForce.setP2(QPointF(frame.boatForceX, -frame.boatForceY) * scaleForce)
-
-        self.boatForceSailDrag.setP2(QPointF(frame.boatSailDragX, -frame.boatSailDragY) * scaleForce)
-        self.boatForceSailLift.setP2(QPointF(frame.boatSailLiftX, -frame.boatSailLiftY) * scaleForce)
-
-        self.boatForceCenterboardDrag.setP2(QPointF(frame.boatCenterboardDragX, -frame.boatCenterboardDragY) * scaleForce)
-        self.boatForceCenterboardLift.setP2(QPointF(frame.boatCenterboardLiftX, -frame.boatCenterboardLiftY) * scaleForce)
-
-        rudderStartPoint = QPointF(-sin(frame.boatDirection)*2.2, cos(frame.boatDirection)*2.2)
-        self.boatForceRudderDrag.setLine(QLineF(rudderStartPoint,
-                                                rudderStartPoint + QPointF(frame.boatRudderDragX, -frame.boatRudderDragY) * scaleForce))
-        self.boatForceRudderLift.setLine(QLineF(rudderStartPoint,
-                                                rudderStartPoint + QPointF(frame.boatRudderLiftX, -frame.boatRudderLiftY) * scaleForce))
+            self.setPos(row[0], row[1])
+
+    def updateArrows(self) -> None:
+        """Set the arrows to the frame shown, this happens when they are painted as the arrows are shared by all GUIBoatVectors."""
+        row = self.row
+        first = ARROWS_COLUMN
+        for arrow in self.arrows:
+            arrow.setGeometry(row[first:first + ARROW_COLUMNS])
+            first += ARROW_COLUMNS
 
 
 class GUIWaypoints(QGraphicsItem):
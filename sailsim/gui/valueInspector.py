@@ -1,52 +1,128 @@
 """This module contains the class declaration for the ValueInspectorWidget."""
 
 from math import pi, sqrt
+from time import perf_counter
 
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QTreeWidget
 
 def toString(text):
     return f'{text:.4f}'.rstrip('0').rstrip('.')
 
+
+def vector(nameX, nameY):
+    """Return a function that reads the length and the components of a vector from a frame."""
+    def values(frame):
+        valX = getattr(frame, nameX)
+        valY = getattr(frame, nameY)
+        return (sqrt(valX**2 + valY**2), valX, valY)
+    return values
+
+
+def scalar(name, factor=1):
+    """Return a function that reads a value from a frame."""
+    return lambda frame: (getattr(frame, name) * factor,)
+
+
+# Path of the item in the tree -> values of its columns 1, 2, ...
+VALUE_ROWS = (
+    ((0,), vector("boatPosX", "boatPosY")),
+    ((1,), scalar("boatDirection", 180 / pi)),
+    ((2,), vector("boatSpeedX", "boatSpeedY")),
+    ((3,), scalar("boatAngSpeed", 180 / pi)),
+    # Forces
+    ((4,), vector("boatForceX", "boatForceY")),
+    ((4, 0), vector("boatSailDragX", "boatSailDragY")),
+    ((4, 1), vector("boatSailLiftX", "boatSailLiftY")),
+    ((4, 2), vector("boatCenterboardDragX", "boatCenterboardDragY")),
+    ((4, 3), vector("boatCenterboardLiftX", "boatCenterboardLiftY")),
+    ((4, 4), vector("boatRudderDragX", "boatRudderDragY")),
+    ((4, 5), vector("boatRudderLiftX", "boatRudderLiftY")),
+    # ((4, 6), vector("boatHullDragX", "boatHullDragY")),
+    # ((4, 7), vector("boatHullLiftX", "boatHullLiftY")),
+    # Torque
+    ((5,), scalar("boatTorque")),
+    ((5, 0), scalar("boatWaterDragTorque")),
+    ((5, 1), scalar("boatCenterboardTorque")),
+    ((5, 2), scalar("boatRudderTorque")),
+    # ((5, 3), scalar("boatHullTorque")),
+    # Angles
+    ((6, 0), scalar("boatMainSailAngle")),
+    ((6, 1), scalar("boatRudderAngle")),
+    ((6, 2), scalar("boatLeewayAngle")),
+)
+
+
 class ValueInspectorWidget(QTreeWidget):
-    """List Widget that displays the boat's values."""
+    """
+    List Widget that displays the boat's values.
+
+    Only rows that can be seen are updated: collapsed, hidden and scrolled out rows keep their text
+    until they are shown again. Texts are only set if the value changed and the widget refreshes at
+    most maxRefreshRate times per second, frames that arrive in between are skipped.
+    """
+
+    def __init__(self, parent=None, maxRefreshRate: float = 30):
+        super().__init__(parent)
+        self.refreshInterval = 1 / maxRefreshRate
+        self.lastRefresh = -self.refreshInterval
+        self.frame = None
+        self.rows = None  # The items are created after the widget, see rowList()
+
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.timeout.connect(self.refresh)
+        self.itemExpanded.connect(self.scheduleRefresh)
+        self.verticalScrollBar().valueChanged.connect(self.scheduleRefresh)
 
     def viewFrame(self, frame):
-        self.updateValueInspectorRow(self.topLevelItem(0), frame.boatPosX, frame.boatPosY)
-
-        self.topLevelItem(1).setText(1, toString(frame.boatDirection * 180 / pi))
-
-        self.updateValueInspectorRow(self.topLevelItem(2), frame.boatSpeedX, frame.boatSpeedY)
-
-        self.topLevelItem(3).setText(1, toString(frame.boatAngSpeed * 180 / pi))
-
-        # Display Forces
-        itemForce = self.topLevelItem(4)
-        self.updateValueInspectorRow(itemForce, frame.boatForceX, frame.boatForceY)
-        self.updateValueInspectorRow(itemForce.child(0), frame.boatSailDragX, frame.boatSailDragY)
-        self.updateValueInspectorRow(itemForce.child(1), frame.boatSailLiftX, frame.boatSailLiftY)
-        self.updateValueInspectorRow(itemForce.child(2), frame.boatCenterboardDragX, frame.boatCenterboardDragY)
-        self.updateValueInspectorRow(itemForce.child(3), frame.boatCenterboardLiftX, frame.boatCenterboardLiftY)
-        self.updateValueInspectorRow(itemForce.child(4), frame.boatRudderDragX, frame.boatRudderDragY)
-        self.updateValueInspectorRow(itemForce.child(5), frame.boatRudderLiftX, frame.boatRudderLiftY)
-        # self.updateValueInspectorRow(itemForce.child(6), frame.boatHullDragX, frame.boatHullDragY)
-        # self.updateValueInspectorRow(itemForce.child(7), frame.boatHullLiftX, frame.boatHullLiftY)
-
-        # Display Torque
-        itemTorque = self.topLevelItem(5)
-        itemTorque.setText(1, toString(frame.boatTorque))
-        itemTorque.child(0).setText(1, toString(frame.boatWaterDragTorque))
-        itemTorque.child(1).setText(1, toString(frame.boatCenterboardTorque))
-        itemTorque.child(2).setText(1, toString(frame.boatRudderTorque))
-        # itemTorque.child(3).setText(1, toString(frame.boatHullTorque))
-
-        # Display Angles
-        itemAngle = self.topLevelItem(6)
-        itemAngle.child(0).setText(1, toString(frame.boatMainSailAngle))
-        itemAngle.child(1).setText(1, toString(frame.boatRudderAngle))
-        itemAngle.child(2).setText(1, toString(frame.boatLeewayAngle))
-
-
-    def updateValueInspectorRow(self, item, valX, valY):
-        item.setText(1, toString(sqrt(valX**2 + valY**2)))
-        item.setText(2, toString(valX))
-        item.setText(3, toString(valY))
+        """Show a frame, the rows are updated with the next refresh."""
+        self.frame = frame
+        self.scheduleRefresh()
+
+    def scheduleRefresh(self, *_args):
+        if self.refreshTimer.isActive() or not self.isVisible():
+            return  # showEvent refreshes hidden widgets
+        wait = self.lastRefresh + self.refreshInterval - perf_counter()
+        self.refreshTimer.start(max(int(wait * 1000), 0))
+
+    def refresh(self):
+        """Update the texts of all visible rows to the last frame."""
+        self.lastRefresh = perf_counter()
+        frame = self.frame
+        if frame is None or not self.isVisible():
+            return
+        viewport = self.viewport().rect()
+        for (item, values, texts) in self.rowList():
+            if not self.rowVisible(item, viewport):
+                continue
+            for column, value in enumerate(values(frame)):
+                if texts[column] != value:  # NaN is never equal, it is just formatted again
+                    texts[column] = value
+                    item.setText(column + 1, toString(value))
+
+    def rowList(self):
+        """Return the rows (item, values, last values) of VALUE_ROWS."""
+        if self.rows is None:
+            self.rows = []
+            for (path, values) in VALUE_ROWS:
+                item = self.topLevelItem(path[0])
+                for index in path[1:]:
+                    item = item.child(index)
+                self.rows.append((item, values, [None] * 3))
+        return self.rows
+
+    def rowVisible(self, item, viewport):
+        """Return whether an item is shown in the viewport."""
+        if item.isHidden():
+            return False
+        parent = item.parent()
+        while parent is not None:
+            if not parent.isExpanded() or parent.isHidden():
+                return False
+            parent = parent.parent()
+        return self.visualItemRect(item).intersects(viewport)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.scheduleRefresh()
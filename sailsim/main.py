@@ -1,10 +1,204 @@
-from sailsim.simulation.Simulation import Simulation
+"""
+Command line interface of sailsim.
 
-from sailsim.boat.Boat import Boat
-from sailsim.wind.Wind import Wind
-from sailsim.wind.Windfield import Windfield
+Run scenario files (see sailsim.simulation.scenario) without GUI and save the results:
+
+    sailsim upwind.json downwind.json --output results --csv --binary --summary --jobs 4
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from math import isfinite, sqrt
+from time import perf_counter
+from typing import Any, Optional
+
+from sailsim.simulation.ResultCache import DEFAULT_DIRECTORY, ResultCache
+from sailsim.simulation.scenario import createSimulation, loadScenario, scenarioHash
+from sailsim.simulation.StopConditions import CourseFinished, STOP_DIVERGED, Watchdog
+
+OUTPUT_CSV = "csv"
+OUTPUT_BINARY = "binary"
+OUTPUT_SUMMARY = "summary"
+
+
+def runScenario(path: str, outputDir: str = ".", outputs: tuple[str, ...] = (OUTPUT_SUMMARY,), lastFrame: Optional[int] = None,
+                backend: Optional[str] = None, cacheDir: Optional[str] = None, stopEarly: bool = True,
+                outputName: Optional[str] = None) -> dict[str, Any]:
+    """
+    Simulate one scenario file and save the outputs. Return a summary of the run.
+
+    Runs end when the boat diverges and, if stopEarly is set, when the sailor has finished the course.
+
+    Args:
+        path:       scenario file
+        outputDir:  folder for the output files
+        outputs:    any of OUTPUT_CSV, OUTPUT_BINARY and OUTPUT_SUMMARY
+        lastFrame:  overwrite lastFrame of the scenario
+        backend:    overwrite the backend of the simulation
+        cacheDir:   folder of a ResultCache, repeated runs are loaded from there
+        stopEarly:  stop when the course is finished
+        outputName: name of the output files without extension, default: name of the scenario file
+    """
+    summary: dict[str, Any] = {"scenario": path}
+    try:
+        scenario = loadScenario(path)
+        simulation = createSimulation(scenario)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        summary["error"] = f"{type(error).__name__}: {error}"
+        return summary
+
+    if lastFrame is not None:
+        simulation.lastFrame = lastFrame
+    if simulation.lastFrame is None:
+        summary["error"] = "Scenario has no lastFrame"
+        return summary
+    if backend is not None:
+        simulation.backend = backend
+    # Frames are only needed for trajectory outputs
+    simulation.record = OUTPUT_CSV in outputs or OUTPUT_BINARY in outputs
+    simulation.addStopCondition(Watchdog())
+    if stopEarly and simulation.boat.sailor is not None:
+        simulation.addStopCondition(CourseFinished())
+
+    start = perf_counter()
+    diverged = False
+    cached = False
+    try:
+        if cacheDir is not None:
+            cached = ResultCache(cacheDir).run(simulation)
+        else:
+            simulation.run()
+    except (OverflowError, ValueError, ZeroDivisionError):
+        diverged = True
+    diverged = diverged or simulation.stopReason == STOP_DIVERGED
+    wallTime = perf_counter() - start
+
+    name = os.path.join(outputDir, outputName if outputName is not None else os.path.splitext(os.path.basename(path))[0])
+    summary.update({
+        "name": scenario.get("name", os.path.basename(name)),
+        "hash": scenarioHash(scenario),
+        "wallTime": wallTime,
+        "cached": cached,
+    })
+    summary.update(simulationSummary(simulation, diverged))
+
+    boat = simulation.boat
+    files = []
+    if OUTPUT_CSV in outputs:
+        boat.frameList.saveCSV(name + ".csv")
+        files.append(name + ".csv")
+    if OUTPUT_BINARY in outputs:
+        boat.frameList.saveNumpy(name + ".npy")
+        files.append(name + ".npy")
+    if OUTPUT_SUMMARY in outputs:
+        files.append(name + ".json")
+    summary["files"] = files
+    if OUTPUT_SUMMARY in outputs:
+        with open(name + ".json", "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=4)
+    return summary
+
+
+def simulationSummary(simulation, diverged: bool = False) -> dict[str, Any]:
+    """Return frames, time, stop reason and final state of a simulation as dictionary that can be written as JSON."""
+    boat = simulation.boat
+    summary = {
+        "frames": simulation.frame,
+        "time": simulation.getTime(),
+        "diverged": diverged,
+        "stopReason": simulation.stopReason,
+        "posX": _finite(boat.posX),
+        "posY": _finite(boat.posY),
+        "direction": _finite(boat.direction),
+        "speed": _finite(sqrt(boat.speedX**2 + boat.speedY**2)) if not diverged else None,
+    }
+    if boat.sailor is not None:
+        course = boat.sailor.course
+        summary["courseFinished"] = course.finished()
+        summary["distanceRemaining"] = _finite(course.distanceRemaining(boat.posX, boat.posY)) if not diverged else None
+    return summary
+
+
+def _finite(value: float) -> Optional[float]:
+    """Return value or None if it can't be written as JSON number."""
+    return value if isfinite(value) else None
+
+
+def outputNames(paths: list[str]) -> list[str]:
+    """
+    Return a name for the output files of every scenario file, no two scenarios get the same name.
+
+    Scenarios are named like their file. Files with the same name in different folders are named by their path
+    relative to the folder they share, e.g. upwind/light.json -> upwind_light. A file given twice gets a number.
+    """
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    names = list(stems)
+    absolute = [os.path.abspath(path) for path in paths]
+    for stem in set(stems):
+        group = [index for index in range(len(paths)) if stems[index] == stem]
+        if len(group) > 1:
+            common = os.path.commonpath([os.path.dirname(absolute[index]) for index in group])
+            for index in group:
+                names[index] = os.path.splitext(os.path.relpath(absolute[index], common))[0].replace(os.sep, "_")
+    seen: dict[str, int] = {}
+    for (index, name) in enumerate(names):
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            names[index] = f"{name}-{seen[name]}"
+    return names
+
+
+def _runScenarioArgs(args: tuple) -> dict[str, Any]:
+    """Unpack arguments for executor.map."""
+    return runScenario(*args)
+
+
+def runScenarios(paths: list[str], outputDir: str = ".", outputs: tuple[str, ...] = (OUTPUT_SUMMARY,), lastFrame: Optional[int] = None,
+                 backend: Optional[str] = None, jobs: Optional[int] = 1, cacheDir: Optional[str] = None,
+                 stopEarly: bool = True) -> list[dict[str, Any]]:
+    """Run several scenario files, on jobs worker processes if jobs is not 1 (None: number of cpus). Return the summaries."""
+    arguments = [(path, outputDir, outputs, lastFrame, backend, cacheDir, stopEarly, name) for (path, name) in zip(paths, outputNames(paths))]
+    if jobs == 1 or len(paths) < 2:
+        return [runScenario(*args) for args in arguments]
+    with ProcessPoolExecutor(jobs) as pool:
+        return list(pool.map(_runScenarioArgs, arguments))
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    """Entry point of the sailsim command. Return 1 if a scenario could not be run."""
+    parser = argparse.ArgumentParser(prog="sailsim", description="Run sailsim scenarios without GUI.")
+    parser.add_argument("scenarios", nargs="+", help="scenario files (.json or .toml)")
+    parser.add_argument("-o", "--output", default=".", help="folder for the output files, default: current folder")
+    parser.add_argument("--csv", action="store_true", help="save every frame as .csv file")
+    parser.add_argument("--binary", action="store_true", help="save every frame as binary NumPy array (.npy)")
+    parser.add_argument("--summary", action="store_true", help="save a summary as .json file (default if no output is chosen)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes, 0: number of cpus, default: 1")
+    parser.add_argument("--last-frame", type=int, help="overwrite lastFrame of the scenarios")
+    parser.add_argument("--backend", choices=("auto", "kernel", "python"), help="overwrite the simulation backend")
+    parser.add_argument("--cache", metavar="DIR", nargs="?", const=DEFAULT_DIRECTORY, help=f"load repeated runs from a result cache, default: {DEFAULT_DIRECTORY}")
+    parser.add_argument("--full", action="store_true", help="keep running after the course is finished until lastFrame")
+    args = parser.parse_args(arguments)
+
+    outputs = tuple(output for output, chosen in ((OUTPUT_CSV, args.csv), (OUTPUT_BINARY, args.binary), (OUTPUT_SUMMARY, args.summary)) if chosen)
+    os.makedirs(args.output, exist_ok=True)
+    summaries = runScenarios(args.scenarios, args.output, outputs or (OUTPUT_SUMMARY,), args.last_frame, args.backend, args.jobs or None, args.cache,
+                             not args.full)
+
+    failed = 0
+    for summary in summaries:
+        if "error" in summary:
+            failed += 1
+            print(f"{summary['scenario']}: {summary['error']}", file=sys.stderr)
+        else:
+            state = "diverged" if summary["diverged"] else summary["stopReason"] or "ok"
+            if summary["cached"]:
+                state += " (cached)"
+            print(f"{summary['scenario']}: {state}, {summary['frames']} frames in {summary['wallTime']:.3f}s")
+    return 1 if failed else 0
 
 
 if __name__ == '__main__':
-    pass
-    # TODO yet to be implemented
+    sys.exit(main())
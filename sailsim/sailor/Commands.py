@@ -1,35 +1,62 @@
-from math import sqrt
+from math import pi
 
 
 class Waypoint:
     """Holds information about waypoints of the boat."""
 
     def __init__(self, destX, destY, radius):
+        """
+        Create a Waypoint command. sailsim.sailor.Course steers towards it until the boat is inside the radius.
+
+        Args:
+            destX:  x coordinate of the waypoint
+            destY:  y coordinate of the waypoint
+            radius: distance (in m) at which the waypoint counts as reached
+        """
         self.destX = destX
         self.destY = destY
         self.radius = radius
 
-        self.programmed = False
-
-    def checkWaypoint(self, sailor, posX, posY):
-        """Check if the destination is already reached and set destination once."""
-        if sqrt(pow(self.destX - posX, 2) + pow(self.destY - posY, 2)) <= self.radius:
-            self.programmed = False
-            return True
-        else:
-            if not self.programmed:
-                sailor.setDestination(self.destX, self.destY)
-            return False
-
-
-# TODO write other commands
-# class Command:
-#     """Holds information about actions of the boat."""
-#     def __init__(self):
-#         pass
-#
-#     def checkCommand():
-#         return True
+
+class HoldHeading:
+    """Keep the boat on a fixed compass course for some time."""
+
+    def __init__(self, direction, duration):
+        """
+        Create a HoldHeading command.
+
+        Args:
+            direction:  compass course to hold (in rad)
+            duration:   time to hold the course (in s)
+        """
+        self.direction = direction
+        self.duration = duration
+
+
+class Wait:
+    """Keep sailing like before until a point in time is reached."""
+
+    def __init__(self, time):
+        """
+        Create a Wait command.
+
+        Args:
+            time:   simulation time (in s) at which the next command is started
+        """
+        self.time = time
+
+
+class Tack:
+    """Turn the boat through the wind onto the opposite tack."""
+
+    def __init__(self, tolerance=10 / 180 * pi):
+        """
+        Create a Tack command.
+
+        Args:
+            tolerance:  maximum difference (in rad) between compass and new course to finish the tack
+        """
+        self.tolerance = tolerance
 
 
 commandListExample = [Waypoint(10, -20, 1), Waypoint(-10, -10, 1), Waypoint(-30, 30, 1), Waypoint(20, 20, 1), Waypoint(10, -5, 1), Waypoint(100, 0, 1)]
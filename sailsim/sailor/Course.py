@@ -0,0 +1,232 @@
+"""
+This module compiles a command list into a state machine.
+
+Every command is translated once into an enter and a check function with all constants it needs
+precomputed. Which functions are used for a command is looked up in a dispatch table when the
+course is compiled, so running the course only ever calls the functions of the active command.
+"""
+
+from math import pi, sqrt
+from typing import Any, Callable, Optional
+
+from sailsim.utils.anglecalculations import angleKeepInterval, directionKeepInterval
+from sailsim.utils.coordconversion import cartToArg
+from sailsim.sailor.Commands import HoldHeading, Tack, Wait, Waypoint
+
+
+def laylines(trueWindDir: float, tackingAngle: float) -> tuple[float, float]:
+    """Return the courses of both laylines for a true wind blowing towards trueWindDir."""
+    return (directionKeepInterval(trueWindDir + tackingAngle + pi),
+            directionKeepInterval(trueWindDir - tackingAngle + pi))
+
+
+class Leg:
+    """Precomputed geometry of the way from one mark to the next."""
+
+    __slots__ = ("startX", "startY", "endX", "endY", "length", "bearing", "dirX", "dirY")
+
+    def __init__(self, startX: float, startY: float, endX: float, endY: float) -> None:
+        self.startX = startX
+        self.startY = startY
+        self.endX = endX
+        self.endY = endY
+
+        deltaX = endX - startX
+        deltaY = endY - startY
+        self.length: float = sqrt(deltaX**2 + deltaY**2)
+        self.bearing: float = cartToArg(deltaX, deltaY)
+        (self.dirX, self.dirY) = (deltaX / self.length, deltaY / self.length) if self.length != 0 else (0, 0)
+
+    def laylines(self, trueWindDir: float, tackingAngle: float) -> tuple[float, float]:
+        """Return the courses of both laylines for a true wind blowing towards trueWindDir."""
+        return laylines(trueWindDir, tackingAngle)
+
+    def isUpwind(self, trueWindDir: float, tackingAngle: float) -> bool:
+        """Check if the leg can't be sailed in a straight line because the wind is coming from ahead."""
+        return abs(angleKeepInterval(trueWindDir - self.bearing)) > pi - tackingAngle
+
+    def __repr__(self) -> str:
+        return f"Leg ({self.startX}|{self.startY}) -> ({self.endX}|{self.endY}), {round(self.length, 2)}m @{round(self.bearing * 180 / pi, 1)}°"
+
+
+# Signatures of the functions a command is compiled into
+EnterFunction = Callable[[object, float], None]
+CheckFunction = Callable[[object, float, float, float], bool]
+
+# Dispatch table: command type -> compiler returning (enter, check)
+COMMAND_COMPILERS: dict[type, Callable] = {}
+
+
+def registerCommand(commandType: type) -> Callable:
+    """Register a compiler for a command type. Use as a decorator."""
+    def decorator(compiler: Callable) -> Callable:
+        COMMAND_COMPILERS[commandType] = compiler
+        return compiler
+    return decorator
+
+
+def _noEnter(_sailor, _time: float) -> None:
+    """Enter function of commands that don't need to prepare anything."""
+
+
+@registerCommand(Waypoint)
+def compileWaypoint(command: Waypoint) -> tuple[EnterFunction, CheckFunction]:
+    """Steer towards the waypoint until the boat is inside its radius."""
+    destX, destY, radiusSq = command.destX, command.destY, command.radius * command.radius
+
+    def enter(sailor, _time: float) -> None:
+        sailor.holdDirection = None
+        sailor.setDestination(destX, destY)
+
+    def check(_sailor, posX: float, posY: float, _time: float) -> bool:
+        deltaX = destX - posX
+        deltaY = destY - posY
+        return deltaX * deltaX + deltaY * deltaY <= radiusSq
+
+    return (enter, check)
+
+
+@registerCommand(HoldHeading)
+def compileHoldHeading(command: HoldHeading) -> tuple[EnterFunction, CheckFunction]:
+    """Hold a compass course for the duration given."""
+    direction, duration = directionKeepInterval(command.direction), command.duration
+
+    def enter(sailor, time: float) -> None:
+        sailor.holdDirection = direction
+        sailor.holdUntil = time + duration
+
+    def check(sailor, _posX: float, _posY: float, time: float) -> bool:
+        if time >= sailor.holdUntil:
+            sailor.holdDirection = None
+            return True
+        return False
+
+    return (enter, check)
+
+
+@registerCommand(Wait)
+def compileWait(command: Wait) -> tuple[EnterFunction, CheckFunction]:
+    """Keep sailing until the time given."""
+    endTime = command.time
+
+    def check(_sailor, _posX: float, _posY: float, time: float) -> bool:
+        return time >= endTime
+
+    return (_noEnter, check)
+
+
+@registerCommand(Tack)
+def compileTack(command: Tack) -> tuple[EnterFunction, CheckFunction]:
+    """Mirror the course of the boat at the wind axis and steer until the compass reaches it."""
+    tolerance = command.tolerance
+
+    def enter(sailor, _time: float) -> None:
+        sailor.holdDirection = directionKeepInterval(2 * sailor.trueWindDir - sailor.compass)
+
+    def check(sailor, _posX: float, _posY: float, _time: float) -> bool:
+        if abs(angleKeepInterval(sailor.holdDirection - sailor.compass)) < tolerance:
+            sailor.holdDirection = None
+            return True
+        return False
+
+    return (enter, check)
+
+
+class Course:
+    """State machine compiled from a command list."""
+
+    def __init__(self, commandList: list, index: int = 0, startX: float = 0, startY: float = 0) -> None:
+        """
+        Compile a command list.
+
+        Args:
+            commandList:    List of command objects from sailsim.sailor.Commands
+            index:          index of the command to start with
+            startX:         x coordinate where the course starts, used for the first leg
+            startY:         y coordinate where the course starts, used for the first leg
+        """
+        self.commandList = commandList
+        self.startX = startX
+        self.startY = startY
+        self.states: list[tuple[EnterFunction, CheckFunction]] = []
+        for command in commandList:
+            compiler = COMMAND_COMPILERS.get(type(command))
+            if compiler is None:
+                raise TypeError(f"No compiler registered for command {type(command).__name__}")
+            self.states.append(compiler(command))
+
+        # Leg geometry between consecutive waypoints
+        self.legs: list[Leg] = []
+        (lastX, lastY) = (startX, startY)
+        for command in commandList:
+            if isinstance(command, Waypoint):
+                self.legs.append(Leg(lastX, lastY, command.destX, command.destY))
+                (lastX, lastY) = (command.destX, command.destY)
+
+        # nextLeg[i] is the index of the leg that ends at the first waypoint at or after command i, -1 if there is none
+        self.nextLeg: list[int] = [-1] * len(commandList)
+        leg = len(self.legs)
+        for i in range(len(commandList) - 1, -1, -1):
+            if isinstance(commandList[i], Waypoint):
+                leg -= 1
+            self.nextLeg[i] = leg if leg < len(self.legs) else -1
+
+        # remainingLength[i] is the length of all legs after leg i
+        self.remainingLength: list[float] = [0.0] * len(self.legs)
+        for i in range(len(self.legs) - 2, -1, -1):
+            self.remainingLength[i] = self.remainingLength[i + 1] + self.legs[i + 1].length
+
+        self.reset(index)
+
+    def reset(self, index: int = 0) -> None:
+        """Jump to the command with the index given. It is entered the next time the course is checked."""
+        self.index = index
+        self.entered = False
+        (self.enter, self.check) = self.states[index] if index < len(self.states) else (None, None)
+
+    def update(self, sailor, posX: float, posY: float, time: float) -> int:
+        """Run the active command and move on to the next ones while they are finished. Return the index."""
+        while self.check is not None:
+            if not self.entered:
+                self.enter(sailor, time)
+                self.entered = True
+            if not self.check(sailor, posX, posY, time):
+                break
+            self.reset(self.index + 1)
+        return self.index
+
+    def finished(self) -> bool:
+        """Return True if all commands are done."""
+        return self.check is None
+
+    def currentLeg(self) -> Optional[Leg]:
+        """Return the leg that ends at the next waypoint."""
+        if self.finished() or self.nextLeg[self.index] < 0:
+            return None
+        return self.legs[self.nextLeg[self.index]]
+
+    def distanceRemaining(self, posX: float, posY: float) -> float:
+        """Return the distance to the next waypoint plus the length of all legs after it."""
+        if self.finished() or self.nextLeg[self.index] < 0:
+            return 0.0
+        leg = self.nextLeg[self.index]
+        target = self.legs[leg]
+        return sqrt((target.endX - posX)**2 + (target.endY - posY)**2) + self.remainingLength[leg]
+
+    def __copy__(self) -> "Course":
+        course = Course.__new__(Course)
+        course.__dict__.update(self.__dict__)
+        return course
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the state without the compiled functions, they can't be pickled."""
+        return {"commandList": self.commandList, "startX": self.startX, "startY": self.startY,
+                "index": self.index, "entered": self.entered}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Compile the commands again and continue at the same command."""
+        self.__init__(state["commandList"], state["index"], state["startX"], state["startY"])
+        self.entered = state["entered"]
+
+    def __len__(self) -> int:
+        return len(self.states)
@@ -0,0 +1,275 @@
+"""
+This module connects the simulation to sailing algorithms running in a separate process.
+
+The simulation and the external controller exchange fixed size records through a shared memory
+block. The block starts with a header followed by two ring buffers, one for sensor records
+(simulation -> controller) and one for command records (controller -> simulation).
+All values are little endian.
+
+Header (HEADER_SIZE bytes):
+    offset  0   char[8]     magic b"SAILSIM\\0"
+    offset  8   uint32      layout version
+    offset 12   uint32      capacity (number of slots in each ring)
+    offset 16   uint64      sensorHead: number of sensor records written
+    offset 24   uint64      commandHead: number of command records written
+    offset 32   uint64      closed: set to 1 when the simulation shuts down
+
+Sensor record k (slot k % capacity):
+    uint64 seq, double posX, posY, gpsSpeed, gpsDir, compass, windSpeed, windAngle, time
+
+Command record k (slot k % capacity), answer to sensor record k:
+    uint64 seq, double mainSailAngle, rudderAngle
+
+A record is published by writing it into its slot first and then incrementing the head counter.
+Readers poll the head counter, so a controller written in C has to use acquire loads on the
+counters and release stores when publishing. The name of the shared memory block is passed to
+the controller in the environment variable SAILSIM_SHM.
+"""
+
+import os
+import struct
+import subprocess
+import weakref
+from multiprocessing import shared_memory
+from time import perf_counter, sleep
+from typing import Optional
+
+MAGIC = b"SAILSIM\0"
+LAYOUT_VERSION = 1
+ENVIRONMENT_VARIABLE = "SAILSIM_SHM"
+
+HEADER = struct.Struct("<8sII")
+HEADER_SIZE = 64
+SENSOR_HEAD_OFFSET = 16
+COMMAND_HEAD_OFFSET = 24
+CLOSED_OFFSET = 32
+
+COUNTER = struct.Struct("<Q")
+SENSOR_RECORD = struct.Struct("<Q8d")
+COMMAND_RECORD = struct.Struct("<Q2d")
+
+# Number of polls before the waiting side yields its time slice, spinning only pays off with a second core
+SPIN_COUNT = 256 if (os.cpu_count() or 1) > 1 else 1
+# Additional time (in s) the controller gets to answer the first record
+STARTUP_TIMEOUT = 10.0
+
+
+def _blockSize(capacity: int) -> int:
+    """Return the size of a shared memory block with capacity slots per ring."""
+    return HEADER_SIZE + capacity * (SENSOR_RECORD.size + COMMAND_RECORD.size)
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """Stop the resource tracker of this process from unlinking a block it does not own."""
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")  # pylint: disable=protected-access
+    except (ImportError, AttributeError, KeyError):
+        pass
+
+
+class ExternalSailor:
+    """Sailor adapter that delegates the steering of the boat to an external process."""
+
+    from .sailorgetset import importBoat
+
+    maxMainSailAngle: Optional[float] = None
+    maxRudderAngle: Optional[float] = None
+
+    def __init__(self, command: list[str], capacity: int = 64, latency: int = 0, timeout: float = 1.0, env: Optional[dict] = None) -> None:
+        """
+        Create an ExternalSailor for steering a Boat.
+
+        Args:
+            command:    command line of the controller process
+            capacity:   number of records in each ring buffer, has to be greater than latency
+            latency:    number of steps until a command is applied, 0 runs in lockstep
+            timeout:    time (in s) to wait for an answer of the controller
+            env:        additional environment variables for the controller process
+        """
+        if capacity <= latency:
+            raise ValueError("capacity has to be greater than latency")
+        self.command = command
+        self.capacity = capacity
+        self.latency = latency
+        self.timeout = timeout
+        self.env = env
+
+        self.commandList: list = []
+        self.rudderAngle: float = 0
+        self.mainSailAngle: float = 0
+
+        self.step: int = 0
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.process: Optional[subprocess.Popen] = None
+        self._finalizer = None
+
+    def start(self) -> None:
+        """Create the shared memory block and launch the controller process."""
+        if self.process is not None:
+            return
+        self.shm = shared_memory.SharedMemory(create=True, size=_blockSize(self.capacity))
+        self.shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, LAYOUT_VERSION, self.capacity)
+
+        env = dict(os.environ)
+        if self.env is not None:
+            env.update(self.env)
+        env[ENVIRONMENT_VARIABLE] = self.shm.name
+        self.process = subprocess.Popen(self.command, env=env)
+        self.step = 0
+        self._finalizer = weakref.finalize(self, _shutdown, self.shm, self.process, self.timeout)
+
+    def close(self) -> None:
+        """Tell the controller to stop and release all resources."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self._finalizer = None
+        self.shm = None
+        self.process = None
+
+    def run(self, posX: float, posY: float, gpsSpeed: float, gpsDir: float, compass: float, windSpeed: float, windAngle: float, time: float = 0) -> None:
+        """Send the sensor data to the controller and save its answer in object properties."""
+        if self.process is None:
+            self.start()
+        buf = self.shm.buf
+
+        # Publish sensor record
+        step = self.step
+        slot = step % self.capacity
+        SENSOR_RECORD.pack_into(buf, HEADER_SIZE + slot * SENSOR_RECORD.size, step, posX, posY, gpsSpeed, gpsDir, compass, windSpeed, windAngle, time)
+        COUNTER.pack_into(buf, SENSOR_HEAD_OFFSET, step + 1)
+        self.step = step + 1
+
+        # Apply the answer to the record sent latency steps ago
+        answered = step - self.latency
+        if answered < 0:
+            return
+        self.waitForCommand(answered + 1)
+        offset = HEADER_SIZE + self.capacity * SENSOR_RECORD.size + (answered % self.capacity) * COMMAND_RECORD.size
+        (_seq, mainSailAngle, rudderAngle) = COMMAND_RECORD.unpack_from(buf, offset)
+
+        # Prevent the controller from exceeding the limits of the boat
+        if self.maxMainSailAngle is not None:
+            mainSailAngle = max(-self.maxMainSailAngle, min(self.maxMainSailAngle, mainSailAngle))
+        if self.maxRudderAngle is not None:
+            rudderAngle = max(-self.maxRudderAngle, min(self.maxRudderAngle, rudderAngle))
+        self.mainSailAngle = mainSailAngle
+        self.rudderAngle = rudderAngle
+
+    def finished(self) -> bool:
+        """Return False, the controller never tells if it is done."""
+        return False
+
+    def distanceRemaining(self, _posX: float, _posY: float) -> Optional[float]:
+        """Return None, the course is only known to the controller."""
+        return None
+
+    def waitForCommand(self, count: int) -> None:
+        """Block until the controller has written at least count command records."""
+        buf = self.shm.buf
+        spins = 0
+        deadline = None
+        while COUNTER.unpack_from(buf, COMMAND_HEAD_OFFSET)[0] < count:
+            spins += 1
+            if spins < SPIN_COUNT:
+                continue
+            spins = 0
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Controller exited with code {self.process.returncode}")
+            now = perf_counter()
+            if deadline is None:
+                deadline = now + self.timeout + (STARTUP_TIMEOUT if count == 1 else 0)
+            elif now > deadline:
+                raise TimeoutError(f"Controller did not answer sensor record {count - 1} within {self.timeout}s")
+            sleep(0)
+
+    def __copy__(self) -> "ExternalSailor":
+        """Refuse to copy, a copy would share the controller process and the shared memory block."""
+        raise TypeError("an ExternalSailor can't be copied, its state lives in the controller process")
+
+    def __deepcopy__(self, memo) -> "ExternalSailor":
+        """Return an unstarted ExternalSailor with the same configuration."""
+        copy = ExternalSailor(self.command, self.capacity, self.latency, self.timeout, self.env)
+        copy.maxMainSailAngle = self.maxMainSailAngle
+        copy.maxRudderAngle = self.maxRudderAngle
+        memo[id(self)] = copy
+        return copy
+
+    def __enter__(self) -> "ExternalSailor":
+        self.start()
+        return self
+
+    def __exit__(self, *_args) -> None:
+        self.close()
+
+
+def _shutdown(shm: shared_memory.SharedMemory, process: subprocess.Popen, timeout: float) -> None:
+    """Signal the controller to stop, wait for it and remove the shared memory block."""
+    COUNTER.pack_into(shm.buf, CLOSED_OFFSET, 1)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    shm.close()
+    shm.unlink()
+
+
+class ExternalSailorClient:
+    """Controller side of the shared memory connection, used by controllers written in Python."""
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        """
+        Attach to the shared memory block of an ExternalSailor.
+
+        Args:
+            name:   name of the shared memory block, default: read from SAILSIM_SHM
+        """
+        if name is None:
+            name = os.environ[ENVIRONMENT_VARIABLE]
+        self.shm = shared_memory.SharedMemory(name=name)
+        _untrack(self.shm)
+
+        (magic, version, self.capacity) = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            raise ValueError(f"Shared memory block {name} has an incompatible layout")
+        self.commandOffset = HEADER_SIZE + self.capacity * SENSOR_RECORD.size
+        self.step: int = 0
+        self.parent = os.getppid()
+
+    def receive(self) -> Optional[tuple[float, ...]]:
+        """Wait for the next sensor record and return it. Return None when the simulation closed the connection."""
+        buf = self.shm.buf
+        spins = 0
+        while COUNTER.unpack_from(buf, SENSOR_HEAD_OFFSET)[0] <= self.step:
+            if COUNTER.unpack_from(buf, CLOSED_OFFSET)[0]:
+                return None
+            spins += 1
+            if spins >= SPIN_COUNT:
+                spins = 0
+                if os.getppid() != self.parent:
+                    return None
+                sleep(0)
+        return SENSOR_RECORD.unpack_from(buf, HEADER_SIZE + (self.step % self.capacity) * SENSOR_RECORD.size)[1:]
+
+    def send(self, mainSailAngle: float, rudderAngle: float) -> None:
+        """Answer the last sensor record received."""
+        buf = self.shm.buf
+        COMMAND_RECORD.pack_into(buf, self.commandOffset + (self.step % self.capacity) * COMMAND_RECORD.size, self.step, mainSailAngle, rudderAngle)
+        self.step += 1
+        COUNTER.pack_into(buf, COMMAND_HEAD_OFFSET, self.step)
+
+    def serve(self, sailor) -> None:
+        """Steer with an in-process sailor object until the simulation closes the connection."""
+        while True:
+            sensors = self.receive()
+            if sensors is None:
+                break
+            sailor.run(*sensors)
+            self.send(sailor.mainSailAngle, sailor.rudderAngle)
+        self.close()
+
+    def close(self) -> None:
+        """Detach from the shared memory block."""
+        self.shm.close()
@@ -1,9 +1,11 @@
 from math import pi
+from typing import Optional
 
 from sailsim.utils.coordconversion import polarToCart, cartToArg
 from sailsim.utils.anglecalculations import angleKeepInterval, directionKeepInterval
 
-from sailsim.sailor.Commands import Waypoint  # , Command
+from sailsim.sailor.Commands import Waypoint
+from sailsim.sailor.Course import Course, laylines
 
 
 class Sailor:
@@ -17,6 +19,11 @@ class Sailor:
 
     rudderAngle: float
     boatDirection: float
+    holdDirection: Optional[float] = None
+    holdUntil: float = 0
+
+    trueWindDir: float = 0
+    compass: float = 0
 
     mainSailAngle: float
 
@@ -39,24 +46,31 @@ class Sailor:
             commandList:    List of command objects from sailsim.sailor.Commands
         """
         self.commandList = commandList
+        self.course = Course(commandList)
 
+        # Tunable parameters, see sailsim.sailor.SailorTuner
         self.tackingAngleBufferSize = 10 / 180 * pi
+        self.rudderGain = 0.5
+        self.sailTrimFactor = 0.5
 
-    def run(self, posX: float, posY: float, gpsSpeed: float, gpsDir: float, compass: float, windSpeed: float, windAngle: float) -> None:
+    def run(self, posX: float, posY: float, gpsSpeed: float, gpsDir: float, compass: float, windSpeed: float, windAngle: float, time: float = 0) -> None:
         """Execute Sailor calculations and save results in object properties."""
-        self.checkCommand(posX, posY)
+        trueWindDir = trueWindDirection(gpsSpeed, gpsDir, windSpeed, directionKeepInterval(windAngle + compass))
+        (self.trueWindDir, self.compass) = (trueWindDir, compass)
+        self.checkCommand(posX, posY, time)
 
         straightCourse = cartToArg(self.destX - posX, self.destY - posY)
-        trueWindDir = trueWindDirection(gpsSpeed, gpsDir, windSpeed, directionKeepInterval(windAngle + compass))
         windCourseAngle = angleKeepInterval(trueWindDir - straightCourse)
 
         leewayAngle = angleKeepInterval(gpsDir - compass)
 
+        if self.holdDirection is not None:
+            # course given by a command
+            self.boatDirection = self.holdDirection
         # reachable in a straight line ?
-        if abs(windCourseAngle) > pi - self.tackingAngleUpwind - self.tackingAngleBufferSize:
+        elif abs(windCourseAngle) > pi - self.tackingAngleUpwind - self.tackingAngleBufferSize:
             # upwind tacking
-            llp = directionKeepInterval(trueWindDir + self.tackingAngleUpwind + pi)
-            lln = directionKeepInterval(trueWindDir - self.tackingAngleUpwind + pi)
+            (llp, lln) = laylines(trueWindDir, self.tackingAngleUpwind)
             if abs(angleKeepInterval(llp - straightCourse)) < self.tackingAngleBufferSize:
                 self.boatDirection = llp
             elif abs(angleKeepInterval(lln - straightCourse)) < self.tackingAngleBufferSize:
@@ -76,7 +90,7 @@ class Sailor:
             self.boatDirection = straightCourse - (leewayAngle if abs(leewayAngle) < 0.5 else 0)
 
         offset = angleKeepInterval(self.boatDirection - compass)
-        self.rudderAngle = offset * 0.5 / gpsSpeed if gpsSpeed != 0 else 0.00000001
+        self.rudderAngle = offset * self.rudderGain / gpsSpeed if gpsSpeed != 0 else 0.00000001
 
         # Prevent sailor from oversteering
         if abs(self.rudderAngle) > self.maxRudderAngle:
@@ -86,24 +100,19 @@ class Sailor:
                 self.rudderAngle = -self.maxRudderAngle
 
         # NOTE this is a very simple approximation of the real curve
-        self.mainSailAngle = angleKeepInterval((windAngle - pi)) / 2
+        self.mainSailAngle = angleKeepInterval((windAngle - pi)) * self.sailTrimFactor
 
-    def checkCommand(self, posX: float, posY: float) -> None:
+    def checkCommand(self, posX: float, posY: float, time: float = 0) -> None:
         """Execute commands from commandList."""
-        # TODO make prettier
-        while len(self.commandList) > self.commandListIndex:
-            success = None
-            command = self.commandList[self.commandListIndex]
-            if isinstance(command, Waypoint):
-                success = command.checkWaypoint(self, posX, posY)
-            # elif isinstance(command, Command):
-            #     pass # TODO run Command
-
-            # If command was run successfully run next command, if not continue sailing
-            if success:
-                self.commandListIndex += 1
-            else:
-                return
+        self.commandListIndex = self.course.update(self, posX, posY, time)
+
+    def finished(self) -> bool:
+        """Return True if all commands are done."""
+        return self.course.finished()
+
+    def distanceRemaining(self, posX: float, posY: float) -> Optional[float]:
+        """Return the distance along the course that is left from (posX, posY)."""
+        return self.course.distanceRemaining(posX, posY)
 
     def setDestination(self, destX: float, destY: float) -> None:
         """Set Sailor's destination to specific coordinates."""
@@ -0,0 +1,193 @@
+"""
+This module tunes the parameters of a Sailor automatically.
+
+Candidates are generated with differential evolution, a derivative free optimiser, and every
+generation is evaluated on a process pool. With OBJECTIVE_TIME a candidate run is stopped as soon as
+it can't beat the best course time found so far, OBJECTIVE_VMG runs always simulate maxTime or until
+the course is finished.
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from math import inf, pi
+from random import Random
+from typing import Callable, Optional
+
+from sailsim.simulation.Simulation import Simulation
+
+
+# Parameter name -> (lower bound, upper bound)
+SAILOR_PARAMETERS: dict[str, tuple[float, float]] = {
+    "rudderGain": (0.05, 2),
+    "sailTrimFactor": (0.2, 0.8),
+    "tackingAngleBufferSize": (0, 20 / 180 * pi),
+    "tackingAngleUpwind": (30 / 180 * pi, 70 / 180 * pi),
+    "tackingAngleDownwind": (0, 40 / 180 * pi),
+}
+
+OBJECTIVE_TIME = "time"
+OBJECTIVE_VMG = "vmg"
+
+# Speed (in m/s) at which the remaining distance of an unfinished run is converted into time. It is lower than
+# the boat sails, so an unfinished run costs more than the time it would have needed to finish.
+PENALTY_SPEED = 0.5
+
+
+def evaluateSailor(simulationFactory: Callable[[], Simulation], parameters: dict[str, float], objective: str = OBJECTIVE_TIME,
+                   maxTime: float = 600, cutoff: float = inf, penaltySpeed: float = PENALTY_SPEED) -> float:
+    """
+    Simulate one candidate and return its cost. Lower is better.
+
+    Args:
+        simulationFactory:  picklable function that returns a new Simulation with a Sailor
+        parameters:         values for the sailor attributes
+        objective:          OBJECTIVE_TIME: time (in s) to finish the course, unfinished runs add the time to sail the
+                            remaining distance at penaltySpeed
+                            OBJECTIVE_VMG: negative mean velocity made good along the course (in m/s)
+        maxTime:            longest time (in s) to simulate
+        cutoff:             cost the candidate has to beat, OBJECTIVE_TIME runs stop when the time exceeds it.
+                            The final VMG isn't known before the run ends, so OBJECTIVE_VMG runs ignore it
+        penaltySpeed:       speed (in m/s) at which the remaining distance of unfinished OBJECTIVE_TIME runs is sailed
+    """
+    simulation = simulationFactory()
+    simulation.record = False
+    sailor = simulation.boat.sailor
+    for name, value in parameters.items():
+        setattr(sailor, name, value)
+    course = sailor.course
+
+    boat = simulation.boat
+    startDistance = course.distanceRemaining(boat.posX, boat.posY)
+    limit = min(maxTime, cutoff) if objective == OBJECTIVE_TIME else maxTime
+    lastFrame = int(limit / simulation.timestep)
+
+    try:
+        while simulation.frame <= lastFrame:
+            simulation.step()
+            if course.finished():
+                break
+    except (OverflowError, ValueError, ZeroDivisionError):
+        # Diverging simulation
+        return inf
+
+    boat = simulation.boat
+    distanceRemaining = course.distanceRemaining(boat.posX, boat.posY)
+    if objective == OBJECTIVE_VMG:
+        return -(startDistance - distanceRemaining) / simulation.getTime()
+    return simulation.getTime() + distanceRemaining / penaltySpeed
+
+
+class TuningResult:
+    """Outcome of a tuning run."""
+
+    def __init__(self, parameters: dict[str, float], cost: float, evaluations: int, history: list[float]) -> None:
+        self.parameters = parameters
+        self.cost = cost
+        self.evaluations = evaluations
+        self.history = history  # best cost after every generation
+
+    def apply(self, sailor) -> None:
+        """Set the tuned parameters on a sailor."""
+        for name, value in self.parameters.items():
+            setattr(sailor, name, value)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={round(value, 4)}" for name, value in self.parameters.items())
+        return f"TuningResult cost={round(self.cost, 3)} after {self.evaluations} runs: {values}"
+
+
+class SailorTuner:
+    """Optimise sailor parameters with differential evolution."""
+
+    def __init__(self, simulationFactory: Callable[[], Simulation], parameters: Optional[dict[str, tuple[float, float]]] = None,
+                 objective: str = OBJECTIVE_TIME, maxTime: float = 600, populationSize: int = 16,
+                 mutation: float = 0.7, crossover: float = 0.8, seed: Optional[int] = None, penaltySpeed: float = PENALTY_SPEED) -> None:
+        """
+        Create a SailorTuner.
+
+        Args:
+            simulationFactory:  picklable function (defined on module level) that returns a new Simulation with a Sailor
+            parameters:         parameter names with their bounds, default: SAILOR_PARAMETERS
+            objective:          OBJECTIVE_TIME or OBJECTIVE_VMG, see evaluateSailor
+            maxTime:            longest time (in s) to simulate per candidate
+            populationSize:     number of candidates per generation
+            mutation:           differential weight of differential evolution
+            crossover:          crossover probability of differential evolution
+            seed:               seed of the random number generator
+            penaltySpeed:       speed (in m/s) at which the remaining distance of unfinished runs is sailed, see evaluateSailor
+        """
+        self.simulationFactory = simulationFactory
+        self.parameters = parameters if parameters is not None else SAILOR_PARAMETERS
+        self.names = list(self.parameters)
+        self.objective = objective
+        self.maxTime = maxTime
+        self.populationSize = max(populationSize, 4)
+        self.mutation = mutation
+        self.crossover = crossover
+        self.random = Random(seed)
+        self.penaltySpeed = penaltySpeed
+
+        self.evaluations = 0
+
+    def run(self, generations: int = 30, workers: Optional[int] = None, executor: Optional[Executor] = None) -> TuningResult:
+        """
+        Run the optimisation.
+
+        Args:
+            generations:    number of generations after the initial population
+            workers:        number of processes, 1 evaluates in this process, default: number of cpus
+            executor:       use this executor instead of creating a process pool
+        """
+        if executor is None and workers != 1:
+            with ProcessPoolExecutor(workers) as pool:
+                return self.run(generations, workers, pool)
+
+        population = [self.randomCandidate() for _ in range(self.populationSize)]
+        costs = self.evaluate(population, inf, executor)
+        best = min(range(len(costs)), key=costs.__getitem__)
+        history = [costs[best]]
+
+        for _ in range(generations):
+            trials = [self.trialCandidate(population, i, best) for i in range(self.populationSize)]
+            trialCosts = self.evaluate(trials, costs[best], executor)
+
+            # Selection: keep the better one of target and trial
+            for i, trialCost in enumerate(trialCosts):
+                if trialCost <= costs[i]:
+                    population[i] = trials[i]
+                    costs[i] = trialCost
+                    if trialCost < costs[best]:
+                        best = i
+            history.append(costs[best])
+
+        return TuningResult(dict(zip(self.names, population[best])), costs[best], self.evaluations, history)
+
+    def evaluate(self, candidates: list[list[float]], cutoff: float, executor: Optional[Executor]) -> list[float]:
+        """Return the cost of all candidates, evaluated on the executor if given."""
+        arguments = [(self.simulationFactory, dict(zip(self.names, candidate)), self.objective, self.maxTime, cutoff, self.penaltySpeed)
+                     for candidate in candidates]
+        self.evaluations += len(arguments)
+        if executor is None:
+            return [evaluateSailor(*args) for args in arguments]
+        return list(executor.map(_evaluateSailorArgs, arguments))
+
+    def randomCandidate(self) -> list[float]:
+        """Return a candidate with uniformly distributed parameters."""
+        return [self.random.uniform(*self.parameters[name]) for name in self.names]
+
+    def trialCandidate(self, population: list[list[float]], target: int, best: int) -> list[float]:
+        """Create a trial vector for target with the current-to-best/1/bin scheme."""
+        (a, b) = self.random.sample([i for i in range(len(population)) if i != target], 2)
+        forced = self.random.randrange(len(self.names))
+        trial = []
+        for i, name in enumerate(self.names):
+            value = population[target][i]
+            if i == forced or self.random.random() < self.crossover:
+                value += self.mutation * (population[best][i] - value + population[a][i] - population[b][i])
+            (low, high) = self.parameters[name]
+            trial.append(min(max(value, low), high))
+        return trial
+
+
+def _evaluateSailorArgs(args: tuple) -> float:
+    """Unpack arguments for executor.map."""
+    return evaluateSailor(*args)
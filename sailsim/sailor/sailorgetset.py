@@ -1,12 +1,13 @@
+from sailsim.sailor.Course import Course
+
+
 def setCommandList(self, commandList, index=None):
-    """Define command list and index if not set."""
+    """Define and compile command list and set index if given. The course keeps its start position."""
     self.commandList = commandList
 
     if index is not None:
-        self.commandIndex = index
-    else:
-        if self.commandIndex is None:
-            self.commandIndex = 0
+        self.commandListIndex = index
+    self.course = Course(commandList, self.commandListIndex, self.course.startX, self.course.startY)
 
 
 def configBoat(self):
@@ -31,3 +32,9 @@ def importBoat(self, boat):
 
     self.tackingAngleUpwind = boat.tackingAngleUpwind
     self.tackingAngleDownwind = boat.tackingAngleDownwind
+
+    # The first leg of the course starts at the position of the boat
+    course = getattr(self, "course", None)
+    if course is not None:
+        self.course = Course(self.commandList, course.index, boat.posX, boat.posY)
+        self.course.entered = course.entered
@@ -0,0 +1,107 @@
+"""This module contains the Checkpoint class that saves the state of a simulation at one frame."""
+
+import marshal
+import struct
+from typing import Any, Optional
+
+# Dynamic values of the boat, everything else is constant during a simulation
+BOAT_STATE = ("posX", "posY", "speedX", "speedY", "direction", "angSpeed", "mainSailAngle", "rudderAngle")
+# frame, number of recorded frames, course index, course entered, has sailor, boat state
+_HEADER = struct.Struct("<qqq??" + "d" * len(BOAT_STATE))
+_SIMPLE_TYPES = (bool, int, float, str, type(None))
+
+
+def sailorState(sailor) -> dict[str, Any]:
+    """Return all attributes of the sailor that are simple values. Together with the course index they are its state."""
+    return {name: value for name, value in vars(sailor).items() if type(value) in _SIMPLE_TYPES}
+
+
+class Checkpoint:
+    """State of a simulation at one frame: boat state, sailor state, command index and frame number."""
+
+    __slots__ = ("frame", "frameCount", "boat", "sailor", "courseIndex", "courseEntered")
+
+    def __init__(self, frame: int, frameCount: int, boat: tuple[float, ...], sailor: Optional[dict[str, Any]] = None,
+                 courseIndex: int = 0, courseEntered: bool = False) -> None:
+        """
+        Create a Checkpoint. Use Simulation.checkpoint() to get the checkpoint of a simulation.
+
+        Args:
+            frame:          frame number of the simulation
+            frameCount:     number of frames in the frameList of the boat
+            boat:           values of the boat in the order of BOAT_STATE
+            sailor:         state of the sailor (see sailorState) or None if the boat has no sailor
+            courseIndex:    index of the active command
+            courseEntered:  the active command has been started
+        """
+        self.frame = frame
+        self.frameCount = frameCount
+        self.boat = boat
+        self.sailor = sailor
+        self.courseIndex = courseIndex
+        self.courseEntered = courseEntered
+
+    @classmethod
+    def capture(cls, simulation) -> "Checkpoint":
+        """Save the state of a simulation."""
+        boat = simulation.boat
+        sailor = boat.sailor
+        state = tuple(getattr(boat, name) for name in BOAT_STATE)
+        if sailor is None:
+            return cls(simulation.frame, len(boat.frameList), state)
+        if getattr(sailor, "course", None) is None:
+            raise TypeError(f"{type(sailor).__name__} has no course, its state can't be saved in a checkpoint")
+        return cls(simulation.frame, len(boat.frameList), state, sailorState(sailor), sailor.course.index, sailor.course.entered)
+
+    def apply(self, simulation) -> None:
+        """Set boat, sailor and frame number of the simulation to this state. Recorded frames are not changed."""
+        boat = simulation.boat
+        for name, value in zip(BOAT_STATE, self.boat):
+            setattr(boat, name, value)
+
+        sailor = boat.sailor
+        if sailor is not None and self.sailor is not None:
+            # Attributes set after the checkpoint fall back to the class defaults
+            for name, value in list(vars(sailor).items()):
+                if type(value) in _SIMPLE_TYPES and name not in self.sailor:
+                    delattr(sailor, name)
+            for name, value in self.sailor.items():
+                setattr(sailor, name, value)
+            sailor.course.reset(self.courseIndex)
+            sailor.course.entered = self.courseEntered
+        simulation.frame = self.frame
+
+    def toBytes(self) -> bytes:
+        """Serialise the checkpoint."""
+        header = _HEADER.pack(self.frame, self.frameCount, self.courseIndex, self.courseEntered, self.sailor is not None, *self.boat)
+        return header + marshal.dumps(self.sailor)
+
+    @classmethod
+    def fromBytes(cls, data: bytes) -> "Checkpoint":
+        """Load a checkpoint saved with toBytes."""
+        (frame, frameCount, courseIndex, courseEntered, _, *boat) = _HEADER.unpack_from(data)
+        sailor = marshal.loads(data[_HEADER.size:])
+        return cls(frame, frameCount, tuple(boat), sailor, courseIndex, courseEntered)
+
+    def toDict(self) -> dict[str, Any]:
+        """Return the checkpoint as dictionary that can be written as JSON."""
+        return {
+            "frame": self.frame,
+            "frameCount": self.frameCount,
+            "boat": dict(zip(BOAT_STATE, self.boat)),
+            "sailor": self.sailor,
+            "courseIndex": self.courseIndex,
+            "courseEntered": self.courseEntered,
+        }
+
+    @classmethod
+    def fromDict(cls, data: dict[str, Any]) -> "Checkpoint":
+        """Load a checkpoint saved with toDict."""
+        boat = tuple(float(data["boat"][name]) for name in BOAT_STATE)
+        return cls(data["frame"], data["frameCount"], boat, data["sailor"], data["courseIndex"], data["courseEntered"])
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Checkpoint) and self.toDict() == other.toDict()
+
+    def __repr__(self) -> str:
+        return f"Checkpoint @frm{self.frame}, boat at ({round(self.boat[0], 2)}, {round(self.boat[1], 2)})"
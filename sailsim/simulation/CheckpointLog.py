@@ -0,0 +1,133 @@
+"""
+This module contains the CheckpointLog class that re-simulates only the part of a run a change affects.
+
+Run the simulation through a CheckpointLog, it keeps a checkpoint every `interval` frames. After a parameter
+was changed, drop the checkpoints the change affects and simulate from the last one that is still valid, the
+frames before it are kept:
+
+    log = CheckpointLog(simulation)
+    log.run()
+    simulation.boat.sailArea = 8            # affects the whole run
+    log.resimulateFrom(0)
+    log.setCommands(commands)               # e.g. a waypoint added at the end, only the end is simulated again
+"""
+
+from typing import Optional
+
+from sailsim.simulation.Checkpoint import Checkpoint
+
+# Simple values of the boat that are copied from simulation.initBoat by restart()
+_SIMPLE_TYPES = (bool, int, float, str, type(None))
+
+
+class CheckpointLog:
+    """Checkpoints of a run every interval frames, the run can be simulated again from any of them."""
+
+    def __init__(self, simulation, interval: int = 500) -> None:
+        """
+        Create a CheckpointLog, the current state of the simulation is the first checkpoint.
+
+        Args:
+            simulation: simulation that is run
+            interval:   frames between checkpoints, the kernel backend only runs this many frames at once
+        """
+        if interval < 1:
+            raise ValueError("interval has to be at least 1")
+        self.simulation = simulation
+        self.interval = interval
+        self.checkpoints: list[Checkpoint] = [simulation.checkpoint()]
+        self.endFrame = simulation.frame  # Frame the run has reached, resimulate() runs up to it
+
+    def run(self, steps: int = 0) -> Optional[str]:
+        """Run the simulation like Simulation.run() and save checkpoints on the way. Return the stop reason."""
+        simulation = self.simulation
+        if steps < 1:
+            if simulation.lastFrame is None:
+                raise Exception('Simulation has no lastFrame')
+            steps = simulation.lastFrame + 1 - simulation.frame
+        end = simulation.frame + steps
+        reason = None
+        while simulation.frame < end:
+            frame = simulation.frame
+            if frame % self.interval == 0 and frame > self.checkpoints[-1].frame:
+                self.checkpoints.append(simulation.checkpoint())
+            nextCheckpoint = (frame // self.interval + 1) * self.interval
+            reason = simulation.run(min(nextCheckpoint, end) - frame)
+            if reason is not None:
+                break
+        self.endFrame = max(self.endFrame, simulation.frame) if reason is None else simulation.frame
+        return reason
+
+    def invalidate(self, frame: int) -> None:
+        """Drop the checkpoints after frame, call it when a change only affects frame and later frames."""
+        self.checkpoints = self.checkpoints[:1] + [checkpoint for checkpoint in self.checkpoints[1:] if checkpoint.frame <= frame]
+
+    def invalidateTime(self, time: float) -> None:
+        """Drop the checkpoints that a change from time on (in s) affects."""
+        self.invalidate(int(time / self.simulation.timestep))
+
+    def invalidateCourse(self, index: int) -> None:
+        """Drop the checkpoints after the sailor reached the command at index, call it when commands from index on changed."""
+        self.checkpoints = self.checkpoints[:1] + [checkpoint for checkpoint in self.checkpoints[1:] if checkpoint.courseIndex < index]
+
+    def setCommands(self, commandList: list) -> Optional[str]:
+        """
+        Give the sailor new commands and simulate again from the first command that changed on. Return the stop reason.
+
+        Commands are compared by identity, keep the command objects that didn't change.
+        """
+        self.changeCommands(commandList)
+        return self.resimulate()
+
+    def changeCommands(self, commandList: list) -> None:
+        """Give the sailor new commands and drop the checkpoints they affect. Continue with rewind() or resimulate()."""
+        sailor = self.simulation.boat.sailor
+        if sailor is None:
+            raise ValueError("the boat has no sailor")
+        oldCommands = sailor.commandList
+        index = 0
+        while index < min(len(oldCommands), len(commandList)) and oldCommands[index] == commandList[index]:
+            index += 1
+        sailor.setCommandList(commandList)
+        self.invalidateCourse(index)
+
+    def rewind(self) -> None:
+        """Go back to the last valid checkpoint, the frames after it are deleted. Continue with run() or resimulate()."""
+        self.simulation.restore(self.checkpoints[-1])
+
+    def resimulate(self) -> Optional[str]:
+        """Simulate from the last valid checkpoint up to the frame the run had reached. Return the stop reason."""
+        checkpoint = self.checkpoints[-1]
+        endFrame = self.endFrame
+        self.rewind()
+        if endFrame <= checkpoint.frame:
+            return None
+        return self.run(endFrame - checkpoint.frame)
+
+    def resimulateFrom(self, frame: int) -> Optional[str]:
+        """Simulate again after a change that affects frame and later frames. Return the stop reason."""
+        self.invalidate(frame)
+        return self.resimulate()
+
+    def restart(self) -> Optional[str]:
+        """Copy the values of simulation.initBoat to the boat and simulate the whole run again, e.g. after ConfigBoat changed it."""
+        self.reloadBoat()
+        return self.resimulate()
+
+    def reloadBoat(self) -> None:
+        """Go back to the first checkpoint and copy the values of simulation.initBoat to the boat. Continue with run() or resimulate()."""
+        simulation = self.simulation
+        simulation.restore(self.checkpoints[0])
+        boat = simulation.boat
+        for (name, value) in vars(simulation.initBoat).items():
+            if type(value) in _SIMPLE_TYPES:
+                setattr(boat, name, value)
+        if boat.sailor is not None:
+            boat.sailor.importBoat(boat)
+        self.checkpoints = [simulation.checkpoint()]
+
+    def __len__(self) -> int:
+        return len(self.checkpoints)
+
+    def __repr__(self) -> str:
+        return f"CheckpointLog {len(self.checkpoints)} checkpoints up to frame {self.endFrame}"
@@ -0,0 +1,217 @@
+"""
+This module contains the Race class that simulates a fleet of boats that interact with each other.
+
+All boats sail in the same wind with the same clock and their own sailors. Every boat takes wind from
+the boats downwind of it and boats that come too close collide. Close boats are found with a SpatialHash
+that is rebuilt every step, so a step costs about O(N) for N boats.
+"""
+
+from math import hypot, isfinite, sqrt
+from typing import Any, Optional, Sequence
+
+from sailsim.boat.Boat import Boat
+from sailsim.utils.coordconversion import cartToRadius
+from sailsim.utils.SpatialHash import SpatialHash
+from sailsim.wind.Wind import Wind
+
+# Wind shadow: the wind behind a sail is weaker by up to SHADOW_DEFICIT, the shadow is SHADOW_LENGTH long
+# and starts SHADOW_WIDTH wide, it widens by SHADOW_SPREAD per m
+SHADOW_LENGTH = 30.0        # m
+SHADOW_WIDTH = 4.0          # m
+SHADOW_SPREAD = 0.15
+SHADOW_DEFICIT = 0.3
+
+# Distances between the centers of two boats
+COLLISION_DISTANCE = 2.0    # m
+PROXIMITY_DISTANCE = 10.0   # m
+
+
+class Race:
+    """Simulate a fleet of boats with wind shadows and collisions."""
+
+    def __init__(self, boats: Sequence[Boat], wind: Wind, timestep: float, lastFrame: Optional[int] = None,
+                 names: Optional[Sequence[str]] = None, record: bool = True, shadowLength: float = SHADOW_LENGTH,
+                 shadowDeficit: float = SHADOW_DEFICIT, collisionDistance: float = COLLISION_DISTANCE,
+                 proximityDistance: float = PROXIMITY_DISTANCE) -> None:
+        """
+        Create a Race.
+
+        Args:
+            boats:              boats of the fleet, each with its own sailor
+            wind:               wind of the race
+            timestep:           time difference between frames
+            lastFrame:          last frame that is simulated, the race ends earlier when all sailors finished
+            names:              names of the boats for the rankings, default: "boat 1", "boat 2", ...
+            record:             save every frame in the frameList of the boats, default: True
+            shadowLength:       length of the wind shadow behind a boat (in m), 0 disables wind shadows
+            shadowDeficit:      part of the wind a boat takes right behind its sail
+            collisionDistance:  boats closer than this collide (in m)
+            proximityDistance:  boats closer than this are counted as close to another boat (in m)
+        """
+        if names is not None and len(names) != len(boats):
+            raise ValueError("every boat needs a name")
+        self.boats = list(boats)
+        self.wind = wind
+        self.timestep = timestep
+        self.frame = 0
+        self.lastFrame = lastFrame
+        self.record = record
+        self.names = list(names) if names is not None else [f"boat {index + 1}" for index in range(len(self.boats))]
+
+        self.shadowLength = shadowLength
+        self.shadowDeficit = shadowDeficit
+        self.collisionDistance = collisionDistance
+        self.proximityDistance = proximityDistance
+        # Farthest distance at which boats interact, the tip of the wind shadow is hypot(length, half width) away
+        shadowReach = hypot(shadowLength, SHADOW_WIDTH / 2 + shadowLength * SHADOW_SPREAD) if shadowLength > 0 else 0.0
+        self.spatialHash = SpatialHash(max(shadowReach, collisionDistance, proximityDistance))
+
+        self.finishTimes: list[Optional[float]] = [None] * len(self.boats)
+        self.collisions: list[tuple[int, int, int]] = []    # (frame, boat, boat) when two boats touch
+        self.closeFrames: list[int] = [0] * len(self.boats)   # frames every boat was close to another boat
+        self.touching: set[tuple[int, int]] = set()
+        self.windFactors: list[float] = [1.0] * len(self.boats)
+
+    def getTime(self) -> float:
+        """Return the elapsed time since the start of the race."""
+        return self.timestep * self.frame
+
+    def run(self, steps: int = 0) -> int:
+        """Run until all sailors finished or up to lastFrame, or at most the number of steps given. Return the number of steps."""
+        if steps < 1:
+            # A boat that never finishes would keep the race running forever
+            if self.lastFrame is None:
+                raise Exception('Race has no lastFrame')
+            steps = self.lastFrame + 1 - self.frame
+        done = 0
+        while done < steps and not self.finished():
+            self.step()
+            done += 1
+        return done
+
+    def finished(self) -> bool:
+        """Return True if lastFrame was simulated or all boats with a sailor finished their course."""
+        if self.lastFrame is not None and self.frame > self.lastFrame:
+            return True
+        racing = [index for (index, boat) in enumerate(self.boats) if boat.sailor is not None]
+        return bool(racing) and all(self.finishTimes[index] is not None for index in racing)
+
+    def step(self) -> None:
+        """Run one step of all boats."""
+        time = self.frame * self.timestep
+        boats = self.boats
+        winds = [self.wind.getWindCart(boat.posX, boat.posY, time) for boat in boats]
+        self.interact(winds)
+
+        causes = []
+        for (boat, (windX, windY), factor) in zip(boats, winds, self.windFactors):
+            boat.updateTemporaryData(windX * factor, windY * factor)
+            causes.append(boat.resultingCauses())
+            if self.record:
+                boat.frameList.grabFrame(self, boat)
+                frame = boat.frameList.frames[-1]
+                (frame.windX, frame.windY) = (windX * factor, windY * factor)
+        self.frame += 1
+
+        for (index, (boat, (forceX, forceY, torque))) in enumerate(zip(boats, causes)):
+            boat.runSailor(time)
+            if self.finishTimes[index] is None and boat.sailor is not None and boat.sailor.finished():
+                self.finishTimes[index] = self.frame * self.timestep
+            boat.applyCauses(forceX, forceY, torque, self.timestep)
+            boat.moveInterval(self.timestep)
+
+    def interact(self, winds: list[tuple[float, float]]) -> None:
+        """Find close boats, compute the wind factors of the shadows and let boats that touch collide."""
+        boats = self.boats
+        self.spatialHash.build([(boat.posX, boat.posY) for boat in boats])
+        factors = [1.0] * len(boats)
+        touching = set()
+        close = set()
+        radius = self.spatialHash.cellSize
+        collisionSq = self.collisionDistance**2
+        proximitySq = self.proximityDistance**2
+        for (i, j, dx, dy, distanceSq) in self.spatialHash.pairs(radius):
+            if self.shadowLength > 0 and self.shadowDeficit > 0:
+                factors[j] *= 1 - self.shadowAt(winds[i], dx, dy)
+                factors[i] *= 1 - self.shadowAt(winds[j], -dx, -dy)
+            if distanceSq < proximitySq:
+                close.update((i, j))
+            if distanceSq < collisionSq:
+                pair = (min(i, j), max(i, j))
+                touching.add(pair)
+                if pair not in self.touching:
+                    self.collisions.append((self.frame, pair[0], pair[1]))
+                self.collide(boats[i], boats[j], dx, dy, sqrt(distanceSq))
+        for index in close:
+            self.closeFrames[index] += 1
+        self.touching = touching
+        self.windFactors = factors
+
+    def shadowAt(self, wind: tuple[float, float], dx: float, dy: float) -> float:
+        """Return the wind deficit a boat causes at (dx, dy) from it if the wind there blows with wind."""
+        (windX, windY) = wind
+        windSpeed = cartToRadius(windX, windY)
+        if windSpeed == 0:
+            return 0.0
+        along = (dx * windX + dy * windY) / windSpeed           # Distance downwind
+        if not 0 < along < self.shadowLength:
+            return 0.0
+        across = abs(dx * windY - dy * windX) / windSpeed       # Distance from the center line of the shadow
+        halfWidth = SHADOW_WIDTH / 2 + along * SHADOW_SPREAD
+        if across >= halfWidth:
+            return 0.0
+        return self.shadowDeficit * (1 - along / self.shadowLength) * (1 - across / halfWidth)
+
+    def collide(self, boat: Boat, other: Boat, dx: float, dy: float, distance: float) -> None:
+        """Push two boats apart to collisionDistance and stop them from moving towards each other."""
+        if distance == 0:
+            (dx, dy, distance) = (0.0, 1.0, 1.0)  # Boats at the same spot are pushed apart along y
+        (normalX, normalY) = (dx / distance, dy / distance)
+        totalMass = boat.mass + other.mass
+        # Inelastic: the speeds along the normal become equal if the boats approach each other
+        approach = (boat.speedX - other.speedX) * normalX + (boat.speedY - other.speedY) * normalY
+        if approach > 0:
+            boat.speedX -= normalX * approach * other.mass / totalMass
+            boat.speedY -= normalY * approach * other.mass / totalMass
+            other.speedX += normalX * approach * boat.mass / totalMass
+            other.speedY += normalY * approach * boat.mass / totalMass
+        overlap = self.collisionDistance - distance
+        boat.posX -= normalX * overlap * other.mass / totalMass
+        boat.posY -= normalY * overlap * other.mass / totalMass
+        other.posX += normalX * overlap * boat.mass / totalMass
+        other.posY += normalY * overlap * boat.mass / totalMass
+
+    def rankings(self) -> list[dict[str, Any]]:
+        """
+        Return the results of all boats in the order of their rank.
+
+        Boats that finished are ranked by their finish time, the others after them by their remaining distance.
+        """
+        results = []
+        for (index, boat) in enumerate(self.boats):
+            remaining = boat.sailor.distanceRemaining(boat.posX, boat.posY) if boat.sailor is not None else None
+            results.append({
+                "name": self.names[index],
+                "boat": index,
+                "finishTime": self.finishTimes[index],
+                "distanceRemaining": remaining if remaining is None or isfinite(remaining) else None,
+                "collisions": sum(1 for (_, first, second) in self.collisions if index in (first, second)),
+                "closeFrames": self.closeFrames[index],
+            })
+
+        def rankKey(result: dict[str, Any]) -> tuple:
+            if result["finishTime"] is not None:
+                return (0, result["finishTime"], result["boat"])
+            remaining = result["distanceRemaining"]
+            return (1, remaining if remaining is not None else float("inf"), result["boat"])
+
+        results.sort(key=rankKey)
+        for (rank, result) in enumerate(results):
+            result["rank"] = rank + 1
+        return results
+
+    def __len__(self) -> int:
+        return len(self.boats)
+
+    def __repr__(self) -> str:
+        return f"Race of {len(self.boats)} boats @frm{self.frame}({self.getTime()}s)"
@@ -0,0 +1,373 @@
+"""
+This module contains a disk cache for the results of whole simulation runs.
+
+The key of a run is a hash of everything the run depends on: the values of the boat, sailor and
+wind, the source code of custom coefficient functions and sailor classes with the globals they read
+and their base classes, the source code of sailsim itself and its version. If any of it changes, the
+run is simulated again. Code from the standard library and installed packages is only identified by
+name and package version. Objects that can't be described this way raise a TypeError, runs with them
+are not cached.
+"""
+
+import hashlib
+import inspect
+import json
+import marshal
+import os
+import sys
+import sysconfig
+from math import isfinite
+from types import BuiltinFunctionType, CodeType, FunctionType, MethodType, ModuleType
+from typing import Any, Optional
+
+from sailsim.boat.FrameList import FRAME_FIELDS
+from sailsim.simulation.Checkpoint import Checkpoint
+
+DEFAULT_DIRECTORY = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "sailsim")
+DEFAULT_MAX_SIZE = 512 * 1024**2  # bytes
+
+# Attributes that don't influence the results
+IGNORED_ATTRIBUTES = ("frameList", "initBoat", "profiler")
+
+# Entries of class namespaces that are not part of the behaviour
+IGNORED_CLASS_ATTRIBUTES = ("__dict__", "__doc__", "__module__", "__qualname__", "__weakref__")
+
+# Folders of the standard library and installed packages
+LIBRARY_PATHS = tuple(sorted({os.path.abspath(sysconfig.get_paths()[name]) for name in ("stdlib", "platstdlib", "purelib", "platlib")}))
+
+_packageFingerprint: Optional[str] = None
+
+
+def packageFingerprint() -> str:
+    """Return a hash of the sailsim version and the source code of all modules that can change results."""
+    global _packageFingerprint  # pylint: disable=global-statement
+    if _packageFingerprint is None:
+        import sailsim  # pylint: disable=import-outside-toplevel
+        digest = hashlib.sha256(sailsim.__version__.encode())
+        root = os.path.dirname(os.path.abspath(sailsim.__file__))
+        for folder, folders, files in os.walk(root):
+            folders[:] = sorted(name for name in folders if name not in ("gui", "__pycache__"))
+            for name in sorted(files):
+                if name.endswith(".py"):
+                    path = os.path.join(folder, name)
+                    digest.update(os.path.relpath(path, root).encode())
+                    with open(path, "rb") as file:
+                        digest.update(file.read())
+        _packageFingerprint = digest.hexdigest()
+    return _packageFingerprint
+
+
+def _isSailsim(obj: Any) -> bool:
+    """Check if obj is defined in sailsim, its code is covered by packageFingerprint."""
+    return (getattr(obj, "__module__", None) or "").split(".")[0] == "sailsim"
+
+
+def _isLibrary(obj: Any) -> bool:
+    """Check if obj is defined in the standard library or an installed package, it is identified by name and version."""
+    module = sys.modules.get(getattr(obj, "__module__", None) or "")
+    if module is None:
+        return False
+    path = getattr(module, "__file__", None)
+    if path is None:
+        return module.__name__ in sys.builtin_module_names
+    return os.path.abspath(path).startswith(LIBRARY_PATHS)
+
+
+def _library(obj: Any) -> dict[str, Any]:
+    """Return name and package version of library code."""
+    name = f"{obj.__module__}.{getattr(obj, '__qualname__', type(obj).__qualname__)}"
+    package = sys.modules.get(obj.__module__.split(".")[0])
+    return {"library": name, "version": getattr(package, "__version__", sys.version)}
+
+
+def _codeFingerprint(obj: Any) -> str:
+    """Return a hash of the source code of a function or class."""
+    try:
+        source = inspect.getsource(obj).encode()
+    except (OSError, TypeError) as error:
+        if not hasattr(obj, "__code__"):
+            raise TypeError(f"the code of {obj!r} can't be described, runs with it can't be cached") from error
+        source = marshal.dumps(obj.__code__)
+    return hashlib.sha256(source).hexdigest()
+
+
+def _referencedNames(code: CodeType) -> set[str]:
+    """Return the global and attribute names used by code and the functions defined in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names |= _referencedNames(const)
+    return names
+
+
+def _describeGlobals(function: FunctionType, seen: set[int]) -> dict[str, Any]:
+    """Return a description of the module globals a function reads, attributes it reads of modules are included."""
+    names = _referencedNames(function.__code__)
+    description: dict[str, Any] = {}
+    for name in sorted(names):
+        if name not in function.__globals__:
+            continue
+        value = function.__globals__[name]
+        if isinstance(value, ModuleType):
+            if _isSailsim(value):
+                description[name] = {"module": value.__name__}
+            elif _isLibrary(value):
+                description[name] = {"module": value.__name__, "version": getattr(value, "__version__", sys.version)}
+            else:
+                description[name] = {"module": value.__name__, "attributes": {
+                    attribute: describe(getattr(value, attribute), seen)
+                    for attribute in sorted(names) if hasattr(value, attribute) and not isinstance(getattr(value, attribute), ModuleType)}}
+        else:
+            description[name] = describe(value, seen)
+    return description
+
+
+def _describeClass(cls: type, seen: set[int]) -> dict[str, Any]:
+    """Return a description of a class and the classes it inherits from."""
+    if _isSailsim(cls):
+        return {"class": f"{cls.__module__}.{cls.__qualname__}"}
+    if cls is object or _isLibrary(cls):
+        return _library(cls)
+    namespace = {name: describe(value, seen) for (name, value) in vars(cls).items() if name not in IGNORED_CLASS_ATTRIBUTES}
+    return {
+        "class": f"{cls.__module__}.{cls.__qualname__}",
+        "code": _codeFingerprint(cls),
+        "namespace": namespace,
+        "bases": [describe(base, seen) for base in cls.__mro__[1:]],
+    }
+
+
+def _attributes(obj: Any) -> dict[str, Any]:
+    """Return the attributes of an object from its __dict__ and __slots__."""
+    attributes = dict(getattr(obj, "__dict__", {}))
+    hasSlots = False
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            hasSlots = True
+            if name not in ("__dict__", "__weakref__") and hasattr(obj, name):
+                attributes[name] = getattr(obj, name)
+    if not hasattr(obj, "__dict__") and not hasSlots:
+        raise TypeError(f"the state of {type(obj).__qualname__} objects can't be described, runs with them can't be cached")
+    return attributes
+
+
+def describe(obj: Any, seen: Optional[set[int]] = None) -> Any:
+    """
+    Return a JSON serialisable description of obj that changes whenever its results could change.
+
+    Raise a TypeError if obj can't be described.
+    """
+    if obj is None or isinstance(obj, (bool, int, str)):
+        return obj
+    if isinstance(obj, float):
+        return obj if isfinite(obj) else repr(obj)
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return "<cycle>"
+    seen = seen | {id(obj)}
+
+    if isinstance(obj, (list, tuple)):
+        return [describe(item, seen) for item in obj]
+    if isinstance(obj, dict):
+        return {str(key): describe(value, seen) for key, value in sorted(obj.items(), key=lambda item: str(item[0]))}
+    if hasattr(obj, "tobytes") and hasattr(obj, "dtype"):  # NumPy array
+        return {"array": hashlib.sha256(obj.tobytes()).hexdigest(), "dtype": str(obj.dtype), "shape": list(obj.shape)}
+    if isinstance(obj, MethodType):
+        return {"method": describe(obj.__func__, seen), "of": describe(obj.__self__, seen)}
+    if isinstance(obj, BuiltinFunctionType):
+        return {"builtin": f"{getattr(obj, '__module__', '')}.{obj.__qualname__}"}
+    if isinstance(obj, FunctionType):
+        if _isLibrary(obj):
+            return _library(obj)
+        description = {"function": f"{obj.__module__}.{obj.__qualname__}"}
+        if not _isSailsim(obj):
+            description["code"] = _codeFingerprint(obj)
+            description["globals"] = _describeGlobals(obj, seen)
+        if obj.__closure__:
+            description["closure"] = [describe(cell.cell_contents, seen) for cell in obj.__closure__]
+        if obj.__defaults__:
+            description["defaults"] = describe(obj.__defaults__, seen)
+        if obj.__kwdefaults__:
+            description["kwdefaults"] = describe(obj.__kwdefaults__, seen)
+        return description
+    if isinstance(obj, type):
+        return _describeClass(obj, seen)
+    if isinstance(obj, ModuleType):
+        return {"module": obj.__name__}
+
+    # Any other object: its class and its attributes
+    description = {"__class__": describe(type(obj), seen)}
+    attributes = _attributes(obj)
+    for name in sorted(attributes):
+        if name in IGNORED_ATTRIBUTES or name.startswith("temp_"):
+            continue
+        description[name] = describe(attributes[name], seen)
+    return description
+
+
+class ResultCache:
+    """Save the results of simulation runs on disk and serve repeated runs from there."""
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, maxSize: int = DEFAULT_MAX_SIZE) -> None:
+        """
+        Create a ResultCache.
+
+        Args:
+            directory:  folder of the cache files, default: ~/.cache/sailsim
+            maxSize:    the least recently used results are deleted when the cache gets bigger (in bytes)
+        """
+        self.directory = directory
+        self.maxSize = maxSize
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, simulation, steps: int) -> str:
+        """
+        Return the key of running steps frames of simulation.
+
+        Raise a TypeError if the run can't be cached, e.g. because the boat has an ExternalSailor.
+        """
+        sailor = simulation.boat.sailor
+        if sailor is not None and getattr(sailor, "course", None) is None:
+            # The sailor runs in another process, its behaviour can't be part of the key
+            raise TypeError(f"{type(sailor).__name__} has no course, runs with it can't be cached")
+        description = {
+            "package": packageFingerprint(),
+            "steps": steps,
+            "record": simulation.record,
+            "frame": simulation.frame,
+            "timestep": simulation.timestep,
+            "backend": simulation.backend,  # The backends don't give bit-identical frames
+            "boat": describe(simulation.boat),
+            "wind": describe(simulation.wind),
+            "stopConditions": describe(simulation.stopConditions),
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    def run(self, simulation, steps: int = 0) -> bool:
+        """
+        Run the simulation like Simulation.run(steps) or load the result from the cache. Return True on a cache hit.
+
+        A cache hit restores the frames and the Checkpoint at the end of the run.
+        The temporary values of the boat are not restored. Raise a TypeError before simulating if the run can't be cached.
+        """
+        if steps < 1:
+            if simulation.lastFrame is None:
+                raise Exception('Simulation has no lastFrame')
+            steps = simulation.lastFrame + 1 - simulation.frame
+        key = self.key(simulation, steps)
+
+        result = self.load(key)
+        if result is not None:
+            self.hits += 1
+            (frames, meta) = result
+            self.restore(simulation, frames, meta)
+            simulation.stopReason = meta["stopReason"]
+            if meta["diverged"]:
+                raise OverflowError("Simulation diverged")
+            return True
+
+        self.misses += 1
+        startFrame = simulation.frame
+        framesBefore = len(simulation.boat.frameList)
+        diverged = False
+        simulation.stopReason = None
+        try:
+            simulation.run(steps)
+        except (OverflowError, ValueError, ZeroDivisionError):
+            diverged = True
+        frames = simulation.boat.frameList.getValues()[framesBefore:] if simulation.record else []
+        self.store(key, frames, self.summary(simulation, startFrame, diverged))
+        if diverged:
+            raise OverflowError("Simulation diverged")
+        return False
+
+    @staticmethod
+    def summary(simulation, startFrame: int, diverged: bool) -> dict[str, Any]:
+        """Return the metrics and final state of a run."""
+        checkpoint = Checkpoint.capture(simulation).toDict()
+        checkpoint["boat"] = {name: describe(value) for name, value in checkpoint["boat"].items()}
+        return {
+            "startFrame": startFrame,
+            "frame": simulation.frame,
+            "time": simulation.getTime(),
+            "diverged": diverged,
+            "stopReason": simulation.stopReason,
+            "checkpoint": checkpoint,
+        }
+
+    @staticmethod
+    def restore(simulation, frames, meta: dict[str, Any]) -> None:
+        """Apply a cached result to the simulation."""
+        boat = simulation.boat
+        if simulation.record and len(frames):
+            boat.frameList.appendValues(frames)
+        Checkpoint.fromDict(meta["checkpoint"]).apply(simulation)
+
+    def load(self, key: str):
+        """Return frames and metadata of a key or None if it is not cached."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                frames = data["frames"]
+                meta = json.loads(data["meta"].tobytes().decode())
+        except (OSError, KeyError, ValueError):
+            return None
+        os.utime(path)  # Mark as recently used
+        return (frames, meta)
+
+    def store(self, key: str, frames: list, meta: dict[str, Any]) -> None:
+        """Save frames and metadata of a key and evict old results."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        temporary = f"{path}.{os.getpid()}.tmp.npz"
+        frames = np.array(frames, dtype=np.float64).reshape(-1, len(FRAME_FIELDS))
+        np.savez_compressed(temporary, frames=frames, meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8))
+        os.replace(temporary, path)
+        self.evict()
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        """Return (last use, size, path) of all cached results, least recently used first."""
+        entries = []
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz") and ".tmp" not in name:
+                    path = os.path.join(self.directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self) -> int:
+        """Return the size of all cached results (in bytes)."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> None:
+        """Delete the least recently used results until the cache fits into maxSize."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for (_, size, path) in entries:
+            if total <= self.maxSize:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        """Delete all cached results."""
+        for (_, _, path) in self.entries():
+            os.remove(path)
+
+    def __repr__(self) -> str:
+        return f"ResultCache {self.directory}: {self.hits} hits, {self.misses} misses"
@@ -1,15 +1,38 @@
 """This module contains the Simulation class definition."""
 
-from copy import deepcopy
+import sys
+from math import gcd
+from copy import copy, deepcopy
+from importlib.util import find_spec
+from time import perf_counter
+from typing import TYPE_CHECKING, Optional, Union
 
 from sailsim.boat.Boat import Boat
+from sailsim.boat.FrameList import FrameList
+from sailsim.simulation.Checkpoint import Checkpoint
+from sailsim.simulation.StepProfiler import StepProfiler
+from sailsim.simulation.StopConditions import StopCondition, Watchdog
 from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+if TYPE_CHECKING:
+    from sailsim.wind.WindGrid import WindGrid
+
+BACKEND_AUTO = "auto"
+BACKEND_KERNEL = "kernel"
+BACKEND_PYTHON = "python"
+
+# The kernel and NumPy are only imported when they are used
+JIT_AVAILABLE: bool = find_spec("numba") is not None
+# Loading Numba takes longer than simulating this many steps in Python, BACKEND_AUTO uses the kernel for longer runs only
+KERNEL_MIN_STEPS = 10000
 
 
 class Simulation:
     """Main simulation class in this project."""
 
-    def __init__(self, boat: Boat, wind: Wind, timestep: float, lastFrame: int = None) -> None:
+    def __init__(self, boat: Boat, wind: Wind, timestep: float, lastFrame: int = None, record: bool = True,
+                 backend: str = BACKEND_AUTO) -> None:
         """
         Create Simulation.
 
@@ -18,6 +41,9 @@ class Simulation:
             wind:       wind of the simulation
             timestep:   time difference between frames
             lastFrame:  number of frames to be simulated, default: no end
+            record:     save every frame in the frameList of the boat, default: True
+            backend:    BACKEND_PYTHON steps the Boat object, BACKEND_KERNEL runs sailsim.simulation.kernel
+                        (compiled if Numba is installed), BACKEND_AUTO uses the compiled kernel when possible
         """
         self.boat: Boat = boat
         self.wind: Wind = wind
@@ -27,21 +53,86 @@ class Simulation:
         self.timestep: float = timestep
         self.frame: int = 0
         self.lastFrame = lastFrame
+        self.record: bool = record
+        self.backend: str = backend
 
-    def run(self, steps: int = 0) -> None:
-        """Run whole Simulation if lastFrame is set."""
+        # Timings of the step phases, see enableProfiler
+        self.profiler: Optional[StepProfiler] = None
+
+        # Conditions that end run() early, see addStopCondition
+        self.stopConditions: list[StopCondition] = []
+        self.stopReason: Optional[str] = None
+
+    def run(self, steps: int = 0) -> Optional[str]:
+        """
+        Run whole Simulation if lastFrame is set, otherwise the number of steps given.
+
+        Return the reason of the stop condition that ended the run early or None if all steps were run.
+        """
         if steps < 1:
             # Check if lastFrame exists
             if self.lastFrame is None:
                 raise Exception('Simulation has no lastFrame')
-            while self.frame <= self.lastFrame:
-                self.step()
+            steps = self.lastFrame + 1 - self.frame
+        self.stopReason = None
+        if steps < 1:
+            return None
+
+        windGrid = self.kernelWind(steps)
+        if not self.stopConditions:
+            self.runFrames(steps, windGrid)
+            return None
+
+        # Run in chunks and check the conditions that are due in between. The kernel checks the speed limits of a
+        # Watchdog after every frame by itself, so a Watchdog doesn't shorten its chunks and is checked after each of them
+        interval = 0
+        for condition in self.stopConditions:
+            if windGrid is None or not isinstance(condition, Watchdog):
+                interval = gcd(interval, condition.every)
+        if interval == 0:
+            interval = steps
+        watchdog = any(isinstance(condition, Watchdog) for condition in self.stopConditions)
+        startFrame = self.frame
+        endFrame = self.frame + steps
+        while self.frame < endFrame:
+            try:
+                self.runFrames(min(interval, endFrame - self.frame), windGrid)
+            except (OverflowError, ValueError, ZeroDivisionError):
+                if not watchdog:
+                    raise
+                self.stopReason = Watchdog.reason
+                break
+            done = self.frame - startFrame
+            for condition in self.stopConditions:
+                due = done % condition.every == 0 or (windGrid is not None and isinstance(condition, Watchdog))
+                if due and condition.check(self):
+                    self.stopReason = condition.reason
+                    break
+            if self.stopReason is not None:
+                break
+        return self.stopReason
+
+    def runFrames(self, steps: int, windGrid: Optional["WindGrid"] = None) -> None:
+        """Run steps frames with the kernel if windGrid is given, otherwise with step()."""
+        if windGrid is not None:
+            self.runKernel(steps, windGrid)
         else:
             for _ in range(steps):
                 self.step()
 
+    def addStopCondition(self, condition: Union[StopCondition, list[StopCondition]]) -> None:
+        """Add a condition (see sailsim.simulation.StopConditions) or a list of conditions that end run() early."""
+        if isinstance(condition, StopCondition):
+            self.stopConditions.append(condition)
+        else:
+            self.stopConditions.extend(condition)
+
     def step(self) -> None:
         """Run one step of the Simulation."""
+        if self.profiler is not None:
+            self.stepProfiled()
+            return
+
         # Preperations
         time: float = self.frame * self.timestep
 
@@ -52,15 +143,135 @@ class Simulation:
         (forceX, forceY, torque) = self.boat.resultingCauses()
 
         # Save frame
-        self.boat.frameList.grabFrame(self, self.boat)
+        if self.record:
+            self.boat.frameList.grabFrame(self, self.boat)
         self.frame += 1
 
-        self.boat.runSailor()
+        self.boat.runSailor(time)
 
         # Move Boat
         self.boat.applyCauses(forceX, forceY, torque, self.timestep)
         self.boat.moveInterval(self.timestep)
 
+    def stepProfiled(self) -> None:
+        """Run one step like step() and add the time of every phase to the profiler."""
+        time: float = self.frame * self.timestep
+        boat = self.boat
+
+        start = perf_counter()
+        (boatX, boatY) = boat.getPos()
+        (windX, windY) = self.wind.getWindCart(boatX, boatY, time)
+        windDone = perf_counter()
+        boat.updateTemporaryData(windX, windY)
+        updateDone = perf_counter()
+        (forceX, forceY, torque) = boat.resultingCauses()
+        causesDone = perf_counter()
+
+        grabFrame = None
+        if self.record:
+            boat.frameList.grabFrame(self, boat)
+            grabFrame = perf_counter() - causesDone
+        self.frame += 1
+
+        sailorStart = perf_counter()
+        boat.runSailor(time)
+        sailorDone = perf_counter()
+
+        boat.applyCauses(forceX, forceY, torque, self.timestep)
+        boat.moveInterval(self.timestep)
+        integrationDone = perf_counter()
+
+        self.profiler.addStep(windDone - start, updateDone - windDone, causesDone - updateDone, grabFrame,
+                              sailorDone - sailorStart, integrationDone - sailorDone)
+
+    def enableProfiler(self) -> StepProfiler:
+        """Start collecting timings of the step phases. Return the profiler."""
+        if self.profiler is None:
+            self.profiler = StepProfiler()
+        return self.profiler
+
+    def disableProfiler(self) -> Optional[StepProfiler]:
+        """Stop collecting timings. Return the profiler with the timings collected so far."""
+        profiler = self.profiler
+        self.profiler = None
+        return profiler
+
+    def kernelWind(self, steps: int) -> Optional["WindGrid"]:
+        """Return the wind as WindGrid if run() should use the kernel for steps frames, otherwise None."""
+        if self.backend == BACKEND_PYTHON:
+            return None
+        if self.backend == BACKEND_AUTO:
+            loadedKernel = sys.modules.get("sailsim.simulation.kernel")
+            if not JIT_AVAILABLE or (steps < KERNEL_MIN_STEPS and not (loadedKernel and loadedKernel.compiled)):
+                return None
+
+        # pylint: disable=import-outside-toplevel
+        from sailsim.simulation import kernel
+        from sailsim.wind.WindGrid import WindGrid
+        if self.backend == BACKEND_AUTO and not kernel.compileKernel():
+            return None
+        if not kernel.supportsBoat(self.boat):
+            return None
+
+        # Convert wind
+        if isinstance(self.wind, WindGrid):
+            return self.wind
+        winds = self.wind.winds if isinstance(self.wind, Wind) else [self.wind]
+        if all(type(windfield) is Windfield for windfield in winds):  # pylint: disable=unidiomatic-typecheck
+            return WindGrid.constant(sum(w.speedX for w in winds), sum(w.speedY for w in winds))
+        if len(winds) == 1 and isinstance(winds[0], WindGrid):
+            return winds[0]
+        return None
+
+    def runKernel(self, steps: int, windGrid: "WindGrid") -> None:
+        """
+        Run steps frames with sailsim.simulation.kernel. The frames are the same as those of step().
+
+        Raise OverflowError after the first frame that exceeds the speed limits of a Watchdog or diverges.
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        from sailsim.simulation import kernel  # pylint: disable=import-outside-toplevel
+        kernel.compileKernel()
+        start = perf_counter()
+        boat = self.boat
+        sailor = boat.sailor
+        state = kernel.packState(boat)
+        watchdogs = [condition for condition in self.stopConditions if isinstance(condition, Watchdog)]
+        params = kernel.packParams(boat, min((watchdog.maxSpeed for watchdog in watchdogs), default=kernel.MAX_FINITE_SPEED),
+                                   min((watchdog.maxAngSpeed for watchdog in watchdogs), default=kernel.MAX_FINITE_SPEED))
+        rows = np.empty((steps if self.record else 1, kernel.FRAME_SIZE), dtype=np.float64)
+
+        if sailor is None:
+            done = kernel.runSteps(state, params, windGrid.data, windGrid.info, self.frame, steps, self.timestep, rows)
+        elif kernel.supportsSailor(sailor):
+            (sailorState, sailorParams, commands) = kernel.packSailor(sailor)
+            done = kernel.runSailorSteps(state, params, windGrid.data, windGrid.info, self.frame, steps, self.timestep, rows,
+                                         sailorState, sailorParams, commands)
+            kernel.unpackSailor(sailor, sailorState)
+        else:
+            # Sailors the kernel doesn't know are run in Python after every step
+            done = 0
+            while done < steps:
+                row = rows[done] if self.record else rows[0]
+                frame = self.frame + done
+                sailorArgs = kernel.step(state, params, windGrid.data, windGrid.info, frame, self.timestep, row)
+                done += 1
+                sailor.run(*sailorArgs, frame * self.timestep)
+                if not kernel.steer(state, params, row, self.timestep, sailor.mainSailAngle, sailor.rudderAngle):
+                    break
+
+        # Write results back
+        if self.record:
+            boat.frameList.appendValues(rows[:done])
+        kernel.unpackState(boat, state)
+        if done > 0:
+            kernel.unpackTemporaryData(boat, rows[done - 1] if self.record else rows[0])
+        self.frame += done
+        if self.profiler is not None:
+            self.profiler.addKernel(perf_counter() - start, done)
+        if done < steps:
+            raise OverflowError("Simulation diverged")
+
     def getTime(self) -> float:
         """Return the elapsed time since the start of the simulation."""
         return self.timestep * self.frame
@@ -69,6 +280,38 @@ class Simulation:
         """Return the total time that will elapse throughout the simulation."""
         return self.timestep * self.lastFrame
 
+    def checkpoint(self) -> Checkpoint:
+        """Return the state of the simulation at the current frame."""
+        return Checkpoint.capture(self)
+
+    def restore(self, checkpoint: Checkpoint) -> None:
+        """Go back to a checkpoint of this simulation. Frames recorded after the checkpoint are deleted."""
+        del self.boat.frameList.frames[checkpoint.frameCount:]
+        checkpoint.apply(self)
+
+    def fork(self, checkpoint: Optional[Checkpoint] = None) -> "Simulation":
+        """
+        Return a copy of the simulation that can be run independently, e.g. with other commands for the sailor.
+
+        Wind and the initial boat are shared, recorded frames are shared until the copy records new ones.
+        Simulations with an ExternalSailor can't be forked, its state lives in the controller process.
+
+        Args:
+            checkpoint: state of the copy, default: current state
+        """
+        branch = copy(self)
+        branch.profiler = None
+        branch.stopConditions = [copy(condition) for condition in self.stopConditions]  # Conditions like Stalled have a state
+        boat = branch.boat = copy(self.boat)
+        boat.frameList = FrameList()
+        boat.frameList.frames = list(self.boat.frameList.frames)
+        if boat.sailor is not None:
+            boat.sailor = copy(boat.sailor)
+            boat.sailor.course = copy(boat.sailor.course)
+        if checkpoint is not None:
+            branch.restore(checkpoint)
+        return branch
+
     def reset(self) -> None:
         """Set simulation to the first frame recorded."""
         # Reset Boat
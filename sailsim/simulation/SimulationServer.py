@@ -0,0 +1,460 @@
+"""
+This module contains an asyncio server that runs many simulations at once and streams their frames.
+
+Clients talk to the server over TCP, every message is one line of JSON. Requests have an "op" and an
+optional "tag" that is copied into the reply:
+
+    {"op": "submit", "scenario": {...}, "stream": true, "lastFrame": 1000, "tag": 1}
+        -> {"op": "submitted", "id": 0, "hash": "...", "fields": [...], "tag": 1}
+    {"op": "summary", "id": 0, "wait": true}    -> {"op": "summary", "id": 0, "state": "done", "summary": {...}}
+    {"op": "cancel", "id": 0}                   -> {"op": "cancelled", "id": 0}
+    {"op": "status"}                            -> {"op": "status", "jobs": {"running": 3, "done": 12}}
+    {"op": "ack", "id": 0, "batches": 1}        -> no reply
+
+Errors are answered with {"op": "error", "message": "..."}. Streamed simulations send their frames in
+batches {"op": "frames", "id": 0, "frames": [[...], ...]} (values in the order of FRAME_FIELDS) and end
+with {"op": "done", "id": 0, "summary": {...}}.
+
+Streamed simulations are stepped in the event loop, every simulation runs sliceFrames frames and then
+lets the others run. The server sends at most queueSize batches of a simulation that the client has
+not acknowledged with "ack", further batches wait in a queue of queueSize batches. A simulation is
+paused while its queue is full, so slow clients slow down their own simulations only. Simulations
+that are not streamed are run in a process pool.
+
+Start a server with `python -m sailsim.simulation.SimulationServer --port 8765` or use
+SimulationServer and SimulationClient in asyncio code.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from typing import Any, AsyncIterator, Optional
+
+from sailsim.boat.FrameList import FRAME_FIELDS
+from sailsim.simulation.StopConditions import CourseFinished, STOP_DIVERGED, Watchdog
+
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+LINE_LIMIT = 2**24  # Longest message (in bytes)
+DEFAULT_LAST_FRAME = 10000
+KEEP_JOBS = 1000  # Finished jobs whose summaries are kept
+
+
+class ServiceError(RuntimeError):
+    """The server answered a request with an error."""
+
+
+def _encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def prepareSimulation(scenario: dict[str, Any], lastFrame: Optional[int] = None, stopEarly: bool = True):
+    """Create a simulation from a scenario that stops when it diverges and, if stopEarly is set, when the course is finished."""
+    from sailsim.simulation.scenario import createSimulation  # pylint: disable=import-outside-toplevel
+    simulation = createSimulation(scenario)
+    if lastFrame is not None:
+        simulation.lastFrame = lastFrame
+    if simulation.lastFrame is None:
+        simulation.lastFrame = DEFAULT_LAST_FRAME
+    simulation.addStopCondition(Watchdog())
+    if stopEarly and simulation.boat.sailor is not None:
+        simulation.addStopCondition(CourseFinished())
+    return simulation
+
+
+def runBatch(scenario: dict[str, Any], lastFrame: Optional[int] = None, stopEarly: bool = True) -> dict[str, Any]:
+    """Run a whole scenario without recording frames and return its summary. Runs in the worker processes."""
+    from sailsim.main import simulationSummary  # pylint: disable=import-outside-toplevel
+    simulation = prepareSimulation(scenario, lastFrame, stopEarly)
+    simulation.record = False
+    diverged = False
+    try:
+        simulation.run()
+    except (OverflowError, ValueError, ZeroDivisionError):
+        diverged = True
+    return simulationSummary(simulation, diverged or simulation.stopReason == STOP_DIVERGED)
+
+
+class Job:
+    """One submitted simulation."""
+
+    def __init__(self, jobId: int, scenario: dict[str, Any], scenarioHash: str, stream: bool, lastFrame: Optional[int],
+                 stopEarly: bool, queueSize: int) -> None:
+        self.id = jobId
+        self.scenario = scenario
+        self.hash = scenarioHash
+        self.stream = stream
+        self.lastFrame = lastFrame
+        self.stopEarly = stopEarly
+        self.state = STATE_RUNNING
+        self.summary: Optional[dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.finished = asyncio.Event()
+        self.queue: "Optional[asyncio.Queue[Optional[list]]]" = asyncio.Queue(queueSize) if stream else None
+        self.credit = asyncio.Semaphore(queueSize)  # Batches the client may receive before it acknowledges them
+        self.task: Optional[asyncio.Task] = None
+
+    def finish(self, state: str, summary: Optional[dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        self.state = state
+        self.summary = summary
+        self.error = error
+        self.finished.set()
+
+    def reply(self) -> dict[str, Any]:
+        """Return the state of the job as summary message."""
+        message: dict[str, Any] = {"op": "summary", "id": self.id, "state": self.state, "summary": self.summary}
+        if self.error is not None:
+            message["error"] = self.error
+        return message
+
+    def __repr__(self) -> str:
+        return f"Job {self.id} {self.state}"
+
+
+class SimulationServer:
+    """Run submitted scenarios and stream their frames to the clients."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, sliceFrames: int = 100, batchFrames: int = 100,
+                 queueSize: int = 8, workers: Optional[int] = None, keepJobs: int = KEEP_JOBS) -> None:
+        """
+        Create a SimulationServer, call start() to accept connections.
+
+        Args:
+            host:           address to listen on
+            port:           port to listen on, 0: any free port
+            sliceFrames:    frames a streamed simulation runs before the next simulation gets its turn
+            batchFrames:    frames per message
+            queueSize:      unacknowledged batches per simulation before it is paused
+            workers:        processes for simulations that are not streamed, None: number of cpus,
+                            0: run them in the event loop as well
+            keepJobs:       finished jobs that are kept for "summary", older ones are removed
+        """
+        self.host = host
+        self.port = port
+        self.sliceFrames = sliceFrames
+        self.batchFrames = batchFrames
+        self.queueSize = queueSize
+        self.workers = workers
+        self.keepJobs = keepJobs
+        self.jobs: dict[int, Job] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self._ids = count()
+
+    async def start(self) -> tuple[str, int]:
+        """Start listening. Return host and port."""
+        self.server = await asyncio.start_server(self.handleConnection, self.host, self.port, limit=LINE_LIMIT)
+        (self.host, self.port) = self.server.sockets[0].getsockname()[:2]
+        return (self.host, self.port)
+
+    async def serveForever(self) -> None:
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening, cancel all running simulations and shut the worker processes down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    async def handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one client until it disconnects."""
+        lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+        streams: list[Job] = []
+
+        async def send(message: dict[str, Any]) -> None:
+            async with lock:
+                writer.write(_encode(message))
+                await writer.drain()
+
+        async def answer(line: bytes) -> None:
+            request: Any = {}
+            try:
+                request = json.loads(line)
+                reply = await self.handleRequest(request)
+            except (ValueError, KeyError, TypeError) as error:
+                reply = {"op": "error", "message": f"{type(error).__name__}: {error}"}
+            if reply is None:
+                return
+            if isinstance(request, dict) and "tag" in request:
+                reply["tag"] = request["tag"]
+            await send(reply)
+            if reply["op"] == "submitted" and self.jobs[reply["id"]].stream:
+                job = self.jobs[reply["id"]]
+                streams.append(job)
+                await self.forward(job, send)
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                # Requests are answered concurrently, a client can submit while it waits for a summary
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            # Nobody receives the frames anymore
+            for job in streams:
+                if job.task is not None:
+                    job.task.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def handleRequest(self, request: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """Return the reply to a request or None if it has no reply."""
+        op = request.get("op")
+        if op == "submit":
+            job = self.submit(request["scenario"], bool(request.get("stream", True)), request.get("lastFrame"),
+                              bool(request.get("stopEarly", True)))
+            return {"op": "submitted", "id": job.id, "hash": job.hash, "fields": FRAME_FIELDS}
+        if op == "status":
+            states: dict[str, int] = {}
+            for job in self.jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            return {"op": "status", "jobs": states}
+
+        if op not in ("summary", "ack", "cancel"):
+            raise ValueError(f"unknown op {op!r}")
+        job = self.jobs.get(int(request["id"]))
+        if job is None:
+            raise KeyError(f"no job {request['id']}")
+        if op == "summary":
+            if request.get("wait", True):
+                await job.finished.wait()
+            return job.reply()
+        if op == "ack":
+            for _ in range(int(request.get("batches", 1))):
+                job.credit.release()
+            return None
+        if job.task is not None:
+            job.task.cancel()
+        return {"op": "cancelled", "id": job.id}
+
+    def submit(self, scenario: dict[str, Any], stream: bool = True, lastFrame: Optional[int] = None, stopEarly: bool = True) -> Job:
+        """Validate a scenario and start simulating it."""
+        from sailsim.simulation.scenario import scenarioHash, validateScenario  # pylint: disable=import-outside-toplevel
+        if lastFrame is not None and lastFrame < 0:
+            raise ValueError("lastFrame has to be at least 0")
+        scenario = validateScenario(scenario)
+        self.removeFinishedJobs()
+        job = Job(next(self._ids), scenario, scenarioHash(scenario), stream, lastFrame, stopEarly, self.queueSize)
+        self.jobs[job.id] = job
+        if stream or self.workers == 0:
+            job.task = asyncio.create_task(self.runSlices(job))
+        else:
+            job.task = asyncio.create_task(self.runInPool(job))
+        return job
+
+    def removeFinishedJobs(self) -> None:
+        """Remove the oldest finished jobs until at most keepJobs finished jobs are left."""
+        finished = [jobId for (jobId, job) in self.jobs.items() if job.finished.is_set()]
+        for jobId in finished[:max(len(finished) - self.keepJobs, 0)]:
+            del self.jobs[jobId]
+
+    async def runSlices(self, job: Job) -> None:
+        """Run a simulation in the event loop, sliceFrames frames at a time."""
+        from sailsim.main import simulationSummary  # pylint: disable=import-outside-toplevel
+        queue = job.queue
+        try:
+            simulation = prepareSimulation(job.scenario, job.lastFrame, job.stopEarly)
+            simulation.record = queue is not None
+            frames = simulation.boat.frameList.frames
+            diverged = False
+            stopReason = None
+            while simulation.frame <= simulation.lastFrame:
+                try:
+                    stopReason = simulation.run(min(self.sliceFrames, simulation.lastFrame + 1 - simulation.frame))
+                except (OverflowError, ValueError, ZeroDivisionError):
+                    diverged = True
+                    stopReason = STOP_DIVERGED
+                if queue is not None:
+                    # Streamed frames are not kept
+                    rows = [frame.getValues() for frame in frames]
+                    frames.clear()
+                    for start in range(0, len(rows), self.batchFrames):
+                        await queue.put(rows[start:start + self.batchFrames])
+                if stopReason is not None:
+                    break
+                await asyncio.sleep(0)
+            job.finish(STATE_DONE, simulationSummary(simulation, diverged or stopReason == STOP_DIVERGED))
+        except asyncio.CancelledError:
+            job.finish(STATE_CANCELLED)
+        except Exception as error:  # pylint: disable=broad-except
+            job.finish(STATE_FAILED, error=f"{type(error).__name__}: {error}")
+        if queue is not None:
+            # The end marker must not wait for a client that might be gone
+            while queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    async def runInPool(self, job: Job) -> None:
+        """Run a simulation in a worker process."""
+        if self.pool is None:
+            # Forked workers inherit the locks of threads running in this process and can hang, spawn fresh interpreters
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            summary = await asyncio.get_running_loop().run_in_executor(self.pool, runBatch, job.scenario, job.lastFrame, job.stopEarly)
+            job.finish(STATE_DONE, summary)
+        except asyncio.CancelledError:
+            job.finish(STATE_CANCELLED)
+        except Exception as error:  # pylint: disable=broad-except
+            job.finish(STATE_FAILED, error=f"{type(error).__name__}: {error}")
+
+    @staticmethod
+    async def forward(job: Job, send) -> None:
+        """Send the frames of a job to its client."""
+        while True:
+            rows = await job.queue.get()
+            if rows is None:
+                break
+            await job.credit.acquire()
+            await send({"op": "frames", "id": job.id, "frames": rows})
+        message = job.reply()
+        message["op"] = "done"
+        await send(message)
+
+    def __repr__(self) -> str:
+        running = sum(job.state == STATE_RUNNING for job in self.jobs.values())
+        return f"SimulationServer {self.host}:{self.port}, {running}/{len(self.jobs)} jobs running"
+
+
+class SimulationClient:
+    """Connection to a SimulationServer."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Create a client from an open connection, use SimulationClient.connect() to open one."""
+        self.reader = reader
+        self.writer = writer
+        self.replies: dict[int, asyncio.Future] = {}
+        self.streams: dict[int, asyncio.Queue] = {}
+        self.summaries: dict[int, dict[str, Any]] = {}
+        self._tags = count()
+        self._receiver = asyncio.create_task(self.receive())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765) -> "SimulationClient":
+        (reader, writer) = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def receive(self) -> None:
+        """Sort the incoming messages into replies and streams."""
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if "tag" in message:
+                    future = self.replies.pop(message["tag"], None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+                elif message["op"] in ("frames", "done"):
+                    # The server sends a limited number of batches until they are acknowledged
+                    self.stream(message["id"]).put_nowait(message)
+        finally:
+            for future in self.replies.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to the server closed"))
+            for queue in self.streams.values():
+                queue.put_nowait(None)
+
+    def stream(self, jobId: int) -> asyncio.Queue:
+        if jobId not in self.streams:
+            self.streams[jobId] = asyncio.Queue()
+        return self.streams[jobId]
+
+    async def request(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Send a request and return the reply. Raise ServiceError if the server answers with an error."""
+        tag = next(self._tags)
+        future = asyncio.get_running_loop().create_future()
+        self.replies[tag] = future
+        self.writer.write(_encode({**message, "tag": tag}))
+        await self.writer.drain()
+        reply = await future
+        if reply["op"] == "error":
+            raise ServiceError(reply["message"])
+        return reply
+
+    async def submit(self, scenario: dict[str, Any], stream: bool = True, lastFrame: Optional[int] = None, stopEarly: bool = True) -> int:
+        """Submit a scenario. Return the id of the job."""
+        reply = await self.request({"op": "submit", "scenario": scenario, "stream": stream, "lastFrame": lastFrame, "stopEarly": stopEarly})
+        return reply["id"]
+
+    async def frames(self, jobId: int) -> AsyncIterator[list[list[float]]]:
+        """Yield the batches of frames of a streamed job. The summary is saved in summaries afterwards."""
+        queue = self.stream(jobId)
+        while True:
+            message = await queue.get()
+            if message is None:
+                raise ConnectionError("Connection to the server closed")
+            if message["op"] == "done":
+                self.summaries[jobId] = message
+                del self.streams[jobId]
+                return
+            yield message["frames"]
+            self.writer.write(_encode({"op": "ack", "id": jobId, "batches": 1}))
+
+    async def summary(self, jobId: int, wait: bool = True) -> dict[str, Any]:
+        """Return state and summary of a job, wait until it is finished if wait is set."""
+        return await self.request({"op": "summary", "id": jobId, "wait": wait})
+
+    async def cancel(self, jobId: int) -> None:
+        await self.request({"op": "cancel", "id": jobId})
+
+    async def status(self) -> dict[str, int]:
+        """Return the number of jobs per state."""
+        return (await self.request({"op": "status"}))["jobs"]
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await asyncio.gather(self._receiver, return_exceptions=True)
+
+
+def main(arguments: Optional[list[str]] = None) -> None:
+    """Run a SimulationServer until it is interrupted."""
+    parser = argparse.ArgumentParser(prog="sailsim-server", description="Serve sailsim simulations over TCP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on, default: 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on, default: 8765")
+    parser.add_argument("--slice", type=int, default=100, help="frames per time slice, default: 100")
+    parser.add_argument("--batch", type=int, default=100, help="frames per message, default: 100")
+    parser.add_argument("-j", "--workers", type=int, help="worker processes for simulations that are not streamed, default: number of cpus")
+    args = parser.parse_args(arguments)
+
+    server = SimulationServer(args.host, args.port, args.slice, args.batch, workers=args.workers)
+    try:
+        asyncio.run(server.serveForever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
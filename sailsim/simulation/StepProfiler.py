@@ -0,0 +1,88 @@
+"""This module contains the StepProfiler class that collects timings of the phases of a simulation step."""
+
+from typing import Any, Optional
+
+PHASE_WIND = "wind"
+PHASE_UPDATE = "updateTemporaryData"
+PHASE_CAUSES = "resultingCauses"
+PHASE_GRAB_FRAME = "grabFrame"
+PHASE_SAILOR = "runSailor"
+PHASE_INTEGRATION = "integration"
+PHASE_KERNEL = "kernel"
+PHASES = (PHASE_WIND, PHASE_UPDATE, PHASE_CAUSES, PHASE_GRAB_FRAME, PHASE_SAILOR, PHASE_INTEGRATION, PHASE_KERNEL)
+
+
+class StepProfiler:
+    """Accumulate wall time and number of calls per phase of Simulation.step."""
+
+    def __init__(self) -> None:
+        self.times: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.steps: int = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Delete all collected timings."""
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.steps = 0
+
+    def add(self, phase: str, seconds: float, calls: int = 1) -> None:
+        """Add the duration of calls to a phase."""
+        self.times[phase] = self.times.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + calls
+
+    def addStep(self, wind: float, update: float, causes: float, grabFrame: Optional[float], sailor: float, integration: float) -> None:
+        """Add the durations of all phases of one step. grabFrame is None if no frame was recorded."""
+        times = self.times
+        calls = self.calls
+        times[PHASE_WIND] += wind
+        times[PHASE_UPDATE] += update
+        times[PHASE_CAUSES] += causes
+        times[PHASE_SAILOR] += sailor
+        times[PHASE_INTEGRATION] += integration
+        calls[PHASE_WIND] += 1
+        calls[PHASE_UPDATE] += 1
+        calls[PHASE_CAUSES] += 1
+        calls[PHASE_SAILOR] += 1
+        calls[PHASE_INTEGRATION] += 1
+        if grabFrame is not None:
+            times[PHASE_GRAB_FRAME] += grabFrame
+            calls[PHASE_GRAB_FRAME] += 1
+        self.steps += 1
+
+    def addKernel(self, seconds: float, steps: int) -> None:
+        """Add steps that were run by sailsim.simulation.kernel."""
+        self.add(PHASE_KERNEL, seconds, steps)
+        self.steps += steps
+
+    def totalTime(self) -> float:
+        """Return the time spent in all phases (in s)."""
+        return sum(self.times.values())
+
+    def stats(self) -> dict[str, Any]:
+        """Return the timings as dictionary of plain values that can be written as JSON."""
+        total = self.totalTime()
+        phases = {}
+        for phase, seconds in self.times.items():
+            calls = self.calls[phase]
+            phases[phase] = {
+                "time": seconds,
+                "calls": calls,
+                "mean": seconds / calls if calls else 0.0,
+                "share": seconds / total if total else 0.0,
+            }
+        return {"steps": self.steps, "time": total, "phases": phases}
+
+    def report(self) -> str:
+        """Return a table with the timings of every phase."""
+        lines = [f"{'phase':20} {'calls':>10} {'total (ms)':>12} {'mean (us)':>10} {'share':>7}"]
+        for phase, values in self.stats()["phases"].items():
+            if values["calls"] == 0:
+                continue
+            lines.append(f"{phase:20} {values['calls']:10d} {values['time'] * 1e3:12.3f} {values['mean'] * 1e6:10.3f} {values['share']:7.1%}")
+        lines.append(f"{self.steps} steps in {self.totalTime() * 1e3:.3f}ms")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"StepProfiler {self.steps} steps, {round(self.totalTime() * 1e3, 3)}ms"
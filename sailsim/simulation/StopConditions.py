@@ -0,0 +1,181 @@
+"""
+This module contains conditions that end a simulation run before lastFrame.
+
+Add them with Simulation.addStopCondition(). Every condition is checked every `every` frames, when
+one is met Simulation.run() stops and returns its reason. Checking less often is cheaper, the run
+then stops up to every - 1 frames after the condition was met.
+"""
+
+from abc import ABC, abstractmethod
+from math import sqrt
+from typing import Callable, Optional
+
+STOP_COURSE_FINISHED = "courseFinished"
+STOP_TIME_LIMIT = "timeLimit"
+STOP_DISTANCE_LIMIT = "distanceLimit"
+STOP_STALLED = "stalled"
+STOP_PREDICATE = "predicate"
+STOP_DIVERGED = "diverged"
+
+
+class StopCondition(ABC):
+    """Base class of all stop conditions."""
+
+    reason: str = STOP_PREDICATE
+
+    def __init__(self, every: int = 1) -> None:
+        """
+        Create a StopCondition.
+
+        Args:
+            every:  check the condition every this many frames
+        """
+        if every < 1:
+            raise ValueError("every has to be at least 1")
+        self.every = every
+
+    @abstractmethod
+    def check(self, simulation) -> bool:
+        """Return True if the simulation should stop."""
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__} every {self.every} frames"
+
+
+class CourseFinished(StopCondition):
+    """Stop when the sailor has completed all commands."""
+
+    reason = STOP_COURSE_FINISHED
+
+    def __init__(self, every: int = 10) -> None:
+        super().__init__(every)
+
+    def check(self, simulation) -> bool:
+        sailor = simulation.boat.sailor
+        return sailor is not None and sailor.course.finished()
+
+
+class TimeLimit(StopCondition):
+    """Stop when the simulation time is reached."""
+
+    reason = STOP_TIME_LIMIT
+
+    def __init__(self, time: float, every: int = 1) -> None:
+        """
+        Create a TimeLimit.
+
+        Args:
+            time:   simulated time to stop at (in s)
+            every:  check the condition every this many frames
+        """
+        super().__init__(every)
+        self.time = time
+
+    def check(self, simulation) -> bool:
+        return simulation.getTime() >= self.time
+
+
+class DistanceLimit(StopCondition):
+    """Stop when the boat is further away from its start position than the distance given."""
+
+    reason = STOP_DISTANCE_LIMIT
+
+    def __init__(self, distance: float, every: int = 10) -> None:
+        """
+        Create a DistanceLimit.
+
+        Args:
+            distance:   distance from the start position of the boat (in m)
+            every:      check the condition every this many frames
+        """
+        super().__init__(every)
+        self.distance = distance
+
+    def check(self, simulation) -> bool:
+        (startX, startY) = simulation.initBoat.getPos()
+        (posX, posY) = simulation.boat.getPos()
+        return sqrt((posX - startX)**2 + (posY - startY)**2) > self.distance
+
+
+class Stalled(StopCondition):
+    """Stop when the boat has been slower than minSpeed for the duration given."""
+
+    reason = STOP_STALLED
+
+    def __init__(self, minSpeed: float = 0.05, duration: float = 30, every: int = 10) -> None:
+        """
+        Create a Stalled condition.
+
+        Args:
+            minSpeed:   speed below which the boat counts as stuck (in m/s)
+            duration:   time the boat has to be stuck (in s)
+            every:      check the condition every this many frames
+        """
+        super().__init__(every)
+        self.minSpeed = minSpeed
+        self.duration = duration
+        self.since: Optional[float] = None
+
+    def check(self, simulation) -> bool:
+        time = simulation.getTime()
+        if self.since is not None and self.since > time:  # Simulation was reset or restored
+            self.since = None
+        boat = simulation.boat
+        if sqrt(boat.speedX**2 + boat.speedY**2) >= self.minSpeed:
+            self.since = None
+            return False
+        if self.since is None:
+            self.since = time
+        return time - self.since >= self.duration
+
+
+class Predicate(StopCondition):
+    """Stop when a function of the simulation returns True."""
+
+    def __init__(self, function: Callable[..., bool], every: int = 1, reason: str = STOP_PREDICATE) -> None:
+        """
+        Create a Predicate.
+
+        Args:
+            function:   called with the simulation, returns True to stop
+            every:      check the condition every this many frames
+            reason:     reason returned by Simulation.run()
+        """
+        super().__init__(every)
+        self.function = function
+        self.reason = reason
+
+    def check(self, simulation) -> bool:
+        return bool(self.function(simulation))
+
+
+class Watchdog(StopCondition):
+    """
+    Stop when the boat state is not finite or the speeds are unrealistically high.
+
+    A simulation with a Watchdog also stops instead of raising when the physics overflows. The kernel backend
+    checks maxSpeed and maxAngSpeed after every frame, regardless of every.
+    """
+
+    reason = STOP_DIVERGED
+
+    def __init__(self, maxSpeed: float = 100, maxAngSpeed: float = 100, every: int = 1) -> None:
+        """
+        Create a Watchdog.
+
+        Args:
+            maxSpeed:       highest plausible speed of the boat (in m/s)
+            maxAngSpeed:    highest plausible angular speed of the boat (in rad/s)
+            every:          check the condition every this many frames
+        """
+        super().__init__(every)
+        self.maxSpeed = maxSpeed
+        self.maxAngSpeed = maxAngSpeed
+
+    def check(self, simulation) -> bool:
+        boat = simulation.boat
+        # Comparisons with NaN are False, so NaN is caught by the negation
+        return not (abs(boat.speedX) <= self.maxSpeed and abs(boat.speedY) <= self.maxSpeed
+                    and abs(boat.angSpeed) <= self.maxAngSpeed
+                    and abs(boat.posX) < float("inf") and abs(boat.posY) < float("inf")
+                    and abs(boat.direction) < float("inf"))
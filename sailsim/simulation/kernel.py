@@ -0,0 +1,597 @@
+"""
+This module contains the physics of one simulation step as plain functions on float arrays.
+
+The functions do exactly the same calculations as Boat.updateTemporaryData, Boat.resultingCauses,
+Boat.applyCauses and Boat.moveInterval (with the default coefficient functions), but they only use
+the math module and NumPy arrays. This way they can be compiled with Numba. Call compileKernel()
+to replace the functions of this module with compiled versions. If Numba is not installed the
+plain Python functions stay in place.
+
+The state of a boat is kept in an array indexed by the STATE_* constants, the boat constants in an
+array indexed by the PARAM_* constants. Every step fills a row with all values of a Frame in the
+order of sailsim.boat.FrameList.FRAME_FIELDS. The runs stop after the first frame whose speeds exceed
+PARAM_MAX_SPEED or PARAM_MAX_ANG_SPEED, Simulation sets them to the limits of its Watchdog.
+
+A Sailor with a command list of Waypoint, HoldHeading, Wait and Tack commands is compiled into the
+kernel as well (sailorRun does the same as Sailor.run and Course.update), its state is kept in an array
+indexed by the SAILOR_* constants. Other sailors, e.g. subclasses or an ExternalSailor, are run in Python
+between the kernel steps, these runs are hardly faster than BACKEND_PYTHON.
+"""
+
+import importlib.util
+from math import atan2, floor, isnan, nan, pi, sin, cos, sqrt
+
+import numpy as np
+
+from sailsim.boat.FrameList import FRAME_FIELDS
+from sailsim.boat.coefficientsapprox import coefficientAirDrag, coefficientAirLift, coefficientWaterDrag, coefficientWaterLift
+from sailsim.sailor.Commands import HoldHeading, Tack, Wait, Waypoint
+from sailsim.sailor.Sailor import Sailor
+from sailsim.utils.constants import DENSITY_AIR, DENSITY_WATER
+
+TAU = 2 * pi
+
+# Boat state
+STATE_POS_X = 0
+STATE_POS_Y = 1
+STATE_SPEED_X = 2
+STATE_SPEED_Y = 3
+STATE_DIRECTION = 4
+STATE_ANG_SPEED = 5
+STATE_MAIN_SAIL_ANGLE = 6
+STATE_RUDDER_ANGLE = 7
+STATE_SIZE = 8
+
+# Boat constants
+PARAM_LENGTH = 0
+PARAM_MASS = 1
+PARAM_MOMENTUM_INERTIA = 2
+PARAM_SAIL_AREA = 3
+PARAM_CENTERBOARD_AREA = 4
+PARAM_CENTERBOARD_LEVER = 5
+PARAM_RUDDER_AREA = 6
+PARAM_RUDDER_LEVER = 7
+PARAM_MAX_SPEED = 8
+PARAM_MAX_ANG_SPEED = 9
+PARAM_SIZE = 10
+
+# Speeds above this can overflow the Python backend, the kernel stops before them
+MAX_FINITE_SPEED = 1e150
+
+# Sailor state, SAILOR_HOLD_DIRECTION is NaN if the sailor doesn't hold a course
+SAILOR_DEST_X = 0
+SAILOR_DEST_Y = 1
+SAILOR_HOLD_DIRECTION = 2
+SAILOR_HOLD_UNTIL = 3
+SAILOR_TRUE_WIND_DIR = 4
+SAILOR_COMPASS = 5
+SAILOR_BOAT_DIRECTION = 6
+SAILOR_RUDDER_ANGLE = 7
+SAILOR_MAIN_SAIL_ANGLE = 8
+SAILOR_INDEX = 9
+SAILOR_ENTERED = 10
+SAILOR_SIZE = 11
+
+# Sailor constants
+SAILOR_PARAM_TACKING_ANGLE = 0
+SAILOR_PARAM_BUFFER = 1
+SAILOR_PARAM_RUDDER_GAIN = 2
+SAILOR_PARAM_SAIL_TRIM = 3
+SAILOR_PARAM_MAX_RUDDER_ANGLE = 4
+SAILOR_PARAM_SIZE = 5
+
+# Commands are rows of (type, values), see packCommands
+COMMAND_WAYPOINT = 0
+COMMAND_HOLD_HEADING = 1
+COMMAND_WAIT = 2
+COMMAND_TACK = 3
+COMMAND_SIZE = 4
+
+# Columns of a frame row
+(COL_FRAME, COL_TIME,
+ COL_POS_X, COL_POS_Y, COL_SPEED_X, COL_SPEED_Y, COL_DIRECTION, COL_ANG_SPEED,
+ COL_MAIN_SAIL_ANGLE, COL_RUDDER_ANGLE,
+ COL_APPARENT_WIND_X, COL_APPARENT_WIND_Y, COL_APPARENT_WIND_ANGLE, COL_LEEWAY_ANGLE, COL_ANGLE_OF_ATTACK,
+ COL_FORCE_X, COL_FORCE_Y,
+ COL_SAIL_DRAG_X, COL_SAIL_DRAG_Y, COL_SAIL_LIFT_X, COL_SAIL_LIFT_Y,
+ COL_CENTERBOARD_DRAG_X, COL_CENTERBOARD_DRAG_Y, COL_CENTERBOARD_LIFT_X, COL_CENTERBOARD_LIFT_Y,
+ COL_RUDDER_DRAG_X, COL_RUDDER_DRAG_Y, COL_RUDDER_LIFT_X, COL_RUDDER_LIFT_Y,
+ COL_TORQUE, COL_WATER_DRAG_TORQUE, COL_CENTERBOARD_TORQUE, COL_RUDDER_TORQUE,
+ COL_WIND_X, COL_WIND_Y) = range(len(FRAME_FIELDS))
+FRAME_SIZE = len(FRAME_FIELDS)
+
+# Coefficient functions the kernel has built in
+DEFAULT_COEFFICIENTS = (coefficientAirDrag, coefficientAirLift, coefficientWaterDrag, coefficientWaterLift)
+
+JIT_AVAILABLE: bool = importlib.util.find_spec("numba") is not None
+compiled: bool = False
+
+
+def packState(boat) -> np.ndarray:
+    """Return the state of the boat as an array."""
+    state = np.empty(STATE_SIZE, dtype=np.float64)
+    state[STATE_POS_X] = boat.posX
+    state[STATE_POS_Y] = boat.posY
+    state[STATE_SPEED_X] = boat.speedX
+    state[STATE_SPEED_Y] = boat.speedY
+    state[STATE_DIRECTION] = boat.direction
+    state[STATE_ANG_SPEED] = boat.angSpeed
+    state[STATE_MAIN_SAIL_ANGLE] = boat.mainSailAngle
+    state[STATE_RUDDER_ANGLE] = boat.rudderAngle
+    return state
+
+
+def unpackState(boat, state: np.ndarray) -> None:
+    """Write a state array back into the boat."""
+    boat.posX = float(state[STATE_POS_X])
+    boat.posY = float(state[STATE_POS_Y])
+    boat.speedX = float(state[STATE_SPEED_X])
+    boat.speedY = float(state[STATE_SPEED_Y])
+    boat.direction = float(state[STATE_DIRECTION])
+    boat.angSpeed = float(state[STATE_ANG_SPEED])
+    boat.mainSailAngle = float(state[STATE_MAIN_SAIL_ANGLE])
+    boat.rudderAngle = float(state[STATE_RUDDER_ANGLE])
+
+
+def unpackTemporaryData(boat, row: np.ndarray) -> None:
+    """Write the temporary values of a frame row into the boat."""
+    (boat.temp_apparentWindX, boat.temp_apparentWindY) = (float(row[COL_APPARENT_WIND_X]), float(row[COL_APPARENT_WIND_Y]))
+    boat.temp_apparentWindAngle = float(row[COL_APPARENT_WIND_ANGLE])
+    boat.temp_apparentWindSpeed = sqrt(boat.temp_apparentWindX**2 + boat.temp_apparentWindY**2)
+    boat.temp_boatSpeed = sqrt(float(row[COL_SPEED_X])**2 + float(row[COL_SPEED_Y])**2)
+    boat.temp_leewayAngle = float(row[COL_LEEWAY_ANGLE])
+    boat.temp_angleOfAttack = float(row[COL_ANGLE_OF_ATTACK])
+
+    (boat.temp_forceX, boat.temp_forceY) = (float(row[COL_FORCE_X]), float(row[COL_FORCE_Y]))
+    (boat.temp_sailDragX, boat.temp_sailDragY) = (float(row[COL_SAIL_DRAG_X]), float(row[COL_SAIL_DRAG_Y]))
+    (boat.temp_sailLiftX, boat.temp_sailLiftY) = (float(row[COL_SAIL_LIFT_X]), float(row[COL_SAIL_LIFT_Y]))
+    (boat.temp_centerboardDragX, boat.temp_centerboardDragY) = (float(row[COL_CENTERBOARD_DRAG_X]), float(row[COL_CENTERBOARD_DRAG_Y]))
+    (boat.temp_centerboardLiftX, boat.temp_centerboardLiftY) = (float(row[COL_CENTERBOARD_LIFT_X]), float(row[COL_CENTERBOARD_LIFT_Y]))
+    (boat.temp_rudderDragX, boat.temp_rudderDragY) = (float(row[COL_RUDDER_DRAG_X]), float(row[COL_RUDDER_DRAG_Y]))
+    (boat.temp_rudderLiftX, boat.temp_rudderLiftY) = (float(row[COL_RUDDER_LIFT_X]), float(row[COL_RUDDER_LIFT_Y]))
+
+    boat.temp_torque = float(row[COL_TORQUE])
+    boat.temp_waterDragTorque = float(row[COL_WATER_DRAG_TORQUE])
+    boat.temp_centerboardTorque = float(row[COL_CENTERBOARD_TORQUE])
+    boat.temp_rudderTorque = float(row[COL_RUDDER_TORQUE])
+
+
+def withinLimits(state: np.ndarray, params: np.ndarray) -> bool:
+    """Check if the speeds of the state are within PARAM_MAX_SPEED and PARAM_MAX_ANG_SPEED. NaN is never within them."""
+    maxSpeed = params[PARAM_MAX_SPEED]
+    return (abs(state[STATE_SPEED_X]) <= maxSpeed and abs(state[STATE_SPEED_Y]) <= maxSpeed
+            and abs(state[STATE_ANG_SPEED]) <= params[PARAM_MAX_ANG_SPEED])
+
+
+def packParams(boat, maxSpeed: float = MAX_FINITE_SPEED, maxAngSpeed: float = MAX_FINITE_SPEED) -> np.ndarray:
+    """
+    Return the constants of the boat as an array.
+
+    Args:
+        boat:           boat to simulate
+        maxSpeed:       the kernel stops when the boat gets faster (in m/s), e.g. Watchdog.maxSpeed
+        maxAngSpeed:    the kernel stops when the boat turns faster (in rad/s), e.g. Watchdog.maxAngSpeed
+    """
+    params = np.empty(PARAM_SIZE, dtype=np.float64)
+    params[PARAM_LENGTH] = boat.length
+    params[PARAM_MASS] = boat.mass
+    params[PARAM_MOMENTUM_INERTIA] = boat.momentumInertia
+    params[PARAM_SAIL_AREA] = boat.sailArea
+    params[PARAM_CENTERBOARD_AREA] = boat.centerboardArea
+    params[PARAM_CENTERBOARD_LEVER] = boat.centerboardLever
+    params[PARAM_RUDDER_AREA] = boat.rudderArea
+    params[PARAM_RUDDER_LEVER] = boat.rudderLever
+    params[PARAM_MAX_SPEED] = min(maxSpeed, MAX_FINITE_SPEED)
+    params[PARAM_MAX_ANG_SPEED] = min(maxAngSpeed, MAX_FINITE_SPEED)
+    return params
+
+
+def supportsSailor(sailor) -> bool:
+    """Check if sailorRun does the same as the sailor, i.e. it is a plain Sailor with commands the kernel knows."""
+    return type(sailor) is Sailor and all(type(command) in (Waypoint, HoldHeading, Wait, Tack) for command in sailor.course.commandList)
+
+
+def packSailor(sailor) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return state, constants and commands of a sailor as arrays."""
+    state = np.empty(SAILOR_SIZE, dtype=np.float64)
+    state[SAILOR_DEST_X] = sailor.destX
+    state[SAILOR_DEST_Y] = sailor.destY
+    state[SAILOR_HOLD_DIRECTION] = nan if sailor.holdDirection is None else sailor.holdDirection
+    state[SAILOR_HOLD_UNTIL] = sailor.holdUntil
+    state[SAILOR_TRUE_WIND_DIR] = sailor.trueWindDir
+    state[SAILOR_COMPASS] = sailor.compass
+    state[SAILOR_BOAT_DIRECTION] = getattr(sailor, "boatDirection", 0)
+    state[SAILOR_RUDDER_ANGLE] = getattr(sailor, "rudderAngle", 0)
+    state[SAILOR_MAIN_SAIL_ANGLE] = getattr(sailor, "mainSailAngle", 0)
+    state[SAILOR_INDEX] = sailor.course.index
+    state[SAILOR_ENTERED] = sailor.course.entered
+
+    params = np.empty(SAILOR_PARAM_SIZE, dtype=np.float64)
+    params[SAILOR_PARAM_TACKING_ANGLE] = sailor.tackingAngleUpwind
+    params[SAILOR_PARAM_BUFFER] = sailor.tackingAngleBufferSize
+    params[SAILOR_PARAM_RUDDER_GAIN] = sailor.rudderGain
+    params[SAILOR_PARAM_SAIL_TRIM] = sailor.sailTrimFactor
+    params[SAILOR_PARAM_MAX_RUDDER_ANGLE] = sailor.maxRudderAngle
+    return (state, params, packCommands(sailor.course.commandList))
+
+
+def packCommands(commandList: list) -> np.ndarray:
+    """Return the commands as rows of (type, values) with the constants Course compiles them into."""
+    commands = np.zeros((len(commandList), COMMAND_SIZE), dtype=np.float64)
+    for (row, command) in zip(commands, commandList):
+        if isinstance(command, Waypoint):
+            row[:] = (COMMAND_WAYPOINT, command.destX, command.destY, command.radius * command.radius)
+        elif isinstance(command, HoldHeading):
+            row[:3] = (COMMAND_HOLD_HEADING, command.direction % TAU, command.duration)
+        elif isinstance(command, Wait):
+            row[:2] = (COMMAND_WAIT, command.time)
+        else:
+            row[:2] = (COMMAND_TACK, command.tolerance)
+    return commands
+
+
+def unpackSailor(sailor, state: np.ndarray) -> None:
+    """Write a sailor state array back into the sailor, values that didn't change are left alone."""
+    values = {
+        "destX": float(state[SAILOR_DEST_X]),
+        "destY": float(state[SAILOR_DEST_Y]),
+        "holdDirection": None if isnan(state[SAILOR_HOLD_DIRECTION]) else float(state[SAILOR_HOLD_DIRECTION]),
+        "holdUntil": float(state[SAILOR_HOLD_UNTIL]),
+    }
+    for (name, value) in values.items():
+        if getattr(sailor, name) != value:
+            setattr(sailor, name, value)
+    sailor.trueWindDir = float(state[SAILOR_TRUE_WIND_DIR])
+    sailor.compass = float(state[SAILOR_COMPASS])
+    sailor.boatDirection = float(state[SAILOR_BOAT_DIRECTION])
+    sailor.rudderAngle = float(state[SAILOR_RUDDER_ANGLE])
+    sailor.mainSailAngle = float(state[SAILOR_MAIN_SAIL_ANGLE])
+    index = int(state[SAILOR_INDEX])
+    if index != sailor.course.index:
+        sailor.course.reset(index)
+    sailor.course.entered = bool(state[SAILOR_ENTERED])
+    sailor.commandListIndex = index
+
+
+def supportsBoat(boat) -> bool:
+    """Check if the kernel calculates the same forces as the boat, i.e. the boat uses the default coefficients."""
+    return (boat.coefficientAirDrag, boat.coefficientAirLift, boat.coefficientWaterDrag, boat.coefficientWaterLift) == DEFAULT_COEFFICIENTS
+
+
+# Helpers, equivalent to sailsim.utils
+def angleKeepInterval(angle: float) -> float:
+    """Keep angle inside the range of (-pi; pi]."""
+    if angle > pi:
+        return angle - TAU
+    if angle <= -pi:
+        return angle + TAU
+    return angle
+
+
+def cartToArg(cartX: float, cartY: float) -> float:
+    """Convert Cartesian coordinates into their corresponding argument (angle)."""
+    argument = atan2(cartX, cartY + 0.0) % TAU
+    return argument if argument < TAU else 0.0
+
+
+def airDrag(angleOfAttack: float) -> float:
+    """Same as coefficientsapprox.coefficientAirDrag."""
+    return 0.41 * angleOfAttack**2 + 0.13 * abs(angleOfAttack) + 0.3
+
+
+def airLift(angleOfAttack: float) -> float:
+    """Same as coefficientsapprox.coefficientAirLift."""
+    return -3.5 * 16 / pi**2 * (abs(angleOfAttack) - pi / 4)**2 + 3.5
+
+
+def interpolationIndex(position: float, size: int):
+    """Return both neighbouring grid indices and the weight of the second one. Positions outside are clamped."""
+    if size == 1 or position <= 0:
+        return (0, 0, 0.0)
+    if position >= size - 1:
+        return (size - 1, size - 1, 0.0)
+    index = int(floor(position))
+    return (index, index + 1, position - index)
+
+
+def sampleWind(data: np.ndarray, info: np.ndarray, x: float, y: float, t: float):
+    """Interpolate wind data of a sailsim.wind.WindGrid.WindGrid linearly in x, y and t."""
+    (t0, t1, wt) = interpolationIndex((t - info[3]) / info[4], data.shape[0])
+    (y0, y1, wy) = interpolationIndex((y - info[1]) / info[2], data.shape[1])
+    (x0, x1, wx) = interpolationIndex((x - info[0]) / info[2], data.shape[2])
+    windX = 0.0
+    windY = 0.0
+    for (it, weightT) in ((t0, 1 - wt), (t1, wt)):
+        for (iy, weightY) in ((y0, 1 - wy), (y1, wy)):
+            for (ix, weightX) in ((x0, 1 - wx), (x1, wx)):
+                weight = weightT * weightY * weightX
+                windX += weight * data[it, iy, ix, 0]
+                windY += weight * data[it, iy, ix, 1]
+    return (windX, windY)
+
+
+def computeForces(state: np.ndarray, params: np.ndarray, windX: float, windY: float, row: np.ndarray) -> None:
+    """Calculate all temporary values, forces and torques of the boat and save them in the frame row."""
+    speedX = state[STATE_SPEED_X]
+    speedY = state[STATE_SPEED_Y]
+    direction = state[STATE_DIRECTION]
+    angSpeed = state[STATE_ANG_SPEED]
+    mainSailAngle = state[STATE_MAIN_SAIL_ANGLE]
+    rudderAngle = state[STATE_RUDDER_ANGLE]
+
+    # Boat.updateTemporaryData
+    apparentWindX = windX - speedX
+    apparentWindY = windY - speedY
+    apparentWindAngle = angleKeepInterval(cartToArg(apparentWindX, apparentWindY) - direction)
+    apparentWindSpeed = sqrt(apparentWindX**2 + apparentWindY**2)
+    leewayAngle = angleKeepInterval(cartToArg(speedX, speedY) - direction)
+    angleOfAttack = angleKeepInterval(apparentWindAngle - mainSailAngle + pi)
+
+    # Boat.leverSpeedVector
+    backwards = (direction + pi) % TAU
+    orbRadius = angSpeed * params[PARAM_RUDDER_LEVER]
+    flowSpeedRudderX = -speedX + orbRadius * sin(backwards)
+    flowSpeedRudderY = -speedY + orbRadius * cos(backwards)
+    flowSpeedRudderSq = flowSpeedRudderX**2 + flowSpeedRudderY**2
+    flowSpeedRudder = sqrt(flowSpeedRudderSq)
+    orbRadius = angSpeed * params[PARAM_CENTERBOARD_LEVER]
+    flowSpeedCenterboardX = -speedX + orbRadius * sin(backwards)
+    flowSpeedCenterboardY = -speedY + orbRadius * cos(backwards)
+    flowSpeedCenterboardSq = flowSpeedCenterboardX**2 + flowSpeedCenterboardY**2
+    flowSpeedCenterboard = sqrt(flowSpeedCenterboardSq)
+
+    # Normalised vectors
+    dirNormX = sin(direction)
+    dirNormY = cos(direction)
+    (apparentWindNormX, apparentWindNormY) = (apparentWindX / apparentWindSpeed, apparentWindY / apparentWindSpeed) if apparentWindSpeed != 0 else (0.0, 0.0)
+    (rudderNormX, rudderNormY) = (flowSpeedRudderX / flowSpeedRudder, flowSpeedRudderY / flowSpeedRudder) if flowSpeedRudder != 0 else (0.0, 0.0)
+    (centerboardNormX, centerboardNormY) = (flowSpeedCenterboardX / flowSpeedCenterboard, flowSpeedCenterboardY / flowSpeedCenterboard) if flowSpeedCenterboard != 0 else (0.0, 0.0)
+
+    # Sail forces
+    scalar = 0.5 * DENSITY_AIR * params[PARAM_SAIL_AREA] * apparentWindSpeed**2 * airDrag(angleOfAttack)
+    (sailDragX, sailDragY) = (scalar * apparentWindNormX, scalar * apparentWindNormY)
+    scalar = 0.5 * DENSITY_AIR * params[PARAM_SAIL_AREA] * apparentWindSpeed**2 * airLift(angleOfAttack)
+    if angleOfAttack < 0:
+        (sailLiftX, sailLiftY) = (-scalar * apparentWindNormY, scalar * apparentWindNormX)
+    else:
+        (sailLiftX, sailLiftY) = (scalar * apparentWindNormY, -scalar * apparentWindNormX)
+
+    # Centerboard forces
+    scalar = 0.5 * DENSITY_WATER * params[PARAM_CENTERBOARD_AREA] * flowSpeedCenterboardSq * airDrag(leewayAngle)
+    (centerboardDragX, centerboardDragY) = (scalar * centerboardNormX, scalar * centerboardNormY)
+    scalar = 0.5 * DENSITY_WATER * params[PARAM_CENTERBOARD_AREA] * flowSpeedCenterboardSq * airLift(leewayAngle)
+    if leewayAngle < 0:
+        (centerboardLiftX, centerboardLiftY) = (-scalar * centerboardNormY, scalar * centerboardNormX)
+    else:
+        (centerboardLiftX, centerboardLiftY) = (scalar * centerboardNormY, -scalar * centerboardNormX)
+
+    # Rudder forces
+    rudderAngleOfAttack = angleKeepInterval(leewayAngle + rudderAngle)
+    scalar = 0.5 * DENSITY_WATER * params[PARAM_RUDDER_AREA] * flowSpeedRudderSq * airDrag(rudderAngleOfAttack)
+    (rudderDragX, rudderDragY) = (scalar * rudderNormX, scalar * rudderNormY)
+    scalar = 0.5 * DENSITY_WATER * params[PARAM_RUDDER_AREA] * flowSpeedRudderSq * airLift(rudderAngleOfAttack)
+    if rudderAngleOfAttack < 0:
+        (rudderLiftX, rudderLiftY) = (-scalar * rudderNormY, scalar * rudderNormX)
+    else:
+        (rudderLiftX, rudderLiftY) = (scalar * rudderNormY, -scalar * rudderNormX)
+
+    # Torques
+    waterDragTorque = 1 / 64 * 1.1 * .3 * DENSITY_WATER * params[PARAM_LENGTH]**4 * angSpeed**2
+    if angSpeed >= 0:
+        waterDragTorque = -waterDragTorque
+    centerboardTorque = ((centerboardDragY + centerboardLiftY) * dirNormX - (centerboardDragX + centerboardLiftX) * dirNormY) * params[PARAM_CENTERBOARD_LEVER]
+    rudderTorque = ((rudderDragY + rudderLiftY) * dirNormX - (rudderDragX + rudderLiftX) * dirNormY) * params[PARAM_RUDDER_LEVER]
+
+    # Save frame row
+    row[COL_POS_X] = state[STATE_POS_X]
+    row[COL_POS_Y] = state[STATE_POS_Y]
+    row[COL_SPEED_X] = speedX
+    row[COL_SPEED_Y] = speedY
+    row[COL_DIRECTION] = direction
+    row[COL_ANG_SPEED] = angSpeed
+    row[COL_MAIN_SAIL_ANGLE] = mainSailAngle
+    row[COL_RUDDER_ANGLE] = rudderAngle
+    row[COL_APPARENT_WIND_X] = apparentWindX
+    row[COL_APPARENT_WIND_Y] = apparentWindY
+    row[COL_APPARENT_WIND_ANGLE] = apparentWindAngle
+    row[COL_LEEWAY_ANGLE] = leewayAngle
+    row[COL_ANGLE_OF_ATTACK] = angleOfAttack
+    row[COL_FORCE_X] = sailDragX + sailLiftX + centerboardDragX + centerboardLiftX + rudderDragX + rudderLiftX
+    row[COL_FORCE_Y] = sailDragY + sailLiftY + centerboardDragY + centerboardLiftY + rudderDragY + rudderLiftY
+    row[COL_SAIL_DRAG_X] = sailDragX
+    row[COL_SAIL_DRAG_Y] = sailDragY
+    row[COL_SAIL_LIFT_X] = sailLiftX
+    row[COL_SAIL_LIFT_Y] = sailLiftY
+    row[COL_CENTERBOARD_DRAG_X] = centerboardDragX
+    row[COL_CENTERBOARD_DRAG_Y] = centerboardDragY
+    row[COL_CENTERBOARD_LIFT_X] = centerboardLiftX
+    row[COL_CENTERBOARD_LIFT_Y] = centerboardLiftY
+    row[COL_RUDDER_DRAG_X] = rudderDragX
+    row[COL_RUDDER_DRAG_Y] = rudderDragY
+    row[COL_RUDDER_LIFT_X] = rudderLiftX
+    row[COL_RUDDER_LIFT_Y] = rudderLiftY
+    row[COL_TORQUE] = waterDragTorque + centerboardTorque + rudderTorque
+    row[COL_WATER_DRAG_TORQUE] = waterDragTorque
+    row[COL_CENTERBOARD_TORQUE] = centerboardTorque
+    row[COL_RUDDER_TORQUE] = rudderTorque
+    row[COL_WIND_X] = windX
+    row[COL_WIND_Y] = windY
+
+
+def integrate(state: np.ndarray, params: np.ndarray, row: np.ndarray, interval: float) -> None:
+    """Apply forces and torque of the frame row and move the boat (Boat.applyCauses and Boat.moveInterval)."""
+    state[STATE_SPEED_X] += row[COL_FORCE_X] / params[PARAM_MASS] * interval
+    state[STATE_SPEED_Y] += row[COL_FORCE_Y] / params[PARAM_MASS] * interval
+    state[STATE_ANG_SPEED] += row[COL_TORQUE] / params[PARAM_MOMENTUM_INERTIA] * interval
+    state[STATE_POS_X] += state[STATE_SPEED_X] * interval
+    state[STATE_POS_Y] += state[STATE_SPEED_Y] * interval
+    state[STATE_DIRECTION] = (state[STATE_DIRECTION] + state[STATE_ANG_SPEED] * interval) % TAU
+
+
+def step(state: np.ndarray, params: np.ndarray, windData: np.ndarray, windInfo: np.ndarray, frame: int, interval: float, row: np.ndarray):
+    """
+    Run the wind lookup and force calculation of one frame and fill the frame row.
+
+    Return the arguments of Sailor.run (without time): posX, posY, boatSpeed, boatDirection, boatAngle,
+    apparentWindSpeed and apparentWindAngle.
+    """
+    time = frame * interval
+    (windX, windY) = sampleWind(windData, windInfo, state[STATE_POS_X], state[STATE_POS_Y], time)
+    computeForces(state, params, windX, windY, row)
+    row[COL_FRAME] = frame
+    row[COL_TIME] = time
+    speedX = state[STATE_SPEED_X]
+    speedY = state[STATE_SPEED_Y]
+    return (state[STATE_POS_X], state[STATE_POS_Y], sqrt(speedX**2 + speedY**2), cartToArg(speedX, speedY), state[STATE_DIRECTION],
+            sqrt(row[COL_APPARENT_WIND_X]**2 + row[COL_APPARENT_WIND_Y]**2), row[COL_APPARENT_WIND_ANGLE])
+
+
+def steer(state: np.ndarray, params: np.ndarray, row: np.ndarray, interval: float, mainSailAngle: float, rudderAngle: float) -> bool:
+    """Set the angles chosen by the sailor and move the boat. Return False if the state left the limits of params."""
+    state[STATE_MAIN_SAIL_ANGLE] = mainSailAngle
+    state[STATE_RUDDER_ANGLE] = rudderAngle
+    integrate(state, params, row, interval)
+    return withinLimits(state, params)
+
+
+def runSteps(state: np.ndarray, params: np.ndarray, windData: np.ndarray, windInfo: np.ndarray, frame: int, steps: int,
+             interval: float, trajectory: np.ndarray) -> int:
+    """
+    Simulate a boat with fixed sail and rudder angles.
+
+    Every frame is saved in trajectory if it has steps rows, otherwise trajectory needs one row which is reused.
+    Return the number of frames simulated, which is less than steps if the state left the limits of params.
+    """
+    record = trajectory.shape[0] >= steps
+    for i in range(steps):
+        row = trajectory[i] if record else trajectory[0]
+        step(state, params, windData, windInfo, frame + i, interval, row)
+        integrate(state, params, row, interval)
+        if not withinLimits(state, params):
+            return i + 1
+    return steps
+
+
+def commandEnter(sailor: np.ndarray, command: np.ndarray, time: float) -> None:
+    """Start a command (the enter functions of sailsim.sailor.Course)."""
+    kind = command[0]
+    if kind == COMMAND_WAYPOINT:
+        sailor[SAILOR_HOLD_DIRECTION] = nan
+        sailor[SAILOR_DEST_X] = command[1]
+        sailor[SAILOR_DEST_Y] = command[2]
+    elif kind == COMMAND_HOLD_HEADING:
+        sailor[SAILOR_HOLD_DIRECTION] = command[1]
+        sailor[SAILOR_HOLD_UNTIL] = time + command[2]
+    elif kind == COMMAND_TACK:
+        sailor[SAILOR_HOLD_DIRECTION] = (2 * sailor[SAILOR_TRUE_WIND_DIR] - sailor[SAILOR_COMPASS]) % TAU
+
+
+def commandCheck(sailor: np.ndarray, command: np.ndarray, posX: float, posY: float, time: float) -> bool:
+    """Check if a command is finished (the check functions of sailsim.sailor.Course)."""
+    kind = command[0]
+    if kind == COMMAND_WAYPOINT:
+        deltaX = command[1] - posX
+        deltaY = command[2] - posY
+        return deltaX * deltaX + deltaY * deltaY <= command[3]
+    if kind == COMMAND_HOLD_HEADING:
+        if time >= sailor[SAILOR_HOLD_UNTIL]:
+            sailor[SAILOR_HOLD_DIRECTION] = nan
+            return True
+        return False
+    if kind == COMMAND_WAIT:
+        return time >= command[1]
+    if abs(angleKeepInterval(sailor[SAILOR_HOLD_DIRECTION] - sailor[SAILOR_COMPASS])) < command[1]:
+        sailor[SAILOR_HOLD_DIRECTION] = nan
+        return True
+    return False
+
+
+def sailorRun(sailor: np.ndarray, sailorParams: np.ndarray, commands: np.ndarray, posX: float, posY: float, gpsSpeed: float,
+              gpsDir: float, compass: float, windSpeed: float, windAngle: float, time: float) -> None:
+    """Choose main sail and rudder angle like Sailor.run, the commands are run like Course.update."""
+    # True wind direction (sailsim.sailor.Sailor.trueWindDirection)
+    windDirection = (windAngle + compass) % TAU
+    trueWindDir = cartToArg(gpsSpeed * sin(gpsDir) + windSpeed * sin(windDirection), gpsSpeed * cos(gpsDir) + windSpeed * cos(windDirection))
+    sailor[SAILOR_TRUE_WIND_DIR] = trueWindDir
+    sailor[SAILOR_COMPASS] = compass
+
+    # Commands
+    index = int(sailor[SAILOR_INDEX])
+    while index < commands.shape[0]:
+        if sailor[SAILOR_ENTERED] == 0:
+            commandEnter(sailor, commands[index], time)
+            sailor[SAILOR_ENTERED] = 1
+        if not commandCheck(sailor, commands[index], posX, posY, time):
+            break
+        index += 1
+        sailor[SAILOR_INDEX] = index
+        sailor[SAILOR_ENTERED] = 0
+
+    straightCourse = cartToArg(sailor[SAILOR_DEST_X] - posX, sailor[SAILOR_DEST_Y] - posY)
+    windCourseAngle = angleKeepInterval(trueWindDir - straightCourse)
+    leewayAngle = angleKeepInterval(gpsDir - compass)
+    tackingAngle = sailorParams[SAILOR_PARAM_TACKING_ANGLE]
+    buffer = sailorParams[SAILOR_PARAM_BUFFER]
+
+    if not isnan(sailor[SAILOR_HOLD_DIRECTION]):
+        boatDirection = sailor[SAILOR_HOLD_DIRECTION]
+    elif abs(windCourseAngle) > pi - tackingAngle - buffer:
+        # Upwind tacking (sailsim.sailor.Course.laylines)
+        llp = (trueWindDir + tackingAngle + pi) % TAU
+        lln = (trueWindDir - tackingAngle + pi) % TAU
+        if abs(angleKeepInterval(llp - straightCourse)) < buffer:
+            boatDirection = llp
+        elif abs(angleKeepInterval(lln - straightCourse)) < buffer:
+            boatDirection = lln
+        elif angleKeepInterval(trueWindDir - compass) > 0:
+            boatDirection = llp
+        else:
+            boatDirection = lln
+    else:
+        boatDirection = straightCourse - (leewayAngle if abs(leewayAngle) < 0.5 else 0)
+    sailor[SAILOR_BOAT_DIRECTION] = boatDirection
+
+    offset = angleKeepInterval(boatDirection - compass)
+    rudderAngle = offset * sailorParams[SAILOR_PARAM_RUDDER_GAIN] / gpsSpeed if gpsSpeed != 0 else 0.00000001
+    maxRudderAngle = sailorParams[SAILOR_PARAM_MAX_RUDDER_ANGLE]
+    if abs(rudderAngle) > maxRudderAngle:
+        rudderAngle = maxRudderAngle if rudderAngle > 0 else -maxRudderAngle
+    sailor[SAILOR_RUDDER_ANGLE] = rudderAngle
+    sailor[SAILOR_MAIN_SAIL_ANGLE] = angleKeepInterval(windAngle - pi) * sailorParams[SAILOR_PARAM_SAIL_TRIM]
+
+
+def runSailorSteps(state: np.ndarray, params: np.ndarray, windData: np.ndarray, windInfo: np.ndarray, frame: int, steps: int,
+                   interval: float, trajectory: np.ndarray, sailor: np.ndarray, sailorParams: np.ndarray, commands: np.ndarray) -> int:
+    """
+    Simulate a boat steered by a sailor compiled with packSailor.
+
+    Every frame is saved in trajectory if it has steps rows, otherwise trajectory needs one row which is reused.
+    Return the number of frames simulated, which is less than steps if the state left the limits of params.
+    """
+    record = trajectory.shape[0] >= steps
+    for i in range(steps):
+        row = trajectory[i] if record else trajectory[0]
+        (posX, posY, gpsSpeed, gpsDir, compass, windSpeed, windAngle) = step(state, params, windData, windInfo, frame + i, interval, row)
+        sailorRun(sailor, sailorParams, commands, posX, posY, gpsSpeed, gpsDir, compass, windSpeed, windAngle, (frame + i) * interval)
+        if not steer(state, params, row, interval, sailor[SAILOR_MAIN_SAIL_ANGLE], sailor[SAILOR_RUDDER_ANGLE]):
+            return i + 1
+    return steps
+
+
+# Functions in the order they have to be compiled, callees first
+KERNEL_FUNCTIONS = ("angleKeepInterval", "cartToArg", "airDrag", "airLift", "interpolationIndex", "sampleWind", "withinLimits",
+                    "computeForces", "integrate", "step", "steer", "runSteps", "commandEnter", "commandCheck", "sailorRun",
+                    "runSailorSteps")
+
+
+def compileKernel() -> bool:
+    """Replace the kernel functions with Numba compiled versions. Return True if the kernel is compiled."""
+    global compiled  # pylint: disable=global-statement
+    if compiled or not JIT_AVAILABLE:
+        return compiled
+    from numba import njit  # pylint: disable=import-outside-toplevel
+    namespace = globals()
+    for name in KERNEL_FUNCTIONS:
+        namespace[name] = njit(cache=True)(namespace[name])
+    compiled = True
+    return compiled
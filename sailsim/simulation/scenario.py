@@ -0,0 +1,284 @@
+"""
+This module creates simulations from declarative scenario files.
+
+A scenario is a JSON or TOML document like this:
+
+    {
+        "name": "upwind",
+        "timestep": 0.01,
+        "lastFrame": 10000,
+        "boat": {"posX": 0, "posY": 0, "direction": 0, "mass": 80},
+        "wind": [
+            {"type": "Windfield", "x": 0, "y": 5},
+            {"type": "Fluctuationfield", "amplitude": 1, "noiseSeed": 3}
+        ],
+        "sailor": {
+            "rudderGain": 0.5,
+            "commands": [{"type": "Waypoint", "destX": 0, "destY": 100, "radius": 2}]
+        }
+    }
+
+Windfields and commands take the arguments of their constructors. The boat takes the arguments of
+Boat() and the attributes in BOAT_ATTRIBUTES, the sailor takes the attributes in SAILOR_PARAMETERS.
+Without "sailor" the boat keeps its initial sail and rudder angles.
+
+validateScenario() checks a scenario and returns its canonical form with all defaults filled in.
+Scenarios that simulate the same get the same scenarioHash(), so runners can deduplicate work and
+cache results.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+from collections import OrderedDict
+from copy import deepcopy
+from math import pi
+from typing import Any
+
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Commands import Waypoint, HoldHeading, Wait, Tack
+from sailsim.sailor.Sailor import Sailor
+from sailsim.simulation.Simulation import Simulation
+from sailsim.utils.optional import importOptional
+from sailsim.wind.Wind import Wind
+
+
+class ScenarioError(ValueError):
+    """A scenario does not match the schema."""
+
+
+REQUIRED = object()  # Marks parameters without default
+
+# Wind type -> module, the noise library is only imported if a scenario uses it
+WIND_TYPES = {
+    "Windfield": "sailsim.wind.Windfield",
+    "Fluctuationfield": "sailsim.wind.Fluctuationfield",
+    "Squallfield": "sailsim.wind.Squallfield",
+}
+# Wind type -> constructor parameters with their defaults
+WIND_PARAMETERS: dict[str, dict[str, Any]] = {
+    "Windfield": {"x": REQUIRED, "y": REQUIRED},
+    "Fluctuationfield": {"x": 0.0, "y": 0.0, "amplitude": 1.0, "scale": 64.0, "speed": 16.0, "noiseSeed": 0},
+    "Squallfield": {"x": REQUIRED, "y": REQUIRED, "gridDistance": REQUIRED, "displacementFactor": 1.0, "noiseSeed": 0},
+}
+COMMAND_TYPES = {
+    "Waypoint": Waypoint,
+    "HoldHeading": HoldHeading,
+    "Wait": Wait,
+    "Tack": Tack,
+}
+COMMAND_PARAMETERS: dict[str, dict[str, Any]] = {
+    "Waypoint": {"destX": REQUIRED, "destY": REQUIRED, "radius": REQUIRED},
+    "HoldHeading": {"direction": REQUIRED, "duration": REQUIRED},
+    "Wait": {"time": REQUIRED},
+    "Tack": {"tolerance": 10 / 180 * pi},
+}
+BOAT_ARGUMENTS = ("posX", "posY", "direction", "speedX", "speedY", "angSpeed")
+BOAT_ATTRIBUTES = (
+    "length", "width", "mass", "momentumInertia", "sailArea", "hullArea", "centerboardArea", "centerboardLever",
+    "rudderArea", "rudderLever", "mainSailAngle", "rudderAngle", "maxMainSailAngle", "maxRudderAngle",
+    "tackingAngleUpwind", "tackingAngleDownwind",
+)
+# Sailor parameters with their defaults, None: taken from the boat
+SAILOR_PARAMETERS: dict[str, Any] = {
+    "rudderGain": 0.5,
+    "sailTrimFactor": 0.5,
+    "tackingAngleBufferSize": 10 / 180 * pi,
+    "tackingAngleUpwind": None,
+    "tackingAngleDownwind": None,
+}
+INTEGER_PARAMETERS = ("lastFrame", "noiseSeed")
+# Keys that describe a scenario but don't change the results
+INFO_KEYS = ("name", "description")
+
+CACHE_SIZE = 128
+_cache: "OrderedDict[str, tuple[tuple[int, int], dict[str, Any]]]" = OrderedDict()
+
+
+def _number(value: Any, path: str, integer: bool = False):
+    """Check that value is a number and return it as float, or as int if integer is set."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ScenarioError(f"{path}: expected a number, got {value!r}")
+    if integer:
+        if value != int(value):
+            raise ScenarioError(f"{path}: expected an integer, got {value!r}")
+        return int(value)
+    return float(value)
+
+
+def _object(value: Any, path: str) -> dict[str, Any]:
+    if not isinstance(value, dict):
+        raise ScenarioError(f"{path}: expected an object, got {type(value).__name__}")
+    return value
+
+
+def _checkKeys(description: dict[str, Any], allowed, path: str) -> None:
+    unknown = sorted(set(description) - set(allowed))
+    if unknown:
+        raise ScenarioError(f"{path}: unknown keys {', '.join(unknown)}")
+
+
+def _typedObject(description: Any, parameters: dict[str, dict[str, Any]], path: str) -> dict[str, Any]:
+    """Validate a windfield or command description and fill in the defaults."""
+    description = _object(description, path)
+    typeName = description.get("type")
+    if typeName not in parameters:
+        raise ScenarioError(f"{path}.type: expected one of {', '.join(parameters)}, got {typeName!r}")
+    _checkKeys(description, ("type", *parameters[typeName]), path)
+    result: dict[str, Any] = {"type": typeName}
+    for name, default in parameters[typeName].items():
+        if name in description:
+            result[name] = _number(description[name], f"{path}.{name}", name in INTEGER_PARAMETERS)
+        elif default is REQUIRED:
+            raise ScenarioError(f"{path}.{name}: missing")
+        else:
+            result[name] = default
+    return result
+
+
+def validateScenario(scenario: Any) -> dict[str, Any]:
+    """Check a scenario and return its canonical form: all defaults filled in, numbers as float or int."""
+    scenario = _object(scenario, "scenario")
+    _checkKeys(scenario, ("timestep", "lastFrame", "boat", "wind", "sailor", *INFO_KEYS), "scenario")
+    result: dict[str, Any] = {}
+    for key in INFO_KEYS:
+        if key in scenario:
+            if not isinstance(scenario[key], str):
+                raise ScenarioError(f"{key}: expected a string")
+            result[key] = scenario[key]
+
+    if "timestep" not in scenario:
+        raise ScenarioError("timestep: missing")
+    result["timestep"] = _number(scenario["timestep"], "timestep")
+    if result["timestep"] <= 0:
+        raise ScenarioError("timestep: has to be positive")
+    lastFrame = scenario.get("lastFrame")
+    result["lastFrame"] = None if lastFrame is None else _number(lastFrame, "lastFrame", True)
+
+    # Boat, the values of Boat() are filled in except momentumInertia which depends on the dimensions
+    boat = _object(scenario.get("boat", {}), "boat")
+    _checkKeys(boat, BOAT_ARGUMENTS + BOAT_ATTRIBUTES, "boat")
+    defaults = Boat()
+    result["boat"] = {}
+    for name in BOAT_ARGUMENTS + BOAT_ATTRIBUTES:
+        if name in boat:
+            result["boat"][name] = _number(boat[name], f"boat.{name}")
+        elif name != "momentumInertia":
+            result["boat"][name] = float(getattr(defaults, name))
+
+    wind = scenario.get("wind", [])
+    if not isinstance(wind, list):
+        raise ScenarioError("wind: expected a list")
+    result["wind"] = [_typedObject(windfield, WIND_PARAMETERS, f"wind[{i}]") for i, windfield in enumerate(wind)]
+
+    sailor = scenario.get("sailor")
+    if sailor is None:
+        result["sailor"] = None
+    else:
+        sailor = _object(sailor, "sailor")
+        _checkKeys(sailor, ("commands", *SAILOR_PARAMETERS), "sailor")
+        commands = sailor.get("commands", [])
+        if not isinstance(commands, list):
+            raise ScenarioError("sailor.commands: expected a list")
+        result["sailor"] = {"commands": [_typedObject(command, COMMAND_PARAMETERS, f"sailor.commands[{i}]") for i, command in enumerate(commands)]}
+        for name, default in SAILOR_PARAMETERS.items():
+            value = sailor.get(name, default)
+            result["sailor"][name] = None if value is None else _number(value, f"sailor.{name}")
+    return result
+
+
+def scenarioHash(scenario: dict[str, Any]) -> str:
+    """Return the SHA-256 of the canonical scenario. Name and description are not part of the hash."""
+    canonical = validateScenario(scenario)
+    for key in INFO_KEYS:
+        canonical.pop(key, None)
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def parseScenario(text: str, fileFormat: str = "json") -> dict[str, Any]:
+    """Parse and validate a scenario document in the format "json" or "toml"."""
+    if fileFormat == "toml":
+        try:
+            import tomllib  # pylint: disable=import-outside-toplevel
+        except ImportError:  # Python < 3.11
+            tomllib = importOptional("tomli", "toml")
+        try:
+            data = tomllib.loads(text)
+        except tomllib.TOMLDecodeError as error:
+            raise ScenarioError(f"invalid TOML: {error}") from error
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as error:
+            raise ScenarioError(f"invalid JSON: {error}") from error
+    return validateScenario(data)
+
+
+def loadScenario(path: str) -> dict[str, Any]:
+    """Read and validate a scenario file (.json or .toml). Files that didn't change since the last call are not parsed again."""
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        _cache.move_to_end(key)
+        return deepcopy(cached[1])
+
+    with open(path, "r", encoding="utf-8") as file:
+        text = file.read()
+    try:
+        scenario = parseScenario(text, "toml" if path.endswith(".toml") else "json")
+    except ScenarioError as error:
+        raise ScenarioError(f"{path}: {error}") from error
+
+    _cache[key] = (version, scenario)
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return deepcopy(scenario)
+
+
+def createWindfield(description: dict[str, Any]):
+    """Create a windfield from its description."""
+    arguments = dict(description)
+    windType = arguments.pop("type")
+    windClass = getattr(importlib.import_module(WIND_TYPES[windType]), windType)
+    return windClass(**arguments)
+
+
+def createCommand(description: dict[str, Any]):
+    """Create a command for the sailor from its description."""
+    arguments = dict(description)
+    return COMMAND_TYPES[arguments.pop("type")](**arguments)
+
+
+def createBoat(description: dict[str, Any]) -> Boat:
+    """Create a boat, values that are not arguments of Boat() overwrite the boat attributes."""
+    boat = Boat(**{name: value for name, value in description.items() if name in BOAT_ARGUMENTS})
+    for name, value in description.items():
+        if name not in BOAT_ARGUMENTS:
+            setattr(boat, name, value)
+    if "momentumInertia" not in description:
+        # Same formula as in Boat.__init__ with the new dimensions
+        boat.momentumInertia = 1/12 * boat.mass * (pow(boat.length, 2) + pow(boat.width, 2))
+    return boat
+
+
+def createSailor(description: dict[str, Any], boat: Boat) -> Sailor:
+    """Create a sailor for a boat."""
+    sailor = Sailor([createCommand(command) for command in description.get("commands", [])])
+    sailor.importBoat(boat)
+    for name in SAILOR_PARAMETERS:
+        if description.get(name) is not None:
+            setattr(sailor, name, description[name])
+    return sailor
+
+
+def createSimulation(scenario: dict[str, Any]) -> Simulation:
+    """Validate a scenario and create a Simulation from it."""
+    scenario = validateScenario(scenario)
+    boat = createBoat(scenario["boat"])
+    if scenario["sailor"] is not None:
+        boat.sailor = createSailor(scenario["sailor"], boat)
+    wind = Wind([createWindfield(windfield) for windfield in scenario["wind"]])
+    return Simulation(boat, wind, scenario["timestep"], scenario["lastFrame"])
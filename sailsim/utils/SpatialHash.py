@@ -0,0 +1,84 @@
+"""This module contains the SpatialHash class that finds points near each other in about linear time."""
+
+from math import ceil, floor
+from typing import Iterator, Sequence
+
+
+class SpatialHash:
+    """
+    Uniform grid of square cells that holds the indices of points.
+
+    Build it from the positions of all points at once, neighbours are looked up in the cells around a
+    point only. As long as only a few points share a cell, finding all close pairs costs O(N) instead of
+    the O(N²) of comparing every pair.
+    """
+
+    def __init__(self, cellSize: float) -> None:
+        """
+        Create an empty SpatialHash.
+
+        Args:
+            cellSize:   side length of the cells (in m), about the largest distance that is queried
+        """
+        if cellSize <= 0:
+            raise ValueError("cellSize has to be positive")
+        self.cellSize = cellSize
+        self.cells: dict[tuple[int, int], list[int]] = {}
+        self.points: Sequence[tuple[float, float]] = ()
+
+    def build(self, points: Sequence[tuple[float, float]]) -> None:
+        """Replace all points, their indices in points are stored."""
+        self.points = points
+        cells: dict[tuple[int, int], list[int]] = {}
+        size = self.cellSize
+        for (index, (x, y)) in enumerate(points):
+            key = (floor(x / size), floor(y / size))
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [index]
+            else:
+                cell.append(index)
+        self.cells = cells
+
+    def query(self, x: float, y: float, radius: float) -> list[int]:
+        """Return the indices of all points less than radius away from (x, y)."""
+        size = self.cellSize
+        radiusSq = radius * radius
+        points = self.points
+        found = []
+        for cellX in range(floor((x - radius) / size), floor((x + radius) / size) + 1):
+            for cellY in range(floor((y - radius) / size), floor((y + radius) / size) + 1):
+                for index in self.cells.get((cellX, cellY), ()):
+                    (pointX, pointY) = points[index]
+                    if (pointX - x)**2 + (pointY - y)**2 < radiusSq:
+                        found.append(index)
+        return found
+
+    def pairs(self, radius: float) -> Iterator[tuple[int, int, float, float, float]]:
+        """Yield every pair of points less than radius apart once as (i, j, dx, dy, distanceSq) with dx, dy from i to j."""
+        reach = ceil(radius / self.cellSize)
+        # Half of the neighbouring cells, the other half finds the same pairs from the other side
+        offsets = [(offsetX, offsetY) for offsetX in range(-reach, reach + 1) for offsetY in range(-reach, reach + 1)
+                   if (offsetX, offsetY) > (0, 0)]
+        radiusSq = radius * radius
+        points = self.points
+        cells = self.cells
+        for ((cellX, cellY), cell) in cells.items():
+            for (position, i) in enumerate(cell):
+                (x, y) = points[i]
+                for j in cell[position + 1:]:
+                    dx = points[j][0] - x
+                    dy = points[j][1] - y
+                    distanceSq = dx * dx + dy * dy
+                    if distanceSq < radiusSq:
+                        yield (i, j, dx, dy, distanceSq)
+                for (offsetX, offsetY) in offsets:
+                    for j in cells.get((cellX + offsetX, cellY + offsetY), ()):
+                        dx = points[j][0] - x
+                        dy = points[j][1] - y
+                        distanceSq = dx * dx + dy * dy
+                        if distanceSq < radiusSq:
+                            yield (i, j, dx, dy, distanceSq)
+
+    def __len__(self) -> int:
+        return len(self.points)
@@ -6,7 +6,9 @@ The argument is measured clockwise between the positive y-axis and the vector li
 found on a compass. So this definition differs from the standard definition of angles in mathematics.
 """
 
-from math import sin, cos, atan, pi, sqrt
+from math import sin, cos, atan2, pi, sqrt
+
+TAU = 2 * pi
 
 
 def cartToRadius(cartX: float, cartY: float) -> float:
@@ -21,17 +23,11 @@ def cartToRadiusSq(cartX: float, cartY: float) -> float:
 
 def cartToArg(cartX: float, cartY: float) -> float:
     """Convert Cartesian coordinates into their corresponding argument (angle)."""
-    if cartY != 0:
-        if cartY < 0:               # 2nd and 3rd quadrant
-            return atan(cartX / cartY) + pi
-        if cartX < 0:               # 4st quadrant
-            return atan(cartX / cartY) + 2 * pi
-        return atan(cartX / cartY)  # else 1th quadrant
-    if cartX > 0:
-        return pi / 2               # 90 degrees
-    if cartX == 0:
-        return 0                    # 0 degrees when speed is 0
-    return 3 / 2 * pi               # 270 degrees
+    # atan2 with swapped arguments measures clockwise from the y-axis, adding 0.0 turns -0.0 into 0.0
+    # so (0, 0) and (0, -0) both map to 0 and negative results are moved into [0; 2*pi). Tiny negative
+    # results round to 2*pi, they belong to 0
+    argument = atan2(cartX, cartY + 0.0) % TAU
+    return argument if argument < TAU else 0.0
 
 
 def cartToPolar(cartX: float, cartY: float) -> tuple[float, float]:
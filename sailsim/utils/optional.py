@@ -0,0 +1,18 @@
+"""This module helps to import dependencies that are only installed with one of the extras of sailsim."""
+
+import importlib
+from types import ModuleType
+
+
+def importOptional(module: str, extra: str) -> ModuleType:
+    """
+    Import a module of an optional dependency.
+
+    Args:
+        module: name of the module
+        extra:  name of the sailsim extra that installs it, used in the error message
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError as error:
+        raise ImportError(f"{module} is required for this feature, install it with: pip install sailsim[{extra}]") from error
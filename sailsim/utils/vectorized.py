@@ -0,0 +1,51 @@
+"""
+This module contains NumPy versions of the functions in coordconversion and anglecalculations.
+
+All functions accept arrays (or anything NumPy can convert) and follow the same conventions as their
+scalar counterparts: arguments are measured clockwise from the positive y-axis and lie in [0; 2*pi).
+"""
+
+import numpy as np
+
+TAU = 2 * np.pi
+
+
+def cartToRadius(cartX, cartY) -> np.ndarray:
+    """Convert Cartesian coordinates into their corresponding radius."""
+    return np.hypot(cartX, cartY)
+
+
+def cartToRadiusSq(cartX, cartY) -> np.ndarray:
+    """Convert Cartesian coordinates into their corresponding radius squared."""
+    cartX = np.asarray(cartX, dtype=float)
+    cartY = np.asarray(cartY, dtype=float)
+    return cartX * cartX + cartY * cartY
+
+
+def cartToArg(cartX, cartY) -> np.ndarray:
+    """Convert Cartesian coordinates into their corresponding argument (angle)."""
+    # Adding 0.0 turns -0.0 into 0.0, so (0, -0) maps to 0 like in the scalar version. Tiny negative
+    # angles round to 2*pi, they belong to 0
+    argument = np.mod(np.arctan2(cartX, np.add(cartY, 0.0)), TAU)
+    return np.where(argument < TAU, argument, 0.0)
+
+
+def cartToPolar(cartX, cartY) -> tuple[np.ndarray, np.ndarray]:
+    """Convert Cartesian coordinates into polar coordinates."""
+    return (cartToRadius(cartX, cartY), cartToArg(cartX, cartY))
+
+
+def polarToCart(radius, argument) -> tuple[np.ndarray, np.ndarray]:
+    """Convert polar coordinates into Cartesian coordinates."""
+    return (np.multiply(radius, np.sin(argument)), np.multiply(radius, np.cos(argument)))
+
+
+def angleKeepInterval(angle) -> np.ndarray:
+    """Keep angle inside the range of (-pi; pi]. Like the scalar version angles are only shifted once."""
+    angle = np.asarray(angle, dtype=float)
+    return np.where(angle > np.pi, angle - TAU, np.where(angle <= -np.pi, angle + TAU, angle))
+
+
+def directionKeepInterval(direction) -> np.ndarray:
+    """Keep direction inside the range of [0; 2*pi)."""
+    return np.mod(direction, TAU)
@@ -1,5 +1,4 @@
-from opensimplex import OpenSimplex # Noise function
-
+from sailsim.utils.optional import importOptional
 from sailsim.wind.Windfield import Windfield
 
 
@@ -26,6 +25,7 @@ class Fluctuationfield(Windfield):
         self.setSpeed(speed)
 
         self.noiseSeed = noiseSeed
+        OpenSimplex = importOptional("opensimplex", "noise").OpenSimplex  # Noise function
         self.noiseX = OpenSimplex(noiseSeed)
         self.noiseY = OpenSimplex(noiseSeed + 1)
 
@@ -35,6 +35,17 @@ class Fluctuationfield(Windfield):
         windY = self.noiseY.noise3(x * self.scale, y * self.scale, t * self.speed) * self.amplitude + self.speedY
         return (windX, windY)
 
+    def getWindCartGrid(self, xs, ys, t=0):
+        """Return cartesian components of the windfield on a grid as two arrays of shape (len(ys), len(xs))."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        x = np.asarray(xs, dtype=float) * self.scale
+        y = np.asarray(ys, dtype=float) * self.scale
+        z = np.array([t * self.speed])
+        # noise3array returns the noise with the shape (len(z), len(y), len(x))
+        windX = self.noiseX.noise3array(x, y, z)[0] * self.amplitude + self.speedX
+        windY = self.noiseY.noise3array(x, y, z)[0] * self.amplitude + self.speedY
+        return (windX, windY)
+
     def setScale(self, scale):
         self.scale = 1 / scale
 
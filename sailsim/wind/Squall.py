@@ -28,6 +28,14 @@ class Squall(Windfield):
                 return windWeight
         return 0
 
+    def calcWindWeightGrid(self, x, y):
+        """Return the factors of calcWindWeight for arrays of positions."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        (x, y) = self.rotatePosition(x, y)
+        windWeight = self.windSquallFunction(x, y)
+        inside = (-1 < x) & (x < 2) & (np.abs(y) < .5) & (windWeight > 0)
+        return np.where(inside, windWeight, 0.0)
+
     @staticmethod
     def windSquallFunction(x, y):
         """Return weight of the squall at position x, y."""
@@ -1,6 +1,6 @@
 from random import getrandbits
-from opensimplex import OpenSimplex # Noise function
 
+from sailsim.utils.optional import importOptional
 from sailsim.wind.Windfield import Windfield
 from sailsim.wind.Squall import Squall
 
@@ -30,6 +30,7 @@ class Squallfield(Windfield):
 
         # Noise object creation
         self.noiseSeed = noiseSeed
+        OpenSimplex = importOptional("opensimplex", "noise").OpenSimplex  # Noise function
         self.noiseX = OpenSimplex(noiseSeed)
         self.noiseY = OpenSimplex(noiseSeed + 1)
 
@@ -52,6 +53,22 @@ class Squallfield(Windfield):
 
         return (sumX, sumY)
 
+    def getWindCartGrid(self, xs, ys, t=0):
+        """Return cartesian components of the windfield on a grid as two arrays of shape (len(ys), len(xs))."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        (x, y) = np.meshgrid(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        (x, y) = self.transformPositionTime(x, y, t)
+        closestX = np.round(x / self.gridDistance)
+        closestY = np.round(y / self.gridDistance)
+
+        weights = np.zeros(x.shape)
+        maxsize = self.squall.maxsize
+        for offsetX in range(-maxsize, maxsize + 1):
+            for offsetY in range(-maxsize, maxsize + 1):
+                (relX, relY) = self.relativePosSquall(x, y, closestX + offsetX, closestY + offsetY)
+                weights += self.squall.calcWindWeightGrid(relX, relY)
+        return (self.squall.speedX * weights, self.squall.speedY * weights)
+
     def closestPointIndex(self, x, y):
         """Return the index of the closest points around the position x,y."""
         indexX = round(x / self.gridDistance)
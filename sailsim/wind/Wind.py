@@ -1,15 +1,21 @@
-from typing import Union
+from typing import TYPE_CHECKING, Union
+
 from sailsim.utils.coordconversion import cartToPolar
 
 from sailsim.wind.Windfield import Windfield
-from sailsim.wind.Fluctuationfield import Fluctuationfield
-from sailsim.wind.Squallfield import Squallfield
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    # Not imported at runtime, they load the noise library
+    from sailsim.wind.Fluctuationfield import Fluctuationfield
+    from sailsim.wind.Squallfield import Squallfield
 
 
 class Wind:
     """This class holds all windfields and calculates speed and direction of wind."""
 
-    def __init__(self, winds: list[Union[Windfield, Fluctuationfield, Squallfield]]) -> None:
+    def __init__(self, winds: list[Union[Windfield, "Fluctuationfield", "Squallfield"]]) -> None:
         self.winds = winds
 
     def getWindCart(self, x: float, y: float, t: float) -> tuple[float, float]:
@@ -22,6 +28,17 @@ class Wind:
             sumY += windY
         return (sumX, sumY)
 
+    def getWindCartGrid(self, xs, ys, t: float) -> tuple["np.ndarray", "np.ndarray"]:
+        """Sum up the windfields on a grid, return two arrays of shape (len(ys), len(xs)) with the x and y components."""
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        sumX = np.zeros((len(ys), len(xs)))
+        sumY = np.zeros((len(ys), len(xs)))
+        for wind in self.winds:
+            (windX, windY) = wind.getWindCartGrid(xs, ys, t)
+            sumX += windX
+            sumY += windY
+        return (sumX, sumY)
+
     def getWind(self, x: float, y: float, t: float) -> tuple[float, float]:
         """Return direction and speed of the windfield at the position (x,y) as a tuple."""
         (cartX, cartY) = self.getWindCart(x, y, t)
@@ -30,8 +47,8 @@ class Wind:
     def __repr__(self) -> str:
         # TODO make nicer
         windfields: int = sum(isinstance(x, Windfield) for x in self.winds)
-        fluctuationfields: int = sum(type(x) is Fluctuationfield for x in self.winds)
-        squallfields: int = sum(type(x) is Squallfield for x in self.winds)
+        fluctuationfields: int = sum(type(x).__name__ == "Fluctuationfield" for x in self.winds)
+        squallfields: int = sum(type(x).__name__ == "Squallfield" for x in self.winds)
         return f"Wind made up of {len(self.winds)} winds:\n\t{windfields} Windfields\n\t{fluctuationfields} Fluctuationfields\n\t{squallfields} Squallfields"
 
     def __len__(self) -> int:
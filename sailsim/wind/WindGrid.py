@@ -0,0 +1,57 @@
+"""This module contains a windfield that interpolates wind sampled on a regular grid."""
+
+import numpy as np
+
+from sailsim.simulation import kernel
+from sailsim.wind.Windfield import Windfield
+
+
+class WindGrid(Windfield):
+    """Wind sampled on a grid in space and time. Values between grid points are interpolated linearly."""
+
+    def __init__(self, data, originX: float = 0, originY: float = 0, cellSize: float = 1, startTime: float = 0, timeStep: float = 1) -> None:
+        """
+        Create a WindGrid.
+
+        Args:
+            data:       array of shape (times, rows, columns, 2) holding the x and y component of the wind
+            originX:    x coordinate of column 0 (in m)
+            originY:    y coordinate of row 0 (in m)
+            cellSize:   distance between grid points (in m)
+            startTime:  time of the first sample (in s)
+            timeStep:   time between samples (in s)
+        Outside of the grid the values at the border are used.
+        """
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        if data.ndim != 4 or data.shape[3] != 2:
+            raise ValueError("data has to be of shape (times, rows, columns, 2)")
+        (meanX, meanY) = data.reshape(-1, 2).mean(axis=0)
+        super().__init__(float(meanX), float(meanY))
+        self.name = "WindGrid"
+
+        self.data = data
+        # Grid description in the form used by sailsim.simulation.kernel
+        self.info = np.array([originX, originY, cellSize, startTime, timeStep], dtype=np.float64)
+
+    @classmethod
+    def constant(cls, x: float, y: float) -> "WindGrid":
+        """Create a WindGrid with the same wind everywhere."""
+        return cls(np.array([[[[x, y]]]], dtype=np.float64))
+
+    @classmethod
+    def sample(cls, wind, originX: float, originY: float, columns: int, rows: int, cellSize: float,
+               startTime: float = 0, times: int = 1, timeStep: float = 1) -> "WindGrid":
+        """Sample any windfield (or Wind) on a grid."""
+        data = np.empty((times, rows, columns, 2), dtype=np.float64)
+        for it in range(times):
+            t = startTime + it * timeStep
+            for iy in range(rows):
+                y = originY + iy * cellSize
+                for ix in range(columns):
+                    data[it, iy, ix] = wind.getWindCart(originX + ix * cellSize, y, t)
+        return cls(data, originX, originY, cellSize, startTime, timeStep)
+
+    def getWindCart(self, x: float = 0, y: float = 0, t: float = 0) -> tuple[float, float]:
+        """Return cartesian components of the windfield at the position (x, y) as a tuple."""
+        (windX, windY) = kernel.sampleWind(self.data, self.info, x, y, t)
+        return (float(windX), float(windY))
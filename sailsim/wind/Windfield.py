@@ -1,7 +1,11 @@
 from math import pi
+from typing import TYPE_CHECKING
 
 from sailsim.utils.coordconversion import cartToPolar
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class Windfield:
     """Describe a partion of the wind."""
@@ -14,6 +18,23 @@ class Windfield:
         """Return cartesian components of the windfield at the position (x, y) as a tuple."""
         return (self.speedX, self.speedY)
 
+    def getWindCartGrid(self, xs, ys, t: float = 0) -> tuple["np.ndarray", "np.ndarray"]:
+        """
+        Return cartesian components of the windfield on a grid as two arrays of shape (len(ys), len(xs)).
+
+        Windfields that can sample many positions at once override this, others are sampled point by point.
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        shape = (len(ys), len(xs))
+        if type(self).getWindCart is Windfield.getWindCart:
+            return (np.full(shape, float(self.speedX)), np.full(shape, float(self.speedY)))
+        windX = np.empty(shape)
+        windY = np.empty(shape)
+        for (iy, y) in enumerate(ys):
+            for (ix, x) in enumerate(xs):
+                (windX[iy, ix], windY[iy, ix]) = self.getWindCart(x, y, t)
+        return (windX, windY)
+
     def getWind(self, _x: float = 0, _y: float = 0, _t: float = 0) -> tuple[float, float]:
         """Return direction and speed of the windfield at the position (x, y) as a tuple."""
         (cartX, cartY) = self.getWindCart()
@@ -7,6 +7,7 @@ from sailsim.gui.SailsimGUI import SailsimGUI
 
 # Import basic modules
 from sailsim.simulation.Simulation import Simulation
+from sailsim.simulation.StopConditions import Watchdog
 from sailsim.boat.Boat import Boat
 from sailsim.sailor.Sailor import Sailor
 from sailsim.sailor.Commands import commandListExample, Waypoint
@@ -26,18 +27,13 @@ sailor.importBoat(b)
 
 # Create simulation
 s = Simulation(b, wind, 0.01, 10000)
-
-# Run simulation
-try:
-    s.run()
-except (OverflowError, ValueError):
-    s.lastFrame = s.frame - 1
-    print("Overflow after Frame", s.frame)
+s.addStopCondition(Watchdog())
 
 #OUTPUT_PATH = "..\\..\\MATLAB\\sailsim\\out.csv"
 #s.boat.frameList.saveCSV(OUTPUT_PATH)
 
 app = QApplication(sys.argv)
+# The GUI runs the simulation in the background and shows the frames as they arrive
 window = SailsimGUI(s)
 window.show()
 sys.exit(app.exec())
@@ -1,34 +1,314 @@
-# Import basic modules
-from sailsim.simulation.Simulation import Simulation
+"""
+Benchmark suite of sailsim.
+
+Every benchmark measures one operation many times. The results can be saved as a baseline per
+machine and later runs are compared against it. A benchmark counts as regression if it is slower
+than the baseline by more than THRESHOLD and a Mann-Whitney U test says the difference is
+significant.
+
+Usage:
+    python -m tests.benchmark                   run all benchmarks and compare them with the baseline
+    python -m tests.benchmark --save            run all benchmarks and save them as new baseline
+    python -m tests.benchmark step wind         only run benchmarks whose names contain "step" or "wind"
+    python -m tests.benchmark --profile step.windfield
+                                                profile one benchmark with cProfile into out.prof
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from math import erf, sqrt
+from statistics import median
+from time import perf_counter
+from typing import Callable, Optional
+
+from sailsim.simulation.Simulation import Simulation, BACKEND_KERNEL, BACKEND_PYTHON
 from sailsim.boat.Boat import Boat
 from sailsim.sailor.Sailor import Sailor
 from sailsim.sailor.Commands import commandListExample
-
-# Import Winds
+from sailsim.wind.Wind import Wind
 from sailsim.wind.Windfield import Windfield
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+from sailsim.wind.Squallfield import Squallfield
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".benchmarks")
+THRESHOLD = 0.05    # relative slowdown that is tolerated
+ALPHA = 0.01        # significance level of the regression test
+
+# Modules a headless simulation with constant wind uses and the time (in s) importing them may take
+CORE_IMPORT = "import sailsim.simulation.Simulation, sailsim.boat.Boat, sailsim.sailor.Sailor, sailsim.wind.Wind"
+IMPORT_BUDGET = 0.1
+# Dependencies that must not be loaded by CORE_IMPORT
+HEAVY_MODULES = ("numpy", "numba", "opensimplex", "PySide6")
+
+# Benchmark name -> (function that prepares and returns the operation, calls per sample)
+BENCHMARKS: dict[str, tuple[Callable[[], Callable[[], object]], int]] = {}
+# Benchmarks whose operation measures itself and returns its time (in s)
+SELF_TIMED: set[str] = set()
+
+
+def benchmark(name: str, number: int = 1, selfTimed: bool = False) -> Callable:
+    """
+    Register a function that prepares a benchmark and returns the operation to be measured.
+
+    Args:
+        name:       name of the benchmark
+        number:     calls of the operation per sample
+        selfTimed:  the operation returns the time it measured, e.g. in a subprocess, instead of being timed
+    """
+    def register(setup: Callable[[], Callable[[], object]]) -> Callable[[], Callable[[], object]]:
+        BENCHMARKS[name] = (setup, number)
+        if selfTimed:
+            SELF_TIMED.add(name)
+        return setup
+    return register
+
+
+def createSimulation(wind, record: bool = True, backend: str = BACKEND_PYTHON) -> Simulation:
+    """Create the reference scenario: the example course sailed in the given wind."""
+    boat = Boat(0, 0, 0)
+    boat.sailor = Sailor(commandListExample)
+    boat.sailor.importBoat(boat)
+    return Simulation(boat, wind, 0.01, record=record, backend=backend)
+
+
+def stepBenchmark(wind, record: bool = True) -> Callable[[], object]:
+    simulation = createSimulation(wind, record)
+    simulation.run(10)
+    return simulation.step
+
+
+@benchmark("step.windfield", 1000)
+def benchStepWindfield():
+    return stepBenchmark(Windfield(2, 2))
+
+
+@benchmark("step.fluctuationfield", 1000)
+def benchStepFluctuationfield():
+    return stepBenchmark(Fluctuationfield(2, 2, 1))
+
+
+@benchmark("step.squallfield", 1000)
+def benchStepSquallfield():
+    return stepBenchmark(Squallfield(2, 2, 30))
+
+
+@benchmark("step.wind", 1000)
+def benchStepWind():
+    return stepBenchmark(Wind([Windfield(2, 2), Fluctuationfield(0, 0, 1), Squallfield(0, 0, 30)]))
+
+
+@benchmark("step.norecord", 1000)
+def benchStepNoRecord():
+    return stepBenchmark(Windfield(2, 2), record=False)
+
+
+@benchmark("run.kernel", 10)
+def benchRunKernel():
+    simulation = createSimulation(Windfield(2, 2), record=False, backend=BACKEND_KERNEL)
+    def run():
+        simulation.reset()
+        simulation.run(1000)
+    return run
+
+
+@benchmark("frameList.csv", 1)
+def benchCSV():
+    simulation = createSimulation(Windfield(2, 2))
+    simulation.run(1000)
+    return simulation.boat.frameList.getCSV
+
+
+@benchmark("simulation.reset", 10)
+def benchReset():
+    simulation = createSimulation(Windfield(2, 2))
+    simulation.run(1000)
+    return simulation.reset
+
+
+@benchmark("gui.pointsToPath", 10)
+def benchPointsToPath():
+    from sailsim.gui.qgraphicsitems import pointsToPath  # pylint: disable=import-outside-toplevel
+    simulation = createSimulation(Windfield(2, 2))
+    simulation.run(1000)
+    points = simulation.boat.frameList.getCoordinateList()
+    return lambda: pointsToPath(points)
+
+
+@benchmark("gui.pathLevels", 10)
+def benchPathLevels():
+    from sailsim.gui.PathLevels import PathLevels  # pylint: disable=import-outside-toplevel
+    simulation = createSimulation(Windfield(2, 2))
+    simulation.run(1000)
+    points = simulation.boat.frameList.getCoordinateList()
+    return lambda: PathLevels().extend(points)
+
+
+@benchmark("gui.frameRenderData", 10)
+def benchFrameRenderData():
+    from sailsim.gui.FrameRenderData import FrameRenderData  # pylint: disable=import-outside-toplevel
+    simulation = createSimulation(Windfield(2, 2))
+    simulation.run(1000)
+    return lambda: FrameRenderData(simulation.boat.frameList).extend()
+
+
+@benchmark("gui.seriesPyramid", 10)
+def benchSeriesPyramid():
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from sailsim.gui.SeriesPyramid import SeriesPyramid  # pylint: disable=import-outside-toplevel
+    pyramid = SeriesPyramid()
+    pyramid.extend(np.random.default_rng(0).normal(size=1000000).cumsum())
+    return lambda: [pyramid.envelope(start, start + 500000, 1000) for start in range(0, 500000, 50000)]
+
+
+def importTime(statement: str = CORE_IMPORT) -> float:
+    """Return the time (in s) a fresh interpreter needs for the imports of statement, measured with -X importtime."""
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True)
+    total = 0
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package, top level imports are not indented
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit() and not parts[2].startswith("  ") and parts[2].strip().startswith("sailsim"):
+            total += int(parts[1])
+    return total / 1e6
+
+
+@benchmark("import.core", 1, selfTimed=True)
+def benchImport():
+    return importTime
+
+
+def measure(name: str, repeat: int = 20) -> list[float]:
+    """Run a benchmark and return the time per call (in s) of every sample."""
+    (setup, number) = BENCHMARKS[name]
+    operation = setup()
+    operation()  # warm up
+    samples = []
+    for _ in range(repeat):
+        if name in SELF_TIMED:
+            samples.append(sum(operation() for _ in range(number)) / number)
+            continue
+        start = perf_counter()
+        for _ in range(number):
+            operation()
+        samples.append((perf_counter() - start) / number)
+    return samples
+
+
+def mannWhitneyU(samplesA: list[float], samplesB: list[float]) -> float:
+    """Return the one sided p-value of samplesB being larger than samplesA (normal approximation with tie correction)."""
+    (nA, nB) = (len(samplesA), len(samplesB))
+    values = sorted([(value, 0) for value in samplesA] + [(value, 1) for value in samplesB])
+
+    # Ranks with ties averaged
+    ranks = [0.0] * len(values)
+    tieCorrection = 0
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        ties = j - i + 1
+        tieCorrection += ties**3 - ties
+        i = j + 1
+
+    rankSumB = sum(rank for rank, (_, group) in zip(ranks, values) if group == 1)
+    u = rankSumB - nB * (nB + 1) / 2
+    n = nA + nB
+    variance = nA * nB / 12 * ((n + 1) - tieCorrection / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - nA * nB / 2) / sqrt(variance)
+    return 0.5 * (1 - erf(z / sqrt(2)))
+
+
+def compare(baseline: list[float], samples: list[float]) -> tuple[float, float, bool]:
+    """Return relative change of the median, p-value and whether it is a regression."""
+    change = median(samples) / median(baseline) - 1
+    pValue = mannWhitneyU(baseline, samples)
+    return (change, pValue, change > THRESHOLD and pValue < ALPHA)
+
+
+def machineName() -> str:
+    """Return an identifier of this machine and interpreter."""
+    return f"{platform.node()}-{platform.machine()}-py{platform.python_version()}"
+
+
+def baselinePath(machine: Optional[str] = None) -> str:
+    return os.path.join(BASELINE_DIR, (machine or machineName()) + ".json")
+
+
+def loadBaseline(path: str) -> dict[str, list[float]]:
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)["benchmarks"]
+
+
+def saveBaseline(path: str, results: dict[str, list[float]]) -> None:
+    baseline = loadBaseline(path)
+    baseline.update(results)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"machine": machineName(), "python": sys.version, "benchmarks": baseline}, file, indent=1)
+
 
+def selectBenchmarks(patterns: list[str]) -> list[str]:
+    return [name for name in BENCHMARKS if not patterns or any(pattern in name for pattern in patterns)]
 
-OUTPUT_PATH = "test"
 
-class Benchmark:
-    """Test which module requires what partion of time when simulating."""
+def main(arguments: Optional[list[str]] = None) -> int:
+    """Run the benchmarks. Return 1 if a regression was found."""
+    parser = argparse.ArgumentParser(description="Run the sailsim benchmarks.")
+    parser.add_argument("patterns", nargs="*", help="only run benchmarks containing one of these strings")
+    parser.add_argument("--save", action="store_true", help="save the results as baseline of this machine")
+    parser.add_argument("--baseline", help="baseline file to compare with, default: .benchmarks/<machine>.json")
+    parser.add_argument("--repeat", type=int, default=20, help="number of samples per benchmark")
+    parser.add_argument("--profile", metavar="NAME", help="profile one benchmark with cProfile and save out.prof")
+    args = parser.parse_args(arguments)
 
-    def __init__(self):
-        wind = Windfield(2, 2)
-        boat = Boat(0, 0, 0)
-        sailor = Sailor(commandListExample)
-        boat.sailor = sailor
-        sailor.importBoat(boat)
+    if args.profile:
+        import cProfile  # pylint: disable=import-outside-toplevel
+        cProfile.runctx("measure(name, repeat)", globals(), {"name": args.profile, "repeat": args.repeat}, "out.prof", sort="cumtime")
+        return 0
 
-        self.simulation = Simulation(boat, wind, 0.01, 1000)
+    path = args.baseline or baselinePath()
+    baseline = loadBaseline(path)
+    results = {}
+    regressions = []
+    for name in selectBenchmarks(args.patterns):
+        try:
+            samples = measure(name, args.repeat)
+        except ImportError as error:
+            print(f"{name:24} skipped ({error})")
+            continue
+        results[name] = samples
+        line = f"{name:24} {median(samples) * 1e6:12.2f}us"
+        if name in baseline:
+            (change, pValue, regression) = compare(baseline[name], samples)
+            line += f" {change:+8.1%} (p={pValue:.3f})"
+            if regression:
+                line += " REGRESSION"
+                regressions.append(name)
+        print(line)
 
+    if "import.core" in results:
+        coreImport = median(results["import.core"])
+        if coreImport > IMPORT_BUDGET:
+            print(f"Importing the core modules takes {coreImport * 1e3:.1f}ms, the budget is {IMPORT_BUDGET * 1e3:.0f}ms")
+            regressions.append("import.core")
 
-    def run(self, number=10000):
-        self.simulation.run(number)
-        # self.simulation.frameList.saveCSV(OUTPUT_PATH)
+    if args.save:
+        saveBaseline(path, results)
+        print("Saved baseline", path)
+    return 1 if regressions else 0
 
 
 if __name__ == "__main__":
-    import cProfile
-    b = Benchmark()
-    cProfile.run("b.run()", 'out.prof', sort="cumtime")
+    sys.exit(main())
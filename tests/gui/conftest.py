@@ -0,0 +1,20 @@
+"""Fixtures of the GUI tests."""
+
+import os
+from importlib.util import find_spec
+
+import pytest
+
+# Test modules that import Qt, they are not collected without PySide6
+QT_TESTS = ["test_BatchRenderer.py", "test_FrameRenderData.py", "test_PlotPanel.py", "test_SailsimGUI.py",
+            "test_SimulationWorker.py", "test_WindOverlay.py", "test_qgraphicsitems.py", "test_valueInspector.py"]
+if find_spec("PySide6") is None:
+    collect_ignore = QT_TESTS
+
+
+@pytest.fixture(name="app", scope="session")
+def fixtureApp():
+    """Return the QApplication. It is created once, because it has to outlive all widgets of all tests."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication  # pylint: disable=import-outside-toplevel
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,75 @@
+"""Test module sailsim.gui.BatchRenderer."""
+
+import json
+import os
+
+import pytest
+from PySide6 import QtGui
+
+from sailsim.gui import BatchRenderer
+from sailsim.gui.BatchRenderer import FRAME_PATTERN, FrameRenderer, main, renderRange, renderRun, splitRange
+from sailsim.main import OUTPUT_BINARY, runScenario
+from sailsim.simulation.scenario import createSimulation
+
+pytestmark = pytest.mark.usefixtures("app")
+
+SCENARIO = os.path.join(os.path.dirname(__file__), "..", "scenarios", "constant.json")
+
+
+def loadScenario():
+    with open(SCENARIO, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def test_splitRange():
+    assert splitRange(0, 99, 1, 4) == [(0, 25), (25, 50), (50, 75), (75, 100)]
+    assert splitRange(10, 100, 10, 3) == [(10, 40), (40, 70), (70, 101)]
+    # Every range starts on a step and all steps are covered once
+    for (first, last, step, parts) in ((3, 1000, 7, 5), (0, 5, 4, 8), (0, 0, 1, 2)):
+        ranges = splitRange(first, last, step, parts)
+        frames = [frame for (start, stop) in ranges for frame in range(start, stop, step) if (frame - first) % step == 0]
+        assert frames == list(range(first, last + 1, step))
+        assert all((start - first) % step == 0 for (start, _) in ranges)
+
+
+def test_frameRenderer():
+    simulation = createSimulation(loadScenario())
+    renderer = FrameRenderer(simulation.boat, size=(320, 180))
+    simulation.run(300)
+    first = renderer.render(0)
+    assert (first.width(), first.height()) == (320, 180)
+    last = renderer.render(299)
+    assert renderer.mapScene.path.pathEnd == 300
+    assert first != last
+    renderer.close()
+
+
+def test_renderRange(tmp_path):
+    (tmp_path / "frames").mkdir()
+    runScenario(SCENARIO, str(tmp_path), (OUTPUT_BINARY,), lastFrame=199, stopEarly=False)
+    framesPath = str(tmp_path / "constant.npy")
+    output = str(tmp_path / "frames")
+    # Two workers, numbered as one sequence
+    assert renderRange(loadScenario(), framesPath, 20, 100, 10, 20, output, (160, 90)) == 8
+    assert renderRange(loadScenario(), framesPath, 100, 200, 10, 20, output, (160, 90)) == 10
+    assert sorted(os.listdir(output)) == [FRAME_PATTERN.format(index) for index in range(18)]
+    assert QtGui.QImage(os.path.join(output, FRAME_PATTERN.format(17))).size().toTuple() == (160, 90)
+
+
+def test_renderRun(tmp_path, monkeypatch):
+    monkeypatch.setattr(BatchRenderer.shutil, "which", lambda _name: None)
+    summary = renderRun(loadScenario(), str(tmp_path), last=99, step=5, size=(160, 90), video=str(tmp_path / "run.mp4"))
+    assert summary["images"] == 20
+    assert summary["video"] is None
+    assert len(os.listdir(tmp_path)) == 20
+
+    with pytest.raises(ValueError):
+        renderRun(loadScenario(), str(tmp_path), first=50, last=10)
+
+
+def test_parallel(tmp_path):
+    runScenario(SCENARIO, str(tmp_path), (OUTPUT_BINARY,), lastFrame=59, stopEarly=False)
+    assert main([SCENARIO, "-o", str(tmp_path / "out"), "--frames", str(tmp_path / "constant.npy"), "--step", "2", "-j", "2", "--size", "64x48"]) == 0
+    assert len(os.listdir(tmp_path / "out")) == 30
+    with pytest.raises(SystemExit):
+        main([SCENARIO, "--size", "big"])
@@ -0,0 +1,94 @@
+"""Test module sailsim.gui.FrameRenderData."""
+
+from math import cos, degrees, sin
+
+import pytest
+from PySide6.QtCore import QLineF
+
+from sailsim.boat.Boat import Boat
+from sailsim.gui.FrameRenderData import ARROW_COLUMNS, ARROWS, ARROWS_COLUMN, BOUNDS_COLUMN, COLUMN_COUNT, FORCE_SCALE, POSE_COLUMNS, FrameRenderData
+from sailsim.gui.boatInspector import BoatInspectorScene
+from sailsim.gui.mapView import MapViewScene
+from sailsim.gui.qgraphicsitems import QGraphicsArrowItem
+from sailsim.sailor.Commands import Waypoint
+from sailsim.sailor.Sailor import Sailor
+from sailsim.simulation.Simulation import Simulation
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+pytestmark = pytest.mark.usefixtures("app")
+
+
+def createSimulation():
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 20, 1)])
+    boat.sailor.importBoat(boat)
+    return Simulation(boat, Wind([Windfield(3, 1)]), 0.01, 599)
+
+
+def test_rows():
+    simulation = createSimulation()
+    simulation.run()
+    renderData = FrameRenderData(simulation.boat.frameList)
+    row = renderData.row(400)
+    assert len(renderData) == 600
+    assert len(row) == COLUMN_COUNT
+
+    frame = simulation.boat.frameList[400]
+    assert row[:POSE_COLUMNS] == pytest.approx([
+        frame.boatPosX, -frame.boatPosY, degrees(frame.boatDirection),
+        -sin(frame.boatMainSailAngle) * 2, cos(frame.boatMainSailAngle) * 2,
+        sin(frame.boatRudderAngle) * 0.5, 2.2 + cos(frame.boatRudderAngle) * 0.5,
+    ])
+    # Rudder forces start at the rudder, their heads match the ones a QGraphicsArrowItem computes
+    first = ARROWS_COLUMN + [name for (name, *_) in ARROWS].index("boatForceRudderLift") * ARROW_COLUMNS
+    (x1, y1) = (-sin(frame.boatDirection) * 2.2, cos(frame.boatDirection) * 2.2)
+    (x2, y2) = (x1 + frame.boatRudderLiftX * FORCE_SCALE, y1 - frame.boatRudderLiftY * FORCE_SCALE)
+    assert row[first:first + 4] == pytest.approx([x1, y1, x2, y2])
+    assert row[first + 4:first + 8] == pytest.approx(QGraphicsArrowItem(QLineF(x1, y1, x2, y2)).headDirections)
+    assert row[BOUNDS_COLUMN] <= min(x1, x2) and row[BOUNDS_COLUMN + 3] >= max(y1, y2)
+
+
+def test_incremental():
+    simulation = createSimulation()
+    renderData = FrameRenderData(simulation.boat.frameList)
+    simulation.run(100)
+    renderData.extend()
+    simulation.run()
+    assert renderData.row(599) == FrameRenderData(simulation.boat.frameList).row(599)
+    assert len(renderData) == 600
+
+    # Fewer frames rebuild all rows
+    frameList = simulation.boat.frameList
+    values = frameList.getValues()
+    frameList.reset()
+    frameList.appendValues(values[100:150])
+    renderData.extend(len(frameList))
+    assert len(renderData) == 50
+    assert renderData.row(49) == FrameRenderData(frameList).row(49)
+    with pytest.raises(IndexError):
+        renderData.row(50)
+
+
+def test_items():
+    simulation = createSimulation()
+    simulation.run()
+    boat = simulation.boat
+    mapScene = MapViewScene(boat)
+    inspectorScene = BoatInspectorScene(boat, renderData=mapScene.renderData)
+    assert inspectorScene.boat.renderData is mapScene.boatVectors.renderData
+
+    mapScene.viewFrame(300)
+    frame = boat.frameList[300]
+    assert mapScene.boat.pos().x() == pytest.approx(frame.boatPosX)
+    assert mapScene.boat.rotation() == pytest.approx(degrees(frame.boatDirection))
+    sail = QLineF(mapScene.boat.mainSail)
+    mapScene.boatVectors.updateArrows()
+    assert mapScene.boatVectors.boatSpeed.line().p2().y() == pytest.approx(-frame.boatSpeedY)
+    for arrow in mapScene.boatVectors.arrows:
+        assert mapScene.boatVectors.boundingRect().contains(arrow.line().p2())
+
+    # The pose from the frame values without render data is the same
+    mapScene.boat.setState(frame.boatPosX, frame.boatPosY, frame.boatDirection, frame.boatMainSailAngle, frame.boatRudderAngle)
+    assert mapScene.boat.mainSail.p2().x() == pytest.approx(sail.p2().x())
+    assert mapScene.boat.mainSail.p2().y() == pytest.approx(sail.p2().y())
@@ -0,0 +1,81 @@
+"""Test module sailsim.gui.PathLevels."""
+
+from math import cos, sin, sqrt
+
+from sailsim.gui.PathLevels import PathLevels
+
+
+def spiral(count):
+    return [(0.01 * i * cos(i / 100), 0.01 * i * sin(i / 100)) for i in range(count)]
+
+
+def test_levels():
+    points = spiral(20000)
+    levels = PathLevels(chunkSize=256)
+    levels.extend(points)
+    assert len(levels) == 20000
+    assert levels.points(0) == points
+
+    sizes = [len(levels.points(level)) for level in range(len(levels.tolerances))]
+    assert sizes == sorted(sizes, reverse=True)
+    assert sizes[-1] < 100
+
+    # Every point is close to the simplified path
+    for level in (3, 6, 9):
+        kept = levels.points(level)
+        limit = 2 * levels.tolerances[level]
+        for (x, y) in points[::499]:
+            assert min(sqrt((x - keptX)**2 + (y - keptY)**2) for (keptX, keptY) in kept) < limit
+
+
+def test_incremental():
+    points = spiral(5000)
+    levels = PathLevels(chunkSize=100)
+    levels.extend(points)
+    appended = PathLevels(chunkSize=100)
+    for start in range(0, 5000, 333):
+        appended.extend(points[start:start + 333])
+    assert appended.chunks == levels.chunks
+    assert appended.bounds == levels.bounds
+
+
+def test_chunks():
+    levels = PathLevels(chunkSize=10)
+    levels.extend((x, 0) for x in range(25))
+    chunks = levels.chunks[0]
+    assert [len(chunk) // 2 for chunk in chunks] == [10, 10, 7]
+    assert chunks[1][0] == chunks[0][-2]  # Shared boundary point
+    assert levels.bounds[0][1] == [9, 0, 18, 0]
+    assert list(levels.visibleChunks(0, (12.5, -1, 14, 1))) == [1]
+    assert list(levels.visibleChunks(0, (18, -1, 100, 1))) == [1, 2]
+    assert levels.boundingBox() == (0, 0, 24, 0)
+
+
+def test_levelFor():
+    levels = PathLevels(baseTolerance=0.01)
+    assert levels.levelFor(0.001) == 0
+    assert levels.levelFor(0.04) == 1
+    assert levels.levelFor(0.16) == 3
+    assert levels.levelFor(1e9) == len(levels.tolerances) - 1
+    assert PathLevels().boundingBox() is None
+
+
+def test_extendArrays():
+    points = spiral(20000)
+    levels = PathLevels(chunkSize=256)
+    xs = [x for (x, _) in points]
+    ys = [y for (_, y) in points]
+    levels.extendArrays(xs[:7000], ys[:7000])
+    levels.extendArrays(xs[7000:], ys[7000:])
+    assert len(levels) == 20000
+    assert levels.points(0) == points
+    reference = PathLevels(chunkSize=256)
+    reference.extend(points)
+    assert levels.boundingBox() == reference.boundingBox()
+
+    for level in (3, 6, 9):
+        kept = levels.points(level)
+        assert len(kept) < len(points)
+        limit = 2 * levels.tolerances[level]
+        for (x, y) in points[::499]:
+            assert min(sqrt((x - keptX)**2 + (y - keptY)**2) for (keptX, keptY) in kept) < limit
@@ -0,0 +1,51 @@
+"""Test module sailsim.gui.PlaybackClock."""
+
+from sailsim.gui.PlaybackClock import PlaybackClock
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 100.0
+
+    def __call__(self):
+        return self.time
+
+
+def test_targetFrame():
+    clock = FakeClock()
+    playback = PlaybackClock(0.01, clock=clock)
+    playback.start(10)
+    assert playback.targetFrame(0, 1000) == (10, False)
+
+    # Frames are skipped if the ticks are late
+    clock.time += 0.255
+    assert playback.targetFrame(0, 1000) == (35, False)
+    clock.time += 1
+    assert playback.targetFrame(0, 1000) == (135, False)
+
+
+def test_speed():
+    clock = FakeClock()
+    playback = PlaybackClock(0.01, speed=10, clock=clock)
+    playback.start(0)
+    clock.time += 0.5
+    assert playback.targetFrame(0, 1000) == (500, False)
+
+    # Changing the speed continues from the current frame
+    playback.setSpeed(-2)
+    clock.time += 1
+    assert playback.targetFrame(0, 1000) == (300, False)
+    clock.time += 10
+    assert playback.targetFrame(0, 1000) == (0, True)
+
+
+def test_limit():
+    clock = FakeClock()
+    playback = PlaybackClock(0.01, clock=clock)
+    playback.start(0)
+    clock.time += 5
+    assert playback.targetFrame(0, 200) == (200, True)
+
+    # More frames: playback continues from the limit instead of jumping to the time
+    clock.time += 1
+    assert playback.targetFrame(0, 1000) == (300, False)
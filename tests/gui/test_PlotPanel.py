@@ -0,0 +1,87 @@
+"""Test module sailsim.gui.PlotPanel."""
+
+import pytest
+from PySide6 import QtGui
+
+from sailsim.boat.Boat import Boat
+from sailsim.gui.PlotPanel import PlotPanel
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.simulation.Simulation import Simulation
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+pytestmark = pytest.mark.usefixtures("app")
+
+
+@pytest.fixture(name="simulation")
+def fixtureSimulation():
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 20, 1)])
+    boat.sailor.importBoat(boat)
+    simulation = Simulation(boat, Wind([Windfield(3, 1)]), 0.01, 999)
+    simulation.run(500)
+    return simulation
+
+
+def render(panel):
+    image = QtGui.QImage(panel.size(), QtGui.QImage.Format_RGB32)
+    panel.render(image)
+    return image
+
+
+def test_extend(simulation):
+    frameList = simulation.boat.frameList
+    panel = PlotPanel(frameList, ("boatSpeedY", "boatRudderAngle"))
+    panel.extend(len(frameList))
+    assert list(panel.series["boatSpeedY"].values()) == [frame.boatSpeedY for frame in frameList.frames]
+
+    simulation.run()
+    panel.extend(len(frameList))
+    assert panel.count == 1000
+    assert len(panel.series["boatRudderAngle"]) == 1000
+
+    # New fields are loaded, fewer frames rebuild the series
+    panel.setFields(("boatSpeedY", "boatTorque"))
+    assert len(panel.series["boatTorque"]) == 1000
+    del frameList.frames[300:]
+    panel.extend(300)
+    assert list(panel.series["boatTorque"].values()) == [frame.boatTorque for frame in frameList.frames]
+    with pytest.raises(ValueError):
+        panel.setFields(("time",))
+
+
+def test_view(simulation):
+    panel = PlotPanel(simulation.boat.frameList)
+    panel.extend(len(simulation.boat.frameList))
+    panel.resize(500, 100)
+    assert panel.viewRange() == (0, 499)
+    panel.setView(100, 200)
+    assert panel.viewRange() == (100, 200)
+    assert panel.frameAt(250) == 150
+
+    # The view follows the cursor
+    panel.setFrame(400)
+    assert panel.viewRange() == (350, 450)
+    panel.setView(-50, 20)
+    assert panel.viewRange() == (0, 70)
+    panel.setView(0, 5000)
+    assert panel.view is None
+
+    selected = []
+    panel.frameSelected.connect(selected.append)
+    panel.selectFrame(250)
+    panel.selectFrame(10000)
+    assert selected == [250, 499]
+    render(panel)
+
+
+def test_render(simulation):
+    panel = PlotPanel(simulation.boat.frameList, ("boatPosY",))
+    panel.extend(len(simulation.boat.frameList))
+    panel.resize(200, 100)
+    panel.setFrame(250)
+    image = render(panel)
+    colors = {image.pixelColor(x, y).name() for x in range(200) for y in range(100)}
+    assert "#1f77b4" in colors    # The series
+    assert "#ff0000" in colors    # The cursor
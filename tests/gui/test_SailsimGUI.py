@@ -0,0 +1,98 @@
+"""Test module sailsim.gui.SailsimGUI."""
+
+import pytest
+from PySide6.QtWidgets import QApplication
+
+from sailsim.gui.PlaybackClock import PLAYBACK_SPEEDS
+from sailsim.gui.SailsimGUI import SailsimGUI
+from sailsim.simulation.Simulation import Simulation
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+pytestmark = pytest.mark.usefixtures("app")
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+@pytest.fixture(name="window")
+def fixtureWindow():
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 20, 1)])
+    boat.sailor.importBoat(boat)
+    simulation = Simulation(boat, Wind([Windfield(3, 1)]), 0.01, 999)
+    simulation.run()
+    window = SailsimGUI(simulation)
+    window.playback.clock = FakeClock()
+    yield window
+    window.close()
+    QApplication.processEvents()
+
+
+def test_playback(window):
+    clock = window.playback.clock
+    window.pressedPlay(True)
+    assert window.timer.isActive()
+
+    clock.time += 0.1234
+    window.playStep()
+    assert window.frame == 12
+
+    window.speedBox.setCurrentIndex(PLAYBACK_SPEEDS.index(10.0))
+    clock.time += 0.5
+    window.playStep()
+    assert window.frame == 512
+
+    # The user moves the slider while playing
+    window.ui.timeSlider.setValue(100)
+    clock.time += 0.1
+    window.playStep()
+    assert window.frame == 200
+
+    clock.time += 100
+    window.playStep()
+    assert window.frame == 999
+    assert not window.timer.isActive()
+    assert not window.ui.buttonPlay.isChecked()
+
+
+def test_reverse(window):
+    clock = window.playback.clock
+    window.endFrame()
+    window.speedBox.setCurrentIndex(PLAYBACK_SPEEDS.index(-1.0))
+    window.pressedPlay(True)
+    clock.time += 1
+    window.playStep()
+    assert window.frame == 899
+    clock.time += 100
+    window.playStep()
+    assert window.frame == 0
+    assert not window.timer.isActive()
+
+
+def test_coalescedRendering(window):
+    rendered = []
+    window.renderFrame = lambda: rendered.append(window.frame)
+    window.renderTimer.timeout.disconnect()
+    window.renderTimer.timeout.connect(window.renderFrame)
+    for frame in range(1, 50):
+        window.ui.timeSlider.setValue(frame)
+    while window.renderTimer.isActive():
+        QApplication.processEvents()
+    assert rendered == [49]
+
+
+def test_plotPanel(window):
+    assert window.plotPanel.count == 1000
+    window.plotPanel.selectFrame(window.plotPanel.width() / 2)
+    assert window.ui.timeSlider.value() == window.frame > 0
+    window.renderFrame()
+    assert window.plotPanel.frame == window.frame
@@ -0,0 +1,44 @@
+"""Test module sailsim.gui.SeriesPyramid."""
+
+import numpy as np
+
+from sailsim.gui.SeriesPyramid import SeriesPyramid
+
+
+def test_extend():
+    values = np.random.default_rng(1).normal(size=100003).cumsum()
+    pyramid = SeriesPyramid()
+    for chunk in np.array_split(values, 97):
+        pyramid.extend(chunk)
+    assert len(pyramid) == 100003
+    assert np.array_equal(pyramid.values(), values)
+
+    # Appending in chunks gives the same levels as appending at once
+    reference = SeriesPyramid()
+    reference.extend(values)
+    assert pyramid.counts == reference.counts
+    for level, count in enumerate(pyramid.counts):
+        assert np.array_equal(pyramid.mins[level][:count], reference.mins[level][:count])
+        assert np.array_equal(pyramid.maxs[level][:count], reference.maxs[level][:count])
+    assert pyramid.counts[-1] <= pyramid.factor
+
+
+def test_envelope():
+    values = np.random.default_rng(2).normal(size=50000).cumsum()
+    pyramid = SeriesPyramid()
+    pyramid.extend(values)
+    for (start, stop, buckets) in ((0, 50000, 1000), (1234, 40321, 700), (49000, 50000, 300)):
+        (indices, mins, maxs) = pyramid.envelope(start, stop, buckets)
+        assert len(indices) == buckets
+        for (index, end, low, high) in zip(indices, indices[1:], mins, maxs):
+            assert (low, high) == (values[index:end].min(), values[index:end].max())
+        # The groups cover the range
+        assert indices[0] <= start < indices[1]
+        assert pyramid.range(start, stop) == (values[start:stop].min(), values[start:stop].max())
+
+    # Fewer values than buckets returns the values
+    (indices, mins, maxs) = pyramid.envelope(10, 20, 100)
+    assert list(indices) == list(range(10, 20))
+    assert np.array_equal(mins, values[10:20]) and np.array_equal(maxs, values[10:20])
+    assert pyramid.envelope(60000, 70000, 10)[0].size == 0
+    assert SeriesPyramid().range(0, 10) is None
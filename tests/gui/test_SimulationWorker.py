@@ -0,0 +1,177 @@
+"""Test module sailsim.gui.SimulationWorker."""
+
+from tkinter import TclError
+
+import pytest
+
+from sailsim.gui.SailsimGUI import SailsimGUI
+from sailsim.gui.SimulationWorker import SimulationWorker
+from sailsim.simulation.Simulation import Simulation
+from sailsim.simulation.StopConditions import Watchdog
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+pytestmark = pytest.mark.usefixtures("app")
+
+
+class FakeConfigWindow:
+    """Stands in for a Tk window, it is closed after a number of updates."""
+
+    def __init__(self, updates):
+        self.updates = updates
+        self.destroyed = False
+
+    def update(self):
+        if self.destroyed or self.updates == 0:
+            raise TclError("application has been destroyed")
+        self.updates -= 1
+
+    def destroy(self):
+        self.destroyed = True
+
+
+def createSimulation(lastFrame=999, commands=None):
+    boat = Boat()
+    boat.sailor = Sailor(commands or [Waypoint(0, 20, 1)])
+    boat.sailor.importBoat(boat)
+    return Simulation(boat, Wind([Windfield(3, 1)]), 0.01, lastFrame)
+
+
+def waitFor(app, worker):
+    while not worker.wait(10):
+        app.processEvents()
+    app.processEvents()
+
+
+def test_worker(app):
+    simulation = createSimulation()
+    worker = SimulationWorker(simulation, batchFrames=50, refreshRate=1e9)
+    counts = []
+    reasons = []
+    worker.framesAvailable.connect(counts.append)
+    worker.simulationStopped.connect(reasons.append)
+    worker.start()
+    waitFor(app, worker)
+
+    assert counts[0] == 50
+    assert counts == sorted(counts)
+    assert counts[-1] == len(simulation.boat.frameList) == 1000
+    assert reasons == [""]
+
+    # Frames are the same as those of a simulation in the main thread
+    reference = createSimulation()
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+
+
+def test_workerStop(app):
+    simulation = createSimulation(None)
+    simulation.addStopCondition(Watchdog())
+    worker = SimulationWorker(simulation, batchFrames=10)
+    worker.start()
+    worker.stop()
+    app.processEvents()
+    assert not worker.isRunning()
+    assert worker.stopReason is None
+    assert simulation.frame % 10 == 0
+
+
+def test_progressiveGUI(app):
+    simulation = createSimulation()
+    window = SailsimGUI(simulation)
+    assert window.worker is not None
+    waitFor(app, window.worker)
+
+    assert window.ui.timeSlider.maximum() == 999
+    assert window.mapViewScene.path.pathEnd == 1000
+    assert len(window.mapViewScene.path.levels) == 1000
+    window.endFrame()
+    assert window.frame == 999
+    window.close()
+
+    # Simulations that are finished are not run again and can't be changed
+    window = SailsimGUI(simulation)
+    assert window.worker is None
+    assert window.ui.timeSlider.maximum() == 999
+    assert window.checkpointLog is None
+    assert not window.actionConfigBoat.isEnabled()
+    window.close()
+
+
+def test_configChanged(app):
+    simulation = createSimulation()
+    window = SailsimGUI(simulation)
+    waitFor(app, window.worker)
+    assert len(window.checkpointLog) == 2
+    window.ui.timeSlider.setValue(700)
+    frames = list(simulation.boat.frameList.frames)
+
+    # Changed wind, e.g. by ConfigWind
+    simulation.wind.winds[0].speedX = 2
+    window.windChanged()
+    waitFor(app, window.worker)
+    reference = createSimulation()
+    reference.wind.winds[0].speedX = 2
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+    assert simulation.boat.frameList.frames[0] is not frames[0]
+    assert window.ui.timeSlider.maximum() == 999
+    assert window.mapViewScene.path.pathEnd == window.mapViewScene.renderData.count == window.plotPanel.count == 1000
+    assert window.frame == 0
+
+    # Changed initial boat, e.g. by ConfigBoat
+    window.ui.timeSlider.setValue(700)
+    simulation.initBoat.mass = 90
+    window.boatChanged()
+    waitFor(app, window.worker)
+    reference = createSimulation()
+    reference.wind.winds[0].speedX = 2
+    reference.boat.mass = 90
+    reference.boat.sailor.importBoat(reference.boat)
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+    assert window.plotPanel.count == 1000
+    window.close()
+
+
+def test_setCommands(app):
+    commands = [Waypoint(0, 10, 1), Waypoint(0, 20, 1)]
+    simulation = createSimulation(1999, commands)
+    window = SailsimGUI(simulation)
+    waitFor(app, window.worker)
+    frames = list(simulation.boat.frameList.frames)
+
+    # Only the frames after the sailor reached the changed command are simulated again
+    window.setCommands(commands[:1] + [Waypoint(5, 20, 1)])
+    waitFor(app, window.worker)
+    assert simulation.boat.frameList.frames[500] is frames[500]
+    assert simulation.boat.frameList.frames[-1] is not frames[-1]
+    reference = createSimulation(1999, [Waypoint(0, 10, 1), Waypoint(5, 20, 1)])
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+    assert window.mapViewScene.path.pathEnd == 2000
+    window.close()
+
+
+def test_configWindow(app):
+    simulation = createSimulation(None)
+    window = SailsimGUI(simulation)
+
+    # Frames are shown while a config window is open
+    config = FakeConfigWindow(5)
+    window.showConfigWindow(config)
+    while config.updates > 0:
+        app.processEvents()
+    assert window.frameCount > 0
+    while window.configWindows:
+        app.processEvents()
+
+    # Open windows are closed with the GUI
+    config = FakeConfigWindow(1000)
+    window.showConfigWindow(config)
+    window.close()
+    assert config.destroyed
+    assert not window.configWindows
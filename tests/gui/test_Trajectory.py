@@ -0,0 +1,52 @@
+"""Test module sailsim.gui.Trajectory."""
+
+import numpy as np
+import pytest
+
+from sailsim.boat.Boat import Boat
+from sailsim.gui.Trajectory import TRAJECTORY_FIELDS, Trajectory
+from sailsim.sailor.Commands import Waypoint
+from sailsim.sailor.Sailor import Sailor
+from sailsim.simulation.Simulation import Simulation
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+
+def runBoat(frames=200):
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 20, 1)])
+    boat.sailor.importBoat(boat)
+    Simulation(boat, Wind([Windfield(3, 1)]), 0.01, frames - 1).run()
+    return boat
+
+
+def test_fromFrameList():
+    boat = runBoat()
+    trajectory = Trajectory.fromFrameList(boat.frameList, "run")
+    assert len(trajectory) == len(boat.frameList)
+    frame = boat.frameList[50]
+    assert trajectory.state(50) == tuple(getattr(frame, field) for field in TRAJECTORY_FIELDS)
+    # Runs that ended stay at their last frame
+    assert trajectory.state(10**6) == trajectory.state(len(trajectory) - 1)
+    assert trajectory.state(-1) == trajectory.state(0)
+
+
+def test_load(tmp_path):
+    boat = runBoat()
+    path = str(tmp_path / "upwind.npy")
+    boat.frameList.saveNumpy(path)
+    trajectory = Trajectory.load(path)
+    assert trajectory.name == "upwind"
+    assert len(trajectory) == len(boat.frameList)
+    assert trajectory.state(120) == Trajectory.fromFrameList(boat.frameList).state(120)
+
+    np.save(str(tmp_path / "other.npy"), np.zeros((10, 3)))
+    with pytest.raises(ValueError):
+        Trajectory.load(str(tmp_path / "other.npy"))
+
+
+def test_lengths():
+    columns = {field: np.zeros(5) for field in TRAJECTORY_FIELDS}
+    columns["boatDirection"] = np.zeros(4)
+    with pytest.raises(ValueError):
+        Trajectory(columns)
@@ -0,0 +1,103 @@
+"""Test module sailsim.gui.WindOverlay."""
+
+from time import perf_counter, sleep
+
+import pytest
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtWidgets import QApplication
+
+from sailsim.boat.Boat import Boat
+from sailsim.gui.WindOverlay import TILE_PIXELS, WindTileCache, WindTileRenderer, renderTile, speedColors, tileSize
+from sailsim.gui.mapView import MapViewScene
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+pytestmark = pytest.mark.usefixtures("app")
+
+
+def wait(renderer, timeout=10):
+    end = perf_counter() + timeout
+    while renderer.pending and perf_counter() < end:
+        sleep(0.005)
+        QApplication.processEvents()
+    assert not renderer.pending
+
+
+def render(scene, source):
+    image = QImage(200, 200, QImage.Format_ARGB32)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(0, 0, 200, 200), source)
+    painter.end()
+    return image
+
+
+def test_renderTile():
+    wind = Wind([Windfield(0, 0), Fluctuationfield(2, 1, 2, 64, 16, 3)])
+    tile = renderTile(wind, (0, 0, -1, 0), 0.0, 10)
+    assert (tile.width(), tile.height()) == (TILE_PIXELS, TILE_PIXELS)
+    # The heatmap changes over the tile
+    colors = {tile.pixelColor(x, y).name() for x in range(0, TILE_PIXELS, 16) for y in range(0, TILE_PIXELS, 16)}
+    assert len(colors) > 10
+
+    colors = speedColors(__import__("numpy").array([0.0, 5.0, 100.0]), 10)
+    assert colors[0] >> 24 == colors[2] >> 24 > 0
+    assert colors[0] & 0xffffff == 0x313695 and colors[2] & 0xffffff == 0xa50026
+
+
+def test_cache():
+    cache = WindTileCache(2)
+    cache.put((0, 0, 0, 0), QImage())
+    cache.put((0, 1, 0, 0), QImage())
+    assert cache.get((0, 0, 0, 0)) is not None
+    cache.put((0, 2, 0, 0), QImage())
+    # The least recently used tile was dropped
+    assert (0, 1, 0, 0) not in cache
+    assert (0, 0, 0, 0) in cache and len(cache) == 2
+
+
+def test_renderer():
+    renderer = WindTileRenderer(Wind([Windfield(3, 1)]), timeBucket=2, workers=2)
+    ready = []
+    renderer.tileReady.connect(ready.append)
+    keys = [(0, x, 0, renderer.bucket(5)) for x in range(4)]
+    assert keys[0][3] == 2
+    for key in keys + keys:
+        renderer.request(key)
+    wait(renderer)
+    assert sorted(ready) == keys
+    assert len(renderer.cache) == 4
+    renderer.shutdown()
+
+
+def test_overlay():
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 20, 1)])
+    scene = MapViewScene(boat, Wind([Windfield(3, 1)]))
+    overlay = scene.windOverlay
+    assert not overlay.isVisible()
+    overlay.setVisible(True)
+
+    # 100 m on 200 pixels are drawn with zoom level 1, two tiles of 128 m in every direction are needed
+    render(scene, QRectF(-50, -50, 100, 100))
+    assert set(overlay.renderer.pending) == {(1, x, y, 0) for x in (-1, 0) for y in (-1, 0)}
+    assert tileSize(1) == 128
+    wait(overlay.renderer)
+    image = render(scene, QRectF(-50, -50, 100, 100))
+    assert image.pixelColor(100, 100) != scene.backgroundBrush().color()
+    assert not overlay.renderer.pending
+
+    # New time buckets are rendered, the old tiles are drawn meanwhile
+    overlay.setTime(1.5)
+    image = render(scene, QRectF(-50, -50, 100, 100))
+    assert len(overlay.renderer.pending) == 4
+    assert image.pixelColor(100, 100) != scene.backgroundBrush().color()
+
+    # Tiles of a changed wind are dropped
+    wait(overlay.renderer)
+    overlay.clearTiles()
+    assert len(overlay.renderer.cache) == 0
+    scene.close()
@@ -0,0 +1,89 @@
+"""Test module sailsim.gui.qgraphicsitems."""
+
+import pytest
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QImage, QPainter
+
+from sailsim.gui.Trajectory import Trajectory
+from sailsim.gui.mapView import MapViewScene
+from sailsim.simulation.Simulation import Simulation
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+pytestmark = pytest.mark.usefixtures("app")
+
+
+def render(scene, source):
+    image = QImage(200, 200, QImage.Format_ARGB32)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(0, 0, 200, 200), source)
+    painter.end()
+
+
+def test_boatPathLevels():
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 30, 1)])
+    boat.sailor.importBoat(boat)
+    simulation = Simulation(boat, Wind([Windfield(3, 1)]), 0.01, 1999)
+    simulation.run(1000)
+
+    scene = MapViewScene(boat)
+    path = scene.path
+    assert path.pathEnd == 1000
+    box = path.levels.boundingBox()
+    assert path.boundingRect() == QRectF(box[0], box[1], box[2] - box[0], box[3] - box[1])
+
+    # Zoomed out: a coarse level is drawn
+    render(scene, QRectF(-500, -500, 1000, 1000))
+    coarse = {level for (level, _) in path.chunkPaths}
+    assert coarse and min(coarse) > 0
+
+    # Zoomed in: all frames are drawn
+    path.chunkPaths.clear()
+    render(scene, QRectF(-1, -1, 2, 2))
+    assert {level for (level, _) in path.chunkPaths} == {0}
+
+    # New frames replace the cached last chunks
+    simulation.run()
+    path.extendBoatPath(len(boat.frameList))
+    assert path.pathEnd == 2000
+    assert path.chunkPaths == {}
+    assert path.levels.points(0) == [(x, -y) for (x, y) in boat.frameList.getCoordinateList()]
+
+    # Frames were deleted and recorded again
+    del boat.frameList.frames[500:]
+    path.extendBoatPath(500)
+    assert path.pathEnd == 500
+    assert path.levels.points(0) == [(x, -y) for (x, y) in boat.frameList.getCoordinateList()]
+
+
+def test_trajectories():
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 30, 1)])
+    boat.sailor.importBoat(boat)
+    Simulation(boat, Wind([Windfield(3, 1)]), 0.01, 499).run()
+    scene = MapViewScene(boat)
+
+    # Shifted copies of the run
+    base = Trajectory.fromFrameList(boat.frameList)
+    for run in range(50):
+        columns = dict(base.columns)
+        columns["boatPosX"] = base.columns["boatPosX"] + 100 * run
+        scene.addTrajectory(Trajectory(columns, f"run {run}"))
+    assert len(scene.trajectories) == 50
+    assert scene.trajectories[0][1].color != scene.trajectories[1][1].color
+
+    scene.viewFrame(300)
+    for (run, (path, trajectoryBoat)) in enumerate(scene.trajectories):
+        assert trajectoryBoat.pos().x() == pytest.approx(boat.frameList[300].boatPosX + 100 * run)
+        assert path.levels.points(0)[300] == (base.columns["boatPosX"][300] + 100 * run, -base.columns["boatPosY"][300])
+    # Every trajectory boat has its own sail
+    assert scene.trajectories[0][1].mainSail is not scene.trajectories[1][1].mainSail
+
+    # Only the runs in view are drawn
+    render(scene, QRectF(-20, -40, 40, 60))
+    drawn = [run for (run, (path, _)) in enumerate(scene.trajectories) if path.chunkPaths]
+    assert drawn == [0]
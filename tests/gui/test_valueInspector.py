@@ -0,0 +1,95 @@
+"""Test module sailsim.gui.valueInspector."""
+
+from time import sleep
+
+import pytest
+from PySide6 import QtWidgets
+
+from sailsim.boat.Boat import Boat
+from sailsim.gui.valueInspector import ValueInspectorWidget, toString
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.simulation.Simulation import Simulation
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+pytestmark = pytest.mark.usefixtures("app")
+
+
+@pytest.fixture(name="inspector")
+def fixtureInspector():
+    inspector = ValueInspectorWidget(maxRefreshRate=1000)
+    inspector.setColumnCount(4)
+    for children in (0, 0, 0, 0, 6, 4, 3):
+        item = QtWidgets.QTreeWidgetItem(inspector)
+        for _ in range(children):
+            QtWidgets.QTreeWidgetItem(item)
+    inspector.resize(400, 600)
+    inspector.show()
+    yield inspector
+    inspector.close()
+    QtWidgets.QApplication.processEvents()
+
+
+@pytest.fixture(name="frames")
+def fixtureFrames():
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 20, 1)])
+    boat.sailor.importBoat(boat)
+    simulation = Simulation(boat, Wind([Windfield(3, 1)]), 0.01, 99)
+    simulation.run()
+    return simulation.boat.frameList.frames
+
+
+def flush(inspector):
+    while inspector.refreshTimer.isActive():
+        sleep(0.001)
+        QtWidgets.QApplication.processEvents()
+
+
+def test_visibleRows(inspector, frames):
+    inspector.viewFrame(frames[50])
+    flush(inspector)
+    assert inspector.topLevelItem(0).text(2) == toString(frames[50].boatPosX)
+    assert inspector.topLevelItem(2).text(2) != ""
+    # Children of collapsed items are not updated
+    assert inspector.topLevelItem(4).child(0).text(1) == ""
+
+    inspector.topLevelItem(4).setExpanded(True)
+    flush(inspector)
+    assert inspector.topLevelItem(4).child(0).text(1) != ""
+    assert inspector.topLevelItem(5).child(0).text(1) == ""
+
+
+def test_unchangedText(inspector, frames):
+    inspector.viewFrame(frames[50])
+    flush(inspector)
+    item = inspector.topLevelItem(2)
+    item.setText(1, "changed")
+    # The value didn't change, so the text isn't set again
+    inspector.viewFrame(frames[50])
+    flush(inspector)
+    assert item.text(1) == "changed"
+    inspector.viewFrame(frames[51])
+    flush(inspector)
+    assert item.text(1) != "changed"
+
+
+def test_throttle(inspector, frames):
+    inspector.refreshInterval = 10
+    flush(inspector)
+    refreshed = []
+    inspector.refreshTimer.timeout.connect(lambda: refreshed.append(inspector.frame))
+    for frame in frames[:20]:
+        inspector.viewFrame(frame)
+    QtWidgets.QApplication.processEvents()
+    # Frames are not shown before the interval is over, then only the last one is shown
+    assert not refreshed
+    inspector.refreshTimer.setInterval(0)
+    inspector.refreshTimer.start()
+    flush(inspector)
+    assert refreshed == [frames[19]]
+
+    inspector.hide()
+    inspector.viewFrame(frames[30])
+    assert not inspector.refreshTimer.isActive()
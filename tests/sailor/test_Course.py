@@ -0,0 +1,113 @@
+"""Test module sailsim.sailor.Course."""
+
+import pickle
+
+from pytest import approx, raises
+from math import pi
+
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Commands import HoldHeading, Tack, Wait, Waypoint
+from sailsim.sailor.Course import Course, Leg
+from sailsim.sailor.Sailor import Sailor
+
+
+def test_leg():
+    leg = Leg(0, 0, 3, 4)
+    assert leg.length == approx(5)
+    assert (leg.dirX, leg.dirY) == approx((0.6, 0.8))
+    assert Leg(0, 0, 0, 10).bearing == approx(0)
+    assert Leg(0, 0, -10, 0).bearing == approx(3/2 * pi)
+
+    # Wind blowing towards south: a leg to the north is upwind, a leg to the south is not
+    assert Leg(0, 0, 0, 10).isUpwind(pi, pi / 4)
+    assert not Leg(0, 0, 0, -10).isUpwind(pi, pi / 4)
+    assert Leg(0, 0, 0, 10).laylines(pi, pi / 4) == approx((1/4 * pi, 7/4 * pi))
+
+
+def test_waypoints():
+    sailor = Sailor([Waypoint(0, 10, 1), Waypoint(10, 10, 2)])
+    course = sailor.course
+    assert len(course.legs) == 2
+    assert course.distanceRemaining(0, 0) == approx(20)
+
+    sailor.checkCommand(0, 0)
+    assert sailor.commandListIndex == 0
+    assert (sailor.destX, sailor.destY) == (0, 10)
+
+    # Inside radius of the first waypoint: next waypoint is programmed in the same step
+    sailor.checkCommand(0, 9.5)
+    assert sailor.commandListIndex == 1
+    assert (sailor.destX, sailor.destY) == (10, 10)
+    assert course.distanceRemaining(0, 10) == approx(10)
+
+    sailor.checkCommand(8.5, 10)
+    assert course.finished()
+    assert course.distanceRemaining(8.5, 10) == 0
+
+
+def test_startPosition():
+    """The first leg starts at the boat the sailor is imported into, not at the origin."""
+    sailor = Sailor([Waypoint(0, 10, 1), HoldHeading(pi / 2, 5), Waypoint(10, 10, 2)])
+    assert (sailor.course.legs[0].startX, sailor.course.legs[0].startY) == (0, 0)
+    sailor.importBoat(Boat(posX=0, posY=-5))
+    leg = sailor.course.currentLeg()
+    assert (leg.startX, leg.startY) == (0, -5)
+    assert leg.length == approx(15)
+
+    # Importing a boat again keeps the progress, new commands keep the start
+    sailor.checkCommand(0, 9.5, 1)
+    sailor.importBoat(Boat(posX=0, posY=-5))
+    assert (sailor.course.index, sailor.course.entered) == (1, True)
+    sailor.setCommandList([Waypoint(5, 5, 1)], 0)
+    assert (sailor.course.legs[0].startX, sailor.course.legs[0].startY) == (0, -5)
+
+
+def test_timedCommands():
+    sailor = Sailor([HoldHeading(pi / 2, 5), Wait(8), Waypoint(0, 100, 1)])
+    sailor.checkCommand(0, 0, 1)
+    assert sailor.holdDirection == approx(pi / 2)
+    sailor.checkCommand(0, 0, 5.9)
+    assert sailor.commandListIndex == 0
+    sailor.checkCommand(0, 0, 6)
+    assert sailor.commandListIndex == 1
+    assert sailor.holdDirection is None
+    sailor.checkCommand(0, 0, 8)
+    assert sailor.commandListIndex == 2
+    assert sailor.course.distanceRemaining(0, 0) == approx(100)
+
+
+def test_tack():
+    sailor = Sailor([Tack()])
+    (sailor.trueWindDir, sailor.compass) = (0, 1/4 * pi)
+    sailor.checkCommand(0, 0)
+    assert sailor.holdDirection == approx(7/4 * pi)
+    sailor.compass = 7/4 * pi
+    sailor.checkCommand(0, 0)
+    assert sailor.course.finished()
+
+
+def test_unknownCommand():
+    with raises(TypeError):
+        Course([object()])
+
+
+def test_pickle():
+    sailor = Sailor([Waypoint(0, 10, 1), HoldHeading(pi / 2, 5), Waypoint(10, 10, 2)])
+    sailor.checkCommand(0, 9.5, 1)
+    copied = pickle.loads(pickle.dumps(sailor))
+    assert (copied.course.index, copied.course.entered) == (1, True)
+    assert copied.holdDirection == approx(pi / 2)
+    assert copied.course.distanceRemaining(0, 10) == approx(10)
+    copied.checkCommand(0, 10, 6)
+    assert (copied.destX, copied.destY) == (10, 10)
+    assert sailor.course.index == 1
+
+    # A whole simulation can be sent to other processes
+    from sailsim.simulation.Simulation import Simulation
+    from sailsim.wind.Wind import Wind
+    from sailsim.wind.Windfield import Windfield
+    boat = Boat()
+    boat.sailor = sailor
+    sailor.importBoat(boat)
+    simulation = pickle.loads(pickle.dumps(Simulation(boat, Wind([Windfield(3, 0)]), 0.01, 10)))
+    assert simulation.boat.sailor.course.index == 1
@@ -0,0 +1,62 @@
+"""Test module sailsim.sailor.ExternalSailor."""
+
+import sys
+
+from pytest import approx, raises
+
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.ExternalSailor import ExternalSailor
+from sailsim.simulation.Simulation import Simulation
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+
+# Controller that answers with the x position as main sail angle and the step number as rudder angle
+CONTROLLER = """
+from sailsim.sailor.ExternalSailor import ExternalSailorClient
+client = ExternalSailorClient()
+while True:
+    sensors = client.receive()
+    if sensors is None:
+        break
+    client.send(sensors[0], client.step)
+client.close()
+"""
+
+
+def test_lockstep():
+    with ExternalSailor([sys.executable, "-c", CONTROLLER]) as sailor:
+        for step in range(100):
+            sailor.run(step / 100, 0, 0, 0, 0, 0, 0)
+            assert sailor.mainSailAngle == approx(step / 100)
+            assert sailor.rudderAngle == step
+    assert sailor.process is None
+
+
+def test_latency():
+    with ExternalSailor([sys.executable, "-c", CONTROLLER], capacity=4, latency=3) as sailor:
+        for step in range(50):
+            sailor.run(step, 0, 0, 0, 0, 0, 0)
+            if step < 3:
+                assert sailor.rudderAngle == 0
+            else:
+                assert sailor.mainSailAngle == step - 3
+
+
+def test_clampAngles():
+    with ExternalSailor([sys.executable, "-c", CONTROLLER]) as sailor:
+        sailor.maxMainSailAngle = 1
+        sailor.run(5, 0, 0, 0, 0, 0, 0)
+        assert sailor.mainSailAngle == 1
+
+
+def test_noForks():
+    # Branches would share one controller process, so forks and checkpoints are refused
+    boat = Boat()
+    boat.sailor = ExternalSailor([sys.executable, "-c", CONTROLLER])
+    simulation = Simulation(boat, Wind([Windfield(0, 3)]), 0.01, 10)
+    with raises(TypeError, match="ExternalSailor"):
+        simulation.fork()
+    with raises(TypeError, match="ExternalSailor"):
+        simulation.checkpoint()
+    assert boat.sailor.process is None
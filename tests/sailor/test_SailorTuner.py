@@ -0,0 +1,43 @@
+"""Test module sailsim.sailor.SailorTuner."""
+
+from math import inf
+
+from pytest import approx
+
+from sailsim.simulation.Simulation import Simulation
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.sailor.SailorTuner import SailorTuner, evaluateSailor, OBJECTIVE_VMG, PENALTY_SPEED
+from sailsim.wind.Windfield import Windfield
+
+
+def createSimulation():
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(10, 10, 2), Waypoint(-10, 20, 2)])
+    boat.sailor.importBoat(boat)
+    return Simulation(boat, Windfield(0, 3), 0.01)
+
+
+def test_evaluateSailor():
+    courseTime = evaluateSailor(createSimulation, {})
+    assert 0 < courseTime < 600
+
+    # Stop as soon as the best time can't be beaten, the rest of the course is sailed at the penalty speed
+    cost = evaluateSailor(createSimulation, {}, cutoff=10)
+    assert cost > 10 + 10 / PENALTY_SPEED
+    assert evaluateSailor(createSimulation, {}, cutoff=10, penaltySpeed=2 * PENALTY_SPEED) - 10 == approx((cost - 10) / 2, abs=0.01)
+    assert evaluateSailor(createSimulation, {}, OBJECTIVE_VMG, maxTime=10) < 0
+
+
+def test_tuner():
+    tuner = SailorTuner(createSimulation, populationSize=4, maxTime=60, seed=0)
+    result = tuner.run(2, workers=1)
+    assert result.evaluations == 12
+    assert len(result.history) == 3
+    assert result.history == sorted(result.history, reverse=True)
+    assert result.cost < inf
+
+    sailor = createSimulation().boat.sailor
+    result.apply(sailor)
+    assert sailor.rudderGain == result.parameters["rudderGain"]
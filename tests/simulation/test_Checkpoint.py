@@ -0,0 +1,91 @@
+"""Test module sailsim.simulation.Checkpoint."""
+
+from sailsim.simulation.Checkpoint import Checkpoint
+from sailsim.simulation.Simulation import Simulation, BACKEND_PYTHON
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint, HoldHeading
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+
+
+def createSimulation(commands=None):
+    boat = Boat()
+    boat.sailor = Sailor(commands or [Waypoint(3, 3, 1), HoldHeading(1, 2), Waypoint(-10, 20, 2)])
+    boat.sailor.importBoat(boat)
+    wind = Wind([Windfield(0, 3), Fluctuationfield(amplitude=0.5)])
+    return Simulation(boat, wind, 0.01, 999, backend=BACKEND_PYTHON)
+
+
+def test_restore():
+    reference = createSimulation()
+    reference.run(400)
+    checkpoint = reference.checkpoint()
+    assert (checkpoint.frame, checkpoint.frameCount) == (400, 400)
+    reference.run(300)
+    expected = reference.boat.frameList.getValues()
+
+    # Going back deletes the later frames, running again gives the same frames
+    reference.restore(checkpoint)
+    assert reference.frame == 400
+    assert len(reference.boat.frameList) == 400
+    reference.run(300)
+    assert reference.boat.frameList.getValues() == expected
+
+
+def test_restoreCourse():
+    simulation = createSimulation()
+    simulation.run(100)
+    checkpoint = simulation.checkpoint()
+    index = simulation.boat.sailor.course.index
+    simulation.run(500)
+    assert simulation.boat.sailor.course.index != index
+
+    simulation.restore(checkpoint)
+    course = simulation.boat.sailor.course
+    assert (course.index, course.entered) == (checkpoint.courseIndex, checkpoint.courseEntered)
+    assert course.check is course.states[index][1]
+
+
+def test_fork():
+    simulation = createSimulation()
+    simulation.run(300)
+    checkpoint = simulation.checkpoint()
+
+    branch = simulation.fork()
+    assert branch.wind is simulation.wind
+    assert branch.boat is not simulation.boat
+    assert branch.boat.sailor is not simulation.boat.sailor
+    assert branch.boat.sailor.course is not simulation.boat.sailor.course
+    assert branch.boat.frameList[0] is simulation.boat.frameList[0]
+
+    # Changing the branch doesn't change the original simulation
+    branch.boat.sailor.rudderGain = 0.1
+    branch.run(300)
+    assert simulation.checkpoint() == checkpoint
+    assert len(simulation.boat.frameList) == 300
+    assert len(branch.boat.frameList) == 600
+
+    simulation.run(300)
+    assert simulation.boat.posX != branch.boat.posX
+
+    # A fork from a checkpoint continues like the original
+    again = simulation.fork(checkpoint)
+    assert again.frame == 300
+    again.run(300)
+    assert again.boat.frameList.getValues() == simulation.boat.frameList.getValues()
+
+
+def test_serialise():
+    simulation = createSimulation()
+    simulation.run(250)
+    checkpoint = simulation.checkpoint()
+    assert Checkpoint.fromBytes(checkpoint.toBytes()) == checkpoint
+    assert Checkpoint.fromDict(checkpoint.toDict()) == checkpoint
+
+    noSailor = Simulation(Boat(), Wind([Windfield(1, 1)]), 0.01)
+    noSailor.run(10)
+    checkpoint = noSailor.checkpoint()
+    assert checkpoint.sailor is None
+    assert Checkpoint.fromBytes(checkpoint.toBytes()) == checkpoint
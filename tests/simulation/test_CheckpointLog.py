@@ -0,0 +1,122 @@
+"""Test module sailsim.simulation.CheckpointLog."""
+
+import pytest
+
+from sailsim.simulation.CheckpointLog import CheckpointLog
+from sailsim.simulation.Simulation import Simulation, BACKEND_PYTHON
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint, HoldHeading
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+
+
+def createCommands():
+    return [Waypoint(3, 3, 1), HoldHeading(1, 2), Waypoint(-10, 20, 2)]
+
+
+def createSimulation(commands=None, lastFrame=999):
+    boat = Boat()
+    boat.sailor = Sailor(commands or createCommands())
+    boat.sailor.importBoat(boat)
+    wind = Wind([Windfield(0, 3), Fluctuationfield(amplitude=0.5)])
+    return Simulation(boat, wind, 0.01, lastFrame, backend=BACKEND_PYTHON)
+
+
+def test_run():
+    simulation = createSimulation()
+    log = CheckpointLog(simulation, 100)
+    assert log.run() is None
+    assert [checkpoint.frame for checkpoint in log.checkpoints] == list(range(0, 1000, 100))
+    assert log.endFrame == 1000
+
+    reference = createSimulation()
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+    with pytest.raises(ValueError):
+        CheckpointLog(simulation, 0)
+
+
+def test_resimulateFrom():
+    simulation = createSimulation()
+    log = CheckpointLog(simulation, 100)
+    log.run()
+    frames = list(simulation.boat.frameList.frames)
+
+    # A change from frame 650 on, the frames before the checkpoint at 600 are kept
+    simulation.boat.sailArea = 9
+    log.resimulateFrom(650)
+    assert simulation.frame == 1000
+    assert all(new is old for (new, old) in zip(simulation.boat.frameList.frames[:600], frames))
+    assert simulation.boat.frameList.frames[600] is not frames[600]
+
+    reference = createSimulation()
+    reference.run(600)
+    reference.boat.sailArea = 9
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+    assert [checkpoint.frame for checkpoint in log.checkpoints] == list(range(0, 1000, 100))
+
+
+def test_setCommands():
+    commands = [Waypoint(3, 3, 1), HoldHeading(1, 2), Waypoint(3, 8, 2)]
+    simulation = createSimulation(commands, 2999)
+    log = CheckpointLog(simulation, 100)
+    log.run()
+    assert simulation.boat.sailor.course.finished()
+    frames = list(simulation.boat.frameList.frames)
+
+    # A waypoint at the end only changes the frames after the course was finished
+    log.setCommands(commands + [Waypoint(0, 0, 2)])
+    assert all(new is old for (new, old) in zip(simulation.boat.frameList.frames[:1500], frames))
+    assert simulation.boat.frameList.frames[1500] is not frames[1500]
+
+    reference = createSimulation([Waypoint(3, 3, 1), HoldHeading(1, 2), Waypoint(3, 8, 2), Waypoint(0, 0, 2)], 2999)
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+
+    # A changed first command invalidates everything but the start
+    log.setCommands([Waypoint(-3, 3, 1)] + simulation.boat.sailor.commandList[1:])
+    reference = createSimulation([Waypoint(-3, 3, 1), HoldHeading(1, 2), Waypoint(3, 8, 2), Waypoint(0, 0, 2)], 2999)
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+
+
+def test_restart():
+    simulation = createSimulation()
+    log = CheckpointLog(simulation, 250)
+    log.run()
+
+    # The initial boat was changed, e.g. with ConfigBoat
+    simulation.initBoat.posX = 2
+    simulation.initBoat.mass = 90
+    log.restart()
+
+    reference = createSimulation()
+    reference.boat.posX = 2
+    reference.boat.mass = 90
+    reference.boat.sailor.importBoat(reference.boat)
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+
+
+def test_rewind():
+    simulation = createSimulation()
+    log = CheckpointLog(simulation, 100)
+    log.run()
+
+    # Rewinding only goes back, the run is continued by the caller
+    log.invalidate(650)
+    log.rewind()
+    assert simulation.frame == len(simulation.boat.frameList) == 600
+    log.run()
+    reference = createSimulation()
+    reference.run()
+    assert simulation.boat.frameList.getValues() == reference.boat.frameList.getValues()
+
+    simulation.initBoat.posX = 2
+    log.reloadBoat()
+    assert simulation.frame == len(simulation.boat.frameList) == 0
+    assert simulation.boat.posX == 2
+    assert len(log) == 1
@@ -0,0 +1,123 @@
+"""Test module sailsim.simulation.Race."""
+
+import sys
+from time import perf_counter
+
+import pytest
+
+from sailsim.simulation.Race import Race
+from sailsim.simulation.Simulation import Simulation, BACKEND_PYTHON
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.ExternalSailor import ExternalSailor
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+
+
+def createBoat(posX=0, posY=0, commands=None):
+    boat = Boat(posX, posY)
+    if commands is not None:
+        boat.sailor = Sailor(commands)
+        boat.sailor.importBoat(boat)
+    return boat
+
+
+def createWind():
+    return Wind([Windfield(3, 0), Fluctuationfield(amplitude=0.5)])
+
+
+def test_singleBoat():
+    """A race of one boat is a Simulation."""
+    race = Race([createBoat(commands=[Waypoint(0, 20, 1)])], createWind(), 0.01, 499)
+    assert race.run() == 500
+    reference = Simulation(createBoat(commands=[Waypoint(0, 20, 1)]), createWind(), 0.01, 499, backend=BACKEND_PYTHON)
+    reference.run()
+    assert race.boats[0].frameList.getValues() == reference.boat.frameList.getValues()
+    assert race.collisions == []
+    assert race.closeFrames == [0]
+
+
+def test_windShadow():
+    """A boat downwind of another boat gets less wind, a boat upwind doesn't."""
+    race = Race([createBoat(0, 0), createBoat(8, 0), createBoat(0, 30)], Wind([Windfield(3, 0)]), 0.01, 0)
+    race.run()
+    (upwind, downwind, free) = (boat.frameList[0] for boat in race.boats)
+    assert upwind.windX == 3
+    assert free.windX == 3
+    assert 3 * (1 - race.shadowDeficit) < downwind.windX < 3
+    assert race.shadowAt((3, 0), 8, 0) == pytest.approx(1 - downwind.windX / 3)
+    assert race.shadowAt((3, 0), -10, 0) == 0
+    assert race.shadowAt((3, 0), 10, 10) == 0
+    assert race.shadowAt((3, 0), race.shadowLength, 0) == 0
+    assert race.closeFrames == [1, 1, 0]
+
+    calm = Race([createBoat(0, 0), createBoat(10, 0)], Wind([Windfield(3, 0)]), 0.01, 0, shadowLength=0)
+    calm.run()
+    assert calm.boats[1].frameList[0].windX == 3
+
+
+def test_collision():
+    """Boats sailing into each other touch once, stop approaching and are pushed apart."""
+    boats = [createBoat(-1.05, 0), createBoat(1.05, 0)]
+    boats[0].speedX = 2
+    boats[1].speedX = -2
+    race = Race(boats, Wind([Windfield(0, 0)]), 0.01, 199, shadowLength=0)
+    race.run()
+    assert len(race.collisions) == 1
+    (frame, first, second) = race.collisions[0]
+    assert (first, second) == (0, 1)
+    assert frame < 10
+    assert boats[1].posX - boats[0].posX >= race.collisionDistance - 0.05
+    assert race.rankings()[0]["collisions"] == 1
+
+
+def test_rankings():
+    """Boats that finished are ranked by time, the others by the distance they have left."""
+    def commands():
+        return [Waypoint(0, 8, 2)]
+
+    boats = [createBoat(0, 0, commands()), createBoat(40, -40, commands()), createBoat(-20, -5, commands())]
+    race = Race(boats, Wind([Windfield(4, 0)]), 0.01, 2499, names=["near", "far", "middle"])
+    race.run()
+    rankings = race.rankings()
+    assert [result["rank"] for result in rankings] == [1, 2, 3]
+    assert [result["name"] for result in rankings] == ["near", "middle", "far"]
+    assert 0 < rankings[0]["finishTime"] < 25
+    assert rankings[0]["distanceRemaining"] == 0
+    assert rankings[1]["finishTime"] is None
+    assert rankings[1]["distanceRemaining"] < rankings[2]["distanceRemaining"]
+
+    # The race ends before lastFrame when every sailor finished
+    single = Race([createBoat(0, 0, commands())], Wind([Windfield(4, 0)]), 0.01, 5999)
+    single.run()
+    assert single.finished()
+    assert single.frame < 5999
+    assert single.getTime() == pytest.approx(single.finishTimes[0])
+
+    # Sailors that can't tell their course are ranked last
+    external = createBoat(0, 0)
+    external.sailor = ExternalSailor([sys.executable, "-c", "pass"])
+    results = Race([external, createBoat(10, 0, commands())], Wind([]), 0.01).rankings()
+    assert [result["boat"] for result in results] == [1, 0]
+    assert results[1]["distanceRemaining"] is None
+
+    with pytest.raises(ValueError):
+        Race(boats, Wind([]), 0.01, names=["one"])
+    with pytest.raises(Exception, match="lastFrame"):
+        Race([createBoat(0, 0, commands())], Wind([]), 0.01).run()
+
+
+def test_fleet():
+    """A step of a fleet of 100 boats scales with the boats, not the pairs."""
+    boats = [createBoat(20 * (index % 10), 20 * (index // 10), [Waypoint(100, 300, 5)]) for index in range(100)]
+    race = Race(boats, createWind(), 0.01, 19, record=False)
+    start = perf_counter()
+    race.run()
+    assert perf_counter() - start < 10
+    assert race.frame == 20
+    assert all(len(boat.frameList) == 0 for boat in boats)
+    # The spatial hash holds the positions of the last step
+    assert sorted(race.spatialHash.query(*race.spatialHash.points[0], 30)) == [0, 1, 10, 11]
+    assert len(race.rankings()) == len(race) == 100
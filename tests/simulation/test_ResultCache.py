@@ -0,0 +1,147 @@
+"""Test module sailsim.simulation.ResultCache."""
+
+import os
+import sys
+
+import pytest
+
+from sailsim.simulation.ResultCache import ResultCache
+from sailsim.simulation.Simulation import Simulation, BACKEND_KERNEL, BACKEND_PYTHON
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.ExternalSailor import ExternalSailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+
+
+def createSimulation(sailorClass=Sailor, seed=0):
+    boat = Boat()
+    boat.sailor = sailorClass([Waypoint(3, 3, 1), Waypoint(-10, 20, 2)])
+    boat.sailor.importBoat(boat)
+    return Simulation(boat, Wind([Windfield(0, 3), Fluctuationfield(amplitude=0.5, noiseSeed=seed)]), 0.01, 999)
+
+
+DRAG = 0.5
+
+
+class SlowSailor(Sailor):
+    def run(self, *args):
+        super().run(*args)
+        self.mainSailAngle *= 0.5
+
+
+class SlowerSailor(SlowSailor):
+    pass
+
+
+def customDrag(angle):
+    return 0.5
+
+
+def otherDrag(angle):
+    return 0.6
+
+
+def globalDrag(angle):
+    return DRAG
+
+
+def test_run(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    reference = createSimulation()
+    assert not cache.run(reference)
+    assert cache.size() > 0
+
+    simulation = createSimulation()
+    assert cache.run(simulation)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert simulation.frame == reference.frame == 1000
+    assert (simulation.boat.posX, simulation.boat.posY) == (reference.boat.posX, reference.boat.posY)
+    assert simulation.boat.sailor.course.index == reference.boat.sailor.course.index == 1
+    assert simulation.boat.sailor.rudderAngle == reference.boat.sailor.rudderAngle
+    assert len(simulation.boat.frameList) == 1000
+    assert simulation.boat.frameList[500].getValues() == reference.boat.frameList[500].getValues()
+
+    # Continuing from a cached result gives the same as continuing the original run
+    simulation.run(100)
+    reference.run(100)
+    assert simulation.boat.frameList[-1].getValues() == reference.boat.frameList[-1].getValues()
+
+
+def test_key(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache.key(createSimulation(), 100)
+    assert cache.key(createSimulation(), 100) == key
+    assert cache.key(createSimulation(), 101) != key
+    assert cache.key(createSimulation(seed=1), 100) != key
+    assert cache.key(createSimulation(SlowSailor), 100) != key
+
+    simulation = createSimulation()
+    simulation.boat.coefficientAirDrag = customDrag
+    customKey = cache.key(simulation, 100)
+    assert customKey != key
+    simulation.boat.coefficientAirDrag = otherDrag
+    assert cache.key(simulation, 100) != customKey
+
+    simulation = createSimulation()
+    simulation.boat.mass = 81
+    assert cache.key(simulation, 100) != key
+
+    simulation = createSimulation()
+    simulation.backend = BACKEND_KERNEL
+    assert cache.key(simulation, 100) != cache.key(createSimulation(), 100)
+    simulation.backend = BACKEND_PYTHON
+    assert cache.key(simulation, 100) != cache.key(createSimulation(), 100)
+
+
+def test_keyGlobals(tmp_path, monkeypatch):
+    """Globals that custom code reads and the classes it inherits from are part of the key."""
+    cache = ResultCache(str(tmp_path))
+    simulation = createSimulation()
+    simulation.boat.coefficientAirDrag = globalDrag
+    key = cache.key(simulation, 100)
+    monkeypatch.setattr(sys.modules[__name__], "DRAG", 0.7)
+    assert cache.key(simulation, 100) != key
+
+    simulation = createSimulation(SlowerSailor)
+    key = cache.key(simulation, 100)
+    monkeypatch.setattr(SlowSailor, "sailTrimFactor", 0.3, raising=False)
+    assert cache.key(simulation, 100) != key
+
+
+def test_uncachable(tmp_path):
+    cache = ResultCache(str(tmp_path))
+
+    # The state of objects without __dict__ or __slots__ can't be described
+    simulation = createSimulation()
+    simulation.boat.coefficientAirDrag = lambda angle, state=iter([0.5]): 0.5
+    with pytest.raises(TypeError, match="can't be cached"):
+        cache.run(simulation)
+
+    # The behaviour of an ExternalSailor lives in another process, it is rejected before simulating
+    simulation = createSimulation()
+    simulation.boat.sailor = ExternalSailor([sys.executable, "-c", "pass"])
+    with pytest.raises(TypeError, match="ExternalSailor"):
+        cache.run(simulation)
+    assert simulation.frame == 0
+    assert cache.size() == 0
+
+
+def test_evict(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    for seed in range(2):
+        simulation = createSimulation(seed=seed)
+        simulation.record = False
+        cache.run(simulation, 10)
+    entries = cache.entries()
+    assert len(entries) == 2
+
+    os.utime(entries[1][2], (1, 1))  # second result is now the oldest
+    cache.maxSize = entries[0][1]
+    cache.evict()
+    assert [path for (_, _, path) in cache.entries()] == [entries[0][2]]
+
+    cache.clear()
+    assert cache.size() == 0
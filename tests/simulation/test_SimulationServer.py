@@ -0,0 +1,150 @@
+"""Test module sailsim.simulation.SimulationServer."""
+
+import asyncio
+import json
+import os
+
+from pytest import raises
+
+from sailsim.boat.FrameList import FRAME_FIELDS
+from sailsim.simulation.SimulationServer import SimulationServer, SimulationClient, ServiceError, STATE_DONE, runBatch
+from sailsim.simulation.scenario import createSimulation
+
+SCENARIOS = os.path.join(os.path.dirname(__file__), "..", "scenarios")
+
+
+def loadScenario(name="constant.json"):
+    with open(os.path.join(SCENARIOS, name), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def serve(test, **options):
+    """Run test(server, client) against a server on localhost."""
+    async def main():
+        server = SimulationServer(**options)
+        (host, port) = await server.start()
+        client = await SimulationClient.connect(host, port)
+        try:
+            return await test(server, client)
+        finally:
+            await client.close()
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_stream():
+    async def test(_server, client):
+        jobId = await client.submit(loadScenario(), lastFrame=249, stopEarly=False)
+        batches = [batch async for batch in client.frames(jobId)]
+        return (batches, client.summaries[jobId])
+
+    (batches, done) = serve(test, sliceFrames=100, batchFrames=60)
+    assert [len(batch) for batch in batches] == [60, 40, 60, 40, 50]
+    assert done["state"] == STATE_DONE
+    assert done["summary"]["frames"] == 250
+
+    # Same frames as a local simulation
+    reference = createSimulation(loadScenario())
+    reference.run(250)
+    frames = [row for batch in batches for row in batch]
+    assert len(frames[0]) == len(FRAME_FIELDS)
+    assert frames == reference.boat.frameList.getValues()
+
+
+def test_concurrent():
+    async def test(server, client):
+        jobIds = [await client.submit(loadScenario(), lastFrame=199, stopEarly=False) for _ in range(50)]
+        counts = await asyncio.gather(*[collect(client, jobId) for jobId in jobIds])
+        return (counts, await client.status(), len(server.jobs))
+
+    async def collect(client, jobId):
+        return sum([len(batch) async for batch in client.frames(jobId)])
+
+    (counts, status, jobs) = serve(test, sliceFrames=50)
+    assert counts == [200] * 50
+    assert status == {STATE_DONE: 50}
+    assert jobs == 50
+
+
+def test_backPressure():
+    async def test(server, client):
+        jobId = await client.submit(loadScenario(), lastFrame=1999, stopEarly=False)
+        await asyncio.sleep(0.3)
+        # The client didn't read, so the simulation waits
+        running = server.jobs[jobId].state
+        assert server.jobs[jobId].queue.full()
+        # Other requests are still answered
+        assert (await client.status()) == {"running": 1}
+        frames = sum([len(batch) async for batch in client.frames(jobId)])
+        return (running, frames, server.jobs[jobId].state)
+
+    (running, frames, state) = serve(test, sliceFrames=10, batchFrames=10, queueSize=2)
+    assert running == "running"
+    assert frames == 2000
+    assert state == STATE_DONE
+
+
+def test_summary():
+    async def test(_server, client):
+        local = await client.submit(loadScenario(), stream=False)
+        return await client.summary(local)
+
+    reply = serve(test, workers=0)
+    assert reply["summary"] == runBatch(loadScenario())
+    assert reply["summary"]["frames"] == 2001
+
+
+def test_pool():
+    async def test(_server, client):
+        jobIds = [await client.submit(loadScenario(), stream=False, lastFrame=500) for _ in range(2)]
+        return [await client.summary(jobId) for jobId in jobIds]
+
+    replies = serve(test, workers=1)
+    assert [reply["state"] for reply in replies] == [STATE_DONE] * 2
+    assert replies[0]["summary"] == runBatch(loadScenario(), 500)
+
+
+def test_errors():
+    async def test(_server, client):
+        with raises(ServiceError, match="timestep"):
+            await client.submit({"boat": {}})
+        with raises(ServiceError, match="unknown op"):
+            await client.request({"op": "fly", "id": 0})
+        jobId = await client.submit(loadScenario(), lastFrame=100000, stopEarly=False)
+        await client.cancel(jobId)
+        return await client.summary(jobId)
+
+    assert serve(test)["state"] == "cancelled"
+
+
+def test_failedJobs(monkeypatch):
+    def fail(*_args):
+        raise RuntimeError("broken")
+
+    async def test(_server, client):
+        with raises(ServiceError, match="lastFrame"):
+            await client.submit(loadScenario(), lastFrame=-1)
+        # A job that fails still ends its stream
+        monkeypatch.setattr("sailsim.simulation.SimulationServer.prepareSimulation", fail)
+        jobId = await client.submit(loadScenario(), lastFrame=10, stopEarly=False)
+        batches = [batch async for batch in client.frames(jobId)]
+        return (batches, await client.summary(jobId))
+
+    (batches, reply) = serve(test)
+    assert batches == []
+    assert reply["state"] == "failed"
+    assert reply["error"] == "RuntimeError: broken"
+
+
+def test_keepJobs():
+    async def test(server, client):
+        jobIds = []
+        for _ in range(5):
+            jobIds.append(await client.submit(loadScenario(), stream=False, lastFrame=10))
+            await client.summary(jobIds[-1])
+        await client.submit(loadScenario(), stream=False, lastFrame=10)
+        with raises(ServiceError, match="no job"):
+            await client.summary(jobIds[0])
+        return sorted(server.jobs)
+
+    assert serve(test, workers=0, keepJobs=2) == [3, 4, 5]
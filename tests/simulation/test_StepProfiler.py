@@ -0,0 +1,64 @@
+"""Test module sailsim.simulation.StepProfiler."""
+
+import json
+
+from pytest import approx
+
+from sailsim.simulation.Simulation import Simulation, BACKEND_KERNEL, BACKEND_PYTHON
+from sailsim.simulation.StepProfiler import StepProfiler, PHASES, PHASE_GRAB_FRAME, PHASE_KERNEL, PHASE_WIND
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.wind.Windfield import Windfield
+
+
+def createSimulation(record=True, backend=BACKEND_PYTHON):
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(10, 10, 2)])
+    boat.sailor.importBoat(boat)
+    return Simulation(boat, Windfield(0, 3), 0.01, record=record, backend=backend)
+
+
+def test_disabled():
+    simulation = createSimulation()
+    simulation.run(10)
+    assert simulation.profiler is None
+
+
+def test_phases():
+    simulation = createSimulation()
+    profiler = simulation.enableProfiler()
+    simulation.run(100)
+    stats = json.loads(json.dumps(profiler.stats()))
+    assert stats["steps"] == 100
+    for phase in PHASES:
+        assert stats["phases"][phase]["calls"] == (0 if phase == PHASE_KERNEL else 100)
+    assert sum(values["share"] for values in stats["phases"].values()) == approx(1)
+    assert profiler.totalTime() > 0
+    assert PHASE_WIND in profiler.report()
+    assert len(simulation.boat.frameList) == 100
+
+    # Profiled steps produce the same result
+    reference = createSimulation()
+    reference.run(100)
+    assert (simulation.boat.posX, simulation.boat.posY) == (reference.boat.posX, reference.boat.posY)
+
+    assert simulation.disableProfiler() is profiler
+    simulation.run(10)
+    assert profiler.steps == 100
+
+
+def test_noRecordAndKernel():
+    simulation = createSimulation(record=False)
+    profiler = simulation.enableProfiler()
+    simulation.run(10)
+    assert profiler.calls[PHASE_GRAB_FRAME] == 0
+
+    simulation.backend = BACKEND_KERNEL
+    simulation.run(20)
+    assert profiler.calls[PHASE_KERNEL] == 20
+    assert profiler.steps == 30
+
+    profiler.reset()
+    assert profiler.steps == 0 and profiler.totalTime() == 0
+    assert isinstance(profiler, StepProfiler)
@@ -0,0 +1,157 @@
+"""Test module sailsim.simulation.StopConditions."""
+
+import json
+import os
+
+from pytest import approx, raises
+
+from sailsim.simulation.Simulation import Simulation, BACKEND_KERNEL, BACKEND_PYTHON
+from sailsim.simulation.StopConditions import (StopCondition, CourseFinished, TimeLimit, DistanceLimit, Stalled, Predicate, Watchdog,
+                                               STOP_COURSE_FINISHED, STOP_DIVERGED, STOP_STALLED)
+from sailsim.simulation.scenario import createSimulation
+from sailsim.boat.Boat import Boat
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import Waypoint
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+
+SCENARIOS = os.path.join(os.path.dirname(__file__), "..", "scenarios")
+
+
+def loadSimulation(name):
+    with open(os.path.join(SCENARIOS, name), "r", encoding="utf-8") as file:
+        return createSimulation(json.load(file))
+
+
+def createWaypointSimulation(backend=BACKEND_PYTHON):
+    boat = Boat()
+    boat.sailor = Sailor([Waypoint(0, 2, 1)])
+    boat.sailor.importBoat(boat)
+    return Simulation(boat, Wind([Windfield(3, 0)]), 0.01, 5000, backend=backend)
+
+
+def test_noConditions():
+    simulation = createWaypointSimulation()
+    assert simulation.run(100) is None
+    assert simulation.frame == 100
+
+
+def test_courseFinished():
+    for backend in (BACKEND_PYTHON, BACKEND_KERNEL):
+        simulation = createWaypointSimulation(backend)
+        simulation.addStopCondition(CourseFinished(every=1))
+        assert simulation.run() == STOP_COURSE_FINISHED
+        assert simulation.stopReason == STOP_COURSE_FINISHED
+        assert simulation.boat.sailor.course.finished()
+        assert simulation.frame < 5000
+        assert len(simulation.boat.frameList) == simulation.frame
+
+        # The frame is the first one after the course was finished
+        reference = createWaypointSimulation(backend)
+        reference.run(simulation.frame - 1)
+        assert not reference.boat.sailor.course.finished()
+
+
+def test_every():
+    simulation = createWaypointSimulation()
+    simulation.addStopCondition(CourseFinished(every=7))
+    simulation.run()
+    assert simulation.frame % 7 == 0
+
+    calls = []
+    simulation = createWaypointSimulation()
+    simulation.addStopCondition([Predicate(lambda s: calls.append(s.frame), every=4), Predicate(lambda s: False, every=6)])
+    simulation.run(24)
+    assert calls == [4, 8, 12, 16, 20, 24]
+
+    with raises(ValueError):
+        Predicate(bool, every=0)
+    with raises(TypeError):
+        StopCondition()  # pylint: disable=abstract-class-instantiated
+
+
+def test_limits():
+    simulation = createWaypointSimulation()
+    simulation.addStopCondition(TimeLimit(1.5))
+    assert simulation.run() == TimeLimit.reason
+    assert simulation.frame == 150
+
+    simulation = createWaypointSimulation()
+    simulation.addStopCondition(DistanceLimit(1, every=1))
+    assert simulation.run() == DistanceLimit.reason
+    assert abs(simulation.boat.posX) > 1 or abs(simulation.boat.posY) > 1
+
+    simulation = createWaypointSimulation()
+    simulation.addStopCondition(Predicate(lambda s: s.boat.posY > 0.5, reason="halfway"))
+    assert simulation.run() == "halfway"
+
+
+def test_stalled():
+    simulation = Simulation(Boat(), Wind([]), 0.01, 10000)
+    condition = Stalled(minSpeed=0.1, duration=2)
+    simulation.addStopCondition(condition)
+    assert simulation.run() == STOP_STALLED
+    assert simulation.getTime() == approx(2.1)  # First check after 10 frames
+
+    # Running again after a reset starts a new stall
+    simulation.reset()
+    assert simulation.run() == STOP_STALLED
+    assert simulation.getTime() == approx(2.1)
+
+
+def test_watchdog():
+    simulation = loadSimulation("example.json")
+    with raises(OverflowError):
+        simulation.run()
+
+    simulation = loadSimulation("example.json")
+    simulation.addStopCondition(Watchdog())
+    assert simulation.run() == STOP_DIVERGED
+    assert simulation.frame < 1140
+
+    # A state that isn't finite is caught
+    boat = Boat(speedX=float("nan"))
+    simulation = Simulation(boat, Wind([Windfield(0, 1)]), 0.01, 100)
+    simulation.addStopCondition(Watchdog())
+    assert simulation.run() == STOP_DIVERGED
+
+    # Runaway speeds are caught before the physics overflows, both backends stop at the first frame that is too fast
+    frames = []
+    for backend in (BACKEND_PYTHON, BACKEND_KERNEL):
+        simulation = createWaypointSimulation(backend)
+        simulation.addStopCondition(Watchdog(maxSpeed=0.5))
+        assert simulation.run() == STOP_DIVERGED
+        assert 0.5 < simulation.boat.speedY < 0.6
+        frames.append(simulation.frame)
+    assert frames[0] == frames[1] > 1
+
+
+def test_watchdogKernel():
+    # The kernel stops by itself, a Watchdog doesn't split its run into single frames
+    simulation = createWaypointSimulation(BACKEND_KERNEL)
+    simulation.addStopCondition(Watchdog())
+    chunks = []
+    runKernel = simulation.runKernel
+    simulation.runKernel = lambda steps, windGrid: (chunks.append(steps), runKernel(steps, windGrid))
+    assert simulation.run(500) is None
+    assert chunks == [500]
+
+    simulation = loadSimulation("example.json")
+    simulation.backend = BACKEND_KERNEL
+    simulation.addStopCondition(Watchdog())
+    assert simulation.run() == STOP_DIVERGED
+
+
+def test_forkConditions():
+    simulation = Simulation(Boat(), Wind([]), 0.01, 10000)
+    simulation.addStopCondition(Stalled(minSpeed=0.1, duration=2))
+    assert simulation.run(100) is None
+    branch = simulation.fork()
+    assert branch.stopConditions[0].since == approx(0.1)
+    # The branch moves, its condition forgets the stall, the stall of the original goes on
+    branch.boat.speedX = 1
+    assert branch.run(10) is None
+    assert branch.stopConditions[0].since is None
+    assert simulation.stopConditions[0].since == approx(0.1)
+    assert simulation.run() == STOP_STALLED
+    assert simulation.getTime() == approx(2.1)
@@ -0,0 +1,129 @@
+"""Test module sailsim.simulation.kernel: the kernel has to produce the same frames as the Boat object."""
+
+from pytest import approx
+
+from sailsim.boat.Boat import Boat
+from sailsim.boat.FrameList import FRAME_FIELDS
+from sailsim.sailor.Sailor import Sailor
+from sailsim.sailor.Commands import HoldHeading, Tack, Wait, Waypoint
+from sailsim.simulation import kernel
+from sailsim.simulation.Simulation import Simulation, BACKEND_KERNEL, BACKEND_PYTHON
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+from sailsim.wind.Wind import Wind
+from sailsim.wind.Windfield import Windfield
+from sailsim.wind.WindGrid import WindGrid
+
+
+def runBackends(createSimulation, steps, simulations=None):
+    """Run the same simulation with both backends and return the frame lists."""
+    frameLists = []
+    for backend in (BACKEND_PYTHON, BACKEND_KERNEL):
+        simulation = createSimulation()
+        simulation.backend = backend
+        simulation.run(steps)
+        assert simulation.frame == steps
+        frameLists.append(simulation.boat.frameList)
+        if simulations is not None:
+            simulations.append(simulation)
+    return frameLists
+
+
+def assertSameFrames(frameListPython, frameListKernel):
+    assert len(frameListPython) == len(frameListKernel)
+    for (framePython, frameKernel) in zip(frameListPython, frameListKernel):
+        for field in FRAME_FIELDS:
+            assert getattr(frameKernel, field) == approx(getattr(framePython, field), rel=1e-9, abs=1e-9), (framePython.frameNr, field)
+
+
+def fixedBoat():
+    boat = Boat(1, 2, 0.5)
+    boat.mainSailAngle = 0.4
+    boat.rudderAngle = 0.05
+    return boat
+
+
+def test_fixedAngles():
+    def createSimulation():
+        return Simulation(fixedBoat(), Wind([Windfield(2, 3), Windfield(-1, 1)]), 0.01)
+    assertSameFrames(*runBackends(createSimulation, 2000))
+
+
+def test_sailor():
+    def createSimulation():
+        boat = Boat()
+        boat.sailor = Sailor([Waypoint(10, 10, 2), Waypoint(-10, 20, 2), Waypoint(0, 0, 2)])
+        boat.sailor.importBoat(boat)
+        return Simulation(boat, Windfield(0, 3), 0.01)
+    assertSameFrames(*runBackends(createSimulation, 3000))
+
+
+class GentleSailor(Sailor):
+    def run(self, *args):
+        super().run(*args)
+        self.rudderAngle *= 0.5
+
+
+def test_commands():
+    """All commands are compiled into the kernel, the sailor ends in the same state."""
+    def createSimulation():
+        boat = Boat()
+        boat.sailor = Sailor([Waypoint(5, 5, 2), HoldHeading(1, 3), Wait(9), Tack(), Waypoint(-10, 20, 2), Waypoint(0, 0, 2)])
+        boat.sailor.importBoat(boat)
+        return Simulation(boat, Windfield(0, 3), 0.01)
+    assert kernel.supportsSailor(createSimulation().boat.sailor)
+    simulations = []
+    assertSameFrames(*runBackends(createSimulation, 4000, simulations))
+    (sailorPython, sailorKernel) = (simulation.boat.sailor for simulation in simulations)
+    assert sailorKernel.course.index == sailorPython.course.index > 3
+    assert sailorKernel.course.entered == sailorPython.course.entered
+    for name in ("destX", "destY", "holdDirection", "holdUntil", "trueWindDir", "compass", "boatDirection", "rudderAngle", "mainSailAngle"):
+        assert getattr(sailorKernel, name) == approx(getattr(sailorPython, name), rel=1e-9, abs=1e-9), name
+
+    # Continuing with the Python backend gives the same frames
+    for simulation in simulations:
+        simulation.backend = BACKEND_PYTHON
+        simulation.run(500)
+    assertSameFrames(*(simulation.boat.frameList for simulation in simulations))
+
+
+def test_pythonSailor():
+    """Sailors the kernel doesn't know are run in Python between the kernel steps."""
+    def createSimulation():
+        boat = Boat()
+        boat.sailor = GentleSailor([Waypoint(10, 10, 2), Waypoint(-10, 20, 2)])
+        boat.sailor.importBoat(boat)
+        return Simulation(boat, Windfield(0, 3), 0.01)
+    assert not kernel.supportsSailor(createSimulation().boat.sailor)
+    assertSameFrames(*runBackends(createSimulation, 2000))
+
+
+def test_noSteps():
+    simulation = Simulation(fixedBoat(), Windfield(1, 2), 0.01, backend=BACKEND_KERNEL)
+    simulation.run(10)
+    forceX = simulation.boat.temp_forceX
+    simulation.runKernel(0, simulation.kernelWind(1))
+    assert simulation.frame == 10
+    assert simulation.boat.temp_forceX == forceX
+
+
+def test_windGrid():
+    windGrid = WindGrid.sample(Fluctuationfield(1, 3, amplitude=2, scale=16, speed=4), -20, -20, 9, 9, 5, times=4, timeStep=5)
+    assert windGrid.getWindCart(-20, -20, 0) == approx(tuple(windGrid.data[0, 0, 0]))
+    assert windGrid.getWindCart(-17.5, -20, 0) == approx(tuple(windGrid.data[0, 0, 0:2].mean(axis=0)))
+    assert windGrid.getWindCart(-100, 100, 100) == approx(tuple(windGrid.data[-1, -1, 0]))
+
+    def createSimulation():
+        return Simulation(fixedBoat(), windGrid, 0.01)
+    assertSameFrames(*runBackends(createSimulation, 2000))
+
+
+def test_noRecord():
+    simulations = []
+    for backend in (BACKEND_PYTHON, BACKEND_KERNEL):
+        simulation = Simulation(fixedBoat(), Windfield(1, 2), 0.01, record=False, backend=backend)
+        simulation.run(500)
+        assert len(simulation.boat.frameList) == 0
+        simulations.append(simulation)
+    (boatPython, boatKernel) = (simulations[0].boat, simulations[1].boat)
+    assert (boatKernel.posX, boatKernel.posY, boatKernel.direction) == approx((boatPython.posX, boatPython.posY, boatPython.direction))
+    assert boatKernel.temp_forceX == approx(boatPython.temp_forceX)
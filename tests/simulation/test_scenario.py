@@ -0,0 +1,116 @@
+"""Test module sailsim.simulation.scenario."""
+
+import os
+
+from pytest import approx, raises
+
+from sailsim.simulation import scenario as scenarioModule
+from sailsim.simulation.scenario import ScenarioError, createSimulation, loadScenario, parseScenario, scenarioHash, validateScenario
+from sailsim.sailor.Commands import Waypoint, HoldHeading
+from sailsim.wind.Windfield import Windfield
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scenarios")
+
+
+def test_loadScenario():
+    simulation = createSimulation(loadScenario(os.path.join(SCENARIO_DIR, "example.json")))
+    assert simulation.timestep == 0.01
+    assert simulation.lastFrame == 10000
+    assert isinstance(simulation.wind.winds[0], Fluctuationfield)
+    assert len(simulation.boat.sailor.commandList) == 6
+
+
+def test_createSimulation():
+    scenario = {
+        "timestep": 0.02,
+        "boat": {"posX": 1, "posY": 2, "mass": 100, "sailArea": 5},
+        "wind": [{"type": "Windfield", "x": 1, "y": 2}, {"type": "Windfield", "x": 0, "y": 1}],
+        "sailor": {
+            "rudderGain": 0.8,
+            "commands": [{"type": "Waypoint", "destX": 5, "destY": 5, "radius": 1}, {"type": "HoldHeading", "direction": 1, "duration": 10}],
+        },
+    }
+    simulation = createSimulation(scenario)
+    boat = simulation.boat
+    assert (boat.posX, boat.posY, boat.mass, boat.sailArea) == (1, 2, 100, 5)
+    assert boat.momentumInertia == approx(1/12 * 100 * (boat.length**2 + boat.width**2))
+    assert simulation.lastFrame is None
+    assert all(isinstance(windfield, Windfield) for windfield in simulation.wind.winds)
+    assert simulation.wind.getWindCart(0, 0, 0) == (1, 3)
+
+    sailor = boat.sailor
+    assert sailor.rudderGain == 0.8
+    assert sailor.sailArea == 5
+    assert isinstance(sailor.commandList[0], Waypoint) and isinstance(sailor.commandList[1], HoldHeading)
+
+    # Without sailor
+    simulation = createSimulation({"timestep": 0.01, "wind": [{"type": "Windfield", "x": 0, "y": 3}]})
+    assert simulation.boat.sailor is None
+    simulation.run(10)
+
+    with raises(ScenarioError):
+        createSimulation({"timestep": 0.01, "wind": [{"type": "Hurricane"}]})
+
+
+def test_validateScenario():
+    canonical = validateScenario({"timestep": 1, "wind": [{"type": "Fluctuationfield"}], "sailor": {}})
+    assert canonical["timestep"] == 1.0 and isinstance(canonical["timestep"], float)
+    assert canonical["wind"][0] == {"type": "Fluctuationfield", "x": 0.0, "y": 0.0, "amplitude": 1.0, "scale": 64.0, "speed": 16.0, "noiseSeed": 0}
+    assert canonical["boat"]["mass"] == 80
+    assert "momentumInertia" not in canonical["boat"]
+    assert canonical["sailor"]["commands"] == []
+
+    invalid = [
+        ({}, "timestep: missing"),
+        ({"timestep": -1}, "timestep: has to be positive"),
+        ({"timestep": 1, "lastFrame": 1.5}, "lastFrame: expected an integer"),
+        ({"timestep": 1, "boat": {"weight": 1}}, "boat: unknown keys weight"),
+        ({"timestep": 1, "boat": {"mass": "heavy"}}, "boat.mass: expected a number"),
+        ({"timestep": 1, "wind": [{"type": "Windfield", "x": 1}]}, "wind[0].y: missing"),
+        ({"timestep": 1, "sailor": {"commands": [{"type": "Waypoint", "destX": 1, "destY": 1, "radius": True}]}}, "sailor.commands[0].radius: expected a number"),
+        ({"timestep": 1, "sailor": {"commands": [{"type": "Jibe"}]}}, "sailor.commands[0].type"),
+    ]
+    for (scenario, message) in invalid:
+        with raises(ScenarioError, match=message.replace("[", r"\[").replace("]", r"\]")):
+            validateScenario(scenario)
+
+
+def test_scenarioHash():
+    scenario = {"name": "a", "timestep": 0.01, "wind": [{"type": "Windfield", "x": 0, "y": 3}]}
+    same = {"wind": [{"y": 3.0, "x": 0.0, "type": "Windfield"}], "timestep": 0.01, "boat": {"mass": 80}, "name": "b"}
+    assert scenarioHash(scenario) == scenarioHash(same)
+    assert scenarioHash(scenario) != scenarioHash(dict(scenario, timestep=0.02))
+    assert len(scenarioHash(scenario)) == 64
+
+
+def test_toml(tmp_path):
+    text = '''
+name = "toml"
+timestep = 0.01
+lastFrame = 100
+
+[[wind]]
+type = "Windfield"
+x = 0
+y = 3
+
+[sailor]
+rudderGain = 0.6
+commands = [{type = "Waypoint", destX = 10, destY = 10, radius = 2}]
+'''
+    scenario = parseScenario(text, "toml")
+    assert scenario["sailor"]["commands"][0]["destX"] == 10
+    equivalent = {"name": "json", "timestep": 0.01, "lastFrame": 100, "wind": [{"type": "Windfield", "x": 0, "y": 3}],
+                  "sailor": {"rudderGain": 0.6, "commands": [{"type": "Waypoint", "destX": 10, "destY": 10, "radius": 2}]}}
+    assert scenarioHash(scenario) == scenarioHash(equivalent)
+    with raises(ScenarioError):
+        parseScenario("timestep = ", "toml")
+
+    # Cached loading
+    path = tmp_path / "scenario.toml"
+    path.write_text(text, encoding="utf-8")
+    first = loadScenario(str(path))
+    first["timestep"] = 1
+    assert loadScenario(str(path))["timestep"] == 0.01
+    assert str(path.resolve()) in scenarioModule._cache  # pylint: disable=protected-access
@@ -0,0 +1,39 @@
+"""Test the regression detection of tests.benchmark."""
+
+from tests import benchmark
+
+
+def test_mannWhitneyU():
+    fast = [1.0, 1.1, 0.9, 1.05, 0.95, 1.02, 0.98, 1.01]
+    slow = [value * 1.5 for value in fast]
+    assert benchmark.mannWhitneyU(fast, slow) < 0.01
+    assert benchmark.mannWhitneyU(slow, fast) > 0.99
+    assert 0.3 < benchmark.mannWhitneyU(fast, fast) < 0.7
+    assert benchmark.mannWhitneyU([1, 1, 1], [1, 1, 1]) == 1.0
+
+
+def test_compare():
+    baseline = [1.0, 1.1, 0.9, 1.05, 0.95, 1.02, 0.98, 1.01]
+    assert benchmark.compare(baseline, [value * 1.5 for value in baseline])[2]
+    assert not benchmark.compare(baseline, [value * 1.02 for value in baseline])[2]  # below threshold
+    assert not benchmark.compare(baseline, [value * 0.5 for value in baseline])[2]  # faster
+
+
+def test_baseline(tmp_path):
+    path = str(tmp_path / "machine.json")
+    assert benchmark.loadBaseline(path) == {}
+    benchmark.saveBaseline(path, {"a": [1.0, 2.0]})
+    benchmark.saveBaseline(path, {"b": [3.0]})
+    assert benchmark.loadBaseline(path) == {"a": [1.0, 2.0], "b": [3.0]}
+    assert benchmark.selectBenchmarks(["step."]) == [name for name in benchmark.BENCHMARKS if name.startswith("step.")]
+
+
+def test_selfTimed(tmp_path, monkeypatch):
+    # The import benchmark reports the time measured in the subprocess, not the time of the whole subprocess
+    monkeypatch.setattr(benchmark, "importTime", lambda: 1.0)
+    assert benchmark.measure("import.core", 3) == [1.0, 1.0, 1.0]
+
+    # The import budget is only checked if the import benchmark ran
+    baseline = str(tmp_path / "machine.json")
+    assert benchmark.main(["simulation.reset", "--repeat", "2", "--baseline", baseline]) == 0
+    assert benchmark.main(["import.core", "--repeat", "2", "--baseline", baseline]) == 1
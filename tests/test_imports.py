@@ -0,0 +1,37 @@
+"""Test that headless use of sailsim only loads what it needs."""
+
+import json
+import subprocess
+import sys
+
+from tests.benchmark import CORE_IMPORT, HEAVY_MODULES
+
+
+def loadedModules(statement):
+    """Run statement in a fresh interpreter and return the heavy modules it loaded."""
+    script = f"import sys, json\n{statement}\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    process = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return json.loads(process.stdout)
+
+
+def test_coreImport():
+    assert loadedModules(CORE_IMPORT) == []
+    assert loadedModules("import sailsim") == []
+
+
+def test_constantWindRun():
+    statement = (
+        "from sailsim import Simulation, Boat, Sailor, Wind, Windfield\n"
+        "boat = Boat()\n"
+        "boat.sailor = Sailor([])\n"
+        "boat.sailor.importBoat(boat)\n"
+        "Simulation(boat, Wind([Windfield(0, 3)]), 0.01).run(100)"
+    )
+    assert loadedModules(statement) == []
+
+
+def test_lazyAttributes():
+    import sailsim  # pylint: disable=import-outside-toplevel
+    assert sailsim.Simulation.__name__ == "Simulation"
+    assert sailsim.wind.__name__ == "sailsim.wind"
+    assert "Boat" in dir(sailsim)
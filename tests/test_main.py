@@ -0,0 +1,55 @@
+"""Test the command line interface in sailsim.main."""
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+from sailsim.boat.FrameList import FRAME_FIELDS
+from sailsim.main import main, outputNames, runScenario, OUTPUT_BINARY, OUTPUT_CSV, OUTPUT_SUMMARY
+
+SCENARIO = os.path.join(os.path.dirname(__file__), "scenarios", "constant.json")
+
+
+def test_runScenario(tmp_path):
+    summary = runScenario(SCENARIO, str(tmp_path), (OUTPUT_CSV, OUTPUT_BINARY, OUTPUT_SUMMARY), lastFrame=99)
+    assert summary["frames"] == 100
+    assert not summary["diverged"]
+    assert summary["courseFinished"] is False
+
+    trajectory = np.load(tmp_path / "constant.npy")
+    assert trajectory.shape == (100, len(FRAME_FIELDS))
+    assert trajectory[-1, 0] == 99
+    with open(tmp_path / "constant.csv", encoding="utf-8") as file:
+        assert len(file.readlines()) == 101
+    with open(tmp_path / "constant.json", encoding="utf-8") as file:
+        assert json.load(file)["posX"] == summary["posX"]
+
+
+def test_main(tmp_path, capsys):
+    output = str(tmp_path / "out")
+    assert main([SCENARIO, "-o", output, "--last-frame", "49", "--jobs", "2"]) == 0
+    assert os.listdir(output) == ["constant.json"]
+    assert capsys.readouterr().out.count("ok, 50 frames") == 1
+
+    assert main([str(tmp_path / "missing.json"), "-o", output]) == 1
+
+
+def test_outputNames(tmp_path, capsys):
+    assert outputNames(["a/upwind.json", "b/downwind.toml"]) == ["upwind", "downwind"]
+    assert outputNames(["races/a/upwind.json", "races/b/upwind.json", "other.json"]) == ["a_upwind", "b_upwind", "other"]
+    assert outputNames(["upwind.json", "upwind.json"]) == ["upwind", "upwind-2"]
+
+    # Scenarios with the same file name run in parallel without overwriting each other
+    for folder in ("light", "strong"):
+        os.makedirs(tmp_path / folder)
+        shutil.copy(SCENARIO, tmp_path / folder / "constant.json")
+    output = str(tmp_path / "out")
+    paths = [str(tmp_path / "light" / "constant.json"), str(tmp_path / "strong" / "constant.json")]
+    assert main(paths + ["-o", output, "--last-frame", "49", "--jobs", "2"]) == 0
+    assert sorted(os.listdir(output)) == ["light_constant.json", "strong_constant.json"]
+    for (path, name) in zip(paths, ("light_constant.json", "strong_constant.json")):
+        with open(os.path.join(output, name), encoding="utf-8") as file:
+            assert json.load(file)["scenario"] == path
+    assert capsys.readouterr().out.count("ok, 50 frames") == 2
@@ -0,0 +1,53 @@
+"""Test module sailsim.utils.SpatialHash against comparing every pair."""
+
+from random import Random
+
+import pytest
+
+from sailsim.utils.SpatialHash import SpatialHash
+
+
+def randomPoints(count, size, seed=1):
+    rng = Random(seed)
+    return [(rng.uniform(-size, size), rng.uniform(-size, size)) for _ in range(count)]
+
+
+def bruteForcePairs(points, radius):
+    pairs = set()
+    for i, (x1, y1) in enumerate(points):
+        for j in range(i + 1, len(points)):
+            (x2, y2) = points[j]
+            if (x2 - x1)**2 + (y2 - y1)**2 < radius**2:
+                pairs.add((i, j))
+    return pairs
+
+
+@pytest.mark.parametrize("cellSize,radius", [(10, 10), (10, 4), (4, 10), (0.5, 3)])
+def test_pairs(cellSize, radius):
+    points = randomPoints(300, 50)
+    spatialHash = SpatialHash(cellSize)
+    spatialHash.build(points)
+    assert len(spatialHash) == 300
+    found = []
+    for (i, j, dx, dy, distanceSq) in spatialHash.pairs(radius):
+        assert dx == pytest.approx(points[j][0] - points[i][0])
+        assert dy == pytest.approx(points[j][1] - points[i][1])
+        assert distanceSq == pytest.approx(dx * dx + dy * dy)
+        found.append((min(i, j), max(i, j)))
+    assert len(found) == len(set(found))  # Every pair once
+    assert set(found) == bruteForcePairs(points, radius)
+
+
+def test_query():
+    points = randomPoints(200, 30, seed=2)
+    spatialHash = SpatialHash(5)
+    spatialHash.build(points)
+    for (x, y) in [(0, 0), (12.5, -7), (-30, 30)]:
+        expected = {index for (index, (px, py)) in enumerate(points) if (px - x)**2 + (py - y)**2 < 8**2}
+        assert set(spatialHash.query(x, y, 8)) == expected
+
+    spatialHash.build([])
+    assert spatialHash.query(0, 0, 8) == []
+    assert list(spatialHash.pairs(8)) == []
+    with pytest.raises(ValueError):
+        SpatialHash(0)
@@ -0,0 +1,110 @@
+"""Test module sailsim.utils.vectorized against the scalar functions."""
+
+from math import atan, pi, nextafter
+from random import Random
+
+import numpy as np
+from pytest import approx
+
+from sailsim.utils import coordconversion, anglecalculations, vectorized
+
+
+def referenceCartToArg(cartX, cartY):
+    """Original branchy implementation of coordconversion.cartToArg."""
+    if cartY != 0:
+        if cartY < 0:
+            return atan(cartX / cartY) + pi
+        if cartX < 0:
+            return atan(cartX / cartY) + 2 * pi
+        return atan(cartX / cartY)
+    if cartX > 0:
+        return pi / 2
+    if cartX == 0:
+        return 0
+    return 3 / 2 * pi
+
+
+# Edge cases: zeros with both signs, axes, tiny and huge values
+EDGE_VALUES = [0.0, -0.0, 1.0, -1.0, 1e-300, -1e-300, 5e-324, -5e-324, 1e300, -1e300, 0.5, -0.5, 3.0, -4.0]
+
+
+def sameDirection(argA, argB, tolerance=1e-12):
+    """Compare two arguments modulo 2*pi. The original cartToArg may return 2*pi instead of 0."""
+    return abs(anglecalculations.angleKeepInterval(argA - argB)) <= tolerance * max(1, abs(argB))
+
+
+def randomPoints(count=2000, seed=0):
+    rand = Random(seed)
+    points = [(x, y) for x in EDGE_VALUES for y in EDGE_VALUES]
+    points += [(rand.uniform(-100, 100), rand.uniform(-100, 100)) for _ in range(count)]
+    return points
+
+
+def anglesAroundPi():
+    """Angles at and next to the interval borders 0, +-pi, +-2*pi and +-3*pi."""
+    angles = []
+    for border in (0, pi, -pi, 2 * pi, -2 * pi, 3 * pi, -3 * pi + 1e-9):
+        angles += [border, nextafter(border, 10), nextafter(border, -10)]
+    rand = Random(1)
+    angles += [rand.uniform(-3 * pi + 1e-9, 3 * pi) for _ in range(2000)]
+    return angles
+
+
+def test_cartToArgScalar():
+    for (x, y) in randomPoints():
+        assert sameDirection(coordconversion.cartToArg(x, y), referenceCartToArg(x, y)), (x, y)
+        assert 0 <= coordconversion.cartToArg(x, y) < 2 * pi
+
+
+def test_cartToArgArray():
+    points = randomPoints()
+    xs = np.array([p[0] for p in points])
+    ys = np.array([p[1] for p in points])
+    result = vectorized.cartToArg(xs, ys)
+    expected = [coordconversion.cartToArg(x, y) for (x, y) in points]
+    assert result.tolist() == approx(expected, rel=1e-12, abs=1e-15)
+
+    # Compass convention
+    assert vectorized.cartToArg([0, 1, 1, 1, 0, -1, -1, -1, 0], [1, 1, 0, -1, -1, -1, 0, 1, 0]).tolist() == \
+        approx([0, 1/4 * pi, 2/4 * pi, 3/4 * pi, pi, 5/4 * pi, 6/4 * pi, 7/4 * pi, 0])
+    assert vectorized.cartToArg(-0.0, -0.0) == 0
+    assert vectorized.cartToArg(-0.0, -1.0) == approx(pi)
+    assert 0 <= result.min() and result.max() < 2 * pi
+    assert vectorized.cartToArg(-1e-300, 1.0) == coordconversion.cartToArg(-1e-300, 1.0) == 0
+
+
+def test_cartToPolarArray():
+    points = randomPoints()
+    xs = np.array([p[0] for p in points])
+    ys = np.array([p[1] for p in points])
+    (radius, argument) = vectorized.cartToPolar(xs, ys)
+    for i, (x, y) in enumerate(points):
+        if abs(x) > 1e150 or abs(y) > 1e150:
+            continue  # the scalar version overflows
+        (expectedRadius, expectedArgument) = coordconversion.cartToPolar(x, y)
+        assert radius[i] == approx(expectedRadius, rel=1e-12)
+        assert argument[i] == approx(expectedArgument, rel=1e-12, abs=1e-15)
+    assert vectorized.cartToRadiusSq(xs[-100:], ys[-100:]).tolist() == approx([x**2 + y**2 for (x, y) in points[-100:]])
+
+
+def test_polarToCartArray():
+    rand = Random(2)
+    radii = [0, 1, -2, 1e-9] + [rand.uniform(-10, 10) for _ in range(500)]
+    args = anglesAroundPi()[:len(radii)]
+    (xs, ys) = vectorized.polarToCart(radii, args)
+    for i, (r, a) in enumerate(zip(radii, args)):
+        assert (xs[i], ys[i]) == approx(coordconversion.polarToCart(r, a), rel=1e-12, abs=1e-12)
+
+
+def test_angleKeepIntervalArray():
+    angles = anglesAroundPi()
+    result = vectorized.angleKeepInterval(angles)
+    assert result.tolist() == [anglecalculations.angleKeepInterval(a) for a in angles]
+    assert vectorized.angleKeepInterval(pi) == pi
+    assert vectorized.angleKeepInterval(-pi) == pi
+
+
+def test_directionKeepIntervalArray():
+    angles = anglesAroundPi()
+    result = vectorized.directionKeepInterval(angles)
+    assert result.tolist() == [anglecalculations.directionKeepInterval(a) for a in angles]
@@ -1,5 +1,7 @@
 """Test sailsim.wind.Fluctuationfield.Fluctuationfield."""
 
+from pytest import approx
+
 from sailsim.wind.Fluctuationfield import Fluctuationfield
 
 
@@ -16,3 +18,13 @@ class TestWind:
         assert self.ff.getWindCart(0, 0, 0) == (2, 7)
         assert self.ff.getWindCart(8, 2, 4) == (2, 7)
         # TODO think of more tests
+
+    def test_getWindCartGrid(self):
+        ff = Fluctuationfield(1, -2, 3, 40, 8, 5)
+        xs = [-70.5, 0, 3, 120]
+        ys = [-9, 0.25, 44]
+        (windX, windY) = ff.getWindCartGrid(xs, ys, 12.5)
+        assert windX.shape == windY.shape == (3, 4)
+        for (iy, y) in enumerate(ys):
+            for (ix, x) in enumerate(xs):
+                assert (windX[iy, ix], windY[iy, ix]) == approx(ff.getWindCart(x, y, 12.5))
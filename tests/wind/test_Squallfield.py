@@ -0,0 +1,18 @@
+"""Test sailsim.wind.Squallfield.Squallfield."""
+
+import numpy as np
+from pytest import approx
+
+from sailsim.wind.Squallfield import Squallfield
+
+
+def test_getWindCartGrid():
+    field = Squallfield(3, 1, 2.5, noiseSeed=4)
+    xs = np.linspace(-12, 12, 41)
+    ys = np.linspace(-7, 9, 23)
+    (windX, windY) = field.getWindCartGrid(xs, ys, 1.7)
+    assert windX.shape == windY.shape == (23, 41)
+    assert np.count_nonzero(windX) > 0
+    for (iy, y) in enumerate(ys):
+        for (ix, x) in enumerate(xs):
+            assert (windX[iy, ix], windY[iy, ix]) == approx(field.getWindCart(x, y, 1.7))
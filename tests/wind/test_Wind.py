@@ -4,6 +4,8 @@ from pytest import approx
 from math import pi, sqrt
 
 from sailsim.wind.Wind import Wind
+from sailsim.wind.Fluctuationfield import Fluctuationfield
+from sailsim.wind.WindGrid import WindGrid
 from sailsim.wind.Windfield import Windfield
 
 
@@ -33,3 +35,13 @@ class TestWind():
 
         self.w.winds = [Windfield(-1, 1)]
         assert self.w.getWind(0, 0, 0) == approx((sqrt(2), 7/4*pi))
+
+    def test_getWindCartGrid(self):
+        xs = [-40, 0, 13.5, 70]
+        ys = [-5, 20, 60]
+        self.w.winds = [Windfield(2, 1), Fluctuationfield(1, 0, 2, 50, 10, 3), WindGrid.sample(Fluctuationfield(), -50, -50, 10, 10, 15, 0, 3, 5)]
+        (windX, windY) = self.w.getWindCartGrid(xs, ys, 7.3)
+        assert windX.shape == windY.shape == (3, 4)
+        for (iy, y) in enumerate(ys):
+            for (ix, x) in enumerate(xs):
+                assert (windX[iy, ix], windY[iy, ix]) == approx(self.w.getWindCart(x, y, 7.3))